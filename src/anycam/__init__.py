@@ -192,6 +192,8 @@ def register():
         ap_ac_props.register()
         ap_ac_ui.register()
         ops_ap_ac.register()
+        ops.RegisterCameraViewCacheHandlers()
+        ops.RegisterRenderCullHandlers()
     except Exception as Ex:
         print("Error registering AnyCam plugin classes.")
         print(Ex)
@@ -216,6 +218,8 @@ def unregister():
         ap_ac_ui.unregister()
         ap_ac_props.unregister()
         ops_ap_ac.unregister()
+        ops.UnregisterCameraViewCacheHandlers()
+        ops.UnregisterRenderCullHandlers()
     except Exception as Ex:
         print("Error unregistering AnyCam plugin classes.")
         print(Ex)
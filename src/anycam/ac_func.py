@@ -243,6 +243,78 @@ def ActivateSelectedCamera(self, context):
 # enddef
 
 
+#######################################################################################
+# Exclude objects from rendering, which are outside the views of the active camera or the selected camera set
+def CullRenderObjects(self, context):
+
+    xAcProps = context.window_manager.AcProps
+
+    try:
+        if xAcProps.bRenderCullCameraSet is True:
+            xAcCamSet = context.scene.AcPropsCamSets.Selected
+            if xAcCamSet is None:
+                raise Exception("No camera set selected")
+            # endif
+
+            lCameras = [
+                (xCamLoc.sAnyCamLabel, ops.GetAnyCamMatrixAtLocation(xCamLoc.sAnyCamLabel, xCamLoc.objLocation))
+                for xCamLoc in xAcCamSet.clCameras
+            ]
+        else:
+            objCam = context.scene.camera
+            if objCam is None:
+                raise Exception("Scene has no active camera")
+            # endif
+
+            lCameras = [(objCam.name, None)]
+        # endif
+
+        if len(lCameras) == 0:
+            raise Exception("No cameras to cull objects for")
+        # endif
+
+        dicResult = ops.CullRenderObjects(
+            context,
+            lCameras,
+            fMargin_m=xAcProps.fRenderCullMargin_m,
+            bRestoreAfterRender=xAcProps.bRenderCullRestoreAfterRender,
+        )
+
+        self.report(
+            {"INFO"},
+            "Culled {0} of {1} objects with {2} of {3} faces, saving about {4:.0f}% of the BVH build time".format(
+                len(dicResult["lCulledNames"]),
+                dicResult["iObjectCnt"],
+                dicResult["iCulledFaceCnt"],
+                dicResult["iFaceCnt"],
+                100.0 * dicResult["fBvhTimeSavedRatio"],
+            ),
+        )
+
+    except Exception as xEx:
+        self.report({"ERROR"}, str(xEx))
+    # endtry
+
+
+# enddef
+
+
+#######################################################################################
+# Restore objects excluded from rendering by CullRenderObjects()
+def RestoreCulledRenderObjects(self, context):
+
+    try:
+        iCnt = ops.RestoreCulledRenderObjects()
+        self.report({"INFO"}, "Restored {0} culled objects".format(iCnt))
+
+    except Exception as xEx:
+        self.report({"ERROR"}, str(xEx))
+    # endtry
+
+
+# enddef
+
+
 #######################################################################################
 # Activate selected camera
 def RemoveSelectedCamera(self, context):
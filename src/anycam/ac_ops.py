@@ -228,6 +228,43 @@ class COpTransformSceneToCameraFrame(bpy.types.Operator):
 # endclass
 
 
+#######################################################################
+# Cull objects outside the camera views for rendering
+class COpCullRenderObjects(bpy.types.Operator):
+    bl_idname = "ac.cull_render_objects"
+    bl_label = "Cull render objects"
+    bl_description = (
+        "Click to exclude all objects from rendering, which are outside the views of the active camera "
+        "or the selected camera set. Culled objects do not cast shadows or reflections."
+    )
+
+    def execute(self, context):
+        ac_func.CullRenderObjects(self, context)
+        return {"FINISHED"}
+
+    # enddef
+
+
+# endclass
+
+
+#######################################################################
+# Restore objects culled for rendering
+class COpRestoreCulledRenderObjects(bpy.types.Operator):
+    bl_idname = "ac.restore_culled_render_objects"
+    bl_label = "Restore culled render objects"
+    bl_description = "Click to include all objects in rendering again, which were culled."
+
+    def execute(self, context):
+        ac_func.RestoreCulledRenderObjects(self, context)
+        return {"FINISHED"}
+
+    # enddef
+
+
+# endclass
+
+
 #######################################################################################
 # Register
 
@@ -244,6 +281,8 @@ def register():
     bpy.utils.register_class(COpApplyRenderParsFromSelectedCamera)
     bpy.utils.register_class(COpSelectSelectedCamera)
     bpy.utils.register_class(COpTransformSceneToCameraFrame)
+    bpy.utils.register_class(COpCullRenderObjects)
+    bpy.utils.register_class(COpRestoreCulledRenderObjects)
 
 
 # enddef
@@ -251,6 +290,8 @@ def register():
 
 def unregister():
 
+    bpy.utils.unregister_class(COpRestoreCulledRenderObjects)
+    bpy.utils.unregister_class(COpCullRenderObjects)
     bpy.utils.unregister_class(COpSelectSelectedCamera)
     bpy.utils.unregister_class(COpApplyRenderParsFromSelectedCamera)
     bpy.utils.unregister_class(COpAssignRenderParsToSelectedCamera)
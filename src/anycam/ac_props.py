@@ -183,6 +183,21 @@ class CPgAcPropsWnd(bpy.types.PropertyGroup):
     bApplyRenderParsOnActivation: bpy.props.BoolProperty(default=True)
     bTransformSceneToCameraFrame: bpy.props.BoolProperty(default=False, update=Update_TransformSceneToCameraFrame)
 
+    bRenderCullCameraSet: bpy.props.BoolProperty(
+        default=False,
+        description="Cull objects outside the views of all cameras of the selected camera set, "
+        "instead of the active camera.",
+    )
+    fRenderCullMargin_m: bpy.props.FloatProperty(
+        default=1.0,
+        min=0.0,
+        description="Margin in meters the objects are expanded by before they are tested against the camera views.",
+    )
+    bRenderCullRestoreAfterRender: bpy.props.BoolProperty(
+        default=True,
+        description="Restore culled objects when the next render is completed or cancelled.",
+    )
+
     iLftRenderWavelength: bpy.props.IntProperty(
         default=520,
         get=GetLftWavelength,
@@ -356,6 +356,17 @@ class AC_PT_Render(bpy.types.Panel):
         yRow.operator("ac.apply_render_pars_from_selected_camera", text="Apply", emboss=True)
         yRow.enabled = bValidCamSel
 
+        yRow = layout.row()
+        yRow.label(text="Render Culling")
+        yRow = layout.row()
+        yRow.prop(xAcProps, "bRenderCullCameraSet", text="Camera Set")
+        yRow.prop(xAcProps, "fRenderCullMargin_m", text="Margin")
+        yRow = layout.row()
+        yRow.prop(xAcProps, "bRenderCullRestoreAfterRender", text="Restore after Render")
+        yRow = layout.row()
+        yRow.operator("ac.cull_render_objects", text="Cull", emboss=True)
+        yRow.operator("ac.restore_culled_render_objects", text="Restore", emboss=True)
+
         yRow = layout.row()
         yRow.label(text="LFT Wavelength")
         yRow.prop(xAcProps, "iLftRenderWavelength", text="")
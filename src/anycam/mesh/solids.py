@@ -317,3 +317,36 @@ def CreateFrustumPanoFovRange(*, sName, lFovRange_deg, fFovMax_deg, iResolution,
 
 
 # enddef
+
+
+#####################################################################################
+def CreateObjectFromMeshArrays(*, sName, aVex, aLoopVex, aLoopStart, aLoopTotal):
+    """Create a mesh object from flat vertex and face loop arrays, as provided by
+    CCameraLut.GetFrustumMeshArrays(). The arrays are copied with foreach_set(),
+    which avoids creating Python objects per vertex and face.
+    The object is not linked to a collection.
+    """
+    meshF = bpy.data.meshes.new(sName + "_mesh")
+    objF = bpy.data.objects.new(sName, meshF)
+    objF.location = (0, 0, 0)
+
+    meshF.vertices.add(aVex.shape[0])
+    meshF.vertices.foreach_set("co", np.ascontiguousarray(aVex, dtype=np.float32).reshape(-1))
+
+    meshF.loops.add(aLoopVex.shape[0])
+    meshF.loops.foreach_set("vertex_index", np.ascontiguousarray(aLoopVex, dtype=np.int32))
+
+    meshF.polygons.add(aLoopStart.shape[0])
+    meshF.polygons.foreach_set("loop_start", np.ascontiguousarray(aLoopStart, dtype=np.int32))
+    # Since Blender 4.0 the loop totals are derived from the loop starts and are read-only
+    if bpy.app.version < (4, 0, 0):
+        meshF.polygons.foreach_set("loop_total", np.ascontiguousarray(aLoopTotal, dtype=np.int32))
+    # endif
+
+    meshF.update(calc_edges=True)
+    meshF.validate(verbose=False)
+
+    return objF
+
+
+# enddef
@@ -20,12 +20,15 @@
 # </LICENSE>
 """
 Code to create a lookup table of ray directions for every pixel on the
-sensor. This version contains the opencv camera model with up to three radial
-distortion parameters. In future, it could also be extended to other camera
-models.
+sensor. This version contains the opencv camera model with radial (including
+the rational model), tangential, thin prism and sensor tilt distortion.
+If only up to three radial distortion parameters are given, the faster
+radial inversion is used. The OpenCV fisheye (Kannala-Brandt) model is
+supported via create_lookup_fisheye().
 
 To create the lookup table of a given camera, call the function
-create_lookup(_tSensorSizeXY, _tFocLenXY, _tImgCtrXY, _tDistRad, _bBlenderFormat=True)
+create_lookup(_tSensorSizeXY, _tFocLenXY, _tImgCtrXY, _tDistRad, _bBlenderFormat=True,
+              _tDistTan=None, _tDistPrism=None, _tDistTilt=None)
 
 For questions, refer to
 Annika Hagemann (CR/AEC3) annika.hagemann@de.bosch.com
@@ -34,6 +37,7 @@ Annika Hagemann (CR/AEC3) annika.hagemann@de.bosch.com
 import numpy as np
 from numpy.polynomial.polynomial import Polynomial as Poly
 import math
+import time
 
 
 ######################################################################################################
@@ -85,7 +89,7 @@ def opencv_radial(_aPoints, _tFocLenXY, _tImgCtrXY, _tDistRad):
 
 
 ######################################################################################################
-def inverse_opencv_radial(_aUv, _tFocLenXY, _tImgCtrXY, _tDistRad):
+def inverse_opencv_radial(_aUv, _tFocLenXY, _tImgCtrXY, _tDistRad, *, _dicStats=None):
     """Generate projection rays from a point grid and a set of camera intrinsics.
 
     Args:
@@ -93,6 +97,7 @@ def inverse_opencv_radial(_aUv, _tFocLenXY, _tImgCtrXY, _tDistRad):
         _tFocLenXY (array_like): Focal length (fx, fy). Expected shape (2,).
         _tImgCtrXY (array_like): Principal point (ppx, ppy). Expected shape (2,).
         _tDistRad (array_like):  Radial distortion parameters (k1, k2, k3). Expected shape (n,) where n in [0, 3].
+        _dicStats (dict, optional): if given, it is filled with the undistortion statistics. See undistort().
 
     Returns:
         numpy.ndarray: projection rays for each image pixel. Shape is (3, WxH).
@@ -125,7 +130,7 @@ def inverse_opencv_radial(_aUv, _tFocLenXY, _tImgCtrXY, _tDistRad):
 
     if fK1 != 0.0 or fK2 != 0.0 or fK3 != 0.0:
         # print("Undistort: {}, {}".format(_fK1, _fK2, _fK3))
-        aRays = undistort(aRays, fK1, fK2, fK3)
+        aRays = undistort(aRays, fK1, fK2, fK3, _dicStats=_dicStats)
     else:
         aRays[2, :] = 1.0
     # endif
@@ -137,15 +142,19 @@ def inverse_opencv_radial(_aUv, _tFocLenXY, _tImgCtrXY, _tDistRad):
 
 
 ######################################################################################################
-def maximum_distortion_radius(_fK1, _fK2, _fK3):
+def maximum_distortion_radius(_fK1, _fK2, _fK3, _fK4=0.0, _fK5=0.0, _fK6=0.0):
     """the maximum radius of polynomial lens distortion is the smallest
     positive root of the derivative of the distorted radius. See also
     https://openaccess.thecvf.com/content/WACV2022/papers/Leotta_On_the_Maximum_Radius_of_Polynomial_Lens_Distortion_WACV_2022_paper.pdf
+    For the rational model, the smallest positive root of the denominator also limits the radius.
 
     Args:
         _fK1 (float): first order radial distortion coefficient.
         _fK2 (float): second order radial distortion coefficient
         _fK3 (float): third order radial distortion coefficient
+        _fK4 (float, optional): first order coefficient of rational model denominator. Defaults to 0.
+        _fK5 (float, optional): second order coefficient of rational model denominator. Defaults to 0.
+        _fK6 (float, optional): third order coefficient of rational model denominator. Defaults to 0.
     Returns:
         float: maximum radius before distortion
         float: maximum radius after distortion
@@ -153,10 +162,19 @@ def maximum_distortion_radius(_fK1, _fK2, _fK3):
 
     # distortion polynomial
     polyR = Poly((0, 1.0, 0, _fK1, 0, _fK2, 0, _fK3))
-    polyDR = polyR.deriv()
+
+    if _fK4 == 0.0 and _fK5 == 0.0 and _fK6 == 0.0:
+        polyDen = None
+        polyDR = polyR.deriv()
+        aRoots = polyDR.roots()
+    else:
+        # numerator of derivative of rational distortion function
+        polyDen = Poly((1.0, 0, _fK4, 0, _fK5, 0, _fK6))
+        polyDR = polyR.deriv() * polyDen - polyR * polyDen.deriv()
+        aRoots = np.concatenate((polyDR.roots(), polyDen.roots()))
+    # endif
 
     # get maximum radius (monotonous regime)
-    aRoots = polyDR.roots()
     aRoots_real = aRoots[aRoots.imag == 0.0].real
     aRoots_pos = aRoots_real[aRoots_real > 0.0]
 
@@ -167,6 +185,9 @@ def maximum_distortion_radius(_fK1, _fK2, _fK3):
         fR_zero = np.min(aRoots_pos)
         fRmax_undistorted = math.floor(fR_zero * 1e2) * 1e-2
         fRmax_distorted = polyR(fRmax_undistorted)
+        if polyDen is not None:
+            fRmax_distorted /= polyDen(fRmax_undistorted)
+        # endif
         fRmax_distorted = math.floor(fRmax_distorted * 1e2) * 1e-2
 
     return fRmax_undistorted, fRmax_distorted
@@ -176,7 +197,7 @@ def maximum_distortion_radius(_fK1, _fK2, _fK3):
 
 
 ######################################################################################################
-def approx_undistortion(_aR_distorted, _fK1, _fK2, _fK3):
+def approx_undistortion(_aR_distorted, _fK1, _fK2, _fK3, _fK4=0.0, _fK5=0.0, _fK6=0.0):
     """get initial values for undistorted radii by approximating the inverse
     distortion with a fitted polynomial in the valid (monotonous) regime
 
@@ -185,6 +206,9 @@ def approx_undistortion(_aR_distorted, _fK1, _fK2, _fK3):
         _fK1 (float): first order radial distortion coefficient.
         _fK2 (float): second order radial distortion coefficient
         _fK3 (float): third order radial distortion coefficient
+        _fK4 (float, optional): first order coefficient of rational model denominator. Defaults to 0.
+        _fK5 (float, optional): second order coefficient of rational model denominator. Defaults to 0.
+        _fK6 (float, optional): third order coefficient of rational model denominator. Defaults to 0.
     Returns:
         float: maximum radius before distortion
         float: maximum radius after distortion
@@ -192,7 +216,7 @@ def approx_undistortion(_aR_distorted, _fK1, _fK2, _fK3):
     polyR = Poly((0, 1.0, 0, _fK1, 0, _fK2, 0, _fK3))
 
     # get maximum radius (monotonous regime)
-    fRmax_undistorted, _ = maximum_distortion_radius(_fK1, _fK2, _fK3)
+    fRmax_undistorted, _ = maximum_distortion_radius(_fK1, _fK2, _fK3, _fK4, _fK5, _fK6)
 
     # in case the maximum radius is inf, set heuristic different max value
     fX_max = min(fRmax_undistorted, np.max(_aR_distorted) * 3)
@@ -203,6 +227,9 @@ def approx_undistortion(_aR_distorted, _fK1, _fK2, _fK3):
 
     # get corresponding distorted values (this direction is known)
     aY = polyR(aX)
+    if _fK4 != 0.0 or _fK5 != 0.0 or _fK6 != 0.0:
+        aY /= distortion_factor(aX * aX, _fK4, _fK5, _fK6)
+    # endif
 
     # Fit inverse polynomial
     aFit = np.polyfit(aY, aX, deg=11)
@@ -215,10 +242,247 @@ def approx_undistortion(_aR_distorted, _fK1, _fK2, _fK3):
 
 
 ######################################################################################################
-def undistort(_aRays, _fK1, _fK2, _fK3):
+def distortion_factor(_aR2, _fK1, _fK2, _fK3):
+    """Radial distortion factor 1 + k1 r^2 + k2 r^4 + k3 r^6 for squared radii, in Horner form."""
+    return 1.0 + _aR2 * (_fK1 + _aR2 * (_fK2 + _aR2 * _fK3))
+
+
+# enddef
+
+
+######################################################################################################
+def distortion_coefficients(_tDistRad, _tDistTan=None, _tDistPrism=None):
+    """Combine the distortion coefficients of the full OpenCV model in a single tuple.
+
+    Args:
+        _tDistRad (array_like): Radial distortion parameters (k1, ..., k6). Expected shape (n,) where n in [0, 6].
+            The parameters k4, k5, k6 are the coefficients of the denominator of the rational model.
+        _tDistTan (array_like, optional): Tangential distortion parameters (p1, p2).
+        _tDistPrism (array_like, optional): Thin prism distortion parameters (s1, s2, s3, s4).
+    Returns:
+        tuple: (k1, k2, k3, k4, k5, k6, p1, p2, s1, s2, s3, s4)
+    """
+
+    def get_coefs(_tCoef, _iCnt, _sName):
+        lCoef = [0.0] * _iCnt
+        if _tCoef is not None:
+            if len(_tCoef) > _iCnt:
+                raise ValueError(f"Expect at most {_iCnt} {_sName} distortion parameters but {len(_tCoef)} were given")
+            # endif
+            lCoef[0 : len(_tCoef)] = [float(x) for x in _tCoef]
+        # endif
+        return lCoef
+
+    # enddef
+
+    return tuple(
+        get_coefs(_tDistRad, 6, "radial") + get_coefs(_tDistTan, 2, "tangential") + get_coefs(_tDistPrism, 4, "prism")
+    )
+
+
+# enddef
+
+
+######################################################################################################
+def tilt_projection_matrix(_fTauX, _fTauY):
+    """Projection matrix of a tilted sensor, as in the OpenCV function computeTiltProjectionMatrix().
+
+    Args:
+        _fTauX (float): tilt angle around x-axis in radians.
+        _fTauY (float): tilt angle around y-axis in radians.
+    Returns:
+        numpy.ndarray: homography from the normalized image plane to the tilted sensor plane. Shape (3, 3).
+    """
+    fCosX = math.cos(_fTauX)
+    fSinX = math.sin(_fTauX)
+    fCosY = math.cos(_fTauY)
+    fSinY = math.sin(_fTauY)
+
+    aRotX = np.array([[1.0, 0.0, 0.0], [0.0, fCosX, fSinX], [0.0, -fSinX, fCosX]])
+    aRotY = np.array([[fCosY, 0.0, -fSinY], [0.0, 1.0, 0.0], [fSinY, 0.0, fCosY]])
+    aRotXY = aRotY @ aRotX
+    aProjZ = np.array(
+        [[aRotXY[2, 2], 0.0, -aRotXY[0, 2]], [0.0, aRotXY[2, 2], -aRotXY[1, 2]], [0.0, 0.0, 1.0]]
+    )
+
+    return aProjZ @ aRotXY
+
+
+# enddef
+
+
+######################################################################################################
+def distort_full(_aX, _aY, _tDistCoef, _bJacobian=False):
+    """Apply the OpenCV distortion model with radial, rational, tangential and thin prism terms
+    to normalized image coordinates. Terms with zero coefficients are skipped.
+
+    Args:
+        _aX (numpy.ndarray): normalized x-coordinates.
+        _aY (numpy.ndarray): normalized y-coordinates.
+        _tDistCoef (tuple): distortion coefficients as returned by distortion_coefficients().
+        _bJacobian (bool, optional): whether to also return the Jacobian. Defaults to False.
+    Returns:
+        tuple: distorted coordinates (x, y). If _bJacobian is True, additionally the
+        elements (dx/dx, dx/dy, dy/dx, dy/dy) of the Jacobian and the rational denominator.
+    """
+    fK1, fK2, fK3, fK4, fK5, fK6, fP1, fP2, fS1, fS2, fS3, fS4 = _tDistCoef
+    bRational = fK4 != 0.0 or fK5 != 0.0 or fK6 != 0.0
+    bTangential = fP1 != 0.0 or fP2 != 0.0
+    bPrism = fS1 != 0.0 or fS2 != 0.0 or fS3 != 0.0 or fS4 != 0.0
+
+    aX2 = _aX * _aX
+    aY2 = _aY * _aY
+    aXY = _aX * _aY
+    aR2 = aX2 + aY2
+
+    aRad = distortion_factor(aR2, fK1, fK2, fK3)
+    if bRational:
+        aDen = distortion_factor(aR2, fK4, fK5, fK6)
+        aRad /= aDen
+    else:
+        aDen = None
+    # endif
+
+    aXd = _aX * aRad
+    aYd = _aY * aRad
+    if bTangential:
+        aXd += 2.0 * fP1 * aXY + fP2 * (aR2 + 2.0 * aX2)
+        aYd += fP1 * (aR2 + 2.0 * aY2) + 2.0 * fP2 * aXY
+    # endif
+    if bPrism:
+        aXd += aR2 * (fS1 + fS2 * aR2)
+        aYd += aR2 * (fS3 + fS4 * aR2)
+    # endif
+
+    if not _bJacobian:
+        return aXd, aYd
+    # endif
+
+    # derivative of radial factor with respect to squared radius
+    aRad_dr2 = fK1 + aR2 * (2.0 * fK2 + aR2 * 3.0 * fK3)
+    if bRational:
+        aRad_dr2 -= aRad * (fK4 + aR2 * (2.0 * fK5 + aR2 * 3.0 * fK6))
+        aRad_dr2 /= aDen
+    else:
+        aDen = np.ones_like(aR2)
+    # endif
+
+    aJxx = aRad + 2.0 * aX2 * aRad_dr2
+    aJyy = aRad + 2.0 * aY2 * aRad_dr2
+    aJxy = 2.0 * aXY * aRad_dr2
+    if bTangential:
+        aJxx += 2.0 * fP1 * _aY + 6.0 * fP2 * _aX
+        aJyy += 6.0 * fP1 * _aY + 2.0 * fP2 * _aX
+        aJxy += 2.0 * fP1 * _aX + 2.0 * fP2 * _aY
+    # endif
+    aJyx = aJxy.copy()
+    if bPrism:
+        aPrismX_dr2 = 2.0 * (fS1 + 2.0 * fS2 * aR2)
+        aPrismY_dr2 = 2.0 * (fS3 + 2.0 * fS4 * aR2)
+        aJxx += _aX * aPrismX_dr2
+        aJxy += _aY * aPrismX_dr2
+        aJyx += _aX * aPrismY_dr2
+        aJyy += _aY * aPrismY_dr2
+    # endif
+
+    return aXd, aYd, aJxx, aJxy, aJyx, aJyy, aDen
+
+
+# enddef
+
+
+######################################################################################################
+def opencv_full(_aPoints, _tFocLenXY, _tImgCtrXY, _tDistRad, _tDistTan=None, _tDistPrism=None, _tDistTilt=None):
+    """Project rays back to image plane using the full OpenCV camera model.
+    This is only used for verification purposes.
+
+    Args:
+        _aPoints (numpy.ndarray): projection rays for each image pixel. Expected shape is (3, WxH)
+        _tFocLenXY (array_like): Focal length (fx, fy). Expected shape (2,).
+        _tImgCtrXY (array_like): Principal point (ppx, ppy). Expected shape (2,).
+        _tDistRad (array_like): Radial distortion parameters (k1, ..., k6). Expected shape (n,) where n in [0, 6].
+        _tDistTan (array_like, optional): Tangential distortion parameters (p1, p2).
+        _tDistPrism (array_like, optional): Thin prism distortion parameters (s1, s2, s3, s4).
+        _tDistTilt (array_like, optional): Sensor tilt angles (tauX, tauY) in radians.
+    Returns:
+        numpy.ndarray: position of reprojected rays. Shape (2,HxW)
+    """
+
+    fFx, fFy = _tFocLenXY
+    fPpx, fPpy = _tImgCtrXY
+
+    tDistCoef = distortion_coefficients(_tDistRad, _tDistTan, _tDistPrism)
+    aXd, aYd = distort_full(_aPoints[0, :] / _aPoints[2, :], _aPoints[1, :] / _aPoints[2, :], tDistCoef)
+
+    if _tDistTilt is not None and any(_tDistTilt):
+        aTilt = tilt_projection_matrix(*_tDistTilt)
+        aW = aTilt[2, 0] * aXd + aTilt[2, 1] * aYd + aTilt[2, 2]
+        aXd, aYd = (
+            (aTilt[0, 0] * aXd + aTilt[0, 1] * aYd + aTilt[0, 2]) / aW,
+            (aTilt[1, 0] * aXd + aTilt[1, 1] * aYd + aTilt[1, 2]) / aW,
+        )
+    # endif
+
+    aPoint_proj = np.zeros((2, _aPoints.shape[1]))
+    aPoint_proj[0, :] = aXd * fFx + fPpx
+    aPoint_proj[1, :] = aYd * fFy + fPpy
+
+    return aPoint_proj
+
+
+# enddef
+
+
+######################################################################################################
+def inverse_opencv_full(
+    _aUv, _tFocLenXY, _tImgCtrXY, _tDistRad, _tDistTan=None, _tDistPrism=None, _tDistTilt=None, *, _dicStats=None
+):
+    """Generate projection rays from a point grid and the full OpenCV camera model,
+    including rational radial, tangential, thin prism and sensor tilt distortion.
+
+    Args:
+        _aUv (numpy.ndarray): Grid of pixel positions. Expected shape is (2, HxW)
+        _tFocLenXY (array_like): Focal length (fx, fy). Expected shape (2,).
+        _tImgCtrXY (array_like): Principal point (ppx, ppy). Expected shape (2,).
+        _tDistRad (array_like): Radial distortion parameters (k1, ..., k6). Expected shape (n,) where n in [0, 6].
+        _tDistTan (array_like, optional): Tangential distortion parameters (p1, p2).
+        _tDistPrism (array_like, optional): Thin prism distortion parameters (s1, s2, s3, s4).
+        _tDistTilt (array_like, optional): Sensor tilt angles (tauX, tauY) in radians.
+        _dicStats (dict, optional): if given, it is filled with the undistortion statistics. See undistort_full().
+
+    Returns:
+        numpy.ndarray: projection rays for each image pixel. Shape is (3, WxH).
+    """
+
+    fFx, fFy = _tFocLenXY
+    fPpx, fPpy = _tImgCtrXY
+
+    aPoints = np.zeros((2, _aUv.shape[1]))
+    aPoints[0, :] = (_aUv[0, :] - fPpx) / fFx
+    aPoints[1, :] = (_aUv[1, :] - fPpy) / fFy
+
+    if _tDistTilt is not None and any(_tDistTilt):
+        # The tilt is a homography, which can be inverted directly
+        aTiltInv = np.linalg.inv(tilt_projection_matrix(*_tDistTilt))
+        aW = aTiltInv[2, 0] * aPoints[0, :] + aTiltInv[2, 1] * aPoints[1, :] + aTiltInv[2, 2]
+        aPoints[:] = (aTiltInv[0:2, 0:2] @ aPoints + aTiltInv[0:2, 2:3]) / aW
+    # endif
+
+    tDistCoef = distortion_coefficients(_tDistRad, _tDistTan, _tDistPrism)
+
+    return undistort_full(aPoints, tDistCoef, _dicStats=_dicStats)
+
+
+# enddef
+
+
+######################################################################################################
+def undistort(_aRays, _fK1, _fK2, _fK3, *, _dicStats=None, _iMaxIterCnt=1000):
     """Find the distance x, that, after applying the distortion, will result in
     the distance r_image.
-    Uses Newton Algorithm to compute this.
+    Uses a safeguarded Newton algorithm to compute this. Only the pixels that have not
+    converged yet are evaluated in each iteration. Newton steps that leave the
+    bracket of the root, or that do not reduce the bracket fast enough, are replaced by bisection steps.
     Invalid pixels (beyond maximum radius) will be assigned the viewing ray [0, 0, 0].
 
     Args:
@@ -226,82 +490,209 @@ def undistort(_aRays, _fK1, _fK2, _fK3):
         _fK1 (float): first order radial distortion coefficient.
         _fK2 (float): second order radial distortion coefficient
         _fK3 (float): third order radial distortion coefficient
+        _dicStats (dict, optional): if given, it is filled with iteration and convergence statistics:
+            "iPixelCnt", "iValidCnt", "iIterCnt", "iNewtonStepCnt", "iBisectStepCnt",
+            "lActiveCnt" (active pixels per iteration), "fMaxResidual" and "fTime_s".
+        _iMaxIterCnt (int, optional): maximal number of iterations. Defaults to 1000.
     Returns:
         numpy.ndarray: projection rays for each image pixel. Shape is (3, WxH).
+        None, if not all pixels converged within the maximal number of iterations.
     """
 
-    def cost_distortion(_aR, _fK1, _fK2, _fK3, _aR_image):
+    fTimeStart = time.perf_counter()
+
+    def cost_distortion(_aR, _aR_image):
         """Function of which we want to find the root"""
-        aR2 = _aR * _aR
-        aR4 = aR2 * aR2
-        aR6 = aR4 * aR2
-        return _aR * (1 + _fK1 * aR2 + _fK2 * aR4 + _fK3 * aR6) - _aR_image
+        return _aR * distortion_factor(_aR * _aR, _fK1, _fK2, _fK3) - _aR_image
 
     # enddef
 
-    def ddr_distortion(_aR, _fK1, _fK2, _fK3, _aR_image=None):
+    def ddr_distortion(_aR):
         """Computes derivative of distortion term"""
         aR2 = _aR * _aR
-        aR4 = aR2 * aR2
-        aR6 = aR4 * aR2
-        return 1 + 3 * _fK1 * aR2 + 5 * _fK2 * aR4 + 7 * _fK3 * aR6
+        return 1.0 + aR2 * (3.0 * _fK1 + aR2 * (5.0 * _fK2 + aR2 * 7.0 * _fK3))
+
+    # enddef
+
+    def cost_distortion_into(_aR, _aR_image, _aOut, _aTemp):
+        """Evaluates cost_distortion() in the given output array, using _aTemp for the squared radii"""
+        aR2 = np.multiply(_aR, _aR, out=_aTemp)
+        np.multiply(aR2, _fK3, out=_aOut)
+        _aOut += _fK2
+        _aOut *= aR2
+        _aOut += _fK1
+        _aOut *= aR2
+        _aOut += 1.0
+        _aOut *= _aR
+        _aOut -= _aR_image
+        return _aOut
+
+    # enddef
+
+    def ddr_distortion_into(_aR, _aOut, _aTemp):
+        """Evaluates ddr_distortion() in the given output array, using _aTemp for the squared radii"""
+        aR2 = np.multiply(_aR, _aR, out=_aTemp)
+        np.multiply(aR2, 7.0, out=_aOut)
+        _aOut *= _fK3
+        _aOut += 5.0 * _fK2
+        _aOut *= aR2
+        _aOut += 3.0 * _fK1
+        _aOut *= aR2
+        _aOut += 1.0
+        return _aOut
 
     # enddef
 
     fEpsilon = 1e-10
+    iPixelCnt = _aRays.shape[1]
     aR_image = np.sqrt(np.sum(_aRays * _aRays, axis=0))
-    aRays_undistorted = np.zeros((3, _aRays.shape[1]))
+    aRays_undistorted = np.zeros((3, iPixelCnt))
 
     # mask pixels for which maximum distortion radius is exceeded
-    _, fRmax_distorted = maximum_distortion_radius(_fK1, _fK2, _fK3)
-    aMask = aR_image < fRmax_distorted
+    fRmax_undistorted, fRmax_distorted = maximum_distortion_radius(_fK1, _fK2, _fK3)
+    aMask_invalid = aR_image >= fRmax_distorted
 
     # get initial values for undistorted radii
     aRk = approx_undistortion(aR_image, _fK1, _fK2, _fK3)
-    aDf_dr = np.ones(aRk.shape, float)
+
+    # Indices of pixels that still need to be optimized
+    aIdx = np.flatnonzero(~aMask_invalid)
+
+    # Bracket of the root per active pixel. The distortion function is monotonously
+    # increasing on [0, fRmax_undistorted], and has a negative value at zero.
+    aLo = np.zeros(aIdx.size)
+    if math.isfinite(fRmax_undistorted):
+        aHi = np.full(aIdx.size, fRmax_undistorted)
+    else:
+        # No maximum radius, so the function grows without bound. Double the upper bound
+        # until it lies beyond the root.
+        aHi = np.maximum(aR_image[aIdx], 1.0)
+        aGrow = cost_distortion(aHi, aR_image[aIdx]) <= 0.0
+        while aGrow.any():
+            aHi[aGrow] *= 2.0
+            aGrow[aGrow] = cost_distortion(aHi[aGrow], aR_image[aIdx[aGrow]]) <= 0.0
+        # endwhile
+    # endif
+
+    # Work arrays of the active pixels, preallocated once: radius, image radius, cost, lower and upper
+    # bracket, and the pixel indices. The active set is compacted from one set of buffers into the other,
+    # so that no arrays are allocated per iteration.
+    iActiveCnt = aIdx.size
+    aWork = np.empty((2, 5, iActiveCnt))
+    aWorkIdx = np.empty((2, iActiveCnt), dtype=aIdx.dtype)
+    aStepBuf = np.empty(iActiveCnt)
+    aTempBuf = np.empty(iActiveCnt)
+    aMaskBuf = np.empty((2, iActiveCnt), dtype=bool)
+
+    aRa, aRa_image, aCost, aLoW, aHiW = aWork[0]
+    np.clip(aRk[aIdx], aLo, aHi, out=aRa)
+    aRa_image[:] = aR_image[aIdx]
+    np.copyto(aLoW, aLo)
+    np.copyto(aHiW, aHi)
+    aWorkIdx[0] = aIdx
+    aRk[aIdx] = aRa
+    cost_distortion_into(aRa, aRa_image, aCost, aTempBuf)
+
+    iCur = 0
+    iIterCnt = 0
+    iNewtonStepCnt = 0
+    iBisectStepCnt = 0
+    lActiveCnt = []
 
     # use newton step for optimization
-    iI_invert = 0
-    while aMask.any():
-        aDf_dr[aMask] = ddr_distortion(aRk[aMask], _fK1, _fK2, _fK3, aR_image[aMask])
-        aRk[aMask] = aRk[aMask] - (
-            cost_distortion(aRk[aMask], _fK1, _fK2, _fK3, aR_image[aMask])
-            / aDf_dr[aMask]
-        )
-        aMask = (
-            np.abs(cost_distortion(aRk, _fK1, _fK2, _fK3, aR_image)) > fEpsilon
-        ) & (aR_image < fRmax_distorted)
+    while True:
+        aRa, aRa_image, aCost, aLo, aHi = aWork[iCur, :, :iActiveCnt]
+        aIdx = aWorkIdx[iCur, :iActiveCnt]
+        aTemp = aTempBuf[:iActiveCnt]
+        aActive = aMaskBuf[0, :iActiveCnt]
+        aFlag = aMaskBuf[1, :iActiveCnt]
+
+        # Pixels stay active, if they have not converged and their bracket can still be reduced
+        np.greater(np.abs(aCost, out=aTemp), fEpsilon, out=aActive)
+        np.subtract(aHi, aLo, out=aTemp)
+        np.greater(aTemp, np.multiply(aHi, 4.0 * np.finfo(float).eps, out=aStepBuf[:iActiveCnt]), out=aFlag)
+        np.logical_and(aActive, aFlag, out=aActive)
+
+        # Compact active set into the other set of work buffers
+        iNewActiveCnt = int(np.count_nonzero(aActive))
+        if iNewActiveCnt < iActiveCnt:
+            iNext = 1 - iCur
+            np.compress(aActive, aWork[iCur, :, :iActiveCnt], axis=1, out=aWork[iNext, :, :iNewActiveCnt])
+            np.compress(aActive, aIdx, out=aWorkIdx[iNext, :iNewActiveCnt])
+            iCur, iActiveCnt = iNext, iNewActiveCnt
+
+            aRa, aRa_image, aCost, aLo, aHi = aWork[iCur, :, :iActiveCnt]
+            aIdx = aWorkIdx[iCur, :iActiveCnt]
+            aTemp = aTempBuf[:iActiveCnt]
+            aFlag = aMaskBuf[1, :iActiveCnt]
+        # endif
 
-        if iI_invert >= 1000:
+        if iActiveCnt == 0:
+            break
+        # endif
+
+        if iIterCnt >= _iMaxIterCnt:
             return None
         # endif
-        iI_invert += 1
-    # endwhile
+        iIterCnt += 1
+        lActiveCnt.append(iActiveCnt)
+
+        # Update bracket
+        aPos = np.greater(aCost, 0.0, out=aFlag)
+        np.copyto(aHi, aRa, where=aPos)
+        np.copyto(aLo, aRa, where=np.logical_not(aPos, out=aMaskBuf[0, :iActiveCnt]))
+
+        # Newton step, with bisection fallback where the step leaves the bracket
+        aStep = ddr_distortion_into(aRa, aStepBuf[:iActiveCnt], aTemp)
+        np.divide(aCost, aStep, out=aStep)
+        np.subtract(aRa, aStep, out=aStep)
+        aBisect = np.greater(aStep, aLo, out=aMaskBuf[0, :iActiveCnt])
+        np.logical_and(aBisect, np.less(aStep, aHi, out=aFlag), out=aBisect)
+        np.logical_not(aBisect, out=aBisect)
+        iBisectCnt = int(np.count_nonzero(aBisect))
+        if iBisectCnt > 0:
+            np.add(aLo, aHi, out=aTemp)
+            aTemp *= 0.5
+            np.copyto(aStep, aTemp, where=aBisect)
+            iBisectStepCnt += iBisectCnt
+        # endif
+        iNewtonStepCnt += iActiveCnt - iBisectCnt
 
-    # set radii to zero that ended up slightly below zero because of limited
-    # optimization accuracy
-    aRk[(aRk < 0) & (aRk > -fEpsilon)] = 0
+        np.copyto(aRa, aStep)
+        cost_distortion_into(aRa, aRa_image, aCost, aTemp)
+        aRk[aIdx] = aRa
+    # endwhile
 
-    aRk2 = aRk * aRk
-    aRk4 = aRk2 * aRk2
-    aRk6 = aRk4 * aRk2
+    aRk[aMask_invalid] = 0.0
 
-    aRays_undistorted[0, :] = _aRays[0, :] / (
-        1 + _fK1 * aRk2 + _fK2 * aRk4 + _fK3 * aRk6
-    )
-    aRays_undistorted[1, :] = _aRays[1, :] / (
-        1 + _fK1 * aRk2 + _fK2 * aRk4 + _fK3 * aRk6
-    )
+    aFactor = distortion_factor(aRk * aRk, _fK1, _fK2, _fK3)
+    np.divide(_aRays[0, :], aFactor, out=aRays_undistorted[0, :])
+    np.divide(_aRays[1, :], aFactor, out=aRays_undistorted[1, :])
     aRays_undistorted[2, :] = 1
 
     # set viewing rays of invalid pixels to zero
-    aMask_invalid = aR_image >= fRmax_distorted
     aRays_undistorted[:, aMask_invalid] = 0
 
     #  sanity check to make sure that all valid undistorted radii are positive
     if not np.all(aRk[~aMask_invalid] >= 0):
-        raise RuntimeError(
-            "Error in calculating undistortion: some radii are negative."
+        raise RuntimeError("Error in calculating undistortion: some radii are negative.")
+    # endif
+
+    if _dicStats is not None:
+        aValid = ~aMask_invalid
+        _dicStats.update(
+            {
+                "iPixelCnt": iPixelCnt,
+                "iValidCnt": int(np.count_nonzero(aValid)),
+                "iIterCnt": iIterCnt,
+                "iNewtonStepCnt": int(iNewtonStepCnt),
+                "iBisectStepCnt": iBisectStepCnt,
+                "lActiveCnt": lActiveCnt,
+                "fMaxResidual": float(
+                    np.max(np.abs(cost_distortion(aRk[aValid], aR_image[aValid])), initial=0.0)
+                ),
+                "fTime_s": time.perf_counter() - fTimeStart,
+            }
         )
     # endif
 
@@ -312,29 +703,420 @@ def undistort(_aRays, _fK1, _fK2, _fK3):
 
 
 ######################################################################################################
-def create_lookup(
-    _tSensorSizeXY,
-    _tFocLenXY,
-    _tImgCtrXY,
-    _tDistRad,
-    _iLutSupersampling=1,
-    _iLutBorderPixel=1,
-    _bBlenderFormat=True,
-):
-    """Creates a projection rays mask for a pair of camera  _tIntrinsics and sensor size.
+def undistort_full(_aPoints, _tDistCoef, *, _dicStats=None, _iMaxIterCnt=100):
+    """Find the normalized image coordinates, that, after applying the full OpenCV distortion model,
+    will result in the given distorted coordinates.
+    Uses a 2D Newton algorithm with step halving, starting from the inverse of the radial distortion.
+    Only the pixels that have not converged yet are evaluated in each iteration.
+    Invalid pixels (beyond maximum radius, folded or not converged) will be assigned the viewing ray [0, 0, 0].
+    As for the radial model, the maximum radius is tested after compensating the non-radial terms.
 
     Args:
-        _tSensorSize (array_like): Image plane resolution (width, height). Expected shape (2,).
+        _aPoints (numpy.ndarray): distorted normalized image coordinates for each image pixel.
+            Expected shape is (2, WxH).
+        _tDistCoef (tuple): distortion coefficients as returned by distortion_coefficients().
+        _dicStats (dict, optional): if given, it is filled with iteration and convergence statistics:
+            "iPixelCnt", "iValidCnt", "iIterCnt", "iNewtonStepCnt", "iHalveStepCnt", "iStalledCnt",
+            "iUnconvergedCnt", "lActiveCnt" (active pixels per iteration), "fMaxResidual" and "fTime_s".
+        _iMaxIterCnt (int, optional): maximal number of iterations. Defaults to 100.
+    Returns:
+        numpy.ndarray: projection rays for each image pixel. Shape is (3, WxH).
+    """
+
+    fTimeStart = time.perf_counter()
+
+    fEpsilon = 1e-10
+    iMaxHalveCnt = 8
+    iPixelCnt = _aPoints.shape[1]
+    aR_image = np.hypot(_aPoints[0, :], _aPoints[1, :])
+
+    # get initial values from the inverse of the radial distortion
+    tDistRad = _tDistCoef[0:6]
+    fRmax_undistorted, fRmax_distorted = maximum_distortion_radius(*tDistRad)
+
+    def invert_radial(_aPnt):
+        aR_image = np.hypot(_aPnt[0], _aPnt[1])
+        aRk = approx_undistortion(aR_image, *tDistRad)
+        np.clip(aRk, 0.0, fRmax_undistorted, out=aRk)
+        aScale = np.ones(aR_image.shape)
+        np.divide(aRk, aR_image, out=aScale, where=aR_image > 0.0)
+        return _aPnt * aScale, aR_image
+
+    # enddef
+
+    aPnt, aR_image = invert_radial(_aPoints)
+
+    # Compensate the non-radial terms by a single fixed point step,
+    # which saves a full Newton iteration for small tangential and prism distortions.
+    if any(_tDistCoef[6:]):
+        aXd, aYd = distort_full(aPnt[0], aPnt[1], _tDistCoef)
+        aR2 = aPnt[0] * aPnt[0] + aPnt[1] * aPnt[1]
+        aRad = distortion_factor(aR2, *tDistRad[0:3]) / distortion_factor(aR2, *tDistRad[3:6])
+        aXd -= aPnt[0] * aRad
+        aYd -= aPnt[1] * aRad
+        aPnt, aR_image = invert_radial(np.stack((_aPoints[0] - aXd, _aPoints[1] - aYd)))
+    # endif
+
+    # mask pixels for which maximum radial distortion radius is exceeded
+    aInside = aR_image < fRmax_distorted
+
+    # Solution per pixel. Rows are x, y, squared error, Jacobian determinant and rational denominator.
+    aResult = np.zeros((5, iPixelCnt))
+    aConverged = np.zeros(iPixelCnt, dtype=bool)
+
+    def evaluate(_aPnt, _aPnt_image):
+        """Evaluate the Newton step, the squared error, the Jacobian determinant and the denominator."""
+        aXd, aYd, aJxx, aJxy, aJyx, aJyy, aDen = distort_full(_aPnt[0], _aPnt[1], _tDistCoef, True)
+        aXd -= _aPnt_image[0]
+        aYd -= _aPnt_image[1]
+        aDet = aJxx * aJyy - aJxy * aJyx
+        # Newton step: solve J * delta = error
+        aStep = np.stack((aJyy * aXd - aJxy * aYd, aJxx * aYd - aJyx * aXd, aXd * aXd + aYd * aYd, aDet, aDen))
+        aStep[0:2] /= aDet
+        return aStep
+
+    # enddef
+
+    # Active set of pixels. The Newton step, error, determinant and denominator
+    # are stored in a single stacked array, so that compaction needs fewer fancy indexing operations.
+    fEpsilon2 = fEpsilon * fEpsilon
+    aIdx = np.flatnonzero(aInside)
+    aPnt = np.compress(aInside, aPnt, axis=1)
+    aPnt_image = np.compress(aInside, _aPoints, axis=1)
+    aStep = evaluate(aPnt, aPnt_image)
+
+    iIterCnt = 0
+    iNewtonStepCnt = 0
+    iHalveStepCnt = 0
+    iStalledCnt = 0
+    lActiveCnt = []
+
+    while True:
+        # Compact active set to the pixels that have not converged
+        aActive = aStep[2] > fEpsilon2
+        if not aActive.all():
+            aDone = ~aActive
+            aDoneIdx = aIdx[aDone]
+            aConverged[aDoneIdx] = True
+            aResult[0:2, aDoneIdx] = aPnt[:, aDone]
+            aResult[2:5, aDoneIdx] = aStep[2:5, aDone]
+
+            aIdx = np.compress(aActive, aIdx)
+            aPnt = np.compress(aActive, aPnt, axis=1)
+            aPnt_image = np.compress(aActive, aPnt_image, axis=1)
+            aStep = np.compress(aActive, aStep, axis=1)
+        # endif
+
+        if aIdx.size == 0 or iIterCnt >= _iMaxIterCnt:
+            break
+        # endif
+        iIterCnt += 1
+        lActiveCnt.append(int(aIdx.size))
+        iNewtonStepCnt += aIdx.size
+
+        aDelta = aStep[0:2]
+        aPntN = aPnt - aDelta
+        aStepN = evaluate(aPntN, aPnt_image)
+
+        # Halve the step where the error does not decrease
+        aWorse = ~(aStepN[2] < aStep[2])
+        iHalveIdx = 0
+        while iHalveIdx < iMaxHalveCnt and aWorse.any():
+            iHalveStepCnt += int(np.count_nonzero(aWorse))
+            aDelta[:, aWorse] *= 0.5
+            aPntN[:, aWorse] = aPnt[:, aWorse] - aDelta[:, aWorse]
+            aStepN[:, aWorse] = evaluate(aPntN[:, aWorse], aPnt_image[:, aWorse])
+            aWorse[aWorse] = ~(aStepN[2, aWorse] < aStep[2, aWorse])
+            iHalveIdx += 1
+        # endwhile
+
+        aPnt = aPntN
+        aStep = aStepN
+
+        # Remove stalled pixels from active set. They remain unconverged.
+        if aWorse.any():
+            iStalledCnt += int(np.count_nonzero(aWorse))
+            aActive = ~aWorse
+            aIdx = np.compress(aActive, aIdx)
+            aPnt = np.compress(aActive, aPnt, axis=1)
+            aPnt_image = np.compress(aActive, aPnt_image, axis=1)
+            aStep = np.compress(aActive, aStep, axis=1)
+        # endif
+    # endwhile
+
+    # Valid solutions lie in the monotonous regime of the radial distortion,
+    # and the distortion must not fold the image plane.
+    aValid = aConverged
+    aValid &= np.hypot(aResult[0], aResult[1]) <= fRmax_undistorted
+    aValid &= (aResult[3] > 0.0) & (aResult[4] > 0.0)
+
+    aRays_undistorted = np.zeros((3, iPixelCnt))
+    aRays_undistorted[0:2, aValid] = aResult[0:2, aValid]
+    aRays_undistorted[2, aValid] = 1.0
+
+    if _dicStats is not None:
+        _dicStats.update(
+            {
+                "iPixelCnt": iPixelCnt,
+                "iValidCnt": int(np.count_nonzero(aValid)),
+                "iIterCnt": iIterCnt,
+                "iNewtonStepCnt": int(iNewtonStepCnt),
+                "iHalveStepCnt": iHalveStepCnt,
+                "iStalledCnt": iStalledCnt,
+                "iUnconvergedCnt": int(np.count_nonzero(aInside) - np.count_nonzero(aConverged)),
+                "lActiveCnt": lActiveCnt,
+                "fMaxResidual": math.sqrt(np.max(aResult[2, aValid], initial=0.0)),
+                "fTime_s": time.perf_counter() - fTimeStart,
+            }
+        )
+    # endif
+
+    return aRays_undistorted
+
+
+# enddef
+
+
+######################################################################################################
+def fisheye_coefficients(_tDistFish):
+    """Distortion coefficients (k1, k2, k3, k4) of the OpenCV fisheye model, padded with zeros."""
+    lCoef = [0.0] * 4
+    if _tDistFish is not None:
+        if len(_tDistFish) > 4:
+            raise ValueError(f"Expect at most 4 fisheye distortion parameters but {len(_tDistFish)} were given")
+        # endif
+        lCoef[0 : len(_tDistFish)] = [float(x) for x in _tDistFish]
+    # endif
+    return tuple(lCoef)
+
+
+# enddef
+
+
+######################################################################################################
+def maximum_fisheye_angle(_tDistFish):
+    """The maximum ray angle of the OpenCV fisheye model is the smallest positive root
+    of the derivative of the distorted angle theta_d = theta (1 + k1 theta^2 + k2 theta^4 + k3 theta^6 + k4 theta^8).
+    Ray angles beyond pi are not unique, so the maximum angle is at most pi.
+
+    Args:
+        _tDistFish (array_like): Fisheye distortion parameters (k1, k2, k3, k4). Expected shape (n,) where n in [0, 4].
+    Returns:
+        float: maximum ray angle in radians
+        float: maximum distorted angle, i.e. radius in normalized image coordinates
+    """
+    fK1, fK2, fK3, fK4 = fisheye_coefficients(_tDistFish)
+    polyT = Poly((0, 1.0, 0, fK1, 0, fK2, 0, fK3, 0, fK4))
+
+    aRoots = polyT.deriv().roots()
+    aRoots_real = aRoots[aRoots.imag == 0.0].real
+    aRoots_pos = aRoots_real[(aRoots_real > 0.0) & (aRoots_real < math.pi)]
+
+    if aRoots_pos.size == 0:
+        fThetaMax = math.pi
+    else:
+        fThetaMax = math.floor(np.min(aRoots_pos) * 1e2) * 1e-2
+    # endif
+
+    return fThetaMax, float(polyT(fThetaMax))
+
+
+# enddef
+
+
+######################################################################################################
+def opencv_fisheye(_aPoints, _tFocLenXY, _tImgCtrXY, _tDistFish):
+    """Project rays back to image plane using the OpenCV fisheye (Kannala-Brandt) model.
+    In contrast to cv2.fisheye, the ray angle is evaluated with atan2(), so that also
+    rays with an angle of more than 90 degrees to the optical axis are projected.
+    This is only used for verification purposes.
+
+    Args:
+        _aPoints (numpy.ndarray): projection rays for each image pixel. Expected shape is (3, WxH)
         _tFocLenXY (array_like): Focal length (fx, fy). Expected shape (2,).
         _tImgCtrXY (array_like): Principal point (ppx, ppy). Expected shape (2,).
-        _tDistRad (array_like):  Radial distortion parameters (k1, k2, k3). Expected shape (n,) where n in [0, 3].
+        _tDistFish (array_like): Fisheye distortion parameters (k1, k2, k3, k4). Expected shape (n,) where n in [0, 4].
+    Returns:
+        numpy.ndarray: position of reprojected rays. Shape (2,HxW)
+    """
+    fFx, fFy = _tFocLenXY
+    fPpx, fPpy = _tImgCtrXY
+    fK1, fK2, fK3, fK4 = fisheye_coefficients(_tDistFish)
+
+    aR = np.sqrt(_aPoints[0, :] ** 2 + _aPoints[1, :] ** 2)
+    aTheta = np.arctan2(aR, _aPoints[2, :])
+    aTheta2 = aTheta * aTheta
+    aTheta_d = aTheta * (1.0 + aTheta2 * (fK1 + aTheta2 * (fK2 + aTheta2 * (fK3 + aTheta2 * fK4))))
+
+    aScale = np.zeros_like(aR)
+    np.divide(aTheta_d, aR, out=aScale, where=aR > 0.0)
+
+    aPoint_proj = np.zeros((2, _aPoints.shape[1]))
+    aPoint_proj[0, :] = _aPoints[0, :] * aScale * fFx + fPpx
+    aPoint_proj[1, :] = _aPoints[1, :] * aScale * fFy + fPpy
+
+    return aPoint_proj
+
+
+# enddef
+
+
+######################################################################################################
+def undistort_fisheye(_aTheta_d, _tDistFish, *, _dicStats=None, _iMaxIterCnt=100):
+    """Find the ray angles theta, that, after applying the fisheye distortion, result in the
+    distorted angles theta_d. The initial values are interpolated from a table of the distortion function
+    in its monotonous regime, and then refined with Newton iterations on the active set of pixels.
+
+    Args:
+        _aTheta_d (numpy.ndarray): distorted angles, i.e. radii in normalized image coordinates.
+        _tDistFish (array_like): Fisheye distortion parameters (k1, k2, k3, k4). Expected shape (n,) where n in [0, 4].
+        _dicStats (dict, optional): if given, it is filled with iteration and convergence statistics:
+            "iPixelCnt", "iValidCnt", "iIterCnt", "lActiveCnt" (active pixels per iteration),
+            "fMaxResidual" and "fTime_s".
+        _iMaxIterCnt (int, optional): maximal number of iterations. Defaults to 100.
+    Returns:
+        numpy.ndarray: ray angles theta. Same shape as _aTheta_d.
+        numpy.ndarray: boolean mask of valid angles, i.e. angles in the monotonous regime.
+    """
+    fTimeStart = time.perf_counter()
+
+    fK1, fK2, fK3, fK4 = fisheye_coefficients(_tDistFish)
+
+    def cost_distortion(_aTheta, _aTheta_d):
+        aTheta2 = _aTheta * _aTheta
+        return _aTheta * (1.0 + aTheta2 * (fK1 + aTheta2 * (fK2 + aTheta2 * (fK3 + aTheta2 * fK4)))) - _aTheta_d
+
+    # enddef
+
+    def ddt_distortion(_aTheta):
+        aTheta2 = _aTheta * _aTheta
+        return 1.0 + aTheta2 * (3.0 * fK1 + aTheta2 * (5.0 * fK2 + aTheta2 * (7.0 * fK3 + aTheta2 * 9.0 * fK4)))
+
+    # enddef
+
+    fEpsilon = 1e-10
+    fThetaMax, fThetaMax_d = maximum_fisheye_angle(_tDistFish)
+    aValid = _aTheta_d < fThetaMax_d
+
+    # initial values from dense table of monotonous distortion function
+    aTableTheta = np.linspace(0.0, fThetaMax, 4097)
+    aTableTheta_d = cost_distortion(aTableTheta, 0.0)
+    aTheta = np.interp(_aTheta_d, aTableTheta_d, aTableTheta)
+
+    aIdx = np.flatnonzero(aValid.ravel())
+    aThetaA = aTheta.ravel()[aIdx]
+    aThetaA_d = _aTheta_d.ravel()[aIdx]
+    aCost = cost_distortion(aThetaA, aThetaA_d)
+
+    iIterCnt = 0
+    lActiveCnt = []
+    fMaxResidual = 0.0
+    aTheta_flat = aTheta.reshape(-1)
+
+    while True:
+        aCostAbs = np.abs(aCost)
+        aActive = aCostAbs > fEpsilon
+        if not aActive.all():
+            fMaxResidual = max(fMaxResidual, float(np.max(aCostAbs[~aActive])))
+            aTheta_flat[aIdx[~aActive]] = aThetaA[~aActive]
+            aIdx = np.compress(aActive, aIdx)
+            aThetaA = np.compress(aActive, aThetaA)
+            aThetaA_d = np.compress(aActive, aThetaA_d)
+            aCost = np.compress(aActive, aCost)
+        # endif
+
+        if aIdx.size == 0 or iIterCnt >= _iMaxIterCnt:
+            break
+        # endif
+        iIterCnt += 1
+        lActiveCnt.append(int(aIdx.size))
+
+        # The function is monotonous in [0, fThetaMax], so keep the solution in this range
+        aThetaA = np.clip(aThetaA - aCost / ddt_distortion(aThetaA), 0.0, fThetaMax)
+        aCost = cost_distortion(aThetaA, aThetaA_d)
+    # endwhile
+
+    if aIdx.size > 0:
+        aTheta_flat[aIdx] = aThetaA
+        aValid.reshape(-1)[aIdx] = False
+    # endif
+
+    if _dicStats is not None:
+        _dicStats.update(
+            {
+                "iPixelCnt": int(_aTheta_d.size),
+                "iValidCnt": int(np.count_nonzero(aValid)),
+                "iIterCnt": iIterCnt,
+                "lActiveCnt": lActiveCnt,
+                "fMaxResidual": fMaxResidual,
+                "fTime_s": time.perf_counter() - fTimeStart,
+            }
+        )
+    # endif
+
+    return aTheta, aValid
+
+
+# enddef
+
+
+######################################################################################################
+def inverse_opencv_fisheye(_aUv, _tFocLenXY, _tImgCtrXY, _tDistFish, *, _dicStats=None):
+    """Generate projection rays from a point grid and the OpenCV fisheye (Kannala-Brandt) model.
+    The rays are normalized, as rays with an angle of 90 degrees or more to the optical axis
+    cannot be represented with z = 1.
+
+    Args:
+        _aUv (numpy.ndarray): Grid of pixel positions. Expected shape is (2, ...).
+            Can also be a tuple of the horizontal and vertical positions, which are broadcast against each other.
+        _tFocLenXY (array_like): Focal length (fx, fy). Expected shape (2,).
+        _tImgCtrXY (array_like): Principal point (ppx, ppy). Expected shape (2,).
+        _tDistFish (array_like): Fisheye distortion parameters (k1, k2, k3, k4). Expected shape (n,) where n in [0, 4].
+        _dicStats (dict, optional): if given, it is filled with the undistortion statistics. See undistort_fisheye().
+
+    Returns:
+        numpy.ndarray: projection rays for each image pixel. Shape is (3, ...).
+        Invalid pixels are assigned the viewing ray [0, 0, 0].
+    """
+    fFx, fFy = _tFocLenXY
+    fPpx, fPpy = _tImgCtrXY
+
+    aX = (_aUv[0] - fPpx) / fFx
+    aY = (_aUv[1] - fPpy) / fFy
+    aTheta_d = np.sqrt(aX * aX + aY * aY)
+
+    aTheta, aValid = undistort_fisheye(aTheta_d, _tDistFish, _dicStats=_dicStats)
+
+    # scale of normalized image coordinates to sine of ray angle
+    aScale = np.sin(aTheta)
+    np.divide(aScale, aTheta_d, out=aScale, where=aTheta_d > 0.0)
+    aScale[~aValid] = 0.0
+
+    aRays = np.empty((3,) + aTheta_d.shape)
+    np.multiply(aX, aScale, out=aRays[0])
+    np.multiply(aY, aScale, out=aRays[1])
+    np.cos(aTheta, out=aRays[2])
+    aRays[2][~aValid] = 0.0
+
+    return aRays
+
+
+# enddef
+
+
+######################################################################################################
+def lut_pixel_grid(_tSensorSizeXY, _iLutSupersampling=1, _iLutBorderPixel=1):
+    """Image coordinates of the LUT pixel centers, including supersampling and border pixels.
+
+    Args:
+        _tSensorSize (array_like): Image plane resolution (width, height). Expected shape (2,).
         _iLutSupersampling (int): Supersampling parameter, positive integer, defaults to 1 (no supersampling)
-        _iLutBorderPixel (int): Number of border pixels (or number of border "subpixels" in case fo supersampling), defaults to 1 (minimum allowed)
-        _bBlenderFormat (bool, optional): Whether to transform rays to blender CS. Defaults to True.
+        _iLutBorderPixel (int): Number of border pixels (or number of border "subpixels" in case for supersampling),
+            defaults to 1 (minimum allowed)
 
     Returns:
-        numpy.ndarray: projection rays for each image pixel. Shape is (H, W, 3).
-        If _bBlenderFormat is set to False, the shape is (3, WxH).
+        numpy.ndarray: horizontal image coordinates of LUT columns. Shape is (W,).
+        numpy.ndarray: vertical image coordinates of LUT rows. Shape is (H,).
     """
     # The supersampling parameter must be a strictly posivite integer.
     if not _iLutSupersampling > 0 and isinstance(_iLutSupersampling, int):
@@ -348,16 +1130,6 @@ def create_lookup(
             f"_iLutBorderPixel should be a strictly positive integer but {_iLutBorderPixel} was given."
         )
 
-    # Only flip z-axis for Blender, as y-axis is flipped implicitly,
-    # when using numpy array as Blender generated image.
-    aRot_x_180 = np.array([[1.0, 0.0, 0.0], [0.0, -1.0, 0.0], [0.0, 0.0, -1.0]])
-
-    # The y axis is pointing downwards. Adjust the vertical centre accordingly.
-    _tImgCtrXY_opencv = [_tImgCtrXY[0], _tSensorSizeXY[1] - _tImgCtrXY[1]]
-
-    # Determine the size of the LUT based on the imager size, the supersampling, and the two border pixels
-    iLutSizeV = _iLutSupersampling * _tSensorSizeXY[1] + 2 * _iLutBorderPixel
-    iLutSizeH = _iLutSupersampling * _tSensorSizeXY[0] + 2 * _iLutBorderPixel
     fStep = 1 / _iLutSupersampling
 
     # get image coordinates of each pixel. Use pixel center point for ray
@@ -382,28 +1154,42 @@ def create_lookup(
         )
     )
 
-    aU_grid, aV_grid = np.meshgrid(aU, aV)
-    aUv = np.array([np.ravel(aU_grid), np.ravel(aV_grid)])
+    return aU, aV
 
-    # get viewing rays of each pixel
-    aRays = inverse_opencv_radial(aUv, _tFocLenXY, _tImgCtrXY_opencv, _tDistRad)
 
-    # Legacy return for verification purposes
-    if not _bBlenderFormat:
-        return aRays
+# enddef
 
-    if aRays is None:
-        return None
-    # endif
 
-    # Transform rays to blender's camera CS. Shape [H, W, 3].
-    aRays_reshaped = np.moveaxis(np.reshape(aRays, (3, iLutSizeV, iLutSizeH)), 0, 2)
+######################################################################################################
+def lut_from_rays(_aRays, _tSensorSizeXY, _tImgCtrXY_opencv, _dicStats=None, _bNormalize=True):
+    """Transform the projection rays of all LUT pixels to Blender's camera CS,
+    and evaluate the field of view.
 
-    aRays_blender_cs = np.squeeze(aRot_x_180 @ np.expand_dims(aRays_reshaped, -1))
+    Args:
+        _aRays (numpy.ndarray): projection rays in OpenCV camera CS. Expected shape is (3, H, W).
+        _tSensorSize (array_like): Image plane resolution (width, height). Expected shape (2,).
+        _tImgCtrXY_opencv (array_like): Principal point (ppx, ppy) with vertical coordinate flipped.
+        _dicStats (dict, optional): undistortion statistics stored in the result.
+        _bNormalize (bool, optional): whether the rays need to be normalized. Defaults to True.
 
-    aNorm = np.linalg.norm(aRays_blender_cs, axis=2)
-    aNorm[aNorm == 0] = 1
-    aRays_normalized = aRays_blender_cs / np.expand_dims(aNorm, -1)
+    Returns:
+        dict: normalized rays "aRays" of shape (H, W, 3), "lFov_deg", "lFovRange_deg"
+        and "dicUndistortStats".
+    """
+    # Transform rays to blender's camera CS. Shape [H, W, 3].
+    # Only flip z-axis for Blender, as y-axis is flipped implicitly,
+    # when using numpy array as Blender generated image.
+    aRays_blender_cs = np.empty(_aRays.shape[1:] + (3,))
+    aRays_blender_cs[:, :, 0] = _aRays[0]
+    np.subtract(0.0, _aRays[1], out=aRays_blender_cs[:, :, 1])
+    np.subtract(0.0, _aRays[2], out=aRays_blender_cs[:, :, 2])
+
+    aRays_normalized = aRays_blender_cs
+    if _bNormalize:
+        aNorm = np.linalg.norm(aRays_blender_cs, axis=2)
+        aNorm[aNorm == 0] = 1
+        aRays_normalized /= np.expand_dims(aNorm, -1)
+    # endif
 
     iImgCtrX = int(_tImgCtrXY_opencv[0])
     iImgCtrY = int(_tImgCtrXY_opencv[1])
@@ -423,6 +1209,7 @@ def create_lookup(
         "aRays": aRays_normalized,
         "lFov_deg": [fAngleRight - fAngleLeft, fAngleTop - fAngleBot],
         "lFovRange_deg": [[fAngleLeft, fAngleRight], [fAngleBot, fAngleTop]],
+        "dicUndistortStats": {} if _dicStats is None else _dicStats,
     }
 
     return dicRes
@@ -431,6 +1218,248 @@ def create_lookup(
 # enddef
 
 
+######################################################################################################
+def create_lookup(
+    _tSensorSizeXY,
+    _tFocLenXY,
+    _tImgCtrXY,
+    _tDistRad,
+    _iLutSupersampling=1,
+    _iLutBorderPixel=1,
+    _bBlenderFormat=True,
+    *,
+    _tDistTan=None,
+    _tDistPrism=None,
+    _tDistTilt=None,
+):
+    """Creates a projection rays mask for a pair of camera  _tIntrinsics and sensor size.
+
+    Args:
+        _tSensorSize (array_like): Image plane resolution (width, height). Expected shape (2,).
+        _tFocLenXY (array_like): Focal length (fx, fy). Expected shape (2,).
+        _tImgCtrXY (array_like): Principal point (ppx, ppy). Expected shape (2,).
+        _tDistRad (array_like):  Radial distortion parameters (k1, ..., k6). Expected shape (n,) where n in [0, 6].
+            The parameters k4, k5, k6 are the coefficients of the denominator of the rational model.
+        _iLutSupersampling (int): Supersampling parameter, positive integer, defaults to 1 (no supersampling)
+        _iLutBorderPixel (int): Number of border pixels (or number of border "subpixels" in case for supersampling),
+            defaults to 1 (minimum allowed)
+        _bBlenderFormat (bool, optional): Whether to transform rays to blender CS. Defaults to True.
+        _tDistTan (array_like, optional): Tangential distortion parameters (p1, p2).
+        _tDistPrism (array_like, optional): Thin prism distortion parameters (s1, s2, s3, s4).
+        _tDistTilt (array_like, optional): Sensor tilt angles (tauX, tauY) in radians.
+
+    Returns:
+        numpy.ndarray: projection rays for each image pixel. Shape is (H, W, 3).
+        If _bBlenderFormat is set to False, the shape is (3, WxH).
+        The element "dicUndistortStats" of the returned dictionary contains the
+        iteration statistics of the undistortion. See undistort().
+    """
+    # The y axis is pointing downwards. Adjust the vertical centre accordingly.
+    _tImgCtrXY_opencv = [_tImgCtrXY[0], _tSensorSizeXY[1] - _tImgCtrXY[1]]
+
+    aU, aV = lut_pixel_grid(_tSensorSizeXY, _iLutSupersampling, _iLutBorderPixel)
+    aU_grid, aV_grid = np.meshgrid(aU, aV)
+    aUv = np.array([np.ravel(aU_grid), np.ravel(aV_grid)])
+
+    # get viewing rays of each pixel
+    # Use the faster radial inversion, if only the parameters k1, k2, k3 are given
+    tDistCoef = distortion_coefficients(_tDistRad, _tDistTan, _tDistPrism)
+    bRadialOnly = not any(tDistCoef[3:]) and (_tDistTilt is None or not any(_tDistTilt))
+
+    dicStats = {}
+    if not bRadialOnly:
+        aRays = inverse_opencv_full(
+            aUv, _tFocLenXY, _tImgCtrXY_opencv, _tDistRad, _tDistTan, _tDistPrism, _tDistTilt, _dicStats=dicStats
+        )
+    else:
+        aRays = inverse_opencv_radial(aUv, _tFocLenXY, _tImgCtrXY_opencv, _tDistRad, _dicStats=dicStats)
+    # endif
+
+    # Legacy return for verification purposes
+    if not _bBlenderFormat:
+        return aRays
+
+    if aRays is None:
+        return None
+    # endif
+
+    return lut_from_rays(aRays.reshape(3, aV.size, aU.size), _tSensorSizeXY, _tImgCtrXY_opencv, dicStats)
+
+
+# enddef
+
+
+######################################################################################################
+def create_lookup_fisheye(
+    _tSensorSizeXY,
+    _tFocLenXY,
+    _tImgCtrXY,
+    _tDistFish,
+    _iLutSupersampling=1,
+    _iLutBorderPixel=1,
+    _bBlenderFormat=True,
+):
+    """Creates a projection rays mask for the OpenCV fisheye (Kannala-Brandt) model and sensor size.
+    The field of view may exceed 180 degrees.
+
+    Args:
+        _tSensorSize (array_like): Image plane resolution (width, height). Expected shape (2,).
+        _tFocLenXY (array_like): Focal length (fx, fy). Expected shape (2,).
+        _tImgCtrXY (array_like): Principal point (ppx, ppy). Expected shape (2,).
+        _tDistFish (array_like): Fisheye distortion parameters (k1, k2, k3, k4). Expected shape (n,) where n in [0, 4].
+        _iLutSupersampling (int): Supersampling parameter, positive integer, defaults to 1 (no supersampling)
+        _iLutBorderPixel (int): Number of border pixels (or number of border "subpixels" in case for supersampling),
+            defaults to 1 (minimum allowed)
+        _bBlenderFormat (bool, optional): Whether to transform rays to blender CS. Defaults to True.
+
+    Returns:
+        dict: Same structure as returned by create_lookup().
+        If _bBlenderFormat is set to False, the projection rays of shape (3, WxH) are returned.
+    """
+    # The y axis is pointing downwards. Adjust the vertical centre accordingly.
+    _tImgCtrXY_opencv = [_tImgCtrXY[0], _tSensorSizeXY[1] - _tImgCtrXY[1]]
+
+    aU, aV = lut_pixel_grid(_tSensorSizeXY, _iLutSupersampling, _iLutBorderPixel)
+
+    # Evaluate rays directly on the (H, W) grid using broadcasting
+    aUv = (aU[np.newaxis, :], aV[:, np.newaxis])
+
+    dicStats = {}
+    aRays = inverse_opencv_fisheye(aUv, _tFocLenXY, _tImgCtrXY_opencv, _tDistFish, _dicStats=dicStats)
+
+    # Legacy return for verification purposes
+    if not _bBlenderFormat:
+        return aRays.reshape(3, -1)
+    # endif
+
+    # Rays are already normalized
+    return lut_from_rays(aRays, _tSensorSizeXY, _tImgCtrXY_opencv, dicStats, _bNormalize=False)
+
+
+# enddef
+
+
+######################################################################################################
+def unproject_pixels(
+    _aPixXY,
+    _tSensorSizeXY,
+    _tFocLenXY,
+    _tImgCtrXY,
+    _tDistRad=None,
+    *,
+    _tDistTan=None,
+    _tDistPrism=None,
+    _tDistTilt=None,
+    _tDistFish=None,
+):
+    """Map image positions to normalized ray directions in Blender's camera CS.
+
+    Args:
+        _aPixXY (numpy.ndarray): Image positions (x, y) with origin at the top-left image corner,
+            x-axis pointing right and y-axis pointing down. Pixel (0, 0) covers the range [0, 1).
+            Expected shape is (N, 2).
+        _tSensorSize (array_like): Image plane resolution (width, height). Expected shape (2,).
+        _tFocLenXY (array_like): Focal length (fx, fy). Expected shape (2,).
+        _tImgCtrXY (array_like): Principal point (ppx, ppy), as passed to create_lookup(). Expected shape (2,).
+        _tDistRad (array_like, optional): Radial distortion parameters (k1, ..., k6).
+        _tDistTan (array_like, optional): Tangential distortion parameters (p1, p2).
+        _tDistPrism (array_like, optional): Thin prism distortion parameters (s1, s2, s3, s4).
+        _tDistTilt (array_like, optional): Sensor tilt angles (tauX, tauY) in radians.
+        _tDistFish (array_like, optional): Fisheye distortion parameters (k1, k2, k3, k4).
+            If given, the OpenCV fisheye model is used and the other distortion parameters are ignored.
+
+    Returns:
+        numpy.ndarray: normalized rays with x-axis pointing right, y-axis pointing up
+        and the optical axis along -z. Shape is (N, 3).
+        numpy.ndarray: flags, whether the rays are valid. Shape is (N,).
+        Invalid rays are [0, 0, 0].
+
+    Raises:
+        RuntimeError: if the undistortion does not converge.
+    """
+    # The y axis is pointing downwards. Adjust the vertical centre accordingly.
+    _tImgCtrXY_opencv = [_tImgCtrXY[0], _tSensorSizeXY[1] - _tImgCtrXY[1]]
+
+    aUv = np.asarray(_aPixXY, dtype=np.float64).T
+
+    if _tDistFish is not None:
+        aRays = inverse_opencv_fisheye(aUv, _tFocLenXY, _tImgCtrXY_opencv, _tDistFish)
+    else:
+        tDistRad = () if _tDistRad is None else _tDistRad
+        tDistCoef = distortion_coefficients(tDistRad, _tDistTan, _tDistPrism)
+        bRadialOnly = not any(tDistCoef[3:]) and (_tDistTilt is None or not any(_tDistTilt))
+
+        if not bRadialOnly:
+            aRays = inverse_opencv_full(
+                aUv, _tFocLenXY, _tImgCtrXY_opencv, tDistRad, _tDistTan, _tDistPrism, _tDistTilt
+            )
+        else:
+            aRays = inverse_opencv_radial(aUv, _tFocLenXY, _tImgCtrXY_opencv, tDistRad)
+        # endif
+    # endif
+
+    if aRays is None:
+        raise RuntimeError("Undistortion of image positions did not converge")
+    # endif
+
+    # Transform rays to blender's camera CS and normalize
+    aRays_blender_cs = np.empty((aUv.shape[1], 3))
+    aRays_blender_cs[:, 0] = aRays[0]
+    np.subtract(0.0, aRays[1], out=aRays_blender_cs[:, 1])
+    np.subtract(0.0, aRays[2], out=aRays_blender_cs[:, 2])
+
+    aNorm = np.linalg.norm(aRays_blender_cs, axis=1)
+    aValid = np.isfinite(aNorm) & (aNorm > 0)
+    np.divide(aRays_blender_cs, aNorm[:, np.newaxis], out=aRays_blender_cs, where=aValid[:, np.newaxis])
+    aRays_blender_cs[~aValid] = 0.0
+
+    return aRays_blender_cs, aValid
+
+
+# enddef
+
+
+######################################################################################################
+def create_image_rays(
+    _tSensorSizeXY,
+    _tFocLenXY,
+    _tImgCtrXY,
+    _tDistRad=None,
+    *,
+    _tDistTan=None,
+    _tDistPrism=None,
+    _tDistTilt=None,
+    _tDistFish=None,
+):
+    """Creates the normalized ray directions through the image pixel centers,
+    without LUT border and supersampling. See unproject_pixels() for the arguments.
+
+    Returns:
+        numpy.ndarray: normalized rays in Blender's camera CS, with rows from top to bottom. Shape is (H, W, 3).
+        numpy.ndarray: flags, whether the rays are valid. Shape is (H, W).
+    """
+    iW, iH = int(_tSensorSizeXY[0]), int(_tSensorSizeXY[1])
+    aU_grid, aV_grid = np.meshgrid(np.arange(iW) + 0.5, np.arange(iH) + 0.5)
+    aPixXY = np.stack((np.ravel(aU_grid), np.ravel(aV_grid)), axis=1)
+
+    aRays, aValid = unproject_pixels(
+        aPixXY,
+        _tSensorSizeXY,
+        _tFocLenXY,
+        _tImgCtrXY,
+        _tDistRad,
+        _tDistTan=_tDistTan,
+        _tDistPrism=_tDistPrism,
+        _tDistTilt=_tDistTilt,
+        _tDistFish=_tDistFish,
+    )
+
+    return aRays.reshape(iH, iW, 3), aValid.reshape(iH, iW)
+
+
+# enddef
+
+
 ######################################################################################################
 def verify_inverse_model():
     """Testing method to verify that the projection rays are computed correctly."""
@@ -27,6 +27,7 @@
 ###
 
 import os
+import pickle
 from typing import Optional, Union, NamedTuple
 from collections.abc import Iterable
 
@@ -43,6 +44,8 @@ from anyblend.mesh.types import CMeshData
 
 from scipy.spatial import KDTree
 
+from .cls_lut_container import CLutContainer
+
 
 # ########################################################################################################
 # Render crop tuple
@@ -56,9 +59,93 @@ class CRenderCrop(NamedTuple):
 # endclass
 
 
+# ########################################################################################################
+def _EvalVecLen(_aVecs: np.ndarray, _aOut: np.ndarray) -> np.ndarray:
+    # Length of vectors along the last axis, evaluated in the given output array
+    np.einsum("...i,...i->...", _aVecs, _aVecs, out=_aOut)
+    return np.sqrt(_aOut, out=_aOut)
+
+
+# enddef
+
+
+# ########################################################################################################
+# Statistics of LUT ray directions, that can be evaluated per tile of LUT rows
+class CLutStats(NamedTuple):
+    # Maximal distance of a valid LUT pixel from the LUT center
+    fLutPixRadMax: float
+    # Maximal radial view angle
+    fRadAngleMax_deg: float
+    # Horizontal and vertical angle ranges
+    tAngleRangeX_deg: tuple[float, float]
+    tAngleRangeY_deg: tuple[float, float]
+
+    def Merge(self, _xStats: "CLutStats") -> "CLutStats":
+        return CLutStats(
+            fLutPixRadMax=max(self.fLutPixRadMax, _xStats.fLutPixRadMax),
+            fRadAngleMax_deg=max(self.fRadAngleMax_deg, _xStats.fRadAngleMax_deg),
+            tAngleRangeX_deg=(
+                min(self.tAngleRangeX_deg[0], _xStats.tAngleRangeX_deg[0]),
+                max(self.tAngleRangeX_deg[1], _xStats.tAngleRangeX_deg[1]),
+            ),
+            tAngleRangeY_deg=(
+                min(self.tAngleRangeY_deg[0], _xStats.tAngleRangeY_deg[0]),
+                max(self.tAngleRangeY_deg[1], _xStats.tAngleRangeY_deg[1]),
+            ),
+        )
+
+    # enddef
+
+
+# endclass
+
+
+# ########################################################################################################
+# Frustum mesh as flat arrays, which can be passed to foreach_set() of a Blender mesh
+class CFrustumMeshArrays(NamedTuple):
+    # Vertices of shape (N, 3)
+    aVex: np.ndarray
+    # Vertex indices of all face loops, and start index and vertex count of each face
+    aLoopVex: np.ndarray
+    aLoopStart: np.ndarray
+    aLoopTotal: np.ndarray
+    # The same faces split into triangles of shape (T, 3) and quads of shape (Q, 4)
+    aTriFaces: np.ndarray
+    aQuadFaces: np.ndarray
+
+
+# endclass
+
+
 # ########################################################################################################
 # The camera LUT class
 class CCameraLut:
+    # Members derived from the LUT image by FromArray(), that are
+    # exported by GetStateDict() and restored by FromState().
+    c_tStateMembers: tuple[str, ...] = (
+        "_iLutBorderPixel",
+        "_iLutSuperSampling",
+        "_fImgPerLutPix",
+        "_tLutPixCntRC",
+        "_tLutCenterRC",
+        "_tImgPixCntRC",
+        "_tImgCtrRC",
+        "_tImgCtrPixRC",
+        "_iRenderCtrPix",
+        "_iRenderPixCnt",
+        "_tCamShiftXY",
+        "_fRenderFoV_deg",
+        "_fRenderPixPerDeg",
+        "_tRenderLutAngleRangeX_deg",
+        "_tRenderLutAngleRangeY_deg",
+        "_tLutAngleRangeX_deg",
+        "_tLutAngleRangeY_deg",
+        "_tRenderImgPixRangeCol",
+        "_tRenderImgPixRangeRow",
+        "_xRenderCrop",
+        "_fRadAngleMax_deg",
+    )
+
     def __init__(self):
         # ########################################
         # Member Variables
@@ -71,6 +158,9 @@ class CCameraLut:
         # Mask of valid pixels in LUT
         self._aLutMask: np.ndarray = None
 
+        # Floating point type of the LUT and of all intermediate arrays evaluated from it
+        self._xDType: np.dtype = np.dtype(np.float32)
+
         # Number of LUT pixels used as border
         self._iLutBorderPixel: int = None
 
@@ -144,6 +234,45 @@ class CCameraLut:
 
         # Maximal radial view angle of LUT
         self._fRadAngleMax_deg: float = None
+
+        # Path to LUT file, if LUT was loaded from file
+        self._pathLutFile: Path = None
+
+        # KD-tree over all LUT ray directions. Created on first use
+        # and kept for the lifetime of the LUT.
+        self._xKdTree: KDTree = None
+
+        # Whether the KD-tree is loaded from/saved to a pickle file next to the LUT file.
+        # Loading a pickle file can execute arbitrary code, so this is an explicit opt-in.
+        self._bAllowKdTreePickle: bool = False
+
+        # Inverse LUT: sub-pixel image positions (row, column) on a regular grid
+        # over the equidistant fisheye angle space. Grid rows are along the vertical angle.
+        self._aInvLutPixPosRC: np.ndarray = None
+
+        # Flags per inverse LUT grid node, whether the image position is defined
+        self._aInvLutDefined: np.ndarray = None
+
+        # Angle coordinates (radians) of the first inverse LUT grid node
+        self._tInvLutMinUV: tuple[float, float] = None
+
+        # Angle step (radians) between inverse LUT grid nodes
+        self._fInvLutStep: float = None
+
+        # Number of grid cells along the larger angle range
+        self._iInvLutGridSize: int = None
+
+        # Maximal and mean reprojection error of inverse LUT in image pixels
+        self._fInvLutErrorMax_pix: float = None
+        self._fInvLutErrorMean_pix: float = None
+
+        # Fraction of valid LUT pixels that are reproduced by the inverse LUT
+        self._fInvLutCoverage: float = None
+
+        # Normalized ray directions through the image pixel centers and their valid flags.
+        # Created on first use by GetImageRayDirs().
+        self._aImgRayDirs: np.ndarray = None
+        self._aImgRayValid: np.ndarray = None
         # ########################################
 
     # enddef
@@ -217,6 +346,12 @@ class CCameraLut:
 
     # enddef
 
+    @property
+    def xDType(self) -> np.dtype:
+        return self._xDType
+
+    # enddef
+
     @property
     def aLutMask(self) -> np.ndarray:
         return self._aLutMask
@@ -274,6 +409,42 @@ class CCameraLut:
 
     # enddef
 
+    @property
+    def pathLutFile(self) -> Path:
+        return self._pathLutFile
+
+    # enddef
+
+    @property
+    def bHasKdTree(self) -> bool:
+        return self._xKdTree is not None
+
+    # enddef
+
+    @property
+    def bHasInverseLut(self) -> bool:
+        return self._aInvLutPixPosRC is not None
+
+    # enddef
+
+    @property
+    def fInverseLutErrorMax_pix(self) -> float:
+        return self._fInvLutErrorMax_pix
+
+    # enddef
+
+    @property
+    def fInverseLutErrorMean_pix(self) -> float:
+        return self._fInvLutErrorMean_pix
+
+    # enddef
+
+    @property
+    def fInverseLutCoverage(self) -> float:
+        return self._fInvLutCoverage
+
+    # enddef
+
     # ##########################################################################################################
     def LutToImgPixelValue(self, _fLutPix: float) -> float:
         return (_fLutPix - self._iLutBorderPixel - (self._iLutSuperSampling / 2.0 - 0.5)) * self._fImgPerLutPix
@@ -307,7 +478,45 @@ class CCameraLut:
         _iLutSuperSampling: int = 1,
         _fLutCenterRow: Optional[float] = None,
         _fLutCenterCol: Optional[float] = None,
+        _bAllowKdTreePickle: bool = False,
+        _bStreamTiles: bool = False,
+        _iTileRowCnt: Optional[int] = None,
+        _xMemMapPath: Union[str, list, tuple, Path, None] = None,
+        _sPrecision: str = "float32",
     ):
+        """Load LUT from an image file or from a LUT container file.
+        A LUT container (see CLutContainer) is detected by its magic bytes and memory mapped
+        via FromContainer(). In this case, the LUT parameters are read from the container
+        and the arguments _iLutBorderPixel, _iLutSuperSampling, _fLutCenterRow, _fLutCenterCol,
+        _bStreamTiles, _iTileRowCnt, _xMemMapPath and _sPrecision are ignored.
+
+        Parameters
+        ----------
+        _bAllowKdTreePickle : bool, optional
+            If true, the KD-tree used to map ray directions to pixels is loaded from
+            the file given by GetKdTreeFilePath(), if it exists and matches the LUT file.
+            Otherwise, the KD-tree is created on first use and saved to that file,
+            so that other processes can load it instead of rebuilding it. By default False.
+            The KD-tree file is a pickle file, and loading it can execute arbitrary code.
+            Only enable this, if all KD-tree files next to the LUT files are trusted.
+        _bStreamTiles : bool, optional
+            If true, the LUT is normalized and evaluated in tiles of LUT rows and stored
+            as a single float32 array. For a LUT file with 4 float channels, the loaded image
+            buffer is reused for the LUT, so that the peak memory is about the size of the final LUT.
+            Otherwise, the LUT is evaluated as a whole, which needs several float64 copies of the LUT.
+            By default False.
+        _iTileRowCnt : Optional[int], optional
+            Number of LUT rows per tile, if _bStreamTiles is true. The temporary arrays per tile
+            need about 20 times the memory of the final LUT rows. If None, 1/128th of the LUT rows
+            are used per tile. By default None.
+        _xMemMapPath : Union[str, list, tuple, Path, None], optional
+            If given and _bStreamTiles is true, the LUT is stored in a numpy '.npy' file
+            at this path and kept as memory map. By default None.
+        _sPrecision : str, optional
+            Floating point precision of the LUT and all intermediate arrays,
+            either "float32" or "float64". With _bStreamTiles, the LUT itself is always
+            stored as float32. By default "float32".
+        """
         assertion.FuncArgTypes()
 
         pathLut = anypath.MakeNormPath(_xFilePath)
@@ -316,6 +525,11 @@ class CCameraLut:
         # endif
         sPathLut = pathLut.as_posix()
 
+        if CLutContainer.IsContainerFile(pathLut):
+            self.FromContainer(_xFilePath=pathLut, _bAllowKdTreePickle=_bAllowKdTreePickle)
+            return
+        # endif
+
         imgLut = cv2.imread(sPathLut, cv2.IMREAD_ANYCOLOR | cv2.IMREAD_ANYDEPTH | cv2.IMREAD_UNCHANGED)
         if imgLut is None:
             raise RuntimeError("Error loading image: {0}".format(sPathLut))
@@ -325,6 +539,22 @@ class CCameraLut:
             raise RuntimeError("LUT image has less than three channels")
         # endif
 
+        if _bStreamTiles is True:
+            self._FromImageTiled(
+                _imgBgr=imgLut,
+                _iLutBorderPixel=_iLutBorderPixel,
+                _iLutSuperSampling=_iLutSuperSampling,
+                _fLutCenterRow=_fLutCenterRow,
+                _fLutCenterCol=_fLutCenterCol,
+                _iTileRowCnt=_iTileRowCnt,
+                _xMemMapPath=_xMemMapPath,
+                _sPrecision=_sPrecision,
+            )
+            self._pathLutFile = pathLut
+            self._bAllowKdTreePickle = _bAllowKdTreePickle
+            return
+        # endif
+
         # Flip order of color channel elements, as cv2 stores images as BGR and not RGB.
         if imgLut.shape[2] == 4:
             imgLut = imgLut[:, :, [2, 1, 0, 3]].astype(np.float32)
@@ -338,8 +568,12 @@ class CCameraLut:
             _iLutSuperSampling=_iLutSuperSampling,
             _fLutCenterRow=_fLutCenterRow,
             _fLutCenterCol=_fLutCenterCol,
+            _sPrecision=_sPrecision,
         )
 
+        self._pathLutFile = pathLut
+        self._bAllowKdTreePickle = _bAllowKdTreePickle
+
     # enddef
 
     # ##########################################################################################################
@@ -351,35 +585,145 @@ class CCameraLut:
         _iLutSuperSampling: int = 1,
         _fLutCenterRow: Optional[float] = None,
         _fLutCenterCol: Optional[float] = None,
+        _sPrecision: str = "float32",
     ):
-        self._iLutBorderPixel = max(0, _iLutBorderPixel)
-        self._iLutSuperSampling = max(1, _iLutSuperSampling)
-        self._fImgPerLutPix: float = 1.0 / self._iLutSuperSampling
+        """Initialize LUT from an image array.
 
+        Parameters
+        ----------
+        _imgLut : np.ndarray
+            LUT image of shape (rows, cols, channels) with 3 or 4 channels. The first three
+            channels are the ray directions, the optional fourth channel the vignetting values.
+        _iLutBorderPixel : int, optional
+            Number of LUT pixels used as border, by default 0.
+        _iLutSuperSampling : int, optional
+            Number of LUT pixels per image pixel, by default 1.
+        _fLutCenterRow, _fLutCenterCol : Optional[float], optional
+            LUT pixel position of the principle point. If None, the LUT center is used.
+        _sPrecision : str, optional
+            Floating point precision of the LUT and all intermediate arrays,
+            either "float32" or "float64". By default "float32".
+        """
         iLutRows, iLutCols, iLutChnl = _imgLut.shape
 
         if iLutChnl < 3:
             raise RuntimeError("LUT image has less than three channels")
         # endif
 
-        self._tLutPixCntRC: tuple[int, int] = (iLutRows, iLutCols)
+        self._InitLut(
+            _tLutPixCntRC=(iLutRows, iLutCols),
+            _iLutBorderPixel=_iLutBorderPixel,
+            _iLutSuperSampling=_iLutSuperSampling,
+            _fLutCenterRow=_fLutCenterRow,
+            _fLutCenterCol=_fLutCenterCol,
+            _sPrecision=_sPrecision,
+        )
 
-        imgDir = _imgLut[:, :, 0:3]
+        self._imgLut, self._aLutMask, xStats = self._EvalLutTile(_imgLut, 0)
+        self._EvalRenderParams(xStats)
 
-        # Normalize vectors in LUT image
-        aLen = np.linalg.norm(imgDir, axis=2)
-        self._aLutMask = np.expand_dims(aLen > 1e-6, axis=2)
-        imgDirNorm = np.zeros(imgDir.shape)
-        np.divide(imgDir, np.expand_dims(aLen, axis=2), out=imgDirNorm, where=self._aLutMask)
+    # enddef
 
-        # Add alpha channel as vignetting values per pixel
-        if iLutChnl == 4:
-            self._imgLut = np.concatenate(
-                (imgDirNorm, np.expand_dims(_imgLut[:, :, 3], axis=2).astype(np.float32)), axis=2
+    # ##########################################################################################################
+    def _FromImageTiled(
+        self,
+        *,
+        _imgBgr: np.ndarray,
+        _iLutBorderPixel: int,
+        _iLutSuperSampling: int,
+        _fLutCenterRow: Optional[float],
+        _fLutCenterCol: Optional[float],
+        _iTileRowCnt: Optional[int],
+        _xMemMapPath: Union[str, list, tuple, Path, None],
+        _sPrecision: str,
+    ):
+        # Initialize LUT from an image as loaded by cv2, with color channels in BGR(A) order,
+        # processing the image in tiles of rows. The resulting LUT is a float32 array.
+        # For a 4 channel float32 image without memory map, the image is overwritten by the LUT.
+        iLutRows, iLutCols, iLutChnl = _imgBgr.shape
+
+        self._InitLut(
+            _tLutPixCntRC=(iLutRows, iLutCols),
+            _iLutBorderPixel=_iLutBorderPixel,
+            _iLutSuperSampling=_iLutSuperSampling,
+            _fLutCenterRow=_fLutCenterRow,
+            _fLutCenterCol=_fLutCenterCol,
+            _sPrecision=_sPrecision,
+        )
+
+        if _xMemMapPath is not None:
+            pathMemMap = anypath.MakeNormPath(_xMemMapPath)
+            imgLut = np.lib.format.open_memmap(
+                pathMemMap.as_posix(), mode="w+", dtype=np.float32, shape=(iLutRows, iLutCols, 4)
             )
+        elif iLutChnl == 4 and _imgBgr.dtype == np.float32:
+            # Each tile is evaluated completely before it is written back
+            imgLut = _imgBgr
+        else:
+            imgLut = np.empty((iLutRows, iLutCols, 4), dtype=np.float32)
+        # endif
+
+        aLutMask = np.empty((iLutRows, iLutCols, 1), dtype=bool)
+        lChnl = [2, 1, 0, 3] if iLutChnl == 4 else [2, 1, 0]
+        if _iTileRowCnt is None:
+            iTileRowCnt = max(8, iLutRows // 128)
         else:
-            self._imgLut = np.concatenate((imgDirNorm, np.ones((iLutRows, iLutCols, 1), dtype=np.float32)), axis=2)
+            iTileRowCnt = max(1, _iTileRowCnt)
+        # endif
+        xStats: CLutStats = None
+
+        for iRowStart in range(0, iLutRows, iTileRowCnt):
+            iRowEnd = min(iRowStart + iTileRowCnt, iLutRows)
+            imgTile = _imgBgr[iRowStart:iRowEnd, :, lChnl].astype(np.float32)
+
+            imgTileLut, aTileMask, xTileStats = self._EvalLutTile(imgTile, iRowStart)
+            imgLut[iRowStart:iRowEnd] = imgTileLut
+            aLutMask[iRowStart:iRowEnd] = aTileMask
+            xStats = xTileStats if xStats is None else xStats.Merge(xTileStats)
+        # endfor
+
+        if isinstance(imgLut, np.memmap):
+            imgLut.flush()
+        # endif
+
+        self._imgLut = imgLut
+        self._aLutMask = aLutMask
+        self._EvalRenderParams(xStats)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _InitLut(
+        self,
+        *,
+        _tLutPixCntRC: tuple[int, int],
+        _iLutBorderPixel: int,
+        _iLutSuperSampling: int,
+        _fLutCenterRow: Optional[float],
+        _fLutCenterCol: Optional[float],
+        _sPrecision: str,
+    ):
+        dicDType = {"float32": np.float32, "float64": np.float64}
+        if _sPrecision not in dicDType:
+            raise RuntimeError(f"Unsupported LUT precision '{_sPrecision}'. Expect one of {list(dicDType.keys())}")
         # endif
+        self._xDType = np.dtype(dicDType[_sPrecision])
+
+        self._iLutBorderPixel = max(0, _iLutBorderPixel)
+        self._iLutSuperSampling = max(1, _iLutSuperSampling)
+        self._fImgPerLutPix: float = 1.0 / self._iLutSuperSampling
+
+        # The spatial index and inverse LUT refer to the previous LUT, if any
+        self._pathLutFile = None
+        self._xKdTree = None
+        self._bAllowKdTreePickle = False
+        self._aInvLutPixPosRC = None
+        self._aInvLutDefined = None
+        self._aImgRayDirs = None
+        self._aImgRayValid = None
+
+        iLutRows, iLutCols = _tLutPixCntRC
+        self._tLutPixCntRC: tuple[int, int] = (iLutRows, iLutCols)
 
         # LUT center refers to the principle point
         fLutCtrRow = _fLutCenterRow
@@ -395,12 +739,6 @@ class CCameraLut:
         # LUT center refers to the principle point
         self._tLutCenterRC: tuple[float, float] = (fLutCtrRow, fLutCtrCol)
 
-        aValidIdx = np.argwhere(aLen > 1e-6)
-        aValidRelIdx = aValidIdx - np.array([[fLutCtrRow, fLutCtrRow]])
-        aValidIdxRad = np.linalg.norm(aValidRelIdx, axis=1)
-        fLutPixRadMax = np.max(aValidIdxRad).item()
-        fImgPixRadMax = self.LutToImgPixelValue(fLutPixRadMax)
-
         fPixCols = (iLutCols - 2 * self._iLutBorderPixel) / self._iLutSuperSampling
         if math.fmod(fPixCols, 1.0) > 1e-3:
             raise RuntimeError(
@@ -428,33 +766,112 @@ class CCameraLut:
         # The remaining offset can be adjusted by a camera shift.
         self._tImgCtrPixRC: tuple[int, int] = tuple([int(math.floor(x)) for x in self._tImgCtrRC])
 
-        # Assume -Z-axis points into the view direction of the camera
-        aRadDir = self._imgLut[:, :, 0:2]
-        aRadLen = np.linalg.norm(aRadDir, axis=2)
+    # enddef
+
+    # ##########################################################################################################
+    def _EvalLutTile(self, _imgTile: np.ndarray, _iRowStart: int) -> tuple[np.ndarray, np.ndarray, CLutStats]:
+        """Normalize the ray directions of a tile of LUT rows and evaluate the statistics of the tile.
+        All intermediate arrays use the floating point type of the LUT.
+
+        Parameters
+        ----------
+        _imgTile : np.ndarray
+            LUT rows with 3 or 4 channels in RGB(A) order.
+        _iRowStart : int
+            LUT row index of the first row of the tile.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, CLutStats]
+            The normalized LUT tile with 4 channels, the LUT mask tile and the tile statistics.
+        """
+        iRows, iCols, iChnl = _imgTile.shape
+        xDType = self._xDType
+
+        # Output LUT tile, with the ray directions normalized in place
+        imgLut = np.empty((iRows, iCols, 4), dtype=xDType)
+        imgDir = imgLut[:, :, 0:3]
+        imgDir[:] = _imgTile[:, :, 0:3]
+
+        # Add alpha channel as vignetting values per pixel
+        if iChnl == 4:
+            imgLut[:, :, 3] = _imgTile[:, :, 3].astype(np.float32)
+        else:
+            imgLut[:, :, 3] = 1.0
+        # endif
+
+        # Normalize vectors in LUT image
+        aLen = _EvalVecLen(imgDir, np.empty((iRows, iCols), dtype=xDType))
+        aMask = aLen > 1e-6
+        aLutMask = aMask[:, :, np.newaxis]
+        np.divide(imgDir, aLen[:, :, np.newaxis], out=imgDir, where=aLutMask)
+        np.multiply(imgDir, aLutMask, out=imgDir)
+
+        # The maximal distance of a valid pixel from the LUT center
+        # is attained at the first or last valid column of a row.
+        aRowValid = np.any(aMask, axis=1)
+        aRowIdx = np.flatnonzero(aRowValid)
+        if aRowIdx.shape[0] > 0:
+            aColFirst = np.argmax(aMask[aRowIdx], axis=1)
+            aColLast = iCols - 1 - np.argmax(aMask[aRowIdx, ::-1], axis=1)
+            fLutCtrRow = self._tLutCenterRC[0]
+            aRelRow = aRowIdx + (_iRowStart - fLutCtrRow)
+            aRelCol = np.maximum(np.abs(aColFirst - fLutCtrRow), np.abs(aColLast - fLutCtrRow))
+            fLutPixRadMax = math.sqrt(np.max(aRelRow * aRelRow + aRelCol * aRelCol))
+        else:
+            fLutPixRadMax = -1.0
+        # endif
+
+        # Assume -Z-axis points into the view direction of the camera.
+        # The buffer aLen is reused for the negated z-components.
+        aRadDir = imgLut[:, :, 0:2]
+        aRadLen = _EvalVecLen(aRadDir, np.empty((iRows, iCols), dtype=xDType))
         aMask2 = aRadLen > 1e-6
-        aMask3 = np.expand_dims(aMask2, axis=2)
-        aRadDirNorm = np.divide(aRadDir, np.expand_dims(aRadLen, axis=2), where=aMask3)
 
-        aRadZ = -self._imgLut[:, :, 2]
-        aRadAngle = np.zeros(aRadLen.shape)
+        aRadZ = np.negative(imgLut[:, :, 2], out=aLen)
+        aRadAngle = np.zeros((iRows, iCols), dtype=xDType)
         np.arctan2(aRadLen, aRadZ, out=aRadAngle, where=aMask2)
-        aRadAngle_deg = np.degrees(aRadAngle)
-        self._fRadAngleMax_deg = math.ceil(np.max(aRadAngle_deg, initial=0.0, where=aMask2))
+        fRadAngleMax_deg = math.degrees(np.max(aRadAngle, initial=0.0, where=aMask2))
+
+        # Angle along horizontal and vertical direction of equidistant projection.
+        # The buffer aLen is reused for each direction.
+        aRadAngleDir_deg = aLen
+        lAngleRanges: list[tuple[float, float]] = []
+        for iAxis in range(2):
+            aRadAngleDir_deg.fill(0.0)
+            np.divide(aRadDir[:, :, iAxis], aRadLen, out=aRadAngleDir_deg, where=aMask2)
+            np.multiply(aRadAngleDir_deg, aRadAngle, out=aRadAngleDir_deg)
+            np.degrees(aRadAngleDir_deg, out=aRadAngleDir_deg)
+            lAngleRanges.append(
+                (
+                    float(np.min(aRadAngleDir_deg, initial=1000.0, where=aMask2)),
+                    float(np.max(aRadAngleDir_deg, initial=-1000.0, where=aMask2)),
+                )
+            )
+        # endfor
 
-        aRadAngleDir = np.zeros(aRadDirNorm.shape)
-        np.multiply(aRadDirNorm, np.expand_dims(aRadAngle, axis=2), out=aRadAngleDir, where=aMask3)
+        xStats = CLutStats(
+            fLutPixRadMax=fLutPixRadMax,
+            fRadAngleMax_deg=fRadAngleMax_deg,
+            tAngleRangeX_deg=lAngleRanges[0],
+            tAngleRangeY_deg=lAngleRanges[1],
+        )
 
-        aRadAngleDir_deg = np.degrees(aRadAngleDir)
+        return imgLut, aLutMask, xStats
 
-        self._tLutAngleRangeX_deg = (
-            np.min(aRadAngleDir_deg[:, :, 0], initial=1000.0, where=aMask2),
-            np.max(aRadAngleDir_deg[:, :, 0], initial=-1000.0, where=aMask2),
-        )
+    # enddef
 
-        self._tLutAngleRangeY_deg = (
-            np.min(aRadAngleDir_deg[:, :, 1], initial=1000.0, where=aMask2),
-            np.max(aRadAngleDir_deg[:, :, 1], initial=-1000.0, where=aMask2),
-        )
+    # ##########################################################################################################
+    def _EvalRenderParams(self, _xStats: CLutStats):
+        if _xStats.fLutPixRadMax < 0.0:
+            raise RuntimeError("LUT image has no valid ray directions")
+        # endif
+
+        fImgPixRadMax = self.LutToImgPixelValue(_xStats.fLutPixRadMax)
+
+        self._fRadAngleMax_deg = math.ceil(_xStats.fRadAngleMax_deg)
+        self._tLutAngleRangeX_deg = _xStats.tAngleRangeX_deg
+        self._tLutAngleRangeY_deg = _xStats.tAngleRangeY_deg
 
         # Index to the central render pixel in row and column.
         # This calculation ensures that the effective image is inside the
@@ -512,456 +929,1263 @@ class CCameraLut:
     # enddef
 
     # ##########################################################################################################
-    def GetLutImgPixelRadii(self) -> np.ndarray:
-        aLutCtr = np.array(self._tImgCtrRC)
-
-        aLutIdx = np.argwhere(self._aLutMask[:, :, 0])
-        aLutRelIdx = aLutIdx - aLutCtr[np.newaxis, :]
-
-        aLutImgRad = np.linalg.norm(aLutRelIdx, axis=1) * self._fImgPerLutPix
-
-        aLutImgRad2d = np.zeros(self._aLutMask.shape[0:2])
-        aLutImgRad2d[aLutIdx[:, 0], aLutIdx[:, 1]] = aLutImgRad
-
-        return aLutImgRad2d
-
-    # enddef
-
-    # ##########################################################################################################
-    def GetLutAngles_rad(self) -> np.ndarray:
-        aRadDir = self._imgLut[:, :, 0:2]
-        aRadLen = np.linalg.norm(aRadDir, axis=2)
-
-        aRadZ = -self._imgLut[:, :, 2]
-        aRadTheta = np.zeros_like(aRadLen)
-        np.arctan2(aRadLen, aRadZ, out=aRadTheta, where=self._aLutMask[:, :, 0])
+    def GetStateDict(self) -> dict:
+        """Get all scalar properties derived from the LUT image by FromArray().
+        Together with the LUT image and mask, the returned dictionary fully
+        describes the LUT and can be stored as JSON.
 
-        aRadPhi = np.zeros_like(aRadLen)
-        np.arctan2(aRadDir[:, :, 1], aRadDir[:, :, 0], out=aRadPhi, where=self._aLutMask[:, :, 0])
+        Returns
+        -------
+        dict
+            Dictionary of member names and values. Tuples are stored as lists.
+        """
+        if self._imgLut is None:
+            raise RuntimeError("LUT not initialized")
+        # endif
 
-        aAngles = np.concatenate((aRadTheta[:, :, np.newaxis], aRadPhi[:, :, np.newaxis]), axis=2)
+        dicState: dict = {}
+        for sMember in CCameraLut.c_tStateMembers:
+            xValue = getattr(self, sMember)
+            if isinstance(xValue, tuple):
+                xValue = [x.item() if isinstance(x, np.generic) else x for x in xValue]
+            elif isinstance(xValue, np.generic):
+                xValue = xValue.item()
+            # endif
+            dicState[sMember] = xValue
+        # endfor
 
-        return aAngles
+        return dicState
 
     # enddef
 
     # ##########################################################################################################
-    def RayDirsToPixelsRC(
-        self, _aTestDirs: np.ndarray, *, _bNormalize: bool = False
-    ) -> tuple[list[list[float]], list[bool]]:
-        """Map ray directions to 2D-pixel image positions in pixel-centered CV-coordinate system,
-        with origin at top-left, x-axis pointing right, y-axis pointing down.
-        IMPORTANT: Pixel coordinates are pixel centered,
-        e.g. pixel (0,0) is the center of the top-left pixel and
-        (-0.5, -0.5) is the top-left corner of the top-left pixel.
+    def FromState(
+        self,
+        *,
+        _imgLut: np.ndarray,
+        _aLutMask: np.ndarray,
+        _dicState: dict,
+        _xFilePath: Union[str, list, tuple, Path, None] = None,
+    ):
+        """Initialize LUT from a LUT image, a LUT mask and a state dictionary
+        as created by GetStateDict(), without evaluating the LUT image again.
 
         Parameters
         ----------
-        _aTestDirs : np.ndarray
-            Array of 3D-direction vectors in camera frame to map to image.
-            Input vectors can be normalized, so that you can also pass 3D-point positions in the camera frame.
-
-        _bNormalize : bool
-            If true, the input vectors are normalized.
-
-        Returns
-        -------
-        tuple[list[list[float]], list[bool]]
-            Tuple of list of 2D (row, column) pixel positions
-            and list of bool flags, whether projection is valid.
-            IMPORTANT: Pixel coordinates are pixel centered,
-            e.g. pixel (0,0) is the center of the top-left pixel and
-            (-0.5, -0.5) is the top-left corner of the top-left pixel.
+        _imgLut : np.ndarray
+            The normalized LUT image with 4 channels, as returned by property imgLut.
+            The array is used as is, so it may also be a read-only memory map.
+        _aLutMask : np.ndarray
+            The LUT mask, as returned by property aLutMask.
+        _dicState : dict
+            The state dictionary.
+        _xFilePath : Union[str, list, tuple, Path, None], optional
+            The file the LUT image was loaded from, if any. KD-tree and inverse LUT files
+            are stored next to this file.
         """
-        if len(_aTestDirs.shape) != 2:
-            raise RuntimeError("Argument '_aRayDirs' must be a 2D array")
+        if _imgLut.ndim != 3 or _imgLut.shape[2] != 4:
+            raise RuntimeError("LUT image must have four channels")
         # endif
 
-        if _aTestDirs.shape[1] != 3:
-            raise RuntimeError("Ray directions array must have size 3 in second dimension")
+        if _aLutMask.shape != (_imgLut.shape[0], _imgLut.shape[1], 1):
+            raise RuntimeError("LUT mask does not match LUT image size")
         # endif
 
-        aTestDirs = _aTestDirs
+        lMissing = [x for x in CCameraLut.c_tStateMembers if x not in _dicState]
+        if len(lMissing) > 0:
+            raise RuntimeError(f"LUT state is missing the elements: {lMissing}")
+        # endif
 
-        if _bNormalize is True:
-            aTestDirsLen = np.linalg.norm(_aTestDirs, axis=1)
-            # Normalized input ray directions
-            aTestDirs = np.divide(_aTestDirs, aTestDirsLen[:, np.newaxis])
+        for sMember in CCameraLut.c_tStateMembers:
+            xValue = _dicState[sMember]
+            if sMember == "_xRenderCrop":
+                xValue = CRenderCrop(*xValue)
+            elif isinstance(xValue, list):
+                xValue = tuple(xValue)
+            # endif
+            setattr(self, sMember, xValue)
+        # endfor
+
+        if self._tLutPixCntRC != (_imgLut.shape[0], _imgLut.shape[1]):
+            raise RuntimeError("LUT state does not match LUT image size")
         # endif
 
-        aRayDirs: np.ndarray = self._imgLut[:, :, 0:3]
-        iRowCnt, iColCnt, _ = aRayDirs.shape
-        iPixCnt = iRowCnt * iColCnt
+        # A float16 LUT is converted to float32, as the rounding errors of the ray directions
+        # would otherwise be amplified by the frustum decimation, KD-tree and inverse LUT.
+        if _imgLut.dtype == np.float16:
+            _imgLut = CCameraLut._WidenHalfLut(_imgLut, _aLutMask)
+        # endif
 
-        aRayDirsFlat = aRayDirs.reshape(iPixCnt, 3)
+        self._imgLut = _imgLut
+        self._aLutMask = _aLutMask
+        self._xDType = np.dtype(_imgLut.dtype)
 
-        iTestDirCnt = aTestDirs.shape[0]
-        if iTestDirCnt < 4:
-            # original code: brute force computation of distances to find nearest ray
-            aTestDirsEx = np.expand_dims(aTestDirs, axis=1)
-            aRayDirsFlatEx = np.expand_dims(aRayDirsFlat, axis=0)
+        self._pathLutFile = None if _xFilePath is None else anypath.MakeNormPath(_xFilePath)
+        self._xKdTree = None
+        self._bAllowKdTreePickle = False
+        self._aInvLutPixPosRC = None
+        self._aInvLutDefined = None
+        self._aImgRayDirs = None
+        self._aImgRayValid = None
 
-            aSub = aRayDirsFlatEx - aTestDirsEx
-            aDist = np.linalg.norm(aSub, axis=2)
-            aMinIdx = np.argmin(aDist, axis=1)
-        else:
-            # speed-up if many points need to be projected:
-            # use kd-tree to exclude huge parts of the image from the brute force computation
-            iPixelCnt = aRayDirsFlat.shape[0]
-            xKdTree = KDTree(aRayDirsFlat, leafsize=iPixelCnt // 50)
-            _, aMinIdx = xKdTree.query(aTestDirs)
-        # endif
-
-        lPixPosRC: list[list[float]] = []
-        lPixValid: list[bool] = []
-
-        for iTestIdx, iMinIdx in enumerate(aMinIdx):
-            bValid = False
-            lPosRC = [0.0, 0.0]
-
-            iRowIdx = iMinIdx // iColCnt
-            iColIdx = iMinIdx % iColCnt
-            # print(f"{iRowIdx}, {iColIdx}")
-
-            # Dummy loop to enable jumping over remaining code block
-            # for invalid points.
-            while True:
-                aOrig = aRayDirs[iRowIdx, iColIdx]
-                # Test whether origin is valid
-                if np.linalg.norm(aOrig) < 0.9:
-                    break
-                # endif
-
-                # #####################################################
-                # Linear Interpolation
-                if iColIdx >= iColCnt - 1:
-                    aPos = aRayDirs[iRowIdx, iColIdx - 1]
-                    if np.linalg.norm(aPos) < 0.9:
-                        break
-                    # endif
-                    aX = aOrig - aPos
-
-                else:
-                    aPos = aRayDirs[iRowIdx, iColIdx + 1]
-                    if np.linalg.norm(aPos) < 0.9:
-                        break
-                    # endif
-                    aX = aPos - aOrig
-                # endif
-
-                if iRowIdx >= iRowCnt - 1:
-                    aPos = aRayDirs[iRowIdx - 1, iColIdx]
-                    if np.linalg.norm(aPos) < 0.9:
-                        break
-                    # endif
-                    aY = aOrig - aPos
-
-                else:
-                    aPos = aRayDirs[iRowIdx + 1, iColIdx]
-                    if np.linalg.norm(aPos) < 0.9:
-                        break
-                    # endif
-                    aY = aPos - aOrig
-                # endif
-
-                aTest = aTestDirs[iTestIdx]
-
-                fXlen = np.linalg.norm(aX)
-                fYlen = np.linalg.norm(aY)
-
-                aDelta = aTest - aOrig
-
-                # print(f"aDelta, aX, fXlen: {aDelta}, {aX}, {fXlen}")
-                # print(f"aDelta, aY, fYlen: {aDelta}, {aY}, {fYlen}")
-                if fXlen == 0:
-                    fDeltaPixX = 0
-                else:
-                    fDeltaPixX = np.dot(aDelta, aX) / (fXlen * fXlen)
-                if fYlen == 0:
-                    fDeltaPixY = 0
-                else:
-                    fDeltaPixY = np.dot(aDelta, aY) / (fYlen * fYlen)
-                # #####################################################
-
-                lPosRC = [float(iRowIdx + fDeltaPixY), float(iColIdx + fDeltaPixX)]
-                lPosRC = list(self.LutToImgPixel(lPosRC))
-
-                bValid: bool = (
-                    lPosRC[0] * self._iLutSuperSampling + self._iLutBorderPixel
-                    >= -0.5 * (1 / self._iLutSuperSampling)
-                    and lPosRC[0] * self._iLutSuperSampling + self._iLutBorderPixel
-                    <= iRowCnt
-                    and lPosRC[1] * self._iLutSuperSampling + self._iLutBorderPixel
-                    >= -0.5 * (1 / self._iLutSuperSampling)
-                    and lPosRC[1] * self._iLutSuperSampling + self._iLutBorderPixel
-                    <= iColCnt
-                )
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def _WidenHalfLut(_imgLut: np.ndarray, _aLutMask: np.ndarray, *, _iTileRowCnt: int = 256) -> np.ndarray:
+        # Convert a float16 LUT to float32 per tile of rows and normalize the ray directions again,
+        # which are only of unit length up to the float16 rounding errors.
+        iLutRows, iLutCols, iLutChnl = _imgLut.shape
+        imgLut = np.empty((iLutRows, iLutCols, iLutChnl), dtype=np.float32)
+
+        for iRowStart in range(0, iLutRows, _iTileRowCnt):
+            iRowEnd = min(iRowStart + _iTileRowCnt, iLutRows)
+            imgTile = imgLut[iRowStart:iRowEnd]
+            imgTile[:] = _imgLut[iRowStart:iRowEnd]
 
-                if bValid:
-                    lPosRCRay = self._imgLut[
-                        max(
-                            0,
-                            int(
-                                np.floor(
-                                    lPosRC[0] * self._iLutSuperSampling
-                                    + self._iLutBorderPixel
-                                )
-                            ),
-                        ),
-                        max(
-                            0,
-                            int(
-                                np.floor(
-                                    lPosRC[1] * self._iLutSuperSampling
-                                    + self._iLutBorderPixel
-                                )
-                            ),
-                        ),
-                    ]
-                    if lPosRCRay[0] == 0 and lPosRCRay[1] == 0 and lPosRCRay[2] == 0:
-                        bValid = False
-
-                break
-            # endwhile dummy
-
-            lPixPosRC.append(lPosRC)
-            lPixValid.append(bValid)
+            imgDir = imgTile[:, :, 0:3]
+            aLen = _EvalVecLen(imgDir, np.empty((iRowEnd - iRowStart, iLutCols), dtype=np.float32))
+            np.divide(imgDir, aLen[:, :, np.newaxis], out=imgDir, where=_aLutMask[iRowStart:iRowEnd])
         # endfor
 
-        return (lPixPosRC, lPixValid)
+        return imgLut
 
     # enddef
 
     # ##########################################################################################################
-    def _AddVizRay(
+    def FromContainer(
         self,
         *,
-        _lVizRays: list,
-        _aPrevRay: np.ndarray,
-        _aNewRay: np.ndarray,
-        _fMaxAngle_deg: float,
-        _bForce: bool = False,
-    ) -> np.ndarray:
-        assertion.IsTrue(len(_aNewRay.shape) == 1, "Given ray array has invalid shape")
-
-        if _bForce is True:
-            _lVizRays.append(_aNewRay)
-            return _aNewRay
-        else:
-            fDot = round(np.dot(_aPrevRay, _aNewRay), 5)
-            fAngle_deg = math.degrees(math.acos(fDot))
-            if fAngle_deg > _fMaxAngle_deg:
-                _lVizRays.append(_aNewRay)
-                return _aNewRay
-            else:
-                return _aPrevRay
-            # endif
-        # endif
+        _xFilePath: Union[str, list, tuple, Path],
+        _bMemMap: bool = True,
+        _bVerifyHash: bool = False,
+        _bAllowKdTreePickle: bool = False,
+    ):
+        """Load LUT from a LUT container file, as written by SaveContainer().
+        The LUT is not evaluated again, as the container stores the normalized LUT,
+        the LUT mask and the LUT state. A float16 LUT is converted to float32 in memory
+        and its ray directions are normalized again, so it is not memory mapped.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path]
+            The container file path.
+        _bMemMap : bool, optional
+            If true, the LUT image and mask are read-only memory maps of the container file.
+            Otherwise, they are read into memory. By default True.
+        _bVerifyHash : bool, optional
+            If true, the content hash stored in the container is verified, which reads the whole file.
+            By default False.
+        _bAllowKdTreePickle : bool, optional
+            If true, the KD-tree is loaded from or saved to the pickle file given by GetKdTreeFilePath().
+            Only enable this for trusted files, see FromFile(). By default False.
+        """
+        xData = CLutContainer.Load(_xFilePath, _bMemMap=_bMemMap, _bVerifyHash=_bVerifyHash)
+
+        self.FromState(
+            _imgLut=xData.imgLut,
+            _aLutMask=xData.aLutMask,
+            _dicState=xData.dicHeader["mState"],
+            _xFilePath=_xFilePath,
+        )
+        self._bAllowKdTreePickle = _bAllowKdTreePickle
 
     # enddef
 
     # ##########################################################################################################
-    def _AddVizRayList(
-        self,
-        *,
-        _lVizRays: list,
-        _aPrevRay: np.ndarray,
-        _aNewRayList: np.ndarray,
-        _fMaxAngle_deg: float,
-        _bForceLast: bool = False,
-    ) -> np.ndarray:
-        assertion.IsTrue(len(_aNewRayList.shape) == 2, "Given ray list has invalid shape")
-
-        aPrevRay = _aPrevRay
-        for aRay in _aNewRayList:
-            aPrevRay = self._AddVizRay(
-                _lVizRays=_lVizRays, _aPrevRay=aPrevRay, _aNewRay=aRay, _fMaxAngle_deg=_fMaxAngle_deg
-            )
-        # endfor
+    def SaveContainer(self, _xFilePath: Union[str, list, tuple, Path], *, _sDType: str = "float32") -> dict:
+        """Save the normalized LUT, the LUT mask and the LUT state to a LUT container file,
+        which can be memory mapped by FromFile() or FromContainer().
 
-        if _bForceLast is True:
-            aPrevRay = self._AddVizRay(
-                _lVizRays=_lVizRays,
-                _aPrevRay=aPrevRay,
-                _aNewRay=_aNewRayList[-1],
-                _fMaxAngle_deg=_fMaxAngle_deg,
-                _bForce=True,
-            )
-        # endif
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path]
+            The target file path. By convention, the suffix is CLutContainer.c_sSuffix.
+        _sDType : str, optional
+            Data type of the stored LUT, either "float32" or "float16". See CLutContainer.Write()
+            for the precision of float16 LUTs. By default "float32".
 
-        return aPrevRay
+        Returns
+        -------
+        dict
+            The header dictionary written to the file.
+        """
+        return CLutContainer.Write(
+            _xFilePath, _imgLut=self.imgLut, _aLutMask=self.aLutMask, _dicState=self.GetStateDict(), _sDType=_sDType
+        )
 
     # enddef
 
     # ##########################################################################################################
-    def GetFrustumMesh(
-        self, *, _fRayLen: float, _fMaxEdgeAngle_deg: float = 1.0, _fSurfAngleStep_deg: float = 10.0
-    ) -> CMeshData:
-        lVex: list[tuple[float, float, float]] = [(0.0, 0.0, 0.0), (0.0, 0.0, -_fRayLen)]
-
-        aRayDir = self._imgLut[:, :, 0:3]
-        aRayLen = np.linalg.norm(aRayDir, axis=2)
-        iRayRows, iRayCols = aRayLen.shape
-
-        # Walk around edge of LUT
-        # Get indices of first row that has valid ray directions
-        iTopRowIdx: int = 0
-        aIdx: np.ndarray = np.array([])
-        for iRowIdx in range(iRayRows):
-            aIdx = np.argwhere(aRayLen[iRowIdx] > 0.5)
-            if aIdx.shape[0] > 0:
-                iTopRowIdx = iRowIdx
-                break
-            # endif
-        # endwhile
+    def SaveImage(self, _xFilePath: Union[str, list, tuple, Path]):
+        """Save the normalized LUT as 32bit RGBA OpenEXR image, as expected by FromFile().
+        The LUT parameters are not stored in the image.
 
-        if aIdx.shape[0] == 0:
-            raise RuntimeError("LUT has no valid ray directions")
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path]
+            The target file path with suffix '.exr'.
+        """
+        if self._imgLut is None:
+            raise RuntimeError("LUT not initialized")
+        # endif
+
+        pathFile = anypath.MakeNormPath(_xFilePath)
+        if pathFile.suffix != ".exr":
+            raise RuntimeError("LUT images can only be saved to 32bit RGBA OpenEXR files")
         # endif
 
-        fMaxAngle_deg: float = _fMaxEdgeAngle_deg
-        aPrevRay: np.ndarray = aRayDir[iTopRowIdx][aIdx[0].item()]
-        lVizRays: list = [aPrevRay]
+        # Flip order of color channel elements, as cv2 stores images as BGR and not RGB.
+        imgBgr = self._imgLut[:, :, [2, 1, 0, 3]].astype(np.float32)
+        bRet: bool = cv2.imwrite(pathFile.as_posix(), imgBgr)
+        if bRet is False:
+            raise RuntimeError(f"Error writing camera LUT file to: {(pathFile.as_posix())}")
+        # endif
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetLutImgPixelRadii(self, _iRowStart: int = 0, _iRowEnd: Optional[int] = None) -> np.ndarray:
+        # Radii of the LUT pixels in image pixels, for the LUT rows from _iRowStart to _iRowEnd (exclusive)
+        iRowEnd = self._tLutPixCntRC[0] if _iRowEnd is None else _iRowEnd
+        iLutRows, iLutCols = iRowEnd - _iRowStart, self._tLutPixCntRC[1]
+        aRelRow = np.arange(_iRowStart, iRowEnd, dtype=self._xDType) - self._xDType.type(self._tImgCtrRC[0])
+        aRelCol = np.arange(iLutCols, dtype=self._xDType) - self._xDType.type(self._tImgCtrRC[1])
+
+        aLutImgRad2d = np.empty((iLutRows, iLutCols), dtype=self._xDType)
+        np.hypot(aRelRow[:, np.newaxis], aRelCol[np.newaxis, :], out=aLutImgRad2d)
+        np.multiply(aLutImgRad2d, self._fImgPerLutPix, out=aLutImgRad2d)
+        np.multiply(aLutImgRad2d, self._aLutMask[_iRowStart:iRowEnd, :, 0], out=aLutImgRad2d)
 
-        aDirs = aRayDir[iTopRowIdx][aIdx][:, 0]
-        aPrevRay = self._AddVizRayList(
-            _lVizRays=lVizRays, _aPrevRay=aPrevRay, _aNewRayList=aDirs, _fMaxAngle_deg=fMaxAngle_deg, _bForceLast=True
+        return aLutImgRad2d
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetLutAngles_rad(self, _iRowStart: int = 0, _iRowEnd: Optional[int] = None) -> np.ndarray:
+        # Polar and azimuth angles of the LUT rays, for the LUT rows from _iRowStart to _iRowEnd (exclusive)
+        iRowEnd = self._tLutPixCntRC[0] if _iRowEnd is None else _iRowEnd
+        iLutRows, iLutCols = iRowEnd - _iRowStart, self._tLutPixCntRC[1]
+        aMask = self._aLutMask[_iRowStart:iRowEnd, :, 0]
+        aRadDir = self._imgLut[_iRowStart:iRowEnd, :, 0:2]
+
+        aRadLen = _EvalVecLen(aRadDir, np.empty((iLutRows, iLutCols), dtype=self._xDType))
+        aRadZ = np.negative(
+            self._imgLut[_iRowStart:iRowEnd, :, 2], out=np.empty((iLutRows, iLutCols), dtype=self._xDType)
         )
-        # lVex.extend([tuple(x.tolist()) for x in aDirs])
-
-        # Find last valid LUT row
-        iBotRowIdx: int = iRayRows - 1
-        for iRowIdx in range(iTopRowIdx + 1, iRayRows):
-            aIdx = np.argwhere(aRayLen[iRowIdx] > 0.5)
-            if aIdx.shape[0] == 0:
-                iBotRowIdx = iRowIdx - 1
-                break
+
+        # Polar angle theta and azimuth phi per LUT pixel
+        aAngles = np.zeros((iLutRows, iLutCols, 2), dtype=self._xDType)
+        np.arctan2(aRadLen, aRadZ, out=aAngles[:, :, 0], where=aMask)
+        np.arctan2(aRadDir[:, :, 1], aRadDir[:, :, 0], out=aAngles[:, :, 1], where=aMask)
+
+        return aAngles
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetImageRayDirs(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the normalized ray directions through the centers of the image pixels.
+        The rays are created once from the LUT and kept for the lifetime of the LUT.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Array of shape (rows, columns, 3) of ray directions per image pixel,
+            with rows from top to bottom, and bool array of shape (rows, columns),
+            whether the ray direction is valid. Invalid ray directions are zero.
+        """
+        if self._aImgRayDirs is not None:
+            return self._aImgRayDirs, self._aImgRayValid
+        # endif
+
+        iRows, iCols = self._tImgPixCntRC
+        iSS = self._iLutSuperSampling
+        iBorder = self._iLutBorderPixel
+
+        # The center of an image pixel is at the center of its block of super sampling LUT pixels.
+        # For an odd super sampling this is a single LUT pixel, otherwise the center of 2x2 LUT pixels.
+        iStart = iBorder + (iSS - 1) // 2
+        lOffsets = [0] if iSS % 2 == 1 else [0, 1]
+
+        aRayDirs = np.zeros((iRows, iCols, 3), dtype=self._xDType)
+        aValid = np.ones((iRows, iCols), dtype=bool)
+        for iOffRow in lOffsets:
+            for iOffCol in lOffsets:
+                tRows = slice(iStart + iOffRow, iStart + iOffRow + iRows * iSS, iSS)
+                tCols = slice(iStart + iOffCol, iStart + iOffCol + iCols * iSS, iSS)
+                aRayDirs += self._imgLut[tRows, tCols, 0:3]
+                aValid &= self._aLutMask[tRows, tCols, 0]
+            # endfor
+        # endfor
+
+        if len(lOffsets) > 1:
+            aLen = _EvalVecLen(aRayDirs, np.empty((iRows, iCols), dtype=self._xDType))
+            np.divide(aRayDirs, aLen[:, :, np.newaxis], out=aRayDirs, where=aValid[:, :, np.newaxis])
+        # endif
+        aRayDirs[~aValid] = 0.0
+
+        self._aImgRayDirs = aRayDirs
+        self._aImgRayValid = aValid
+
+        return self._aImgRayDirs, self._aImgRayValid
+
+    # enddef
+
+    # ##########################################################################################################
+    def PixelsRCToRayDirsArray(self, _aPixPosRC: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Map 2D-pixel image positions to normalized ray directions,
+        by bilinear interpolation of the LUT ray directions.
+        This is the inverse of RayDirsToPixelsRCArray().
+
+        Parameters
+        ----------
+        _aPixPosRC : np.ndarray
+            Array of shape (N, 2) of (row, column) pixel positions in pixel-centered CV-coordinate system,
+            e.g. pixel (0,0) is the center of the top-left pixel.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Array of shape (N, 3) of normalized ray directions
+            and (N,) bool array of flags, whether the ray direction is valid.
+            Invalid ray directions are zero.
+        """
+        aPixPosRC = np.asarray(_aPixPosRC)
+        if aPixPosRC.ndim != 2 or aPixPosRC.shape[1] != 2:
+            raise RuntimeError("Pixel positions array must be of shape (N, 2)")
+        # endif
+
+        iRowCnt, iColCnt = self._tLutPixCntRC
+        aLutPosRC = aPixPosRC * self._iLutSuperSampling + (
+            self._iLutBorderPixel + (self._iLutSuperSampling / 2.0 - 0.5)
+        )
+
+        # Positions on the last LUT row or column are interpolated from the cell before
+        aMaxPosRC = np.array([iRowCnt - 1, iColCnt - 1])
+        aValid = np.all(aLutPosRC >= 0.0, axis=1) & np.all(aLutPosRC <= aMaxPosRC, axis=1)
+
+        aIdxRC = np.clip(np.floor(aLutPosRC), 0, aMaxPosRC - 1)
+        aFracRC = (aLutPosRC - aIdxRC).astype(self._xDType)
+        aIdxRC = aIdxRC.astype(np.int64)
+        aIdxRC[~aValid] = 0
+        aRow = aIdxRC[:, 0]
+        aCol = aIdxRC[:, 1]
+
+        aRayDirs = np.zeros((aPixPosRC.shape[0], 3), dtype=self._xDType)
+        for iOffRow, iOffCol in ((0, 0), (0, 1), (1, 0), (1, 1)):
+            aWeight = aFracRC[:, 0] if iOffRow == 1 else 1.0 - aFracRC[:, 0]
+            aWeight = aWeight * (aFracRC[:, 1] if iOffCol == 1 else 1.0 - aFracRC[:, 1])
+            aRayDirs += self._imgLut[aRow + iOffRow, aCol + iOffCol, 0:3] * aWeight[:, np.newaxis]
+            aValid &= self._aLutMask[aRow + iOffRow, aCol + iOffCol, 0]
+        # endfor
+
+        aLen = np.linalg.norm(aRayDirs, axis=1)
+        aValid &= aLen > 1e-6
+        np.divide(aRayDirs, aLen[:, np.newaxis], out=aRayDirs, where=aValid[:, np.newaxis])
+        aRayDirs[~aValid] = 0.0
+
+        return aRayDirs, aValid
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetKdTreeFilePath(self) -> Optional[Path]:
+        """Path of the KD-tree file next to the LUT file, or None if the LUT was not loaded from file."""
+        if self._pathLutFile is None:
+            return None
+        # endif
+
+        return self._pathLutFile.with_suffix(".kdtree")
+
+    # enddef
+
+    # ##########################################################################################################
+    def _GetLutFileStats(self) -> Optional[tuple[int, int]]:
+        if self._pathLutFile is None or not self._pathLutFile.exists():
+            return None
+        # endif
+
+        xStat = self._pathLutFile.stat()
+        return (xStat.st_size, xStat.st_mtime_ns)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _CreateKdTree(self) -> KDTree:
+        iRowCnt, iColCnt, _ = self._imgLut.shape
+        iPixCnt = iRowCnt * iColCnt
+        aRayDirsFlat = self._imgLut[:, :, 0:3].reshape(iPixCnt, 3)
+
+        # The tree is built only once per LUT, so use small leaves,
+        # which makes the nearest neighbor queries fast.
+        return KDTree(aRayDirsFlat, leafsize=16)
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetKdTree(self) -> KDTree:
+        """Get the KD-tree over all LUT ray directions.
+        The tree is created on first call and then kept for the lifetime of the LUT.
+        If the LUT was loaded with '_bAllowKdTreePickle=True', the tree is loaded from
+        or saved to the KD-tree file next to the LUT file.
+        """
+        if self._xKdTree is not None:
+            return self._xKdTree
+        # endif
+
+        if self._imgLut is None:
+            raise RuntimeError("LUT not initialized")
+        # endif
+
+        if self._bAllowKdTreePickle is True and self.LoadKdTree(_bAllowPickle=True) is True:
+            return self._xKdTree
+        # endif
+
+        self._xKdTree = self._CreateKdTree()
+
+        if self._bAllowKdTreePickle is True:
+            self.SaveKdTree()
+        # endif
+
+        return self._xKdTree
+
+    # enddef
+
+    # ##########################################################################################################
+    def SaveKdTree(self, *, _xFilePath: Union[str, list, tuple, Path, None] = None):
+        """Save the KD-tree of the LUT ray directions to a file.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path, None], optional
+            The target file path. If None, the path given by GetKdTreeFilePath() is used.
+        """
+        if _xFilePath is None:
+            pathFile = self.GetKdTreeFilePath()
+            if pathFile is None:
+                raise RuntimeError("No KD-tree file path given and LUT was not loaded from file")
             # endif
+        else:
+            pathFile = anypath.MakeNormPath(_xFilePath)
+        # endif
+
+        xKdTree = self.GetKdTree()
+
+        dicData = {
+            "tLutPixCntRC": self._tLutPixCntRC,
+            "tLutFileStats": self._GetLutFileStats(),
+            "xKdTree": xKdTree,
+        }
+
+        # Write to temporary file first, so that concurrent readers never see a partial file
+        pathTemp = pathFile.with_name(f"{pathFile.name}.{os.getpid()}.tmp")
+        with open(pathTemp, "wb") as xFile:
+            pickle.dump(dicData, xFile, protocol=pickle.HIGHEST_PROTOCOL)
+        # endwith
+        os.replace(pathTemp, pathFile)
+
+    # enddef
+
+    # ##########################################################################################################
+    def LoadKdTree(
+        self, *, _xFilePath: Union[str, list, tuple, Path, None] = None, _bAllowPickle: bool = False
+    ) -> bool:
+        """Load the KD-tree of the LUT ray directions from a file.
+        The tree is only used if it was created for a LUT of the same size
+        and, if the LUT was loaded from file, for the same LUT file.
+        The KD-tree file is a pickle file, which can execute arbitrary code when it is loaded.
+        Therefore, loading must be enabled explicitly with '_bAllowPickle=True'.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path, None], optional
+            The source file path. If None, the path given by GetKdTreeFilePath() is used.
+        _bAllowPickle : bool, optional
+            Must be true, to confirm that the KD-tree file is trusted. By default False.
+
+        Returns
+        -------
+        bool
+            True, if the KD-tree was loaded.
+        """
+        if _bAllowPickle is not True:
+            raise RuntimeError(
+                "Loading a KD-tree file unpickles it, which can execute arbitrary code. "
+                "Set '_bAllowPickle=True' to load trusted KD-tree files only."
+            )
+        # endif
+
+        if _xFilePath is None:
+            pathFile = self.GetKdTreeFilePath()
+        else:
+            pathFile = anypath.MakeNormPath(_xFilePath)
+        # endif
+
+        if pathFile is None or not pathFile.exists():
+            return False
+        # endif
+
+        try:
+            with open(pathFile, "rb") as xFile:
+                dicData: dict = pickle.load(xFile)
+            # endwith
+        except Exception:
+            return False
+        # endtry
+
+        if tuple(dicData.get("tLutPixCntRC", ())) != tuple(self._tLutPixCntRC):
+            return False
+        # endif
+
+        tLutFileStats = self._GetLutFileStats()
+        if tLutFileStats is not None and dicData.get("tLutFileStats") != tLutFileStats:
+            return False
+        # endif
+
+        self._xKdTree = dicData.get("xKdTree")
+        return self._xKdTree is not None
+
+    # enddef
+
+    # ##########################################################################################################
+    def RayDirsToPixelsRC(
+        self, _aTestDirs: np.ndarray, *, _bNormalize: bool = False
+    ) -> tuple[list[list[float]], list[bool]]:
+        """Map ray directions to 2D-pixel image positions in pixel-centered CV-coordinate system,
+        with origin at top-left, x-axis pointing right, y-axis pointing down.
+        IMPORTANT: Pixel coordinates are pixel centered,
+        e.g. pixel (0,0) is the center of the top-left pixel and
+        (-0.5, -0.5) is the top-left corner of the top-left pixel.
+
+        This is a list based wrapper of RayDirsToPixelsRCArray().
+
+        Parameters
+        ----------
+        _aTestDirs : np.ndarray
+            Array of 3D-direction vectors in camera frame to map to image.
+            Input vectors can be normalized, so that you can also pass 3D-point positions in the camera frame.
+
+        _bNormalize : bool
+            If true, the input vectors are normalized.
+
+        Returns
+        -------
+        tuple[list[list[float]], list[bool]]
+            Tuple of list of 2D (row, column) pixel positions
+            and list of bool flags, whether projection is valid.
+            IMPORTANT: Pixel coordinates are pixel centered,
+            e.g. pixel (0,0) is the center of the top-left pixel and
+            (-0.5, -0.5) is the top-left corner of the top-left pixel.
+        """
+        aPixPosRC, aPixValid = self.RayDirsToPixelsRCArray(_aTestDirs, _bNormalize=_bNormalize)
+
+        return (aPixPosRC.tolist(), aPixValid.tolist())
+
+    # enddef
+
+    # ##########################################################################################################
+    def RayDirsToPixelsRCArray(
+        self, _aTestDirs: np.ndarray, *, _bNormalize: bool = False, _bUseInverseLut: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Map ray directions to 2D-pixel image positions in pixel-centered CV-coordinate system,
+        with origin at top-left, x-axis pointing right, y-axis pointing down.
+        The nearest LUT pixel of each direction is refined to sub-pixel accuracy
+        by a linear interpolation of the neighboring LUT ray directions.
+        All steps are evaluated for the whole array of directions at once.
+
+        Parameters
+        ----------
+        _aTestDirs : np.ndarray
+            Array of 3D-direction vectors in camera frame to map to image.
+            Input vectors can be normalized, so that you can also pass 3D-point positions in the camera frame.
+
+        _bNormalize : bool
+            If true, the input vectors are normalized.
+
+        _bUseInverseLut : bool
+            If true, the pixel positions are interpolated from the inverse LUT,
+            instead of searching the nearest rays in the LUT.
+            The inverse LUT has to be created with CreateInverseLut() first.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Tuple of (N,2) float array of (row, column) pixel positions
+            and (N,) bool array of flags, whether projection is valid.
+            Directions without valid neighboring LUT rays have position (0, 0).
+            IMPORTANT: Pixel coordinates are pixel centered,
+            e.g. pixel (0,0) is the center of the top-left pixel and
+            (-0.5, -0.5) is the top-left corner of the top-left pixel.
+        """
+        aTestDirs = self._PrepareTestDirs(_aTestDirs, _bNormalize=_bNormalize)
+
+        if _bUseInverseLut is True:
+            aPixPosRC, aValid = self._InverseLutRayDirsToPixelsRC(aTestDirs)
+        else:
+            aPixPosRC, aValid = self._LutRayDirsToPixelsRC(aTestDirs)
+        # endif
+
+        aValid = self._ValidatePixelsRC(aPixPosRC, aValid)
+
+        return (aPixPosRC, aValid)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _PrepareTestDirs(self, _aTestDirs: np.ndarray, *, _bNormalize: bool) -> np.ndarray:
+        if len(_aTestDirs.shape) != 2:
+            raise RuntimeError("Argument '_aRayDirs' must be a 2D array")
+        # endif
+
+        if _aTestDirs.shape[1] != 3:
+            raise RuntimeError("Ray directions array must have size 3 in second dimension")
+        # endif
+
+        aTestDirs = _aTestDirs
+
+        if _bNormalize is True:
+            aTestDirsLen = np.linalg.norm(_aTestDirs, axis=1)
+            # Normalized input ray directions
+            aTestDirs = np.divide(_aTestDirs, aTestDirsLen[:, np.newaxis])
+        # endif
+
+        return aTestDirs
+
+    # enddef
+
+    # ##########################################################################################################
+    def _LutRayDirsToPixelsRC(self, _aTestDirs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Find nearest LUT rays and refine to sub-pixel image positions.
+        Returns the image pixel positions and a flag per position,
+        whether the nearest LUT ray and its neighbors are valid.
+        The positions are not checked against the LUT bounds.
+        """
+        aTestDirs = _aTestDirs
+        aRayDirs: np.ndarray = self._imgLut[:, :, 0:3]
+        iRowCnt, iColCnt, _ = aRayDirs.shape
+
+        iTestDirCnt = aTestDirs.shape[0]
+        if iTestDirCnt < 4 and self._xKdTree is None:
+            # original code: brute force computation of distances to find nearest ray
+            aRayDirsFlat = aRayDirs.reshape(iRowCnt * iColCnt, 3)
+            aTestDirsEx = np.expand_dims(aTestDirs, axis=1)
+            aRayDirsFlatEx = np.expand_dims(aRayDirsFlat, axis=0)
+
+            aSub = aRayDirsFlatEx - aTestDirsEx
+            aDist = np.linalg.norm(aSub, axis=2)
+            aMinIdx = np.argmin(aDist, axis=1)
+        else:
+            # speed-up if many points need to be projected:
+            # the kd-tree is only created once per LUT and then reused
+            _, aMinIdx = self.GetKdTree().query(aTestDirs)
+        # endif
+
+        aRowIdx = aMinIdx // iColCnt
+        aColIdx = aMinIdx % iColCnt
+
+        # #####################################################
+        # Linear Interpolation
+        # Use the right/bottom neighbor as gradient direction,
+        # apart from the last column/row, where the left/top neighbor is used.
+        aOrig = aRayDirs[aRowIdx, aColIdx]
+
+        aIsLastCol = aColIdx >= iColCnt - 1
+        aPosX = aRayDirs[aRowIdx, np.where(aIsLastCol, aColIdx - 1, aColIdx + 1)]
+        aX = np.where(aIsLastCol[:, np.newaxis], aOrig - aPosX, aPosX - aOrig)
+
+        aIsLastRow = aRowIdx >= iRowCnt - 1
+        aPosY = aRayDirs[np.where(aIsLastRow, aRowIdx - 1, aRowIdx + 1), aColIdx]
+        aY = np.where(aIsLastRow[:, np.newaxis], aOrig - aPosY, aPosY - aOrig)
+
+        # Origin and neighbors need to be valid ray directions
+        aValid = np.linalg.norm(aOrig, axis=1) >= 0.9
+        aValid &= np.linalg.norm(aPosX, axis=1) >= 0.9
+        aValid &= np.linalg.norm(aPosY, axis=1) >= 0.9
+
+        aDelta = aTestDirs - aOrig
+
+        aXlen = np.linalg.norm(aX, axis=1)
+        aXlen2 = aXlen * aXlen
+        aDeltaPixX = np.zeros(iTestDirCnt)
+        np.divide(np.einsum("ij,ij->i", aDelta, aX), aXlen2, out=aDeltaPixX, where=aXlen2 != 0)
+
+        aYlen = np.linalg.norm(aY, axis=1)
+        aYlen2 = aYlen * aYlen
+        aDeltaPixY = np.zeros(iTestDirCnt)
+        np.divide(np.einsum("ij,ij->i", aDelta, aY), aYlen2, out=aDeltaPixY, where=aYlen2 != 0)
+        # #####################################################
+
+        aPixPosRC = np.empty((iTestDirCnt, 2))
+        aPixPosRC[:, 0] = aRowIdx + aDeltaPixY
+        aPixPosRC[:, 1] = aColIdx + aDeltaPixX
+        aPixPosRC -= self._iLutBorderPixel + (self._iLutSuperSampling / 2.0 - 0.5)
+        aPixPosRC *= self._fImgPerLutPix
+        aPixPosRC[~aValid] = 0.0
+
+        return (aPixPosRC, aValid)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _ValidatePixelsRC(self, _aPixPosRC: np.ndarray, _aValid: np.ndarray) -> np.ndarray:
+        """Reset the valid flags of image pixel positions that lie outside of the LUT
+        or fall onto a zero ray of the LUT.
+        """
+        aValid = _aValid
+        iRowCnt, iColCnt = self._tLutPixCntRC
+
+        # Test whether the pixel positions lie inside the LUT
+        aLutPosRC = _aPixPosRC * self._iLutSuperSampling + self._iLutBorderPixel
+        fMinPos = -0.5 * (1 / self._iLutSuperSampling)
+        aValid &= aLutPosRC[:, 0] >= fMinPos
+        aValid &= aLutPosRC[:, 0] <= iRowCnt
+        aValid &= aLutPosRC[:, 1] >= fMinPos
+        aValid &= aLutPosRC[:, 1] <= iColCnt
+
+        # Reject positions that fall onto a zero ray in the LUT
+        aLutIdxRC = np.floor(aLutPosRC[aValid]).astype(np.int64)
+        aLutIdxRow = np.clip(aLutIdxRC[:, 0], 0, iRowCnt - 1)
+        aLutIdxCol = np.clip(aLutIdxRC[:, 1], 0, iColCnt - 1)
+        aValid[aValid] = np.any(self._imgLut[aLutIdxRow, aLutIdxCol, 0:3] != 0, axis=1)
+
+        return aValid
+
+    # enddef
+
+    # ##########################################################################################################
+    def _RayDirsToAngleUV(self, _aDirs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Map ray directions to the equidistant fisheye angle space (radians)
+        also used by the LUT fisheye shader. Returns the (N,2) angle coordinates
+        and the radial angles.
+        """
+        aRadDir = _aDirs[:, 0:2]
+        aRadLen = np.linalg.norm(aRadDir, axis=1)
+        aRadAngle = np.arctan2(aRadLen, -_aDirs[:, 2])
+
+        aScale = np.zeros_like(aRadLen)
+        np.divide(aRadAngle, aRadLen, out=aScale, where=aRadLen > 1e-12)
+
+        return (aRadDir * aScale[:, np.newaxis], aRadAngle)
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetInverseLutFilePath(self) -> Optional[Path]:
+        """Path of the inverse LUT file next to the LUT file, or None if the LUT was not loaded from file."""
+        if self._pathLutFile is None:
+            return None
+        # endif
+
+        return self._pathLutFile.with_suffix(".invlut.npz")
+
+    # enddef
+
+    # ##########################################################################################################
+    def CreateInverseLut(self, *, _iGridSize: Optional[int] = None, _bUseInverseLutFile: bool = False):
+        """Create a regular grid over the equidistant fisheye angle space,
+        which stores the sub-pixel image position for each grid direction.
+        Ray directions can then be mapped to pixels by a bilinear lookup in this grid,
+        via RayDirsToPixelsRCArray(_bUseInverseLut=True).
+
+        Parameters
+        ----------
+        _iGridSize : Optional[int], optional
+            The number of grid cells along the larger angle range.
+            By default, this is the larger of the image pixel counts.
+            Use the property fInverseLutErrorMax_pix to balance grid size against accuracy.
+        _bUseInverseLutFile : bool, optional
+            If true, the inverse LUT is loaded from the file given by GetInverseLutFilePath(),
+            if it exists and matches the LUT file and grid size.
+            Otherwise, it is created and saved to that file. By default False.
+        """
+        iGridSize: int = _iGridSize
+        if iGridSize is None:
+            iGridSize = max(self._tImgPixCntRC)
+        # endif
+        iGridSize = max(2, int(iGridSize))
+
+        if _bUseInverseLutFile is True and self.LoadInverseLut(_iGridSize=iGridSize) is True:
+            return
+        # endif
+
+        # Angle ranges of LUT, extended by a single grid cell,
+        # so that the outer LUT pixels are enclosed by grid cells.
+        aMin = np.radians(np.array([self._tLutAngleRangeX_deg[0], self._tLutAngleRangeY_deg[0]]))
+        aMax = np.radians(np.array([self._tLutAngleRangeX_deg[1], self._tLutAngleRangeY_deg[1]]))
+        fStep: float = float(np.max(aMax - aMin)) / (iGridSize - 2)
+        aMin -= fStep
+        aMax += fStep
+        iCntU = int(math.ceil((aMax[0] - aMin[0]) / fStep)) + 1
+        iCntV = int(math.ceil((aMax[1] - aMin[1]) / fStep)) + 1
+
+        aU = aMin[0] + fStep * np.arange(iCntU)
+        aV = aMin[1] + fStep * np.arange(iCntV)
+        aGridU, aGridV = np.meshgrid(aU, aV)
+
+        # Ray directions for grid nodes
+        aTheta = np.hypot(aGridU, aGridV)
+        aPhi = np.arctan2(aGridV, aGridU)
+        aSinTheta = np.sin(aTheta)
+        aDirs = np.stack((aSinTheta * np.cos(aPhi), aSinTheta * np.sin(aPhi), -np.cos(aTheta)), axis=2).reshape(-1, 3)
+
+        aPixPosRC, aDefined = self._LutRayDirsToPixelsRC(aDirs)
+        aDefined &= aTheta.flatten() <= math.pi
+
+        self._aInvLutPixPosRC = aPixPosRC.reshape(iCntV, iCntU, 2).astype(np.float32)
+        self._aInvLutDefined = aDefined.reshape(iCntV, iCntU)
+        self._tInvLutMinUV = (float(aMin[0]), float(aMin[1]))
+        self._fInvLutStep = fStep
+        self._iInvLutGridSize = iGridSize
+
+        self._EvalInverseLutError()
+
+        if _bUseInverseLutFile is True and self._pathLutFile is not None:
+            self.SaveInverseLut()
+        # endif
+
+    # enddef
+
+    # ##########################################################################################################
+    def _InverseLutRayDirsToPixelsRC(self, _aTestDirs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if self._aInvLutPixPosRC is None:
+            raise RuntimeError("Inverse LUT not created. Call CreateInverseLut() first.")
+        # endif
+
+        iCntV, iCntU, _ = self._aInvLutPixPosRC.shape
+
+        aUV, aRadAngle = self._RayDirsToAngleUV(_aTestDirs)
+        aGrid = (aUV - np.array(self._tInvLutMinUV)) / self._fInvLutStep
+
+        aValid = aRadAngle <= math.radians(self._fRadAngleMax_deg)
+        aValid &= (aGrid[:, 0] >= 0.0) & (aGrid[:, 0] <= iCntU - 1)
+        aValid &= (aGrid[:, 1] >= 0.0) & (aGrid[:, 1] <= iCntV - 1)
+
+        aIdxU = np.clip(np.floor(aGrid[:, 0]), 0, iCntU - 2).astype(np.int64)
+        aIdxV = np.clip(np.floor(aGrid[:, 1]), 0, iCntV - 2).astype(np.int64)
+        aFracU = np.clip(aGrid[:, 0] - aIdxU, 0.0, 1.0)
+        aFracV = np.clip(aGrid[:, 1] - aIdxV, 0.0, 1.0)
+
+        # Flat indices of the four grid nodes enclosing each direction
+        aIdx00 = aIdxV * iCntU + aIdxU
+        aIdx10 = aIdx00 + iCntU
+
+        aDef = self._aInvLutDefined.reshape(-1)
+        aValid &= aDef[aIdx00] & aDef[aIdx00 + 1] & aDef[aIdx10] & aDef[aIdx10 + 1]
+
+        aPixPosRC = np.empty((aGrid.shape[0], 2))
+        for iDim in range(2):
+            aPos = self._aInvLutPixPosRC[:, :, iDim].reshape(-1)
+            aTop = aPos[aIdx00] + aFracU * (aPos[aIdx00 + 1] - aPos[aIdx00])
+            aBottom = aPos[aIdx10] + aFracU * (aPos[aIdx10 + 1] - aPos[aIdx10])
+            aPixPosRC[:, iDim] = aTop + aFracV * (aBottom - aTop)
         # endfor
 
+        aPixPosRC[~aValid] = 0.0
+
+        return (aPixPosRC, aValid)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _EvalInverseLutError(self, *, _iMaxSampleCnt: int = 4000000):
+        """Evaluate the reprojection error of the inverse LUT,
+        by mapping the LUT ray directions back to their pixel positions.
+        """
+        iRowCnt, iColCnt = self._tLutPixCntRC
+        iStep: int = max(1, int(math.ceil(math.sqrt(iRowCnt * iColCnt / _iMaxSampleCnt))))
+
+        aMask = self._aLutMask[::iStep, ::iStep, 0]
+        aLutIdx = np.argwhere(aMask) * iStep
+        aDirs = self._imgLut[aLutIdx[:, 0], aLutIdx[:, 1], 0:3]
+
+        aPixPosRC, aValid = self._InverseLutRayDirsToPixelsRC(aDirs)
+        aExpPosRC = (aLutIdx - (self._iLutBorderPixel + (self._iLutSuperSampling / 2.0 - 0.5))) * self._fImgPerLutPix
+
+        aError = np.linalg.norm(aPixPosRC[aValid] - aExpPosRC[aValid], axis=1)
+        self._fInvLutErrorMax_pix = float(np.max(aError, initial=0.0))
+        self._fInvLutErrorMean_pix = float(np.mean(aError)) if aError.size > 0 else 0.0
+        self._fInvLutCoverage = float(np.count_nonzero(aValid)) / max(1, aValid.shape[0])
+
+    # enddef
+
+    # ##########################################################################################################
+    def SaveInverseLut(self, *, _xFilePath: Union[str, list, tuple, Path, None] = None):
+        """Save the inverse LUT to a numpy '.npz' file.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path, None], optional
+            The target file path. If None, the path given by GetInverseLutFilePath() is used.
+        """
+        if self._aInvLutPixPosRC is None:
+            raise RuntimeError("Inverse LUT not created. Call CreateInverseLut() first.")
+        # endif
+
+        if _xFilePath is None:
+            pathFile = self.GetInverseLutFilePath()
+            if pathFile is None:
+                raise RuntimeError("No inverse LUT file path given and LUT was not loaded from file")
+            # endif
+        else:
+            pathFile = anypath.MakeNormPath(_xFilePath)
+        # endif
+
+        tLutFileStats = self._GetLutFileStats()
+        if tLutFileStats is None:
+            tLutFileStats = (-1, -1)
+        # endif
+
+        # Write to temporary file first, so that concurrent readers never see a partial file
+        pathTemp = pathFile.with_name(f"{pathFile.name}.{os.getpid()}.tmp")
+        with open(pathTemp, "wb") as xFile:
+            np.savez(
+                xFile,
+                aPixPosRC=self._aInvLutPixPosRC,
+                aDefined=self._aInvLutDefined,
+                aMinUV=np.array(self._tInvLutMinUV),
+                fStep=self._fInvLutStep,
+                iGridSize=self._iInvLutGridSize,
+                aLutPixCntRC=np.array(self._tLutPixCntRC),
+                aLutFileStats=np.array(tLutFileStats, dtype=np.int64),
+                aError_pix=np.array(
+                    [self._fInvLutErrorMax_pix, self._fInvLutErrorMean_pix, self._fInvLutCoverage]
+                ),
+            )
+        # endwith
+        os.replace(pathTemp, pathFile)
+
+    # enddef
+
+    # ##########################################################################################################
+    def LoadInverseLut(
+        self, *, _xFilePath: Union[str, list, tuple, Path, None] = None, _iGridSize: Optional[int] = None
+    ) -> bool:
+        """Load the inverse LUT from a numpy '.npz' file.
+        The inverse LUT is only used if it was created for a LUT of the same size
+        and, if the LUT was loaded from file, for the same LUT file.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path, None], optional
+            The source file path. If None, the path given by GetInverseLutFilePath() is used.
+        _iGridSize : Optional[int], optional
+            If given, the stored inverse LUT must have this grid size.
+
+        Returns
+        -------
+        bool
+            True, if the inverse LUT was loaded.
+        """
+        if _xFilePath is None:
+            pathFile = self.GetInverseLutFilePath()
+        else:
+            pathFile = anypath.MakeNormPath(_xFilePath)
+        # endif
+
+        if pathFile is None or not pathFile.exists():
+            return False
+        # endif
+
+        try:
+            with np.load(pathFile) as xData:
+                dicData = {sKey: xData[sKey] for sKey in xData.files}
+            # endwith
+        except Exception:
+            return False
+        # endtry
+
+        if tuple(dicData["aLutPixCntRC"].tolist()) != tuple(self._tLutPixCntRC):
+            return False
+        # endif
+
+        if _iGridSize is not None and int(dicData["iGridSize"]) != _iGridSize:
+            return False
+        # endif
+
+        tLutFileStats = self._GetLutFileStats()
+        if tLutFileStats is not None and tuple(dicData["aLutFileStats"].tolist()) != tLutFileStats:
+            return False
+        # endif
+
+        self._aInvLutPixPosRC = dicData["aPixPosRC"]
+        self._aInvLutDefined = dicData["aDefined"]
+        self._tInvLutMinUV = tuple(dicData["aMinUV"].tolist())
+        self._fInvLutStep = float(dicData["fStep"])
+        self._iInvLutGridSize = int(dicData["iGridSize"])
+        self._fInvLutErrorMax_pix, self._fInvLutErrorMean_pix, self._fInvLutCoverage = dicData["aError_pix"].tolist()
+
+        return True
+
+    # enddef
+
+    # ##########################################################################################################
+    def _GetBoundaryRayIndices(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Closed contour of the valid LUT rays, ordered along the top row from left to right,
+        # down the last valid columns, along the bottom row from right to left and up the first valid columns.
+        # Returns the row and column indices of the contour and the contour indices of the four corners.
+        # The LUT ray directions are normalized, so the mask flags all rays of unit length
+        aRayValid = self._aLutMask[:, :, 0]
+        iRayRows, iRayCols = aRayValid.shape
+
+        aRowValid = np.any(aRayValid, axis=1)
+        if not np.any(aRowValid):
+            raise RuntimeError("LUT has no valid ray directions")
+        # endif
+
+        # The contour extends from the first valid row up to the row before the next invalid row
+        iTopRowIdx = int(np.argmax(aRowValid))
+        aRowInvalidIdx = np.flatnonzero(~aRowValid[iTopRowIdx:])
+        iBotRowIdx = iTopRowIdx + int(aRowInvalidIdx[0]) - 1 if aRowInvalidIdx.size > 0 else iRayRows - 1
+
         if iTopRowIdx == iBotRowIdx:
             raise RuntimeError("LUT has only a single valid row of ray directions")
         # endif
 
-        # list of first columns starting from second valid row
-        lFirstCols: list = []
+        aValid = aRayValid[iTopRowIdx : iBotRowIdx + 1]
+        aFirstCols = np.argmax(aValid, axis=1)
+        aLastCols = iRayCols - 1 - np.argmax(aValid[:, ::-1], axis=1)
 
-        # loop over the next rows apart from the last valid row
-        for iRowIdx in range(iTopRowIdx + 1, iBotRowIdx):
-            aIdx = np.argwhere(aRayLen[iRowIdx] > 0.5)
-            lFirstCols.append(aIdx[0].item())
-            iColIdx: int = int(aIdx[-1].item())
-            aPrevRay = self._AddVizRay(
-                _lVizRays=lVizRays,
-                _aPrevRay=aPrevRay,
-                _aNewRay=aRayDir[iRowIdx, iColIdx, :],
-                _fMaxAngle_deg=fMaxAngle_deg,
+        aTopCols = np.flatnonzero(aValid[0])
+        aBotCols = np.flatnonzero(aValid[-1])[::-1]
+        aMidRows = np.arange(iTopRowIdx + 1, iBotRowIdx)
+
+        aRows = np.concatenate(
+            (
+                np.full(aTopCols.size, iTopRowIdx),
+                aMidRows,
+                np.full(aBotCols.size, iBotRowIdx),
+                aMidRows[::-1],
             )
-            # lVex.append(tuple((aRayDir[iRowIdx, iColIdx, :] * _fRayLen).tolist()))
-        # endfor
+        )
+        aCols = np.concatenate((aTopCols, aLastCols[1:-1], aBotCols, aFirstCols[-2:0:-1]))
 
-        # Process bottom row
-        aIdx = np.argwhere(aRayLen[iBotRowIdx] > 0.5)
-        aPrevRay = aRayDir[iBotRowIdx][aIdx[-1].item()]
-        lVizRays.append(aPrevRay)
+        iBotStartIdx = aTopCols.size + aMidRows.size
+        aCornerIdx = np.array([0, aTopCols.size - 1, iBotStartIdx, iBotStartIdx + aBotCols.size - 1])
 
-        aDirs = aRayDir[iBotRowIdx][aIdx[::-1]][:, 0]
-        aPrevRay = self._AddVizRayList(
-            _lVizRays=lVizRays, _aPrevRay=aPrevRay, _aNewRayList=aDirs, _fMaxAngle_deg=fMaxAngle_deg, _bForceLast=True
-        )
-        # lVex.extend([tuple(x.tolist()) for x in aDirs])
-
-        # Now go back up the first row
-        iRowIdx = iBotRowIdx - 1
-        for iColIdx in lFirstCols[::-1]:
-            aPrevRay = self._AddVizRay(
-                _lVizRays=lVizRays,
-                _aPrevRay=aPrevRay,
-                _aNewRay=aRayDir[iRowIdx, iColIdx, :],
-                _fMaxAngle_deg=fMaxAngle_deg,
-            )
-            # lVex.append(tuple((aRayDir[iRowIdx, iColIdx, :] * _fRayLen).tolist()))
-            iRowIdx -= 1
-        # endfor
+        return aRows, aCols, aCornerIdx
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def _DecimateContour(_aRays: np.ndarray, _aForcedIdx: np.ndarray, _fMaxAngle_deg: float) -> np.ndarray:
+        # Select the contour rays at which the cumulative angle along the closed contour
+        # passes multiples of the maximal angle, together with the forced rays.
+        aNextRays = np.roll(_aRays, -1, axis=0)
+        aDot = np.einsum("ij,ij->i", _aRays, aNextRays)
+        aAngle_deg = np.degrees(np.arccos(np.clip(aDot, -1.0, 1.0)))
+
+        # Cumulative angle at each contour ray, starting at zero at the first ray
+        aCumAngle_deg = np.concatenate(([0.0], np.cumsum(aAngle_deg[:-1])))
+
+        fMaxAngle_deg = max(_fMaxAngle_deg, 1e-6)
+        aThresholds_deg = np.arange(fMaxAngle_deg, aCumAngle_deg[-1], fMaxAngle_deg)
+        aThresholdIdx = np.searchsorted(aCumAngle_deg, aThresholds_deg, side="left")
+
+        return np.unique(np.concatenate(([0], aThresholdIdx, _aForcedIdx)))
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetFrustumMeshArrays(
+        self, *, _fRayLen: float, _fMaxEdgeAngle_deg: float = 1.0, _fSurfAngleStep_deg: float = 10.0
+    ) -> CFrustumMeshArrays:
+        """Create the frustum mesh of the LUT camera as flat arrays.
+
+        The mesh consists of the camera origin, a point on the optical axis, the rays along the boundary
+        of the valid LUT area, and rings of rays that rotate the boundary rays towards the optical axis.
+        The boundary rays are decimated, so that the angle between neighbouring rays is about
+        the maximal edge angle.
+
+        Parameters
+        ----------
+        _fRayLen : float
+            Length of the rays.
+        _fMaxEdgeAngle_deg : float, optional
+            Angle between neighbouring boundary rays.
+        _fSurfAngleStep_deg : float, optional
+            Maximal angle step of the rings towards the optical axis.
+
+        Returns
+        -------
+        CFrustumMeshArrays
+            The vertex and face arrays of the mesh.
+        """
+        aRows, aCols, aCornerIdx = self._GetBoundaryRayIndices()
+        aContourRays = self._imgLut[aRows, aCols, 0:3].astype(np.float64)
+        # The decimation accumulates angles between neighbouring rays, which are sensitive to rounding errors
+        # of the ray lengths, so that the rays are normalized again in double precision.
+        aContourRays /= np.linalg.norm(aContourRays, axis=1)[:, np.newaxis]
 
-        iEdgeRayCnt = len(lVizRays)
-        lVex.extend([tuple((x * _fRayLen).tolist()) for x in lVizRays])
+        aKeepIdx = CCameraLut._DecimateContour(aContourRays, aCornerIdx, _fMaxEdgeAngle_deg)
+        aVizRays = aContourRays[aKeepIdx]
+        iEdgeRayCnt = aVizRays.shape[0]
 
         ###############################################################
         # Eval vertices for front surface by rotating all rays to the
         # optical axis in a number of steps.
-        fAngleStep_deg: float = _fSurfAngleStep_deg
-        fAngleStep: float = math.radians(fAngleStep_deg)
+        fAngleStep: float = math.radians(_fSurfAngleStep_deg)
 
-        aVizRays = np.array(lVizRays)
         aX = np.array([[0.0, 0.0, -1.0]])
 
         aZ: np.ndarray = np.cross(aX, aVizRays)
-        aZlen = np.linalg.norm(aZ, axis=1)
-        aZ = np.divide(aZ, aZlen[:, np.newaxis])
-
+        aZ /= np.linalg.norm(aZ, axis=1)[:, np.newaxis]
         aY: np.ndarray = np.cross(aZ, aX)
-        # aYlen = np.linalg.norm(aY, axis=1)
-        # aY = np.divide(aY, aYlen[:, np.newaxis])
 
-        aAngle = np.arccos(np.dot(aVizRays, aX.T))
-        fAngleMin = np.min(aAngle)
+        aAngle = np.arccos(np.clip(aVizRays @ aX[0], -1.0, 1.0))
+        fAngleMin = float(np.min(aAngle))
 
-        iAngleStepCnt: int = int(math.ceil(fAngleMin / fAngleStep))
+        iAngleStepCnt: int = max(1, int(math.ceil(fAngleMin / fAngleStep)))
         aAngleStepEff: np.ndarray = aAngle / iAngleStepCnt
 
-        for iAngleStep in range(1, iAngleStepCnt):
-            aNewAngle = aAngle - iAngleStep * aAngleStepEff
-            aSin = np.sin(aNewAngle)
-            aCos = np.cos(aNewAngle)
+        # Ring angles of shape (iAngleStepCnt - 1, iEdgeRayCnt)
+        aNewAngle = aAngle[np.newaxis, :] - np.arange(1, iAngleStepCnt)[:, np.newaxis] * aAngleStepEff[np.newaxis, :]
+        aRingRays = (
+            np.cos(aNewAngle)[:, :, np.newaxis] * aX[np.newaxis, :, :]
+            + np.sin(aNewAngle)[:, :, np.newaxis] * aY[np.newaxis, :, :]
+        )
 
-            aNewRay = aCos * aX + aSin * aY
-            lVex.extend([tuple((x * _fRayLen).tolist()) for x in aNewRay])
-        # endfor
+        aVex = np.concatenate(
+            ([[0.0, 0.0, 0.0], [0.0, 0.0, -1.0]], aVizRays, aRingRays.reshape(-1, 3)),
+            axis=0,
+        )
+        aVex *= _fRayLen
 
         ###############################################################
-        lFaces = []
-        # iVexCnt = len(lVex)
         iFirstIdx = 2
+        aIdx = np.arange(iEdgeRayCnt)
+        aNextIdx = np.roll(aIdx, -1)
 
-        # ################################################
-        # Create the central faces
+        # The central faces connect the innermost ring with the point on the optical axis,
+        # and the outer faces connect the boundary rays with the origin.
         iStartIdx = iFirstIdx + (iAngleStepCnt - 1) * iEdgeRayCnt
-        iCnt = iEdgeRayCnt - 1
-        for iVexIdx in range(iStartIdx, iStartIdx + iCnt):
-            lFaces.append([1, iVexIdx, iVexIdx + 1])
-        # endfor
-
-        # Connect the last to the first
-        lFaces.append([1, iStartIdx + iCnt, iStartIdx])
+        aCentralFaces = np.stack((np.full(iEdgeRayCnt, 1), iStartIdx + aIdx, iStartIdx + aNextIdx), axis=1)
+        aOuterFaces = np.stack((np.full(iEdgeRayCnt, 0), iFirstIdx + aIdx, iFirstIdx + aNextIdx), axis=1)
+
+        # Quad rings between neighbouring rings of rays
+        aRingStart = iFirstIdx + np.arange(iAngleStepCnt - 1)[:, np.newaxis] * iEdgeRayCnt
+        aRingFaces = np.stack(
+            (
+                aRingStart + aIdx,
+                aRingStart + aNextIdx,
+                aRingStart + iEdgeRayCnt + aNextIdx,
+                aRingStart + iEdgeRayCnt + aIdx,
+            ),
+            axis=2,
+        ).reshape(-1, 4)
+
+        aTriFaces = np.concatenate((aCentralFaces, aOuterFaces), axis=0)
+        iTriCnt = aTriFaces.shape[0]
+        iQuadCnt = aRingFaces.shape[0]
+
+        aLoopTotal = np.concatenate((np.full(iTriCnt, 3), np.full(iQuadCnt, 4))).astype(np.int32)
+        aLoopStart = np.zeros(aLoopTotal.shape[0], dtype=np.int32)
+        np.cumsum(aLoopTotal[:-1], out=aLoopStart[1:])
+
+        return CFrustumMeshArrays(
+            aVex=aVex,
+            aLoopVex=np.concatenate((aTriFaces.reshape(-1), aRingFaces.reshape(-1))).astype(np.int32),
+            aLoopStart=aLoopStart,
+            aLoopTotal=aLoopTotal,
+            aTriFaces=aTriFaces.astype(np.int32),
+            aQuadFaces=aRingFaces.astype(np.int32),
+        )
 
-        # ################################################
-        # Create the outer faces
-        iStartIdx = iFirstIdx
-        iCnt = iEdgeRayCnt - 1
-        for iVexIdx in range(iStartIdx, iStartIdx + iCnt):
-            lFaces.append([0, iVexIdx, iVexIdx + 1])
-        # endfor
+    # enddef
 
-        # Connect the last to the first
-        lFaces.append([0, iStartIdx + iCnt, iStartIdx])
+    # ##########################################################################################################
+    def GetFrustumMesh(
+        self, *, _fRayLen: float, _fMaxEdgeAngle_deg: float = 1.0, _fSurfAngleStep_deg: float = 10.0
+    ) -> CMeshData:
+        xMesh = self.GetFrustumMeshArrays(
+            _fRayLen=_fRayLen, _fMaxEdgeAngle_deg=_fMaxEdgeAngle_deg, _fSurfAngleStep_deg=_fSurfAngleStep_deg
+        )
 
-        # ################################################
-        # Create a face ring
-        for iAngleStep in range(iAngleStepCnt - 1):
-            iStartIdx = iFirstIdx + iAngleStep * iEdgeRayCnt
-            iCnt = iEdgeRayCnt - 1
-            for iVexIdx in range(iStartIdx, iStartIdx + iCnt):
-                lFaces.append([iVexIdx, iVexIdx + 1, iVexIdx + iEdgeRayCnt + 1, iVexIdx + iEdgeRayCnt])
-            # endfor
-            lFaces.append(
-                [iStartIdx + iEdgeRayCnt - 1, iStartIdx, iStartIdx + iEdgeRayCnt, iStartIdx + 2 * iEdgeRayCnt - 1]
-            )
-        # endfor
+        lFaces = xMesh.aTriFaces.tolist() + xMesh.aQuadFaces.tolist()
 
-        return CMeshData(lVex=lVex, lEdges=[], lFaces=lFaces)
+        return CMeshData(lVex=xMesh.aVex.tolist(), lEdges=[], lFaces=lFaces)
 
     # enddef
 
 
 # endclass
+
+
+# ##########################################################################################################
+def ConvertLutImageToContainer(
+    _xImagePath: Union[str, list, tuple, Path],
+    _xContainerPath: Union[str, list, tuple, Path],
+    *,
+    _iLutBorderPixel: int = 0,
+    _iLutSuperSampling: int = 1,
+    _fLutCenterRow: Optional[float] = None,
+    _fLutCenterCol: Optional[float] = None,
+    _sDType: str = "float32",
+) -> dict:
+    """Convert a LUT image file, e.g. an OpenEXR file, to a LUT container file.
+    The LUT image is evaluated in tiles, so that the peak memory is about the size of the LUT.
+
+    Parameters
+    ----------
+    _xImagePath : Union[str, list, tuple, Path]
+        The LUT image file.
+    _xContainerPath : Union[str, list, tuple, Path]
+        The target container file.
+    _iLutBorderPixel, _iLutSuperSampling, _fLutCenterRow, _fLutCenterCol
+        The LUT parameters as for CCameraLut.FromFile().
+    _sDType : str, optional
+        Data type of the stored LUT, either "float32" or "float16". By default "float32".
+
+    Returns
+    -------
+    dict
+        The header dictionary written to the container file.
+    """
+    xCamLut = CCameraLut()
+    xCamLut.FromFile(
+        _xFilePath=_xImagePath,
+        _iLutBorderPixel=_iLutBorderPixel,
+        _iLutSuperSampling=_iLutSuperSampling,
+        _fLutCenterRow=_fLutCenterRow,
+        _fLutCenterCol=_fLutCenterCol,
+        _bStreamTiles=True,
+    )
+
+    return xCamLut.SaveContainer(_xContainerPath, _sDType=_sDType)
+
+
+# enddef
+
+
+# ##########################################################################################################
+def ConvertLutContainerToImage(
+    _xContainerPath: Union[str, list, tuple, Path], _xImagePath: Union[str, list, tuple, Path]
+) -> dict:
+    """Convert a LUT container file to a 32bit RGBA OpenEXR LUT image.
+
+    Parameters
+    ----------
+    _xContainerPath : Union[str, list, tuple, Path]
+        The LUT container file.
+    _xImagePath : Union[str, list, tuple, Path]
+        The target OpenEXR file.
+
+    Returns
+    -------
+    dict
+        The LUT parameters, which are not stored in the image, with the elements
+        'iLutBorderPixel', 'iLutSuperSampling' and 'lLutCenterRC', as used in the AnyCam LUT data block.
+    """
+    xCamLut = CCameraLut()
+    xCamLut.FromContainer(_xFilePath=_xContainerPath)
+    xCamLut.SaveImage(_xImagePath)
+
+    return {
+        "iLutBorderPixel": xCamLut.iLutBorderPixel,
+        "iLutSuperSampling": xCamLut.iLutSuperSampling,
+        "lLutCenterRC": list(xCamLut.tLutCenterRC),
+    }
+
+
+# enddef
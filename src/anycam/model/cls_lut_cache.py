@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \cls_lut_cache.py
+# Created Date: Friday, October 16th 2026, 10:12:41 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import os
+import json
+import hashlib
+import warnings
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from anybase import path as anypath
+
+from .cls_camera_lut import CCameraLut
+
+
+# ##########################################################################################################
+# On-disk cache of camera LUTs.
+#
+# Each entry is identified by a hash of the parameters the LUT was generated from
+# and consists of the files:
+#   <key>.npy       The normalized LUT image (rows, cols, 4). Loaded as read-only memory map.
+#   <key>.mask.npy  The LUT mask (rows, cols, 1).
+#   <key>.json      The parameters and the state of the CCameraLut instance.
+# KD-tree and inverse LUT files created for a cached LUT are stored with the same key prefix.
+# The JSON file is written last, so that an entry is only visible once it is complete.
+# Entries are evicted in least recently used order, when the total cache size exceeds the maximum.
+# The cache is disabled, unless a cache path or a maximal cache size is given,
+# either as constructor arguments or by the environment variables below.
+class CLutCache:
+    # Increment if the file format or the derived LUT state changes
+    c_iFormatVersion: int = 2
+
+    # Environment variables to set cache path and maximal cache size in megabytes.
+    # Setting either of them enables the cache. A maximal size of zero disables the cache.
+    c_sEnvPath: str = "ANYCAM_LUT_CACHE_PATH"
+    c_sEnvMaxSize: str = "ANYCAM_LUT_CACHE_MAX_MB"
+
+    # Maximal cache size, if only the cache path is given
+    c_iDefaultMaxSize_MB: int = 512
+
+    def __init__(
+        self,
+        *,
+        _xPath: Union[str, list, tuple, Path, None] = None,
+        _iMaxSize_MB: Optional[int] = None,
+    ):
+        bPathGiven: bool = True
+        if _xPath is None:
+            sPath = os.environ.get(CLutCache.c_sEnvPath)
+            if sPath is None or len(sPath) == 0:
+                bPathGiven = False
+                self._pathCache: Path = Path.home() / ".cache" / "anycam" / "lut"
+            else:
+                self._pathCache: Path = anypath.MakeNormPath(sPath)
+            # endif
+        else:
+            self._pathCache: Path = anypath.MakeNormPath(_xPath)
+        # endif
+
+        if _iMaxSize_MB is None:
+            sMaxSize = os.environ.get(CLutCache.c_sEnvMaxSize)
+            if sMaxSize is None or len(sMaxSize) == 0:
+                # The cache is opt-in: without path and size, it is disabled
+                _iMaxSize_MB = CLutCache.c_iDefaultMaxSize_MB if bPathGiven else 0
+            else:
+                try:
+                    _iMaxSize_MB = int(sMaxSize)
+                except ValueError:
+                    raise RuntimeError(f"Environment variable '{CLutCache.c_sEnvMaxSize}' must be an integer")
+                # endtry
+            # endif
+        # endif
+
+        self._iMaxSize_bytes: int = max(0, _iMaxSize_MB) * 1024 * 1024
+
+    # enddef
+
+    # ##########################################################################################################
+    # Properties
+
+    @property
+    def pathCache(self) -> Path:
+        return self._pathCache
+
+    # enddef
+
+    @property
+    def iMaxSize_bytes(self) -> int:
+        return self._iMaxSize_bytes
+
+    # enddef
+
+    @property
+    def bEnabled(self) -> bool:
+        return self._iMaxSize_bytes > 0
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def CreateKey(_dicParams: dict) -> str:
+        """Create the cache key for a set of LUT generation parameters.
+
+        Parameters
+        ----------
+        _dicParams : dict
+            All parameters that determine the LUT, e.g. the projection model, intrinsics,
+            sensor size, super sampling and border. Must be JSON serializable.
+
+        Returns
+        -------
+        str
+            Hex digest of the SHA-256 hash over the parameters and the cache format version.
+        """
+        sParams = json.dumps(
+            {"iFormatVersion": CLutCache.c_iFormatVersion, "mParams": _dicParams},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(sParams.encode("utf-8")).hexdigest()
+
+    # enddef
+
+    # ##########################################################################################################
+    def _GetEntryPaths(self, _sKey: str) -> tuple[Path, Path, Path]:
+        return (
+            self._pathCache / f"{_sKey}.npy",
+            self._pathCache / f"{_sKey}.mask.npy",
+            self._pathCache / f"{_sKey}.json",
+        )
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetCameraLut(self, _sKey: str) -> Optional[CCameraLut]:
+        """Get camera LUT from cache.
+
+        Parameters
+        ----------
+        _sKey : str
+            The cache key as returned by CreateKey().
+
+        Returns
+        -------
+        Optional[CCameraLut]
+            The camera LUT with the LUT image memory mapped from the cache,
+            or None if there is no valid entry for the key.
+        """
+        if not self.bEnabled:
+            return None
+        # endif
+
+        pathLut, pathMask, pathMeta = self._GetEntryPaths(_sKey)
+        if not pathMeta.exists():
+            return None
+        # endif
+
+        try:
+            with open(pathMeta, "r") as xFile:
+                dicMeta = json.load(xFile)
+            # endwith
+
+            if dicMeta.get("iFormatVersion") != CLutCache.c_iFormatVersion:
+                return None
+            # endif
+
+            imgLut = np.load(pathLut, mmap_mode="r")
+            aLutMask = np.load(pathMask, mmap_mode="r")
+
+            xCamLut = CCameraLut()
+            xCamLut.FromState(_imgLut=imgLut, _aLutMask=aLutMask, _dicState=dicMeta["mState"], _xFilePath=pathLut)
+        except Exception:
+            # Entry is incomplete or was evicted by another process in the meantime
+            return None
+        # endtry
+
+        # Mark entry as recently used
+        try:
+            os.utime(pathMeta)
+        except OSError:
+            pass
+        # endtry
+
+        return xCamLut
+
+    # enddef
+
+    # ##########################################################################################################
+    def AddCameraLut(self, _sKey: str, _xCamLut: CCameraLut, *, _dicParams: Optional[dict] = None):
+        """Add camera LUT to cache and evict least recently used entries,
+        if the cache exceeds its maximal size.
+
+        Parameters
+        ----------
+        _sKey : str
+            The cache key as returned by CreateKey().
+        _xCamLut : CCameraLut
+            The initialized camera LUT.
+        _dicParams : Optional[dict], optional
+            The parameters the key was created from. Only stored for reference.
+        """
+        if not self.bEnabled:
+            return
+        # endif
+
+        self._pathCache.mkdir(parents=True, exist_ok=True)
+
+        pathLut, pathMask, pathMeta = self._GetEntryPaths(_sKey)
+        dicMeta = {
+            "iFormatVersion": CLutCache.c_iFormatVersion,
+            "mParams": _dicParams,
+            "mState": _xCamLut.GetStateDict(),
+        }
+
+        # Write to temporary files first, so that concurrent readers never see a partial file
+        sTempSuffix = f".{os.getpid()}.tmp"
+        for pathFile, aData in ((pathLut, _xCamLut.imgLut), (pathMask, _xCamLut.aLutMask)):
+            pathTemp = pathFile.with_name(pathFile.name + sTempSuffix)
+            with open(pathTemp, "wb") as xFile:
+                np.save(xFile, np.ascontiguousarray(aData))
+            # endwith
+            os.replace(pathTemp, pathFile)
+        # endfor
+
+        pathTemp = pathMeta.with_name(pathMeta.name + sTempSuffix)
+        with open(pathTemp, "w") as xFile:
+            json.dump(dicMeta, xFile, indent=4)
+        # endwith
+        os.replace(pathTemp, pathMeta)
+
+        self.Evict(_sKeepKey=_sKey)
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetOrCreateCameraLut(
+        self, _dicParams: dict, _funcCreate: Callable[[], Optional[CCameraLut]]
+    ) -> Optional[CCameraLut]:
+        """Get camera LUT from cache or create it and add it to the cache.
+
+        Parameters
+        ----------
+        _dicParams : dict
+            All parameters that determine the LUT. See CreateKey().
+        _funcCreate : Callable[[], Optional[CCameraLut]]
+            Function without arguments that creates the camera LUT, if it is not in the cache.
+            If the function returns None, nothing is added to the cache.
+
+        Returns
+        -------
+        Optional[CCameraLut]
+            The camera LUT or None, if it could not be created.
+        """
+        if not self.bEnabled:
+            return _funcCreate()
+        # endif
+
+        sKey = CLutCache.CreateKey(_dicParams)
+        xCamLut = self.GetCameraLut(sKey)
+        if xCamLut is None:
+            xCamLut = _funcCreate()
+            if xCamLut is None:
+                return None
+            # endif
+
+            try:
+                self.AddCameraLut(sKey, xCamLut, _dicParams=_dicParams)
+            except OSError as xEx:
+                # The LUT is still valid, so the cache failure is not an error
+                warnings.warn(
+                    f"Cannot write LUT to cache at '{self._pathCache.as_posix()}':\n{str(xEx)}",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+            # endtry
+        # endif
+
+        return xCamLut
+
+    # enddef
+
+    # ##########################################################################################################
+    def _GetEntries(self) -> list[tuple[float, int, list[Path]]]:
+        # Collect files per key, as (last access time, total size, files)
+        dicFiles: dict[str, list[Path]] = {}
+        for pathFile in self._pathCache.iterdir():
+            if not pathFile.is_file() or pathFile.name.endswith(".tmp"):
+                continue
+            # endif
+            dicFiles.setdefault(pathFile.name.split(".")[0], []).append(pathFile)
+        # endfor
+
+        lEntries: list[tuple[float, int, list[Path]]] = []
+        for sKey, lFiles in dicFiles.items():
+            fTime: float = 0.0
+            iSize: int = 0
+            for pathFile in lFiles:
+                try:
+                    xStat = pathFile.stat()
+                except OSError:
+                    continue
+                # endtry
+                iSize += xStat.st_size
+                if pathFile.name == f"{sKey}.json":
+                    fTime = xStat.st_mtime
+                # endif
+            # endfor
+            lEntries.append((fTime, iSize, lFiles))
+        # endfor
+
+        return lEntries
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetSize(self) -> int:
+        """Total size of all cache files in bytes."""
+        if not self._pathCache.exists():
+            return 0
+        # endif
+
+        return sum(x[1] for x in self._GetEntries())
+
+    # enddef
+
+    # ##########################################################################################################
+    def Evict(self, *, _iMaxSize_bytes: Optional[int] = None, _sKeepKey: Optional[str] = None):
+        """Remove least recently used entries until the cache size is below the maximum.
+
+        Parameters
+        ----------
+        _iMaxSize_bytes : Optional[int], optional
+            The maximal cache size. If None, the maximal size of the cache is used.
+        _sKeepKey : Optional[str], optional
+            Key of an entry that is never removed, e.g. the entry just added.
+        """
+        if not self._pathCache.exists():
+            return
+        # endif
+
+        iMaxSize_bytes = self._iMaxSize_bytes if _iMaxSize_bytes is None else _iMaxSize_bytes
+
+        lEntries = self._GetEntries()
+        iSize = sum(x[1] for x in lEntries)
+        lEntries.sort(key=lambda x: x[0])
+
+        for fTime, iEntrySize, lFiles in lEntries:
+            if iSize <= iMaxSize_bytes:
+                break
+            # endif
+
+            if _sKeepKey is not None and lFiles[0].name.split(".")[0] == _sKeepKey:
+                continue
+            # endif
+
+            # Remove the JSON file first, so that the entry is invalid while removing the other files.
+            # Memory maps of removed files held by other processes stay valid.
+            for pathFile in sorted(lFiles, key=lambda x: x.suffix != ".json"):
+                try:
+                    pathFile.unlink()
+                except OSError:
+                    pass
+                # endtry
+            # endfor
+            iSize -= iEntrySize
+        # endfor
+
+    # enddef
+
+    # ##########################################################################################################
+    def Clear(self):
+        """Remove all entries from the cache."""
+        self.Evict(_iMaxSize_bytes=0)
+
+    # enddef
+
+
+# endclass
+
+
+# ##########################################################################################################
+# Process-wide LUT cache instance
+g_xLutCache: Optional[CLutCache] = None
+
+
+# ##########################################################################################################
+def GetLutCache() -> CLutCache:
+    """Get the process-wide LUT cache, configured by environment variables
+    ANYCAM_LUT_CACHE_PATH and ANYCAM_LUT_CACHE_MAX_MB. The cache is disabled, if neither is set."""
+    global g_xLutCache
+
+    if g_xLutCache is None:
+        g_xLutCache = CLutCache()
+    # endif
+
+    return g_xLutCache
+
+
+# enddef
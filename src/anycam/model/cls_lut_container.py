@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \cls_lut_container.py
+# Created Date: Friday, October 16th 2026, 4:37:12 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import os
+import json
+import struct
+import hashlib
+from pathlib import Path
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from anybase import path as anypath
+
+
+# ##########################################################################################################
+# Content of a LUT container file
+class CLutContainerData(NamedTuple):
+    # The normalized LUT image (rows, cols, 4) in RGBA order, top row first.
+    # A read-only memory map of the file, if the container was loaded with memory map.
+    imgLut: np.ndarray
+    # The LUT mask (rows, cols, 1) of type bool
+    aLutMask: np.ndarray
+    # The header dictionary
+    dicHeader: dict
+
+
+# endclass
+
+
+# ##########################################################################################################
+# File format of camera LUT containers.
+#
+# A container stores a normalized LUT together with all parameters derived from it,
+# so that it can be memory mapped without decoding or evaluating the LUT again.
+# The file consists of:
+#   32 bytes        Magic bytes 'ANYCLUT\0', the format version and the header size in bytes
+#                   as little-endian uint32, and the LUT and mask data offsets as little-endian uint64.
+#   header          UTF-8 JSON dictionary, padded with spaces.
+#   LUT data        Raw little-endian float32 or float16 array of shape (rows, cols, 4)
+#                   in RGBA order with the top row first.
+#   mask data       Raw uint8 array of shape (rows, cols), which is 1 for valid LUT pixels.
+# Both data blocks start at multiples of c_iAlignment bytes. The header stores the LUT border pixels,
+# super sampling, LUT center, FoV ranges and render crop, the state dictionary of the CCameraLut instance,
+# and a SHA-256 hash of both data blocks.
+class CLutContainer:
+    c_sMagic: bytes = b"ANYCLUT\0"
+    c_iFormatVersion: int = 1
+    c_sSuffix: str = ".camlut"
+    c_iAlignment: int = 64
+    c_sPrefixFormat: str = "<8sIIQQ"
+    c_dicDTypes: dict[str, str] = {"float32": "<f4", "float16": "<f2"}
+
+    # Number of LUT rows converted and hashed at a time while writing
+    c_iWriteTileRowCnt: int = 256
+
+    # ##########################################################################################################
+    @staticmethod
+    def IsContainerFile(_xFilePath: Union[str, list, tuple, Path]) -> bool:
+        """Test whether a file is a LUT container, by its magic bytes.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path]
+            The file path.
+
+        Returns
+        -------
+        bool
+            True, if the file exists and starts with the container magic bytes.
+        """
+        pathFile = anypath.MakeNormPath(_xFilePath)
+        if not pathFile.is_file():
+            return False
+        # endif
+
+        with open(pathFile, "rb") as xFile:
+            sMagic = xFile.read(len(CLutContainer.c_sMagic))
+        # endwith
+
+        return sMagic == CLutContainer.c_sMagic
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def _AlignOffset(_iOffset: int) -> int:
+        iAlign = CLutContainer.c_iAlignment
+        return ((_iOffset + iAlign - 1) // iAlign) * iAlign
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def _EncodeHeader(_dicHeader: dict, _iLutSize: int) -> tuple[bytes, int, int]:
+        # Returns the prefix and header bytes, padded so that the LUT data starts at an aligned offset,
+        # and the offsets of the LUT data and of the mask data.
+        iPrefixSize = struct.calcsize(CLutContainer.c_sPrefixFormat)
+        xJson = (json.dumps(_dicHeader, indent=4) + "\n").encode("utf-8")
+        iLutOffset = CLutContainer._AlignOffset(iPrefixSize + len(xJson))
+        iMaskOffset = CLutContainer._AlignOffset(iLutOffset + _iLutSize)
+        xJson = xJson.ljust(iLutOffset - iPrefixSize, b" ")
+        xPrefix = struct.pack(
+            CLutContainer.c_sPrefixFormat,
+            CLutContainer.c_sMagic,
+            CLutContainer.c_iFormatVersion,
+            len(xJson),
+            iLutOffset,
+            iMaskOffset,
+        )
+
+        return xPrefix + xJson, iLutOffset, iMaskOffset
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def _ReadHeader(_pathFile: Path) -> tuple[dict, int, int]:
+        # Returns the header dictionary and the offsets of the LUT data and of the mask data
+        iPrefixSize = struct.calcsize(CLutContainer.c_sPrefixFormat)
+
+        with open(_pathFile, "rb") as xFile:
+            xPrefix = xFile.read(iPrefixSize)
+            if len(xPrefix) != iPrefixSize or not xPrefix.startswith(CLutContainer.c_sMagic):
+                raise RuntimeError(f"File is not a camera LUT container: {(_pathFile.as_posix())}")
+            # endif
+
+            _, iVersion, iHeaderSize, iLutOffset, iMaskOffset = struct.unpack(CLutContainer.c_sPrefixFormat, xPrefix)
+            if iVersion > CLutContainer.c_iFormatVersion:
+                raise RuntimeError(
+                    f"Camera LUT container has format version {iVersion}, but only versions up to "
+                    f"{CLutContainer.c_iFormatVersion} are supported: {(_pathFile.as_posix())}"
+                )
+            # endif
+
+            dicHeader: dict = json.loads(xFile.read(iHeaderSize).decode("utf-8"))
+        # endwith
+
+        return dicHeader, iLutOffset, iMaskOffset
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def ReadHeader(_xFilePath: Union[str, list, tuple, Path]) -> dict:
+        """Read the header of a LUT container without reading the LUT data.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path]
+            The container file path.
+
+        Returns
+        -------
+        dict
+            The header dictionary.
+        """
+        dicHeader, _, _ = CLutContainer._ReadHeader(anypath.MakeNormPath(_xFilePath))
+        return dicHeader
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def Write(
+        _xFilePath: Union[str, list, tuple, Path],
+        *,
+        _imgLut: np.ndarray,
+        _aLutMask: np.ndarray,
+        _dicState: dict,
+        _sDType: str = "float32",
+    ) -> dict:
+        """Write a normalized LUT, its mask and its state to a container file.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path]
+            The target file path.
+        _imgLut : np.ndarray
+            The normalized LUT image (rows, cols, 4) in RGBA order, as returned by CCameraLut.imgLut.
+        _aLutMask : np.ndarray
+            The LUT mask (rows, cols, 1), as returned by CCameraLut.aLutMask.
+        _dicState : dict
+            The LUT state, as returned by CCameraLut.GetStateDict().
+        _sDType : str, optional
+            Data type of the stored LUT, either "float32" or "float16". By default "float32".
+            A float16 LUT halves the file size, but the ray directions are rounded to about 11 bits,
+            so that they deviate by up to about 0.03 degrees. For a fisheye LUT with about 0.1 degrees
+            per LUT pixel, this moves projected pixel positions by up to about 0.3 pixels.
+            CCameraLut converts a float16 LUT to float32 on loading, so that it is not memory mapped.
+
+        Returns
+        -------
+        dict
+            The header dictionary written to the file.
+        """
+        if _sDType not in CLutContainer.c_dicDTypes:
+            raise RuntimeError(
+                f"Unsupported LUT container data type '{_sDType}'. "
+                f"Expect one of {list(CLutContainer.c_dicDTypes.keys())}"
+            )
+        # endif
+
+        if _imgLut.ndim != 3 or _imgLut.shape[2] != 4:
+            raise RuntimeError("LUT image must have four channels")
+        # endif
+
+        iLutRows, iLutCols, iLutChnl = _imgLut.shape
+        if _aLutMask.shape != (iLutRows, iLutCols, 1):
+            raise RuntimeError("LUT mask does not match LUT image size")
+        # endif
+
+        xDType = np.dtype(CLutContainer.c_dicDTypes[_sDType])
+        iLutSize = iLutRows * iLutCols * iLutChnl * xDType.itemsize
+
+        dicHeader = {
+            "sDType": _sDType,
+            "lShape": [iLutRows, iLutCols, iLutChnl],
+            "iLutBorderPixel": _dicState["_iLutBorderPixel"],
+            "iLutSuperSampling": _dicState["_iLutSuperSampling"],
+            "lLutCenterRC": list(_dicState["_tLutCenterRC"]),
+            "lLutAngleRangeX_deg": list(_dicState["_tLutAngleRangeX_deg"]),
+            "lLutAngleRangeY_deg": list(_dicState["_tLutAngleRangeY_deg"]),
+            "fRadAngleMax_deg": _dicState["_fRadAngleMax_deg"],
+            "lRenderCrop": list(_dicState["_xRenderCrop"]),
+            # Placeholder of the same length as the final hash, so that the header size does not change
+            "sContentHash": "0" * (2 * hashlib.sha256().digest_size),
+            "mState": _dicState,
+        }
+        xHeader, iLutOffset, iMaskOffset = CLutContainer._EncodeHeader(dicHeader, iLutSize)
+
+        pathFile = anypath.MakeNormPath(_xFilePath)
+        xHash = hashlib.sha256()
+        iTileRowCnt = CLutContainer.c_iWriteTileRowCnt
+
+        # Write to temporary file first, so that concurrent readers never see a partial file.
+        # The data is converted and hashed per tile of rows, and the header is rewritten with the final hash.
+        pathTemp = pathFile.with_name(f"{pathFile.name}.{os.getpid()}.tmp")
+        with open(pathTemp, "wb") as xFile:
+            xFile.write(xHeader)
+
+            for iRowStart in range(0, iLutRows, iTileRowCnt):
+                aTile = np.ascontiguousarray(_imgLut[iRowStart : iRowStart + iTileRowCnt], dtype=xDType)
+                xHash.update(aTile.data)
+                xFile.write(aTile.data)
+            # endfor
+
+            xFile.write(bytes(iMaskOffset - iLutOffset - iLutSize))
+
+            for iRowStart in range(0, iLutRows, iTileRowCnt):
+                aTile = np.ascontiguousarray(_aLutMask[iRowStart : iRowStart + iTileRowCnt, :, 0], dtype=np.uint8)
+                xHash.update(aTile.data)
+                xFile.write(aTile.data)
+            # endfor
+
+            dicHeader["sContentHash"] = xHash.hexdigest()
+            xHeader, _, _ = CLutContainer._EncodeHeader(dicHeader, iLutSize)
+            xFile.seek(0)
+            xFile.write(xHeader)
+        # endwith
+        os.replace(pathTemp, pathFile)
+
+        return dicHeader
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def Load(
+        _xFilePath: Union[str, list, tuple, Path], *, _bMemMap: bool = True, _bVerifyHash: bool = False
+    ) -> CLutContainerData:
+        """Load a LUT container.
+
+        Parameters
+        ----------
+        _xFilePath : Union[str, list, tuple, Path]
+            The container file path.
+        _bMemMap : bool, optional
+            If true, the LUT and the mask are read-only memory maps of the file.
+            Otherwise, they are read into memory. By default True.
+        _bVerifyHash : bool, optional
+            If true, the content hash is evaluated and compared to the hash stored in the header.
+            This reads the whole file. By default False.
+
+        Returns
+        -------
+        CLutContainerData
+            The LUT image, the LUT mask and the header.
+        """
+        pathFile = anypath.MakeNormPath(_xFilePath)
+        dicHeader, iLutOffset, iMaskOffset = CLutContainer._ReadHeader(pathFile)
+
+        sDType: str = dicHeader.get("sDType")
+        if sDType not in CLutContainer.c_dicDTypes:
+            raise RuntimeError(f"Unsupported data type '{sDType}' in camera LUT container: {(pathFile.as_posix())}")
+        # endif
+        xDType = np.dtype(CLutContainer.c_dicDTypes[sDType])
+
+        iLutRows, iLutCols, iLutChnl = dicHeader["lShape"]
+        tLutShape = (iLutRows, iLutCols, iLutChnl)
+        tMaskShape = (iLutRows, iLutCols, 1)
+
+        iFileSize = pathFile.stat().st_size
+        if iFileSize < iMaskOffset + iLutRows * iLutCols:
+            raise RuntimeError(f"Camera LUT container is truncated: {(pathFile.as_posix())}")
+        # endif
+
+        if _bMemMap is True:
+            sPath = pathFile.as_posix()
+            imgLut = np.memmap(sPath, dtype=xDType, mode="r", offset=iLutOffset, shape=tLutShape)
+            aLutMask = np.memmap(sPath, dtype=np.bool_, mode="r", offset=iMaskOffset, shape=tMaskShape)
+        else:
+            with open(pathFile, "rb") as xFile:
+                xFile.seek(iLutOffset)
+                imgLut = np.fromfile(xFile, dtype=xDType, count=iLutRows * iLutCols * iLutChnl).reshape(tLutShape)
+                xFile.seek(iMaskOffset)
+                aLutMask = np.fromfile(xFile, dtype=np.bool_, count=iLutRows * iLutCols).reshape(tMaskShape)
+            # endwith
+        # endif
+
+        if _bVerifyHash is True:
+            xHash = hashlib.sha256()
+            iTileRowCnt = CLutContainer.c_iWriteTileRowCnt
+            for aData in (imgLut, aLutMask):
+                for iRowStart in range(0, iLutRows, iTileRowCnt):
+                    xHash.update(np.ascontiguousarray(aData[iRowStart : iRowStart + iTileRowCnt]).data)
+                # endfor
+            # endfor
+
+            if xHash.hexdigest() != dicHeader.get("sContentHash"):
+                raise RuntimeError(f"Content hash mismatch of camera LUT container: {(pathFile.as_posix())}")
+            # endif
+        # endif
+
+        return CLutContainerData(imgLut=imgLut, aLutMask=aLutMask, dicHeader=dicHeader)
+
+    # enddef
+
+
+# endclass
@@ -32,6 +32,7 @@ from pathlib import Path
 from anybase import config, convert
 from anybase.cls_any_error import CAnyError_Message
 
+from ..model.cls_lut_container import CLutContainer
 from .cls_cameraview_lut import CCameraViewLut
 from .cls_cameraview_pinhole import CCameraViewPinhole
 from .cls_cameraview_pano_equidist import CCameraViewPanoEquidist
@@ -126,9 +127,6 @@ def CreateCameraView(_dicAnyCam: dict, *, _xCamDataPath: Union[str, Path, tuple,
         try:
             sImageName: str = convert.DictElementToString(dicLutData, "sImageName")
             sFilePath: str = convert.DictElementToString(dicLutData, "sFilePath", sDefault=None, bDoRaise=False)
-            iLutBorderPixel: int = convert.DictElementToInt(dicLutData, "iLutBorderPixel")
-            iLutSuperSampling: int = convert.DictElementToInt(dicLutData, "iLutSuperSampling")
-            lLutCenterRC: list = convert.DictElementToFloatList(dicLutData, "lLutCenterRC", iLen=2)
         except Exception as xEx:
             raise CAnyError_Message(sMsg="AnyCamEx LUT data block is missing an element", xChildEx=xEx)
         # endtry
@@ -147,9 +145,26 @@ def CreateCameraView(_dicAnyCam: dict, *, _xCamDataPath: Union[str, Path, tuple,
             # endif
         # endif
 
+        # A LUT container file stores the LUT parameters itself and is memory mapped,
+        # so it is used instead of the Blender LUT image.
+        bIsContainer: bool = xFilePath is not None and CLutContainer.IsContainerFile(xFilePath)
+
+        iLutBorderPixel: int = 0
+        iLutSuperSampling: int = 1
+        lLutCenterRC: list = None
+        if bIsContainer is False:
+            try:
+                iLutBorderPixel = convert.DictElementToInt(dicLutData, "iLutBorderPixel")
+                iLutSuperSampling = convert.DictElementToInt(dicLutData, "iLutSuperSampling")
+                lLutCenterRC = convert.DictElementToFloatList(dicLutData, "lLutCenterRC", iLen=2)
+            except Exception as xEx:
+                raise CAnyError_Message(sMsg="AnyCamEx LUT data block is missing an element", xChildEx=xEx)
+            # endtry
+        # endif
+
         # if there is an image name and we are in a Blender context, then load the LUT image from Blender
         imgLut: np.ndarray = None
-        if sImageName is not None:
+        if sImageName is not None and bIsContainer is False:
             try:
                 # Try to import '_bpy' which only works in an actual Blender context.
                 import _bpy
@@ -45,8 +45,9 @@ from ..material import ray_lut_fisheye
 
 # from .. import model
 
-# from ..mesh import solids
+from ..mesh import solids
 from ..model.cls_camera_lut import CCameraLut
+from ..model.cls_lut_container import CLutContainer
 
 import anyblend
 from anybase.cls_any_error import CAnyError_Message
@@ -112,6 +113,7 @@ def Create(
         _iLutSuperSampling=iLutSuperSampling,
         _fLutCenterRow=fLutCenterRow,
         _fLutCenterCol=fLutCenterCol,
+        _bStreamTiles=True,
     )
 
     # print(xCamLut._tRenderLutAngleRangeX_deg)
@@ -244,7 +246,7 @@ def CreateCameraLut(_sName: str,
     # print("image pixel count: {}".format(len(imgA.pixels)))
 
     # Copy the actual pixels into the Blender image
-    imgA.pixels = list(xCamLut.imgLutFlipped.flatten())
+    SetBlenderImagePixels(imgA, xCamLut.imgLutFlipped)
 
     # Pack image in Blender file
     anyblend.ops_image.Pack(imgA)
@@ -320,10 +322,15 @@ def CreateCameraLut(_sName: str,
     #############################################################
     # Create Frustum if needed
     if bCreateFrustum is True:
-        xMeshFrustumS = xCamLut.GetFrustumMesh(_fRayLen=1.0, _fMaxEdgeAngle_deg=1.0, _fSurfAngleStep_deg=10.0)
-        objFS: bpy.types.Object = anyblend.object.CreateObjectFromMeshData(
-            f"Frustum.Lut.S.{_sName}", xMeshFrustumS, _xCollection=clnMain
+        xMeshFrustumS = xCamLut.GetFrustumMeshArrays(_fRayLen=1.0, _fMaxEdgeAngle_deg=1.0, _fSurfAngleStep_deg=10.0)
+        objFS: bpy.types.Object = solids.CreateObjectFromMeshArrays(
+            sName=f"Frustum.Lut.S.{_sName}",
+            aVex=xMeshFrustumS.aVex,
+            aLoopVex=xMeshFrustumS.aLoopVex,
+            aLoopStart=xMeshFrustumS.aLoopStart,
+            aLoopTotal=xMeshFrustumS.aLoopTotal,
         )
+        clnMain.objects.link(objFS)
 
         # modRemesh = anyblend.ops_object.AddModifier_Remesh(objFS)
         # modRemesh.mode = "SHARP"
@@ -430,8 +437,7 @@ def GetBlenderLutImage(_sImageName: str, _bDoRaise=True) -> np.ndarray:
         return None
     # endif
 
-    imgLut = np.asarray(bpyImage.pixels, dtype=np.float32)
-    imgLut = imgLut.reshape(bpyImage.size[1], bpyImage.size[0], -1)
+    imgLut = GetBlenderImagePixels(bpyImage)
 
     # need to flip Y-axis of image array, as it is stored with
     # bottom row first.
@@ -443,6 +449,66 @@ def GetBlenderLutImage(_sImageName: str, _bDoRaise=True) -> np.ndarray:
 # enddef
 
 
+# ###############################################################################
+def SetBlenderImagePixels(_bpyImage: bpy.types.Image, _imgPixels: np.ndarray):
+    """Copy pixel values into a Blender image via the buffer protocol.
+    This avoids creating a Python float object per pixel channel,
+    as happens when assigning a list to 'pixels'.
+
+    Parameters
+    ----------
+    _bpyImage : bpy.types.Image
+        The Blender image.
+    _imgPixels : np.ndarray
+        Image of shape (rows, cols, channels) with the bottom row first,
+        as Blender expects it. Rows, columns and channels must match the Blender image.
+    """
+    iCols, iRows = _bpyImage.size
+    iChnl: int = _bpyImage.channels
+    if _imgPixels.shape != (iRows, iCols, iChnl):
+        raise CAnyError_Message(
+            sMsg=(
+                f"Image of shape {_imgPixels.shape} does not match Blender image '{_bpyImage.name}' "
+                f"of shape {(iRows, iCols, iChnl)}"
+            )
+        )
+    # endif
+
+    # Only copies the data if it is not already a contiguous float32 array
+    aPixels = np.ascontiguousarray(_imgPixels, dtype=np.float32).reshape(-1)
+    _bpyImage.pixels.foreach_set(aPixels)
+
+    # Needed so that Blender uses the new pixel values
+    _bpyImage.update()
+
+
+# enddef
+
+
+# ###############################################################################
+def GetBlenderImagePixels(_bpyImage: bpy.types.Image) -> np.ndarray:
+    """Copy pixel values of a Blender image into a float32 numpy array via the buffer protocol.
+
+    Parameters
+    ----------
+    _bpyImage : bpy.types.Image
+        The Blender image.
+
+    Returns
+    -------
+    np.ndarray
+        Image of shape (rows, cols, channels) with the bottom row first.
+    """
+    iCols, iRows = _bpyImage.size
+    aPixels = np.empty(iRows * iCols * _bpyImage.channels, dtype=np.float32)
+    _bpyImage.pixels.foreach_get(aPixels)
+
+    return aPixels.reshape(iRows, iCols, -1)
+
+
+# enddef
+
+
 # ###############################################################################
 # Save Blender Lut Image
 def SaveBlenderLutImage(_xFilePath: Union[str, list, tuple, Path], _sImageName: str, *, _bOverwrite: bool = True):
@@ -483,11 +549,56 @@ def SaveBlenderLutImage(_xFilePath: Union[str, list, tuple, Path], _sImageName:
 # enddef
 
 
+# ###############################################################################
+# Save Blender Lut Image as LUT container
+def SaveBlenderLutContainer(
+    _xFilePath: Union[str, list, tuple, Path],
+    _sImageName: str,
+    *,
+    _iLutBorderPixel: int,
+    _iLutSuperSampling: int,
+    _lLutCenterRC: list[float],
+    _sDType: str = "float32",
+    _bOverwrite: bool = True,
+):
+    pathFile = anypath.MakeNormPath(_xFilePath).absolute()
+
+    if pathFile.exists() and _bOverwrite is False:
+        return
+    # endif
+
+    xCamLut = CCameraLut()
+    xCamLut.FromArray(
+        _imgLut=GetBlenderLutImage(_sImageName),
+        _iLutBorderPixel=_iLutBorderPixel,
+        _iLutSuperSampling=_iLutSuperSampling,
+        _fLutCenterRow=_lLutCenterRC[0],
+        _fLutCenterCol=_lLutCenterRC[1],
+    )
+    xCamLut.SaveContainer(pathFile, _sDType=_sDType)
+
+
+# enddef
+
+
 # ###############################################################################
 # Store LUT data in dictionary and saving LUT file
 def StoreLutCameraData(
-    *, _dicCamData: dict, _xPath: Union[Path, str], _xFromPath: Path = None, _bOverwrite: bool = True
+    *,
+    _dicCamData: dict,
+    _xPath: Union[Path, str],
+    _xFromPath: Path = None,
+    _bOverwrite: bool = True,
+    _sLutFormat: str = "exr",
 ):
+    """Store the LUT image of a LUT camera in a file and set the relative file path in the camera data.
+
+    Parameters
+    ----------
+    _sLutFormat : str, optional
+        Either "exr" for a 32bit RGBA OpenEXR image, or "container" for a memory mappable
+        LUT container, which also stores the LUT parameters. By default "exr".
+    """
     try:
         dicLutData: dict = _dicCamData["mEx"]["mLutData"]
         sImageName = dicLutData["sImageName"]
@@ -495,11 +606,16 @@ def StoreLutCameraData(
         raise CAnyError_Message(sMsg=f"Incomplete camera data for LUT camera", xChildEx=xEx)
     # endtry
 
+    dicSuffix = {"exr": ".exr", "container": CLutContainer.c_sSuffix}
+    if _sLutFormat not in dicSuffix:
+        raise CAnyError_Message(sMsg=f"Unsupported LUT file format '{_sLutFormat}'")
+    # endif
+
     pathTrg = Path(_xPath)
 
     # sLutFilename = "Camera-LUT.exr"
     sName = sImageName.replace(".", "-")
-    sLutFilename = f"LUT-{sName}.exr"
+    sLutFilename = f"LUT-{sName}{dicSuffix[_sLutFormat]}"
 
     pathLutFile = pathTrg / sLutFilename
 
@@ -509,7 +625,18 @@ def StoreLutCameraData(
         dicLutData["sFilePath"] = sLutFilename
     # endif
 
-    SaveBlenderLutImage(pathLutFile, sImageName, _bOverwrite=_bOverwrite)
+    if _sLutFormat == "container":
+        SaveBlenderLutContainer(
+            pathLutFile,
+            sImageName,
+            _iLutBorderPixel=convert.DictElementToInt(dicLutData, "iLutBorderPixel", iDefault=0),
+            _iLutSuperSampling=convert.DictElementToInt(dicLutData, "iLutSuperSampling", iDefault=1),
+            _lLutCenterRC=convert.DictElementToFloatList(dicLutData, "lLutCenterRC", iLen=2),
+            _bOverwrite=_bOverwrite,
+        )
+    else:
+        SaveBlenderLutImage(pathLutFile, sImageName, _bOverwrite=_bOverwrite)
+    # endif
 
 
 # enddef
@@ -39,11 +39,11 @@ from pathlib import Path
 # from . import util
 from .. import ops
 from ..mesh import solids
+from ..model.cls_camera_lut import CFrustumMeshArrays
 from anybase import config, convert
 from anybase import path as anypath
 
 import anyblend
-from anyblend.mesh.types import CMeshData
 
 from anybase.cls_anyexcept import CAnyExcept
 from anybase.cls_any_error import CAnyError_Message
@@ -401,13 +401,18 @@ def Create(
             anyblend.object.Hide(objFL, bHide=True, bHideInAllViewports=True, bHideRender=True)
 
         elif sPanoType == "poly":
-            xMeshFrustum: CMeshData = xView.GetFrustumMesh(
+            xMeshFrustum: CFrustumMeshArrays = xView.GetFrustumMeshArrays(
                 _fRayLen=1.0, _fMaxEdgeAngle_deg=1.0, _fSurfAngleStep_deg=10.0
             )
 
-            objFS: bpy.types.Object = anyblend.object.CreateObjectFromMeshData(
-                f"Frustum.Pano.S.{_sName}", xMeshFrustum, _xCollection=clnMain
+            objFS: bpy.types.Object = solids.CreateObjectFromMeshArrays(
+                sName=f"Frustum.Pano.S.{_sName}",
+                aVex=xMeshFrustum.aVex,
+                aLoopVex=xMeshFrustum.aLoopVex,
+                aLoopStart=xMeshFrustum.aLoopStart,
+                aLoopTotal=xMeshFrustum.aLoopTotal,
             )
+            clnMain.objects.link(objFS)
 
             # modRemesh = anyblend.ops_object.AddModifier_Remesh(objFS)
             # modRemesh.mode = "SHARP"
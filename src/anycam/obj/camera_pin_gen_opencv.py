@@ -43,8 +43,10 @@ from .. import material
 from .. import model
 from ..mesh import solids
 from ..model.cls_camera_lut import CCameraLut
+from ..model.cls_lut_cache import GetLutCache
 
 import anyblend
+from anybase import config
 from anybase.cls_anyexcept import CAnyExcept
 
 
@@ -112,16 +114,27 @@ def Create(
     # endif
 
     #####################################################
-    # Get tangential/prism/tilt distortion coefficients - currently unsupported
-    lDistTan = dicProject.get("lDistTan")
-    if any(lDistTan):
-        raise RuntimeError(f"Tangential distortion parameters (unsupported) given: {[x for x in lDistTan]}.")
-    lDistPrism = dicProject.get("lDistPrism")
-    if any(lDistPrism):
-        raise RuntimeError(f"Prism distortion parameters (unsupported) given: {[x for x in lDistPrism]}.")
-    lDistTilt = dicProject.get("lDistTilt")
-    if any(lDistTilt):
-        raise RuntimeError(f"Tilt distortion parameters (unsupported) given: {[x for x in lDistTilt]}.")
+    # The OpenCV fisheye (Kannala-Brandt) model is selected by the projection type
+    # '/anycam/db/project/pingen/opencv/fisheye'.
+    lPrjType = config.SplitDti(dicProject.get("sDTI")).get("lType")
+    bFisheye = len(lPrjType) > 5 and lPrjType[5] == "fisheye"
+
+    #####################################################
+    # Get tangential/prism/tilt distortion coefficients
+    lDistTan = dicProject.get("lDistTan", [])
+    if lDistTan is None or len(lDistTan) not in [0, 2]:
+        raise RuntimeError("Expect element 'lDistTan' to be a list of 2 floats")
+    # endif
+
+    lDistPrism = dicProject.get("lDistPrism", [])
+    if lDistPrism is None or len(lDistPrism) not in [0, 4]:
+        raise RuntimeError("Expect element 'lDistPrism' to be a list of 4 floats")
+    # endif
+
+    lDistTilt = dicProject.get("lDistTilt", [])
+    if lDistTilt is None or len(lDistTilt) not in [0, 2]:
+        raise RuntimeError("Expect element 'lDistTilt' to be a list of 2 floats")
+    # endif
 
     #####################################################
     # Create ray direction lookup image
@@ -137,65 +150,133 @@ def Create(
     # endif
     lImgCtrXY_pix = [int(round(x * fPixPerVal)) for x in lImgCtrXY]
 
-    lDistRad = dicProject.get("lDistRad", [0.0, 0.0])
-    if not isinstance(lDistRad, list):
-        raise RuntimeError("Expect element 'lDistRad' to be a list of 2, 3, or 6 floats")
-    # endif
+    if bFisheye is True:
+        # The fisheye distortion coefficients act on the ray angle and do not depend on the unit.
+        lDistRad = dicProject.get("lDistRad", [])
+        if not isinstance(lDistRad, list) or len(lDistRad) > 4:
+            raise RuntimeError("Expect element 'lDistRad' to be a list of up to 4 floats for the fisheye model")
+        # endif
+
+        if any(lDistTan) or any(lDistPrism) or any(lDistTilt):
+            raise RuntimeError("Tangential, prism and tilt distortion are not supported by the fisheye model")
+        # endif
 
-    iDistCnt = len(lDistRad)
-    if iDistCnt == 0:
-        lDistRad = [0.0, 0.0]
-    elif iDistCnt not in [2, 3, 6]:
-        raise RuntimeError("Expect element 'lDistRad' to be a list of 2, 3, or 6 floats")
+        dicLutParams = {
+            "sModel": "opencv/fisheye",
+            "lSenSizeXY_pix": [iPixCntX, iPixCntY],
+            "lFocLenXY_pix": lFocLenXY_pix,
+            "lImgCtrXY_pix": lImgCtrXY_pix,
+            "lDistRad": lDistRad,
+        }
+    else:
+        lDistRad = dicProject.get("lDistRad", [0.0, 0.0])
+        if not isinstance(lDistRad, list):
+            raise RuntimeError("Expect element 'lDistRad' to be a list of 2, 3, or 6 floats")
+        # endif
+
+        iDistCnt = len(lDistRad)
+        if iDistCnt == 0:
+            lDistRad = [0.0, 0.0]
+        elif iDistCnt not in [2, 3, 6]:
+            raise RuntimeError("Expect element 'lDistRad' to be a list of 2, 3, or 6 floats")
+        # endif
+
+        fFac = fFac2 = 1.0 / (fPixPerVal * fPixPerVal)
+        lDistRad_pix = lDistRad.copy()
+        iDistCnt = len(lDistRad)
+        iCnt = min(3, iDistCnt)
+        for iIdx in range(iCnt):
+            lDistRad_pix[iIdx] = fFac * lDistRad[iIdx]
+            if iDistCnt == 6:
+                lDistRad_pix[iIdx + 3] = fFac * lDistRad[iIdx + 3]
+            # endif
+            fFac *= fFac2
+        # endfor
+
+        # The tangential and prism terms are scaled by the unit in the same way as the radial terms.
+        # The tilt angles do not depend on the unit.
+        fFac = 1.0 / fPixPerVal
+        lDistTan_pix = [fFac * x for x in lDistTan]
+        lDistPrism_pix = [fFac * x for x in lDistPrism]
+        if len(lDistPrism_pix) == 4:
+            lDistPrism_pix[1] *= fFac2
+            lDistPrism_pix[3] *= fFac2
+        # endif
+
+        dicLutParams = {
+            "sModel": "opencv",
+            "lSenSizeXY_pix": [iPixCntX, iPixCntY],
+            "lFocLenXY_pix": lFocLenXY_pix,
+            "lImgCtrXY_pix": lImgCtrXY_pix,
+            "lDistRad": lDistRad_pix,
+            "lDistTan": lDistTan_pix,
+            "lDistPrism": lDistPrism_pix,
+            "lDistTilt": lDistTilt,
+        }
     # endif
 
-    fFac = fFac2 = 1.0 / (fPixPerVal * fPixPerVal)
-    lDistRad_pix = lDistRad.copy()
-    iDistCnt = len(lDistRad)
-    iCnt = min(3, iDistCnt)
-    for iIdx in range(iCnt):
-        lDistRad_pix[iIdx] = fFac * lDistRad[iIdx]
-        if iDistCnt == 6:
-            lDistRad_pix[iIdx + 3] = fFac * lDistRad[iIdx + 3]
+    dicLutParams.update({"iLutSupersampling": 1, "iLutBorderPixel": 1})
+
+    def CreateLut() -> CCameraLut:
+        if bFisheye is True:
+            dicLut = model.camera_opencv.create_lookup_fisheye(
+                (iPixCntX, iPixCntY),
+                lFocLenXY_pix,
+                lImgCtrXY_pix,
+                lDistRad,
+                _iLutSupersampling=1,
+                _iLutBorderPixel=1,
+                _bBlenderFormat=True,
+            )
+        else:
+            dicLut = model.camera_opencv.create_lookup(
+                (iPixCntX, iPixCntY),
+                lFocLenXY_pix,
+                lImgCtrXY_pix,
+                lDistRad_pix,
+                _iLutSupersampling=1,
+                _iLutBorderPixel=1,
+                _bBlenderFormat=True,
+                _tDistTan=lDistTan_pix,
+                _tDistPrism=lDistPrism_pix,
+                _tDistTilt=lDistTilt,
+            )
         # endif
-        fFac *= fFac2
-    # endfor
-
-    dicLut = model.camera_opencv.create_lookup(
-        (iPixCntX, iPixCntY), 
-        lFocLenXY_pix, 
-        lImgCtrXY_pix, 
-        lDistRad_pix,
-        _iLutSupersampling=1, 
-        _iLutBorderPixel=1,
-        _bBlenderFormat=True,
-    )
 
-    if dicLut is None:
+        if dicLut is None:
+            return None
+        # endif
+        aRayNorm = dicLut["aRays"]
+
+        xCamLut = CCameraLut()
+        xCamLut.FromArray(
+            _imgLut=aRayNorm,
+            _iLutBorderPixel=1,
+            _iLutSuperSampling=1,
+            _fLutCenterRow=lImgCtrXY_pix[1],
+            _fLutCenterCol=lImgCtrXY_pix[0],
+        )
+        return xCamLut
+
+    # enddef
+
+    # The LUT and its derived properties only depend on the intrinsics,
+    # so they are taken from the on-disk LUT cache, if available.
+    xCamLut = GetLutCache().GetOrCreateCameraLut(dicLutParams, CreateLut)
+
+    if xCamLut is None:
         return {
             "bResult": False,
             "objCam": None,
             "sMsg": "Error creating inverse projection lookup table",
         }
     # endif
-    aRayNorm = dicLut["aRays"]
-    lFov_deg = dicLut["lFov_deg"]
-    lFovRange_deg = dicLut["lFovRange_deg"]
-
-    xCamLut = CCameraLut()
-    xCamLut.FromArray(
-        _imgLut=aRayNorm, 
-        _iLutBorderPixel=1,
-        _iLutSuperSampling=1,
-        _fLutCenterRow=lImgCtrXY_pix[1],
-        _fLutCenterCol=lImgCtrXY_pix[0]
-    )
 
     return CreateCameraLut(
-        _sName, 
-        xCamLut, 
-        bOverwrite=bOverwrite, 
-        bForce=bForce, 
+        _sName,
+        xCamLut,
+        bOverwrite=bOverwrite,
+        bForce=bForce,
         fScale=fScale,
         bCreateFrustum=bCreateFrustum,
         dicAnyCamEx=dicAnyCamEx,
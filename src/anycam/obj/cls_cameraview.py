@@ -26,12 +26,40 @@
 # </LICENSE>
 ###
 
+import os
 import copy
+import json
 import numpy as np
-from typing import Union
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence, Union
 from anybase.cls_anyexcept import CAnyExcept
 
 
+#############################################################################
+class CDepthFramePoints(NamedTuple):
+    pathFile: Path
+    aPoints: np.ndarray
+    aValid: np.ndarray
+
+
+# endclass
+
+
+#############################################################################
+class CCullVolume(NamedTuple):
+    # Half opening angle in degrees of a cone about the optical axis (-Z),
+    # which contains all rays that project into the image.
+    fConeHalfAngle_deg: float
+    # Optional array of shape (K, 4) of planes (nX, nY, nZ, d) in camera frame.
+    # Points inside the viewing volume satisfy n.x + d >= 0 for all planes.
+    aPlanes: Optional[np.ndarray]
+
+
+# endclass
+
+
 class CCameraView:
     """Base class camera view class. Contains general information and abstract base functions for camera model."""
 
@@ -61,6 +89,13 @@ class CCameraView:
         # Origin (X,Y,Z) in world coordinates
         self._lOrig_m: list[float] = [0, 0, 0]
 
+        # Ray directions through the pixel centers per depth type, created on first use.
+        # The dictionary is shared by shallow copies of the view, which only differ in the extrinsics.
+        self._dicPixelRays: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+        # Conservative viewing volume in camera frame, created when the view is initialized
+        self._xCullVolume: CCullVolume = None
+
     # enddef
 
     @property
@@ -171,6 +206,12 @@ class CCameraView:
 
     # enddef
 
+    @property
+    def xCullVolume(self) -> CCullVolume:
+        return self._xCullVolume
+
+    # enddef
+
     #############################################################################
     def GetDataDict(self):
 
@@ -190,6 +231,19 @@ class CCameraView:
 
     # enddef
 
+    #############################################################################
+    def GetIntrinsicsKey(self) -> str:
+        """Get a string that identifies the type and intrinsics of the view, independent of its extrinsics."""
+        dicData = {
+            sKey: xValue
+            for sKey, xValue in self.GetDataDict().items()
+            if sKey not in ("lAxes", "lOrig_m") and not sKey.endswith("/doc")
+        }
+
+        return f"{type(self).__name__}|{json.dumps(dicData, sort_keys=True, default=str)}"
+
+    # enddef
+
     #############################################################################
     def _AdjustFov(self):
         return
@@ -206,6 +260,31 @@ class CCameraView:
 
     # enddef
 
+    #############################################################################
+    def SetExtrinsics(self, *, lAxes: list[list[float]] = None, lOrig_m: list[float] = None):
+        """Set camera axes and origin in world frame, without changing the intrinsics.
+
+        Parameters
+        ----------
+        lAxes : list[list[float]], optional
+            Camera axes X,Y,Z in world frame. If None, the world axes are used.
+        lOrig_m : list[float], optional
+            Camera origin in world coordinates. If None, the world origin is used.
+        """
+        if lAxes is None:
+            self._lAxes = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+        else:
+            self._lAxes = copy.deepcopy(lAxes)
+        # endif
+
+        if lOrig_m is None:
+            self._lOrig_m = [0, 0, 0]
+        else:
+            self._lOrig_m = copy.deepcopy(lOrig_m)
+        # endif
+
+    # enddef
+
     #############################################################################
     def Init(
         self,
@@ -222,6 +301,7 @@ class CCameraView:
 
         self._lPixCnt = copy.deepcopy(lPixCntXY)
         self._fPixSize_um = fPixSize_um
+        self._dicPixelRays = {}
         self._fFovMax_deg = fFovMax_deg
         self._lFov_deg = copy.deepcopy(lFovXY_deg) if lFovXY_deg is not None else None
         self._lFovRange_deg = copy.deepcopy(lFovRangeXY_deg) if lFovRangeXY_deg is not None else None
@@ -311,6 +391,240 @@ class CCameraView:
         self._AdjustAspect()
         self._lPixPerDeg = [self._lPixCnt[i] / self._lFov_deg[i] for i in range(2)]
 
+        self._xCullVolume = self._CreateCullVolume()
+
+    # enddef
+
+    #############################################################################
+    def ProjectToImageArray(
+        self,
+        _aPointsXYZ_m: np.ndarray,
+        *,
+        _aOutPixXY: Optional[np.ndarray] = None,
+        _aOutInFront: Optional[np.ndarray] = None,
+        _aOutInImage: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Project 3D-world points to image.
+
+        Parameters
+        ----------
+        _aPointsXYZ_m : np.ndarray
+            Array of shape (N, 3) with coordinates of 3D-points in world coordinate system.
+            The pixel positions are evaluated with the same floating point type,
+            if the array is of type float32 or float64.
+        _aOutPixXY : Optional[np.ndarray], optional
+            Array of shape (N, 2) the pixel positions are written to.
+        _aOutInFront : Optional[np.ndarray], optional
+            Boolean array of shape (N,) the in-front flags are written to.
+        _aOutInImage : Optional[np.ndarray], optional
+            Boolean array of shape (N,) the in-image flags are written to.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            2D-pixel coordinates (X,Y) in CV-image coordinate system,
+            with origin at top-left of image and x-axis pointing right, y-axis pointing down.
+            Flags whether points are in front of the camera,
+            and flags whether the projections of the points lie in the image.
+        """
+        aPointsXYZ_m = np.asarray(_aPointsXYZ_m)
+        if aPointsXYZ_m.dtype not in (np.float32, np.float64):
+            aPointsXYZ_m = aPointsXYZ_m.astype(np.float64)
+        # endif
+
+        if aPointsXYZ_m.ndim != 2 or aPointsXYZ_m.shape[1] != 3:
+            raise CAnyExcept(f"Points array must be of shape (N, 3), but has shape {aPointsXYZ_m.shape}")
+        # endif
+
+        iPntCnt: int = aPointsXYZ_m.shape[0]
+        aPixXY = self._GetOutArray(_aOutPixXY, (iPntCnt, 2), aPointsXYZ_m.dtype, "_aOutPixXY")
+        aInFront = self._GetOutArray(_aOutInFront, (iPntCnt,), np.dtype(bool), "_aOutInFront")
+        aInImage = self._GetOutArray(_aOutInImage, (iPntCnt,), np.dtype(bool), "_aOutInImage")
+
+        aLocPnts_m = self.PointsToCameraFrame(aPointsXYZ_m)
+        self._ProjectLocalPointsToImageArray(aLocPnts_m, aPixXY, aInFront, aInImage)
+
+        return aPixXY, aInFront, aInImage
+
+    # enddef
+
+    #############################################################################
+    def _GetOutArray(self, _aOut: Optional[np.ndarray], _tShape: tuple, _xDType: np.dtype, _sName: str) -> np.ndarray:
+        if _aOut is None:
+            return np.empty(_tShape, dtype=_xDType)
+        # endif
+
+        if _aOut.shape != _tShape:
+            raise CAnyExcept(f"Output array '{_sName}' must be of shape {_tShape}, but has shape {_aOut.shape}")
+        # endif
+
+        if _aOut.dtype.kind != _xDType.kind:
+            raise CAnyExcept(f"Output array '{_sName}' must be of type {_xDType}, but is of type {_aOut.dtype}")
+        # endif
+
+        return _aOut
+
+    # enddef
+
+    #############################################################################
+    def ProjectFramesToImageArray(
+        self,
+        _aPointsXYZ_m: np.ndarray,
+        *,
+        _aAxes: Optional[np.ndarray] = None,
+        _aOrig_m: Optional[np.ndarray] = None,
+        _aOutPixXY: Optional[np.ndarray] = None,
+        _aOutInFront: Optional[np.ndarray] = None,
+        _aOutInImage: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Project 3D-world points of a number of frames to image, with per frame extrinsics.
+        The points of all frames are transformed to the camera frame with a single einsum
+        and projected with a single evaluation of the camera model.
+
+        Parameters
+        ----------
+        _aPointsXYZ_m : np.ndarray
+            Array of shape (F, N, 3) with coordinates of 3D-points per frame in world coordinate system,
+            or array of shape (N, 3) with points that are used for all frames.
+        _aAxes : Optional[np.ndarray], optional
+            Array of shape (F, 3, 3) with the camera axes X,Y,Z in world frame per frame.
+            If None, the axes of this view are used for all frames.
+        _aOrig_m : Optional[np.ndarray], optional
+            Array of shape (F, 3) with the camera origin in world coordinates per frame.
+            If None, the origin of this view is used for all frames.
+        _aOutPixXY : Optional[np.ndarray], optional
+            Array of shape (F, N, 2) the pixel positions are written to.
+        _aOutInFront : Optional[np.ndarray], optional
+            Boolean array of shape (F, N) the in-front flags are written to.
+        _aOutInImage : Optional[np.ndarray], optional
+            Boolean array of shape (F, N) the in-image flags are written to.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            Pixel positions of shape (F, N, 2) in CV-image coordinate system,
+            in-front flags and in-image flags of shape (F, N).
+        """
+        aPointsXYZ_m = np.asarray(_aPointsXYZ_m)
+        if aPointsXYZ_m.dtype not in (np.float32, np.float64):
+            aPointsXYZ_m = aPointsXYZ_m.astype(np.float64)
+        # endif
+        xDType = aPointsXYZ_m.dtype
+
+        if aPointsXYZ_m.ndim not in (2, 3) or aPointsXYZ_m.shape[-1] != 3:
+            raise CAnyExcept(f"Points array must be of shape (F, N, 3) or (N, 3), but has shape {aPointsXYZ_m.shape}")
+        # endif
+
+        aAxes = self._GetFrameExtrinsics(_aAxes, self._lAxes, (3, 3), xDType, "_aAxes")
+        aOrig_m = self._GetFrameExtrinsics(_aOrig_m, self._lOrig_m, (3,), xDType, "_aOrig_m")
+
+        lFrameCnts = [aAxes.shape[0], aOrig_m.shape[0]]
+        if aPointsXYZ_m.ndim == 3:
+            lFrameCnts.append(aPointsXYZ_m.shape[0])
+        # endif
+        iFrameCnt = max(lFrameCnts)
+        if any(x not in (1, iFrameCnt) for x in lFrameCnts):
+            raise CAnyExcept(f"Inconsistent frame counts of points and extrinsics: {lFrameCnts}")
+        # endif
+
+        iPntCnt: int = aPointsXYZ_m.shape[-2]
+        aPixXY = self._GetOutArray(_aOutPixXY, (iFrameCnt, iPntCnt, 2), xDType, "_aOutPixXY")
+        aInFront = self._GetOutArray(_aOutInFront, (iFrameCnt, iPntCnt), np.dtype(bool), "_aOutInFront")
+        aInImage = self._GetOutArray(_aOutInImage, (iFrameCnt, iPntCnt), np.dtype(bool), "_aOutInImage")
+
+        # Transform points of all frames to the respective camera frame
+        aRelPnts_m = np.empty((iFrameCnt, iPntCnt, 3), dtype=xDType)
+        np.subtract(aPointsXYZ_m, aOrig_m[:, np.newaxis, :], out=aRelPnts_m)
+        aLocPnts_m = np.einsum("fij,fnj->fni", np.broadcast_to(aAxes, (iFrameCnt, 3, 3)), aRelPnts_m)
+        del aRelPnts_m
+
+        # The camera model is evaluated for the points of all frames at once.
+        # Output arrays are passed as flat views, if they are contiguous.
+        aFlatPixXY = aPixXY.reshape(-1, 2)
+        aFlatInFront = aInFront.reshape(-1)
+        aFlatInImage = aInImage.reshape(-1)
+        self._ProjectLocalPointsToImageArray(aLocPnts_m.reshape(-1, 3), aFlatPixXY, aFlatInFront, aFlatInImage)
+
+        for aOut, aFlat in ((aPixXY, aFlatPixXY), (aInFront, aFlatInFront), (aInImage, aFlatInImage)):
+            if not np.shares_memory(aOut, aFlat):
+                aOut[:] = aFlat.reshape(aOut.shape)
+            # endif
+        # endfor
+
+        return aPixXY, aInFront, aInImage
+
+    # enddef
+
+    #############################################################################
+    def _GetFrameExtrinsics(
+        self, _aValue: Optional[np.ndarray], _lDefault: list, _tShape: tuple, _xDType: np.dtype, _sName: str
+    ) -> np.ndarray:
+        if _aValue is None:
+            return np.array(_lDefault, dtype=_xDType).reshape((1,) + _tShape)
+        # endif
+
+        aValue = np.asarray(_aValue, dtype=_xDType)
+        if aValue.shape == _tShape:
+            aValue = aValue[np.newaxis]
+        # endif
+
+        if aValue.ndim != len(_tShape) + 1 or aValue.shape[1:] != _tShape:
+            raise CAnyExcept(f"Argument '{_sName}' must be of shape (F, {', '.join(str(x) for x in _tShape)})")
+        # endif
+
+        return aValue
+
+    # enddef
+
+    #############################################################################
+    def _ProjectLocalPointsToImageArray(
+        self, _aLocPnts_m: np.ndarray, _aPixXY: np.ndarray, _aInFront: np.ndarray, _aInImage: np.ndarray
+    ):
+        # Implemented by camera types, that support projection.
+        # Projects points given in the camera frame and writes the results into the given output arrays.
+        raise CAnyExcept(f"Projection to image not implemented for camera view type '{type(self).__name__}'")
+
+    # enddef
+
+    #############################################################################
+    def ProjectToImage(self, _lPointsXYZ_m: Union[list[list[float]], np.ndarray], *, _bDetailedFlags: bool = False):
+        """Project 3D-world point to image.
+        This is a list based wrapper of ProjectToImageArray().
+
+        Parameters
+        ----------
+        _lPointsXYZ_m : list[list[float]]
+            Coordinates of 3D-points in world coordinate system.
+
+        Returns
+        -------
+        list[list[float]]
+            2D-pixel coordinates (X,Y) in CV-image coordinate system,
+            with origin at top-left of image and x-axis pointing right,
+            y-axis pointing down.
+        """
+        aPixXY, aInFront, aInImage = self.ProjectToImageArray(np.asarray(_lPointsXYZ_m, dtype=np.float64))
+
+        if _bDetailedFlags is True:
+            return aPixXY.tolist(), aInFront.tolist(), aInImage.tolist()
+        else:
+            return aPixXY.tolist(), aInImage.tolist()
+        # endif
+
+    # enddef
+
+    #############################################################################
+    def _EvalInImage(self, _aPixXY: np.ndarray, _aInFront: np.ndarray, _aInImage: np.ndarray):
+        # Flag whether projection of points in front of the camera is in image.
+        # Pixel positions are rounded to the nearest pixel corner.
+        aPixInt = np.empty(_aPixXY.shape[0], dtype=_aPixXY.dtype)
+        np.copyto(_aInImage, _aInFront)
+        for iAxis, iPixCnt in enumerate((self.iPixCntX, self.iPixCntY)):
+            np.round(_aPixXY[:, iAxis], out=aPixInt)
+            _aInImage &= aPixInt < iPixCnt
+            _aInImage &= aPixInt >= 0.0
+        # endfor
+
     # enddef
 
     #############################################################################
@@ -335,12 +649,677 @@ class CCameraView:
             raise RuntimeError("Points argument is of invalid type")
         # endif
 
-        aMatrix = np.array(self._lAxes).transpose()
-        aOrig_m = np.array(self._lOrig_m)
+        # Evaluate in the floating point type of the points, if given as float32 array
+        xDType = aPointsXYZ_m.dtype if aPointsXYZ_m.dtype == np.float32 else np.float64
+        aMatrix = np.array(self._lAxes, dtype=xDType).transpose()
+        aOrig_m = np.array(self._lOrig_m, dtype=xDType)
 
         return (aPointsXYZ_m - aOrig_m) @ aMatrix
 
     # enddef
 
+    #############################################################################
+    def _CreateCullVolume(self) -> CCullVolume:
+        # Cone about the optical axis from the maximal ray angle,
+        # widened by the angle of one pixel to contain the whole image border.
+        fPixAngle_deg = 1.0 / min(self._lPixPerDeg)
+        return CCullVolume(fConeHalfAngle_deg=min(180.0, self._fFovMax_deg / 2.0 + fPixAngle_deg), aPlanes=None)
+
+    # enddef
+
+    #############################################################################
+    def _CullWorldVolume(
+        self, _aCtrDirs_m: np.ndarray, _aRadii_m: np.ndarray, _aHalfSize_m: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        # The centers are given relative to the camera origin in world frame. The viewing volume is
+        # transformed to world frame instead of the centers, which is cheaper for large counts.
+        aAxes = np.array(self._lAxes, dtype=np.float64)
+        aVisible = np.ones(_aCtrDirs_m.shape[0], dtype=bool)
+
+        fConeHalfAngle_deg: float = self._xCullVolume.fConeHalfAngle_deg
+        if fConeHalfAngle_deg < 180.0:
+            # A sphere intersects the cone, if the angle between its center and the optical axis
+            # is at most the cone angle plus the angle the sphere subtends.
+            aDist_m = np.sqrt(np.einsum("ij,ij->i", _aCtrDirs_m, _aCtrDirs_m))
+            aDistSafe_m = np.maximum(aDist_m, 1e-12)
+            aAngle_rad = np.arccos(np.clip(-(_aCtrDirs_m @ aAxes[2]) / aDistSafe_m, -1.0, 1.0))
+            aAngle_rad -= np.arcsin(np.clip(_aRadii_m / aDistSafe_m, 0.0, 1.0))
+
+            np.less_equal(aAngle_rad, np.radians(fConeHalfAngle_deg), out=aVisible)
+            aVisible |= aDist_m <= _aRadii_m
+        # endif
+
+        aPlanes = self._xCullVolume.aPlanes
+        if aPlanes is not None:
+            aNormals = aPlanes[:, 0:3] @ aAxes
+            for aNormal, fOffset in zip(aNormals, aPlanes[:, 3]):
+                aPlaneDist_m = _aCtrDirs_m @ aNormal
+                if _aHalfSize_m is None:
+                    aPlaneDist_m += _aRadii_m
+                else:
+                    # Distance of the box corner furthest along the plane normal
+                    aPlaneDist_m += _aHalfSize_m @ np.abs(aNormal)
+                # endif
+                aPlaneDist_m += fOffset
+                aVisible &= aPlaneDist_m >= 0.0
+            # endfor
+        # endif
+
+        return aVisible
+
+    # enddef
+
+    #############################################################################
+    def CullSpheres(
+        self, _aCenters_m: np.ndarray, _aRadii_m: Union[float, np.ndarray], *, _fMargin_m: float = 0.0
+    ) -> np.ndarray:
+        """Conservative test, which spheres may be visible in the camera view.
+        Spheres that are rejected are certainly outside the view, so that only the
+        remaining ones need to be projected exactly.
+
+        Parameters
+        ----------
+        _aCenters_m : np.ndarray
+            Array of shape (N, 3) of sphere centers in world coordinate system.
+        _aRadii_m : Union[float, np.ndarray]
+            Radius of all spheres, or array of shape (N,) of radii.
+        _fMargin_m : float, optional
+            Margin the radii are expanded by.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of shape (N,), which is False for spheres outside the viewing volume.
+        """
+        aCenters_m = np.asarray(_aCenters_m, dtype=np.float64)
+        if aCenters_m.ndim != 2 or aCenters_m.shape[1] != 3:
+            raise CAnyExcept(f"Sphere centers must be of shape (N, 3), but have shape {aCenters_m.shape}")
+        # endif
+
+        aRadii_m = np.broadcast_to(np.asarray(_aRadii_m, dtype=np.float64), (aCenters_m.shape[0],)) + _fMargin_m
+
+        return self._CullWorldVolume(aCenters_m - np.array(self._lOrig_m, dtype=np.float64), aRadii_m)
+
+    # enddef
+
+    #############################################################################
+    def CullAABBs(self, _aMin_m: np.ndarray, _aMax_m: np.ndarray, *, _fMargin_m: float = 0.0) -> np.ndarray:
+        """Conservative test, which axis aligned bounding boxes may be visible in the camera view.
+        Boxes are tested against the view cone with their bounding spheres
+        and exactly against the viewing volume planes, if the view has any.
+
+        Parameters
+        ----------
+        _aMin_m : np.ndarray
+            Array of shape (N, 3) of minimal box corners in world coordinate system.
+        _aMax_m : np.ndarray
+            Array of shape (N, 3) of maximal box corners in world coordinate system.
+        _fMargin_m : float, optional
+            Margin the boxes are expanded by on each side.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of shape (N,), which is False for boxes outside the viewing volume.
+        """
+        aMin_m = np.asarray(_aMin_m, dtype=np.float64)
+        aMax_m = np.asarray(_aMax_m, dtype=np.float64)
+        if aMin_m.ndim != 2 or aMin_m.shape[1] != 3 or aMin_m.shape != aMax_m.shape:
+            raise CAnyExcept(
+                f"Box corners must both be of shape (N, 3), but have shapes {aMin_m.shape} and {aMax_m.shape}"
+            )
+        # endif
+
+        aCtrDirs_m = aMin_m + aMax_m
+        aCtrDirs_m *= 0.5
+        aCtrDirs_m -= np.array(self._lOrig_m, dtype=np.float64)
+
+        aHalfSize_m = aMax_m - aMin_m
+        np.abs(aHalfSize_m, out=aHalfSize_m)
+        aHalfSize_m *= 0.5
+        aHalfSize_m += _fMargin_m
+
+        aRadii_m = np.sqrt(np.einsum("ij,ij->i", aHalfSize_m, aHalfSize_m))
+
+        return self._CullWorldVolume(aCtrDirs_m, aRadii_m, aHalfSize_m)
+
+    # enddef
+
+    #############################################################################
+    def UnprojectPixels(self, _aPixXY: np.ndarray, *, _bWorldFrame: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """Map image positions to normalized ray directions. This is the inverse of ProjectToImageArray().
+
+        Parameters
+        ----------
+        _aPixXY : np.ndarray
+            Array of shape (N, 2) of pixel positions (X,Y) in CV-image coordinate system,
+            with origin at top-left of image and x-axis pointing right, y-axis pointing down.
+            The center of the top-left pixel is at (0.5, 0.5).
+        _bWorldFrame : bool, optional
+            If True, the ray directions are returned in the world frame, otherwise in the camera frame.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Array of shape (N, 3) of normalized ray directions
+            and (N,) bool array of flags, whether the ray direction is valid.
+        """
+        aPixXY = np.asarray(_aPixXY, dtype=np.float64)
+        if aPixXY.ndim != 2 or aPixXY.shape[1] != 2:
+            raise CAnyExcept(f"Pixel array must be of shape (N, 2), but has shape {aPixXY.shape}")
+        # endif
+
+        aRayDirs, aValid = self._UnprojectPixelsLocal(aPixXY)
+
+        if _bWorldFrame is True:
+            aRayDirs = aRayDirs @ np.array(self._lAxes, dtype=aRayDirs.dtype)
+        # endif
+
+        return aRayDirs, aValid
+
+    # enddef
+
+    #############################################################################
+    def _UnprojectPixelsLocal(self, _aPixXY: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Implemented by camera types, that support unprojection.
+        # Returns normalized ray directions in the camera frame and their valid flags.
+        raise CAnyExcept(f"Unprojection of pixels not implemented for camera view type '{type(self).__name__}'")
+
+    # enddef
+
+    #############################################################################
+    def _CreatePixelRayDirs(self) -> tuple[np.ndarray, np.ndarray]:
+        # Normalized ray directions in the camera frame through all pixel centers,
+        # with rows from top to bottom. Can be overwritten by camera types,
+        # whose camera model already provides the ray directions per pixel.
+        aGridX, aGridY = np.meshgrid(np.arange(self.iPixCntX) + 0.5, np.arange(self.iPixCntY) + 0.5)
+        aPixXY = np.stack((aGridX.ravel(), aGridY.ravel()), axis=1)
+        aRayDirs, aValid = self._UnprojectPixelsLocal(aPixXY)
+
+        return aRayDirs.reshape(self.iPixCntY, self.iPixCntX, 3), aValid.reshape(self.iPixCntY, self.iPixCntX)
+
+    # enddef
+
+    #############################################################################
+    def GetPixelRayDirs(self, *, _sDepthType: str = "distance") -> tuple[np.ndarray, np.ndarray]:
+        """Get the float32 ray directions in the camera frame through all pixel centers.
+        The rays are created once per view and depth type and shared by copies of the view.
+
+        Parameters
+        ----------
+        _sDepthType : str, optional
+            "distance": the ray directions are normalized, so that a point is the ray direction times
+                        the distance from the camera origin.
+            "z": the ray directions are scaled to a z-component of -1, so that a point is the ray direction
+                 times the depth along the optical axis.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Array of shape (rows, columns, 3) of ray directions per pixel, with rows from top to bottom,
+            and bool array of shape (rows, columns), whether the ray direction is valid.
+            Invalid ray directions are zero.
+        """
+        if _sDepthType not in ("distance", "z"):
+            raise CAnyExcept(f"Unsupported depth type '{_sDepthType}'. Expect 'distance' or 'z'")
+        # endif
+
+        tRays = self._dicPixelRays.get(_sDepthType)
+        if tRays is not None:
+            return tRays
+        # endif
+
+        if _sDepthType == "distance":
+            aRayDirs, aValid = self._CreatePixelRayDirs()
+            aRayDirs = aRayDirs.astype(np.float32)
+            aValid = aValid.copy()
+        else:
+            aRayDirsNorm, aValidNorm = self.GetPixelRayDirs(_sDepthType="distance")
+            aValid = aValidNorm & (aRayDirsNorm[:, :, 2] < -1e-6)
+            aScale = np.zeros(aValid.shape, dtype=np.float32)
+            np.divide(-1.0, aRayDirsNorm[:, :, 2], out=aScale, where=aValid)
+            aRayDirs = aRayDirsNorm * aScale[:, :, np.newaxis]
+        # endif
+        aRayDirs[~aValid] = 0.0
+
+        self._dicPixelRays[_sDepthType] = (aRayDirs, aValid)
+
+        return aRayDirs, aValid
+
+    # enddef
+
+    #############################################################################
+    def DepthToPoints(
+        self,
+        _imgDepth: np.ndarray,
+        *,
+        _sDepthType: str = "distance",
+        _bWorldFrame: bool = True,
+        _aOutPoints: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Convert a depth image of this camera to 3D-points.
+
+        Parameters
+        ----------
+        _imgDepth : np.ndarray
+            Depth image of shape (rows, columns). For images with more channels, the first channel is used.
+        _sDepthType : str, optional
+            "distance", if the depth values are distances from the camera origin along the rays,
+            or "z", if the depth values are distances along the optical axis.
+        _bWorldFrame : bool, optional
+            If True, the points are returned in the world frame, otherwise in the camera frame.
+        _aOutPoints : Optional[np.ndarray], optional
+            Array of shape (rows, columns, 3) the points are written to.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Array of shape (rows, columns, 3) of points and bool array of shape (rows, columns),
+            whether the point is valid. Points are invalid, if the pixel has no valid ray direction,
+            or the depth value is not finite or not positive.
+        """
+        imgDepth = np.asarray(_imgDepth)
+        if imgDepth.ndim == 3:
+            imgDepth = imgDepth[:, :, 0]
+        # endif
+
+        tShape = (self.iPixCntY, self.iPixCntX)
+        if imgDepth.shape != tShape:
+            raise CAnyExcept(f"Depth image must be of shape {tShape}, but has shape {imgDepth.shape}")
+        # endif
+
+        aRayDirs, aRayValid = self.GetPixelRayDirs(_sDepthType=_sDepthType)
+        if _bWorldFrame is True:
+            aRayDirs = aRayDirs @ np.array(self._lAxes, dtype=np.float32)
+        # endif
+
+        xDType = np.result_type(aRayDirs.dtype, imgDepth.dtype)
+        if xDType.kind != "f":
+            xDType = np.dtype(np.float32)
+        # endif
+        aPoints = self._GetOutArray(_aOutPoints, tShape + (3,), xDType, "_aOutPoints")
+
+        np.multiply(aRayDirs, imgDepth[:, :, np.newaxis], out=aPoints, casting="same_kind")
+        if _bWorldFrame is True:
+            aPoints += np.array(self._lOrig_m, dtype=aPoints.dtype)
+        # endif
+
+        aValid = np.isfinite(imgDepth)
+        aValid &= aRayValid
+        aValid &= imgDepth > 0.0
+
+        return aPoints, aValid
+
+    # enddef
+
+    #############################################################################
+    def IterDepthFilesToPoints(
+        self,
+        _xFiles: Union[str, Path, Iterable[Union[str, Path]]],
+        *,
+        _sFilePattern: str = "*.exr",
+        _sDepthType: str = "distance",
+        _bWorldFrame: bool = True,
+        _iThreadCnt: Optional[int] = None,
+        _iMaxPendingCnt: Optional[int] = None,
+    ) -> Iterator[CDepthFramePoints]:
+        """Convert depth image files of this camera to 3D-points, using a pool of threads
+        that load and convert the files, while the results are consumed.
+
+        Parameters
+        ----------
+        _xFiles : Union[str, Path, Iterable[Union[str, Path]]]
+            A folder, whose files matching the file pattern are converted in sorted order,
+            a single file, or an iterable of files.
+        _sFilePattern : str, optional
+            Glob pattern of the depth files in a folder.
+        _sDepthType : str, optional
+            The depth type, see DepthToPoints().
+        _bWorldFrame : bool, optional
+            If True, the points are returned in the world frame, otherwise in the camera frame.
+        _iThreadCnt : Optional[int], optional
+            Number of threads. Defaults to the number of CPUs, but at most 8.
+        _iMaxPendingCnt : Optional[int], optional
+            Maximal number of files that are loaded or converted ahead of the consumer,
+            which limits the memory used. Defaults to twice the number of threads.
+
+        Yields
+        ------
+        CDepthFramePoints
+            The depth file, the points and their valid flags, in the order of the files.
+        """
+        if isinstance(_xFiles, (str, Path)):
+            pathFiles = Path(_xFiles)
+            if pathFiles.is_dir():
+                lFiles = sorted(pathFiles.glob(_sFilePattern))
+            else:
+                lFiles = [pathFiles]
+            # endif
+        else:
+            lFiles = [Path(x) for x in _xFiles]
+        # endif
+
+        # Create the rays before starting the threads, so that they are created only once
+        self.GetPixelRayDirs(_sDepthType=_sDepthType)
+
+        iThreadCnt = _iThreadCnt if _iThreadCnt is not None else min(8, os.cpu_count() or 1)
+        iThreadCnt = max(1, iThreadCnt)
+        iMaxPendingCnt = max(1, _iMaxPendingCnt if _iMaxPendingCnt is not None else 2 * iThreadCnt)
+
+        def Convert(_pathFile: Path) -> CDepthFramePoints:
+            imgDepth = LoadDepthImage(_pathFile)
+            aPoints, aValid = self.DepthToPoints(imgDepth, _sDepthType=_sDepthType, _bWorldFrame=_bWorldFrame)
+            return CDepthFramePoints(_pathFile, aPoints, aValid)
+
+        # enddef
+
+        with ThreadPoolExecutor(max_workers=iThreadCnt) as xPool:
+            dqPending = deque()
+            try:
+                for pathFile in lFiles:
+                    dqPending.append(xPool.submit(Convert, pathFile))
+                    if len(dqPending) >= iMaxPendingCnt:
+                        yield dqPending.popleft().result()
+                    # endif
+                # endfor
+
+                while len(dqPending) > 0:
+                    yield dqPending.popleft().result()
+                # endwhile
+            finally:
+                # Do not convert the remaining files, if the consumer stops early
+                for xFuture in dqPending:
+                    xFuture.cancel()
+                # endfor
+            # endtry
+        # endwith
+
+    # enddef
+
+
+# enddef
+
+
+#############################################################################
+def LoadDepthImage(_xFilePath: Union[str, Path]) -> np.ndarray:
+    """Load a depth image from an OpenEXR or other image file, or from a numpy '.npy' file.
+    For color images the red channel is returned.
+
+    Parameters
+    ----------
+    _xFilePath : Union[str, Path]
+        The depth image file.
+
+    Returns
+    -------
+    np.ndarray
+        The depth image of shape (rows, columns).
+    """
+    pathFile = Path(_xFilePath)
+
+    if pathFile.suffix == ".npy":
+        imgDepth = np.load(pathFile)
+    else:
+        # need to enable OpenExr explicitly
+        os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
+        import cv2
+
+        imgDepth = cv2.imread(pathFile.as_posix(), cv2.IMREAD_ANYCOLOR | cv2.IMREAD_ANYDEPTH | cv2.IMREAD_UNCHANGED)
+        if imgDepth is None:
+            raise CAnyExcept(f"Depth image could not be loaded: {pathFile.as_posix()}")
+        # endif
+
+        # cv2 stores the color channels in BGR(A) order
+        if imgDepth.ndim == 3 and imgDepth.shape[2] >= 3:
+            imgDepth = imgDepth[:, :, 2]
+        # endif
+    # endif
+
+    if imgDepth.ndim == 3:
+        imgDepth = imgDepth[:, :, 0]
+    # endif
+
+    return imgDepth
+
+
+# enddef
+
+
+#############################################################################
+# Default memory budget for the evaluation of a chunk of frames of a single camera
+g_iCameraSetChunkSize_bytes: int = 256 * 1024 * 1024
+
+
+#############################################################################
+class CCameraSetProjection(NamedTuple):
+    iCameraIdx: int
+    iFrameStart: int
+    aPixXY: np.ndarray
+    aInFront: np.ndarray
+    aInImage: np.ndarray
+
+
+# endclass
+
+
+#############################################################################
+def _GetFrameCount(_xValue: Optional[np.ndarray], _iFrameDim: int) -> int:
+    if _xValue is None or np.ndim(_xValue) < _iFrameDim:
+        return 1
+    # endif
+    return np.shape(_xValue)[0]
+
+
+# enddef
+
+
+#############################################################################
+def _GetFrameSlice(_xValue: Optional[np.ndarray], _iFrameDim: int, _iFrameStart: int, _iFrameEnd: int):
+    if _xValue is None or np.ndim(_xValue) < _iFrameDim or np.shape(_xValue)[0] == 1:
+        return _xValue
+    # endif
+    return np.asarray(_xValue)[_iFrameStart:_iFrameEnd]
+
+
+# enddef
+
+
+#############################################################################
+def _GetCameraSetFrames(
+    _lViews: Sequence[CCameraView],
+    _aPointsXYZ_m: np.ndarray,
+    _lAxes: Optional[Sequence[np.ndarray]],
+    _lOrig_m: Optional[Sequence[np.ndarray]],
+    _iMaxChunkSize_bytes: int,
+) -> tuple[np.ndarray, int, int]:
+    # Returns the points array, the total number of frames and the number of frames per chunk.
+    aPointsXYZ_m = np.asarray(_aPointsXYZ_m)
+    if aPointsXYZ_m.dtype not in (np.float32, np.float64):
+        aPointsXYZ_m = aPointsXYZ_m.astype(np.float64)
+    # endif
+
+    if aPointsXYZ_m.ndim not in (2, 3) or aPointsXYZ_m.shape[-1] != 3:
+        raise CAnyExcept(f"Points array must be of shape (F, N, 3) or (N, 3), but has shape {aPointsXYZ_m.shape}")
+    # endif
+
+    iCamCnt = len(_lViews)
+    for sName, lValues in (("_lAxes", _lAxes), ("_lOrig_m", _lOrig_m)):
+        if lValues is not None and len(lValues) != iCamCnt:
+            raise CAnyExcept(f"Argument '{sName}' must have an element per camera view")
+        # endif
+    # endfor
+
+    lFrameCnts = [_GetFrameCount(aPointsXYZ_m, 3)]
+    for iCamIdx in range(iCamCnt):
+        if _lAxes is not None:
+            lFrameCnts.append(_GetFrameCount(_lAxes[iCamIdx], 3))
+        # endif
+        if _lOrig_m is not None:
+            lFrameCnts.append(_GetFrameCount(_lOrig_m[iCamIdx], 2))
+        # endif
+    # endfor
+
+    iFrameCnt = max(lFrameCnts)
+    if any(x not in (1, iFrameCnt) for x in lFrameCnts):
+        raise CAnyExcept(f"Inconsistent frame counts of points and extrinsics: {sorted(set(lFrameCnts))}")
+    # endif
+
+    # Approximate memory per frame: points relative to camera and in camera frame,
+    # pixel positions, temporaries of the camera models and flags.
+    iPntCnt = aPointsXYZ_m.shape[-2]
+    iFrameSize_bytes = max(1, iPntCnt * (16 * aPointsXYZ_m.itemsize + 2))
+    iChunkFrameCnt = max(1, min(iFrameCnt, _iMaxChunkSize_bytes // iFrameSize_bytes))
+
+    return aPointsXYZ_m, iFrameCnt, iChunkFrameCnt
+
+
+# enddef
+
+
+#############################################################################
+def _IterCameraSetChunks(
+    _iCamCnt: int,
+    _aPointsXYZ_m: np.ndarray,
+    _lAxes: Optional[Sequence[np.ndarray]],
+    _lOrig_m: Optional[Sequence[np.ndarray]],
+    _iFrameCnt: int,
+    _iChunkFrameCnt: int,
+):
+    # Yields camera index, frame range, points and extrinsics of each chunk
+    for iCamIdx in range(_iCamCnt):
+        xAxes = None if _lAxes is None else _lAxes[iCamIdx]
+        xOrig_m = None if _lOrig_m is None else _lOrig_m[iCamIdx]
+
+        for iFrameStart in range(0, _iFrameCnt, _iChunkFrameCnt):
+            iFrameEnd = min(_iFrameCnt, iFrameStart + _iChunkFrameCnt)
+
+            # Frame independent points are broadcast to the frames of the chunk
+            aPoints_m = _GetFrameSlice(_aPointsXYZ_m, 3, iFrameStart, iFrameEnd)
+            if aPoints_m.ndim == 2:
+                aPoints_m = np.broadcast_to(aPoints_m, (iFrameEnd - iFrameStart,) + aPoints_m.shape)
+            # endif
+
+            aAxes = _GetFrameSlice(xAxes, 3, iFrameStart, iFrameEnd)
+            aOrig_m = _GetFrameSlice(xOrig_m, 2, iFrameStart, iFrameEnd)
+
+            yield iCamIdx, iFrameStart, iFrameEnd, aPoints_m, aAxes, aOrig_m
+        # endfor
+    # endfor
+
+
+# enddef
+
+
+#############################################################################
+def IterProjectToCameraSet(
+    _lViews: Sequence[CCameraView],
+    _aPointsXYZ_m: np.ndarray,
+    *,
+    _lAxes: Optional[Sequence[np.ndarray]] = None,
+    _lOrig_m: Optional[Sequence[np.ndarray]] = None,
+    _iMaxChunkSize_bytes: int = g_iCameraSetChunkSize_bytes,
+) -> Iterator[CCameraSetProjection]:
+    """Project 3D-world points of a number of frames into a set of cameras, chunk by chunk.
+    Each chunk contains the projections of consecutive frames into a single camera,
+    and is sized, so that its evaluation stays approximately within the given memory budget.
+
+    Parameters
+    ----------
+    _lViews : Sequence[CCameraView]
+        The M camera views.
+    _aPointsXYZ_m : np.ndarray
+        Array of shape (F, N, 3) with coordinates of 3D-points per frame in world coordinate system,
+        or array of shape (N, 3) with points that are used for all frames.
+    _lAxes : Optional[Sequence[np.ndarray]], optional
+        Camera axes per camera view, each of shape (F, 3, 3) or (3, 3).
+        If None, the axes of the camera views are used.
+    _lOrig_m : Optional[Sequence[np.ndarray]], optional
+        Camera origins per camera view, each of shape (F, 3) or (3,).
+        If None, the origins of the camera views are used.
+    _iMaxChunkSize_bytes : int, optional
+        Approximate memory budget for the evaluation of a chunk.
+
+    Yields
+    ------
+    CCameraSetProjection
+        Camera index, index of first frame of chunk, pixel positions of shape (Fc, N, 2),
+        in-front flags and in-image flags of shape (Fc, N).
+    """
+    aPointsXYZ_m, iFrameCnt, iChunkFrameCnt = _GetCameraSetFrames(
+        _lViews, _aPointsXYZ_m, _lAxes, _lOrig_m, _iMaxChunkSize_bytes
+    )
+
+    for iCamIdx, iFrameStart, iFrameEnd, aPoints_m, aAxes, aOrig_m in _IterCameraSetChunks(
+        len(_lViews), aPointsXYZ_m, _lAxes, _lOrig_m, iFrameCnt, iChunkFrameCnt
+    ):
+        aPixXY, aInFront, aInImage = _lViews[iCamIdx].ProjectFramesToImageArray(
+            aPoints_m, _aAxes=aAxes, _aOrig_m=aOrig_m
+        )
+        yield CCameraSetProjection(iCamIdx, iFrameStart, aPixXY, aInFront, aInImage)
+    # endfor
+
+
+# enddef
+
+
+#############################################################################
+def ProjectToCameraSet(
+    _lViews: Sequence[CCameraView],
+    _aPointsXYZ_m: np.ndarray,
+    *,
+    _lAxes: Optional[Sequence[np.ndarray]] = None,
+    _lOrig_m: Optional[Sequence[np.ndarray]] = None,
+    _iMaxChunkSize_bytes: int = g_iCameraSetChunkSize_bytes,
+    _aOutPixXY: Optional[np.ndarray] = None,
+    _aOutInFront: Optional[np.ndarray] = None,
+    _aOutInImage: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Project 3D-world points of a number of frames into a set of cameras.
+    See IterProjectToCameraSet() for a description of the arguments.
+    The projections are evaluated chunk by chunk, directly into the output arrays.
+    To limit the memory used by the results, e.g. memory mapped arrays can be passed as output arrays.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        Pixel positions of shape (M, F, N, 2) in CV-image coordinate system,
+        in-front flags and in-image flags of shape (M, F, N).
+    """
+    aPointsXYZ_m, iFrameCnt, iChunkFrameCnt = _GetCameraSetFrames(
+        _lViews, _aPointsXYZ_m, _lAxes, _lOrig_m, _iMaxChunkSize_bytes
+    )
+
+    iCamCnt = len(_lViews)
+    iPntCnt = aPointsXYZ_m.shape[-2]
+    lOut = []
+    for aOut, tShape, xDType, sName in (
+        (_aOutPixXY, (iCamCnt, iFrameCnt, iPntCnt, 2), aPointsXYZ_m.dtype, "_aOutPixXY"),
+        (_aOutInFront, (iCamCnt, iFrameCnt, iPntCnt), np.dtype(bool), "_aOutInFront"),
+        (_aOutInImage, (iCamCnt, iFrameCnt, iPntCnt), np.dtype(bool), "_aOutInImage"),
+    ):
+        if aOut is None:
+            aOut = np.empty(tShape, dtype=xDType)
+        elif aOut.shape != tShape or aOut.dtype.kind != xDType.kind:
+            raise CAnyExcept(f"Output array '{sName}' must be of shape {tShape} and type {xDType}")
+        # endif
+        lOut.append(aOut)
+    # endfor
+    aPixXY, aInFront, aInImage = lOut
+
+    for iCamIdx, iFrameStart, iFrameEnd, aPoints_m, aAxes, aOrig_m in _IterCameraSetChunks(
+        iCamCnt, aPointsXYZ_m, _lAxes, _lOrig_m, iFrameCnt, iChunkFrameCnt
+    ):
+        _lViews[iCamIdx].ProjectFramesToImageArray(
+            aPoints_m,
+            _aAxes=aAxes,
+            _aOrig_m=aOrig_m,
+            _aOutPixXY=aPixXY[iCamIdx, iFrameStart:iFrameEnd],
+            _aOutInFront=aInFront[iCamIdx, iFrameStart:iFrameEnd],
+            _aOutInImage=aInImage[iCamIdx, iFrameStart:iFrameEnd],
+        )
+    # endfor
+
+    return aPixXY, aInFront, aInImage
+
 
 # enddef
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \obj\cls_cameraview_cache.py
+# Created Date: Friday, October 16th 2026, 2:21:05 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import copy
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from .cls_cameraview import CCameraView
+
+
+# AnyCam elements that describe the camera extrinsics. They are not part of the cache key,
+# as they are set on the cached view instead.
+g_tExtrinsicKeys: tuple[str, ...] = ("lAxes", "lOrigin")
+
+
+#############################################################################
+class CCameraViewCacheEntry(NamedTuple):
+    sKey: str
+    sImageName: Optional[str]
+    xView: CCameraView
+
+
+# endclass
+
+
+#############################################################################
+class CCameraViewCache:
+    """Cache of camera views per camera object, with least recently used eviction.
+
+    A cached view is reused as long as the AnyCam data of the camera, apart from the
+    extrinsics, and the identity of the Blender LUT image, if any, are unchanged.
+    Views are returned as shallow copies with the requested extrinsics set,
+    so that the intrinsic model data, e.g. a camera LUT, is shared between the copies.
+    """
+
+    #############################################################################
+    def __init__(self, *, iMaxViewCnt: int = 32):
+        self._iMaxViewCnt: int = max(1, iMaxViewCnt)
+        self._dicEntries: OrderedDict[str, CCameraViewCacheEntry] = OrderedDict()
+
+    # enddef
+
+    #############################################################################
+    @property
+    def iMaxViewCnt(self) -> int:
+        return self._iMaxViewCnt
+
+    # enddef
+
+    @property
+    def iViewCnt(self) -> int:
+        return len(self._dicEntries)
+
+    # enddef
+
+    #############################################################################
+    @staticmethod
+    def GetLutImageName(_dicAnyCam: dict) -> Optional[str]:
+        dicEx = _dicAnyCam.get("mEx")
+        if not isinstance(dicEx, dict):
+            return None
+        # endif
+
+        dicLutData = dicEx.get("mLutData")
+        if not isinstance(dicLutData, dict):
+            return None
+        # endif
+
+        return dicLutData.get("sImageName")
+
+    # enddef
+
+    #############################################################################
+    @staticmethod
+    def CreateKey(_dicAnyCam: dict) -> str:
+        """Create the cache key from the AnyCam data without extrinsics
+        and the identity of the Blender LUT image, if any."""
+
+        dicIntrinsics = {sKey: xValue for sKey, xValue in _dicAnyCam.items() if sKey not in g_tExtrinsicKeys}
+        sData = json.dumps(dicIntrinsics, sort_keys=True, default=str)
+
+        sImageName = CCameraViewCache.GetLutImageName(_dicAnyCam)
+        if sImageName is not None:
+            try:
+                import bpy
+
+                imgLut = bpy.data.images.get(sImageName)
+                if imgLut is not None:
+                    sData += f"|{sImageName}|{imgLut.as_pointer()}|{tuple(imgLut.size)}|{imgLut.filepath}"
+                # endif
+            except ImportError:
+                pass
+            # endtry
+        # endif
+
+        return hashlib.sha1(sData.encode("utf-8")).hexdigest()
+
+    # enddef
+
+    #############################################################################
+    def GetView(
+        self, _sCamName: str, _dicAnyCam: dict, _funcCreate: Callable[[dict], Optional[CCameraView]]
+    ) -> Optional[CCameraView]:
+        """Get camera view from cache or create it.
+
+        Parameters
+        ----------
+        _sCamName : str
+            Name of the camera object.
+        _dicAnyCam : dict
+            The AnyCam data of the camera, including extrinsics 'lAxes' and 'lOrigin', if available.
+        _funcCreate : Callable[[dict], Optional[CCameraView]]
+            Function that creates the camera view from the AnyCam data, if it is not cached.
+
+        Returns
+        -------
+        Optional[CCameraView]
+            A shallow copy of the cached view with the extrinsics of the given AnyCam data,
+            or None, if the view could not be created.
+        """
+        sKey = CCameraViewCache.CreateKey(_dicAnyCam)
+
+        xEntry = self._dicEntries.get(_sCamName)
+        if xEntry is not None and xEntry.sKey == sKey:
+            self._dicEntries.move_to_end(_sCamName)
+        else:
+            xView = _funcCreate(_dicAnyCam)
+            if xView is None:
+                self._dicEntries.pop(_sCamName, None)
+                return None
+            # endif
+
+            xEntry = CCameraViewCacheEntry(
+                sKey=sKey, sImageName=CCameraViewCache.GetLutImageName(_dicAnyCam), xView=xView
+            )
+            self._dicEntries[_sCamName] = xEntry
+            self._dicEntries.move_to_end(_sCamName)
+
+            while len(self._dicEntries) > self._iMaxViewCnt:
+                self._dicEntries.popitem(last=False)
+            # endwhile
+        # endif
+
+        xView = copy.copy(xEntry.xView)
+        xView.SetExtrinsics(lAxes=_dicAnyCam.get("lAxes"), lOrig_m=_dicAnyCam.get("lOrigin"))
+
+        return xView
+
+    # enddef
+
+    #############################################################################
+    def InvalidateCamera(self, _sCamName: str):
+        self._dicEntries.pop(_sCamName, None)
+
+    # enddef
+
+    #############################################################################
+    def InvalidateImage(self, _sImageName: str):
+        lCamNames = [sName for sName, xEntry in self._dicEntries.items() if xEntry.sImageName == _sImageName]
+        for sCamName in lCamNames:
+            del self._dicEntries[sCamName]
+        # endfor
+
+    # enddef
+
+    #############################################################################
+    def Clear(self):
+        self._dicEntries.clear()
+
+    # enddef
+
+
+# endclass
+
+
+#############################################################################
+# Process-wide camera view cache
+g_xCameraViewCache: CCameraViewCache = CCameraViewCache()
+
+
+#############################################################################
+def GetCameraViewCache() -> CCameraViewCache:
+    return g_xCameraViewCache
+
+
+# enddef
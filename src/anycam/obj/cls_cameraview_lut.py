@@ -30,7 +30,7 @@ from typing import Union
 from pathlib import Path
 from anybase import path as anypath
 import numpy as np
-from .cls_cameraview import CCameraView
+from .cls_cameraview import CCameraView, CCullVolume
 from ..model.cls_camera_lut import CCameraLut
 
 
@@ -53,7 +53,7 @@ class CCameraViewLut(CCameraView):
             "iLutBorderPixel": self._xCamLut.iLutBorderPixel,
             "iLutSuperSampling": self._xCamLut.iLutSuperSampling,
             "lLutCenterRC": list(self._xCamLut.tLutCenterRC),
-            "sFilePath": self._pathFile.as_posix(),
+            "sFilePath": None if self._pathFile is None else self._pathFile.as_posix(),
         }
 
         dicData.update(super().GetDataDict())
@@ -62,23 +62,41 @@ class CCameraViewLut(CCameraView):
 
     # enddef
 
+    #############################################################################
+    def GetIntrinsicsKey(self) -> str:
+        sKey = super().GetIntrinsicsKey()
+
+        # A LUT that was not loaded from file is only identified by the LUT object itself
+        if self._pathFile is None:
+            sKey += f"|{id(self._xCamLut)}"
+        # endif
+
+        return sKey
+
+    # enddef
+
     #############################################################################
     def Init(
         self,
         *,
         aImage: np.ndarray,
-        iLutBorderPixel: int,
-        iLutSuperSampling: int,
-        lLutCenterRC: list[float],
+        iLutBorderPixel: int = 0,
+        iLutSuperSampling: int = 1,
+        lLutCenterRC: list[float] = None,
         lAxes: list = None,
         lOrig_m: list = None,
         xFilePath: Union[str, list, tuple, Path] = None,
+        bAllowKdTreePickle: bool = False,
+        bStreamTiles: bool = False,
     ):
         self._pathFile: Path = None
         if xFilePath is not None:
             self._pathFile = anypath.MakeNormPath(xFilePath)
         # endif
 
+        # The LUT parameters are ignored for a LUT container file, which stores them itself
+        fLutCenterRow, fLutCenterCol = (None, None) if lLutCenterRC is None else lLutCenterRC
+
         self._xCamLut = CCameraLut()
 
         if aImage is not None:
@@ -86,16 +104,18 @@ class CCameraViewLut(CCameraView):
                 _imgLut=aImage,
                 _iLutBorderPixel=iLutBorderPixel,
                 _iLutSuperSampling=iLutSuperSampling,
-                _fLutCenterRow=lLutCenterRC[0],
-                _fLutCenterCol=lLutCenterRC[1],
+                _fLutCenterRow=fLutCenterRow,
+                _fLutCenterCol=fLutCenterCol,
             )
         elif self._pathFile is not None:
             self._xCamLut.FromFile(
                 _xFilePath=self._pathFile,
                 _iLutBorderPixel=iLutBorderPixel,
                 _iLutSuperSampling=iLutSuperSampling,
-                _fLutCenterRow=lLutCenterRC[0],
-                _fLutCenterCol=lLutCenterRC[1],
+                _fLutCenterRow=fLutCenterRow,
+                _fLutCenterCol=fLutCenterCol,
+                _bAllowKdTreePickle=bAllowKdTreePickle,
+                _bStreamTiles=bStreamTiles,
             )
         else:
             raise RuntimeError("Neither an image nor a file path were given to initialize LUT camera")
@@ -123,51 +143,48 @@ class CCameraViewLut(CCameraView):
     # enddef
 
     #############################################################################
-    def ProjectToImage(self, _lPointsXYZ_m, *, _bDetailedFlags: bool = False):
-        """Project 3D-world point to image.
+    def _ProjectLocalPointsToImageArray(
+        self, _aLocPnts_m: np.ndarray, _aPixXY: np.ndarray, _aInFront: np.ndarray, _aInImage: np.ndarray
+    ):
+        # Map 3D-points in camera frame to pixel centered pixel positions
+        aPixPosRC, aPixelValid = self._xCamLut.RayDirsToPixelsRCArray(_aLocPnts_m, _bNormalize=True)
+
+        # Flip row-column to x-y order and transform pixel positions,
+        # from pixel centered to pixel top-left.
+        np.add(aPixPosRC[:, ::-1], 0.5, out=_aPixXY, casting="same_kind")
 
-        Parameters
-        ----------
-        _lPointsXYZ_m : list[list[float]]
-            Coordinates of 3D-points in world coordinate system.
+        # Filter out pixels outside the imager
+        np.copyto(_aInImage, aPixelValid)
+        for iAxis in range(2):
+            _aInImage &= _aPixXY[:, iAxis] < self._lPixCnt[iAxis]
+            _aInImage &= _aPixXY[:, iAxis] > 0
+        # endfor
+        np.copyto(_aInFront, _aInImage)
 
-        Returns
-        -------
-        list[list[float]]
-            2D-pixel coordinates (X,Y) in CV-image coordinate system,
-            with origin at top-left of image and x-axis pointing right,
-            y-axis pointing down.
-        """
+    # enddef
 
-        # Transform world points to points in camera frame
-        aLocPnts_m = self.PointsToCameraFrame(_lPointsXYZ_m)
+    #############################################################################
+    def _UnprojectPixelsLocal(self, _aPixXY: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Flip x-y to row-column order and transform pixel positions,
+        # from pixel top-left to pixel centered.
+        aPixPosRC = _aPixXY[:, ::-1] - 0.5
 
-        # Map 3D-points in camera frame to pixel centered pixel positions
-        lPixPosRC, lPixelValid = self._xCamLut.RayDirsToPixelsRC(aLocPnts_m, _bNormalize=True)
+        return self._xCamLut.PixelsRCToRayDirsArray(aPixPosRC)
 
-        aPixPosRC = np.array(lPixPosRC)
+    # enddef
 
-        # Transform pixel positions, from pixel centered to pixel top-left.
-        aPixPosRC += 0.5
+    #############################################################################
+    def _CreateCullVolume(self) -> CCullVolume:
+        # Cone from the maximal ray angle of the LUT, widened by the angle of one pixel,
+        # as the LUT rays pass through the pixel centers.
+        fPixAngle_deg = 1.0 / min(self._lPixPerDeg)
+        return CCullVolume(fConeHalfAngle_deg=min(180.0, self._xCamLut.fRadAngleMax_deg + fPixAngle_deg), aPlanes=None)
 
-        # Flip row-column to x-y order
-        aPixPosXY = aPixPosRC[:, ::-1]
+    # enddef
 
-        # Filter out pixels outside the imager
-        lPixelValid = [
-            v
-            & (p[0] < self._lPixCnt[0])
-            & (p[1] < self._lPixCnt[1])
-            & (p[0] > 0)
-            & (p[1] > 0)
-            for p, v in zip(aPixPosXY, lPixelValid)
-        ]
-
-        if _bDetailedFlags is True:
-            return aPixPosXY.tolist(), lPixelValid, lPixelValid
-        else:
-            return aPixPosXY.tolist(), lPixelValid
-        # endif
+    #############################################################################
+    def _CreatePixelRayDirs(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._xCamLut.GetImageRayDirs()
 
     # enddef
 
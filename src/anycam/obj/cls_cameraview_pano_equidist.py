@@ -30,7 +30,7 @@ import sys
 import numpy as np
 
 from anybase.cls_anyexcept import CAnyExcept
-from .cls_cameraview import CCameraView
+from .cls_cameraview import CCameraView, CCullVolume
 
 
 class CCameraViewPanoEquidist(CCameraView):
@@ -125,92 +125,95 @@ class CCameraViewPanoEquidist(CCameraView):
     # enddef
 
     #############################################################################
-    def ProjectToImage(self, _lPointsXYZ_m: list[list[float]], *, _bDetailedFlags: bool = False):
-        """Project 3D-world point to image.
-
-        Parameters
-        ----------
-        _lPointsXYZ_m : list[list[float]]
-            Coordinates of 3D-points in world coordinate system.
-
-        Returns
-        -------
-        list[list[float]]
-            2D-pixel coordinates (X,Y) in CV-image coordinate system,
-            with origin at top-left of image and x-axis pointing right,
-            y-axis pointing down.
-        """
-        # print("\n\n")
-
+    def _ProjectLocalPointsToImageArray(
+        self, _aLocPnts_m: np.ndarray, _aPixXY: np.ndarray, _aInFront: np.ndarray, _aInImage: np.ndarray
+    ):
         fDegPerRad = 180.0 / np.pi
-        aZ = np.array([0.0, 0.0, -1.0])
-
-        aLocPnts_m = self.PointsToCameraFrame(_lPointsXYZ_m)
+        aZ = np.array([0.0, 0.0, -1.0], dtype=_aPixXY.dtype)
 
         # Normalize vectors to location
-        aLocPntsUnit = aLocPnts_m / np.linalg.norm(aLocPnts_m, axis=1)[:, np.newaxis]
+        aLocPntsUnit = _aLocPnts_m / np.linalg.norm(_aLocPnts_m, axis=1)[:, np.newaxis]
 
         # Evaluate angle of normalized vectors to optical axis
         aLocPntsUnit_x_Z = -np.cross(aLocPntsUnit, aZ)
         aLocPntsUnit_d_Z = np.dot(aLocPntsUnit, aZ)
         aRadAngle_deg = np.arctan2(np.linalg.norm(aLocPntsUnit_x_Z, axis=1), aLocPntsUnit_d_Z) * fDegPerRad
 
-        # print("RadAngle_deg: {}".format(aRadAngle_deg[0]))
-
         # All points that are within the angle range, can be projected into the image
-        aInFront = aRadAngle_deg <= self._fFovMax_deg
-        # print("InFront: {}".format(aInFront[0]))
+        np.less_equal(aRadAngle_deg, self._fFovMax_deg, out=_aInFront)
 
         # Offset from optical center to bottom-left corner
         aOffset_pix = np.array([self.lFovRange_deg[0][0], self.lFovRange_deg[1][0]]) * self._lPixPerDeg[0]
 
         # Convert angle of projection ray into pixels by constant factor
         aRadPix = aRadAngle_deg * self._lPixPerDeg[0]
-        # print("RadPix: {}".format(aRadPix[0]))
 
         # The direction where the image point is relative to the image center
         # The vector is not yet normalized
-        # aImgDir = np.array([-aLocPntsUnit_x_Z[:, 1], aLocPntsUnit_x_Z[:, 0]]).T
         aImgDir = aLocPntsUnit - aZ * aLocPntsUnit_d_Z[:, np.newaxis]
-        # print("ImgDir: {}".format(aImgDir[0]))
-
         aImgDir = aImgDir[:, 0:2]
-        # print("ImgDir: {}".format(aImgDir[0]))
 
-        # Normalize only those vectors in aImgDir that have a norm >= 1e-6
+        # Normalize only those vectors in aImgDir that have a norm >= 1e-6.
+        # Vectors with norm < 1e-6 are set to zero.
         aImgDirNorm = np.linalg.norm(aImgDir, axis=1)
         aMask = aImgDirNorm >= 1e-6
-        aImgDir = np.divide(aImgDir, aImgDirNorm[:, np.newaxis], where=aMask[:, np.newaxis])
-        # print("ImgDir norm: {}".format(aImgDir[0]))
-
-        # Ensure that vectors with norm < 1e-6 are set to zero
-        aImgDir[~aMask, :] = 0.0
-        # print("ImgDir norm masked: {}".format(aImgDir[0]))
+        aImgDirUnit = np.zeros_like(aImgDir)
+        np.divide(aImgDir, aImgDirNorm[:, np.newaxis], out=aImgDirUnit, where=aMask[:, np.newaxis])
 
         # Evaluate the pixel position in the image of the projected point
-        aPrjPnts_pix = aImgDir * aRadPix[:, np.newaxis] - aOffset_pix
-        # print("PrjPnts_pix: {}".format(aPrjPnts_pix[0]))
+        np.multiply(aImgDirUnit, aRadPix[:, np.newaxis], out=_aPixXY)
+        _aPixXY -= aOffset_pix
 
         # Flip the y-axis to output image coordinates in CV-coordinate frame,
         # instead of camera frame
-        aPrjPnts_pix[:, 1] = self._lPixCnt[1] - aPrjPnts_pix[:, 1]
-        # print("PrjPnts_pix flipped y: {}".format(aPrjPnts_pix[0]))
+        np.subtract(self._lPixCnt[1], _aPixXY[:, 1], out=_aPixXY[:, 1])
 
-        aPrjPntsInt_pix = np.round(aPrjPnts_pix)
+        self._EvalInImage(_aPixXY, _aInFront, _aInImage)
 
-        # Flag whether projection is in image
-        aInImage = np.logical_and(aInFront, aPrjPntsInt_pix[:, 0] < self.iPixCntX)
-        aInImage = np.logical_and(aInImage, aPrjPntsInt_pix[:, 0] >= 0.0)
-        aInImage = np.logical_and(aInImage, aPrjPntsInt_pix[:, 1] < self.iPixCntY)
-        aInImage = np.logical_and(aInImage, aPrjPntsInt_pix[:, 1] >= 0.0)
-        # print("InFront final: {}".format(aInFront[0]))
-        # print("\n\n")
+    # enddef
 
-        if _bDetailedFlags is True:
-            return aPrjPnts_pix.tolist(), aInFront.tolist(), aInImage.tolist()
-        else:
-            return aPrjPnts_pix.tolist(), aInImage.tolist()
-        # endif
+    #############################################################################
+    def _UnprojectPixelsLocal(self, _aPixXY: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        fRadPerDeg = np.pi / 180.0
+
+        # Offset from optical center to bottom-left corner
+        aOffset_pix = np.array([self.lFovRange_deg[0][0], self.lFovRange_deg[1][0]]) * self._lPixPerDeg[0]
+
+        # Flip the y-axis from CV-coordinate frame to camera frame
+        # and evaluate the angle of the ray along the image axes.
+        aAngleXY_deg = np.empty((_aPixXY.shape[0], 2))
+        aAngleXY_deg[:, 0] = _aPixXY[:, 0]
+        np.subtract(self._lPixCnt[1], _aPixXY[:, 1], out=aAngleXY_deg[:, 1])
+        aAngleXY_deg += aOffset_pix
+        aAngleXY_deg /= self._lPixPerDeg[0]
+
+        # Angle of the ray to the optical axis
+        aRadAngle_deg = np.linalg.norm(aAngleXY_deg, axis=1)
+        aValid = aRadAngle_deg <= min(self._fFovMax_deg / 2.0, 180.0)
+
+        aImgDirUnit = np.zeros_like(aAngleXY_deg)
+        aMask = aRadAngle_deg >= 1e-6
+        np.divide(aAngleXY_deg, aRadAngle_deg[:, np.newaxis], out=aImgDirUnit, where=aMask[:, np.newaxis])
+
+        aRadAngle_rad = aRadAngle_deg * fRadPerDeg
+        aRayDirs = np.empty((_aPixXY.shape[0], 3))
+        np.multiply(aImgDirUnit, np.sin(aRadAngle_rad)[:, np.newaxis], out=aRayDirs[:, 0:2])
+        np.negative(np.cos(aRadAngle_rad), out=aRayDirs[:, 2])
+        aRayDirs[~aValid] = 0.0
+
+        return aRayDirs, aValid
+
+    # enddef
+
+    #############################################################################
+    def _CreateCullVolume(self) -> CCullVolume:
+        # The ray angle to the optical axis is the distance of the pixel from the optical center
+        # in degrees, so that the image corner furthest from the center bounds the cone.
+        lAngleX_deg = [self.lFovRange_deg[0][0] + fPix / self._lPixPerDeg[0] for fPix in (0.0, self._lPixCnt[0])]
+        lAngleY_deg = [self.lFovRange_deg[1][0] + fPix / self._lPixPerDeg[0] for fPix in (0.0, self._lPixCnt[1])]
+        fCornerAngle_deg = max(np.hypot(fX, fY) for fX in lAngleX_deg for fY in lAngleY_deg)
+
+        return CCullVolume(fConeHalfAngle_deg=min(180.0, float(fCornerAngle_deg)), aPlanes=None)
 
     # enddef
 
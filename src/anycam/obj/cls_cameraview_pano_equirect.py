@@ -26,8 +26,10 @@
 # </LICENSE>
 ###
 
+import numpy as np
+
 from anybase.cls_anyexcept import CAnyExcept
-from .cls_cameraview import CCameraView
+from .cls_cameraview import CCameraView, CCullVolume
 
 
 class CCameraViewPanoEquirect(CCameraView):
@@ -53,7 +55,16 @@ class CCameraViewPanoEquirect(CCameraView):
 
     #############################################################################
     def Init(
-        self, *, lPixCnt, fPixSize_um, fFovMax_deg=None, lFov_deg=None, lFovRange_deg=None, bEnsureSquarePixel=False
+        self,
+        *,
+        lPixCnt,
+        fPixSize_um,
+        fFovMax_deg=None,
+        lFov_deg=None,
+        lFovRange_deg=None,
+        bEnsureSquarePixel=False,
+        lAxes=None,
+        lOrig_m=None
     ):
 
         super().Init(
@@ -63,10 +74,120 @@ class CCameraViewPanoEquirect(CCameraView):
             lFovXY_deg=lFov_deg,
             lFovRangeXY_deg=lFovRange_deg,
             bEnsureSquarePixel=bEnsureSquarePixel,
+            lAxesXYZ=lAxes,
+            lOrigXYZ_m=lOrig_m,
         )
 
     # enddef
 
+    #############################################################################
+    def DirsToCameraFrame(self, _lDirs):
+        aDirs = np.array(_lDirs)
+        aMatrix = np.array(self._lAxes).transpose()
+        return aDirs @ aMatrix
+
+    # enddef
+
+    #############################################################################
+    def _ProjectLocalPointsToImageArray(
+        self, _aLocPnts_m: np.ndarray, _aPixXY: np.ndarray, _aInFront: np.ndarray, _aInImage: np.ndarray
+    ):
+        # Longitude is the angle about the y-axis, measured from the optical axis (-z) towards the x-axis.
+        # Latitude is the angle from the x-z-plane towards the y-axis.
+        fDegPerRad = 180.0 / np.pi
+        aX = _aLocPnts_m[:, 0]
+        aY = _aLocPnts_m[:, 1]
+        aZ = _aLocPnts_m[:, 2]
+
+        aLong_deg = np.arctan2(aX, -aZ)
+        aLong_deg *= fDegPerRad
+        aLat_deg = np.arctan2(aY, np.hypot(aX, aZ))
+        aLat_deg *= fDegPerRad
+
+        # Longitude ranges may extend beyond +/-180 degrees
+        fLongMin_deg, fLongMax_deg = self._lFovRange_deg[0]
+        fLatMin_deg, fLatMax_deg = self._lFovRange_deg[1]
+        aLong_deg[aLong_deg < fLongMin_deg] += 360.0
+        aLong_deg[aLong_deg > fLongMax_deg] -= 360.0
+
+        # Points that lie within the angle ranges, can be projected into the image
+        np.greater_equal(aLong_deg, fLongMin_deg, out=_aInFront)
+        _aInFront &= aLong_deg <= fLongMax_deg
+        _aInFront &= aLat_deg >= fLatMin_deg
+        _aInFront &= aLat_deg <= fLatMax_deg
+
+        # Pixel positions in CV-coordinate frame, with the y-axis pointing down
+        np.subtract(aLong_deg, fLongMin_deg, out=_aPixXY[:, 0], casting="same_kind")
+        _aPixXY[:, 0] *= self._lPixPerDeg[0]
+        np.subtract(fLatMax_deg, aLat_deg, out=_aPixXY[:, 1], casting="same_kind")
+        _aPixXY[:, 1] *= self._lPixPerDeg[1]
+
+        self._EvalInImage(_aPixXY, _aInFront, _aInImage)
+
+    # enddef
+
+    #############################################################################
+    def _UnprojectPixelsLocal(self, _aPixXY: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        fRadPerDeg = np.pi / 180.0
+        fLongMin_deg, fLongMax_deg = self._lFovRange_deg[0]
+        fLatMin_deg, fLatMax_deg = self._lFovRange_deg[1]
+
+        aLong_rad = _aPixXY[:, 0] / self._lPixPerDeg[0] + fLongMin_deg
+        aLong_rad *= fRadPerDeg
+        aLat_rad = fLatMax_deg - _aPixXY[:, 1] / self._lPixPerDeg[1]
+        aLat_rad *= fRadPerDeg
+
+        aValid = aLong_rad >= fLongMin_deg * fRadPerDeg
+        aValid &= aLong_rad <= fLongMax_deg * fRadPerDeg
+        aValid &= aLat_rad >= max(fLatMin_deg, -90.0) * fRadPerDeg
+        aValid &= aLat_rad <= min(fLatMax_deg, 90.0) * fRadPerDeg
+
+        aCosLat = np.cos(aLat_rad)
+        aRayDirs = np.empty((_aPixXY.shape[0], 3))
+        np.multiply(aCosLat, np.sin(aLong_rad), out=aRayDirs[:, 0])
+        np.sin(aLat_rad, out=aRayDirs[:, 1])
+        np.multiply(aCosLat, np.cos(aLong_rad), out=aRayDirs[:, 2])
+        np.negative(aRayDirs[:, 2], out=aRayDirs[:, 2])
+        aRayDirs[~aValid] = 0.0
+
+        return aRayDirs, aValid
+
+    # enddef
+
+    #############################################################################
+    def _CreateCullVolume(self) -> CCullVolume:
+        # The cosine of the angle between a ray at (longitude, latitude) and the optical axis
+        # is cos(lat) * cos(long). The cone is bounded by its minimum over the FoV range.
+        fLongMax_deg = max(abs(x) for x in self._lFovRange_deg[0])
+        fLatMin_deg, fLatMax_deg = self._lFovRange_deg[1]
+        if fLongMax_deg <= 90.0:
+            fLat_deg = max(abs(fLatMin_deg), abs(fLatMax_deg))
+        elif fLatMin_deg <= 0.0 <= fLatMax_deg:
+            fLat_deg = 0.0
+        else:
+            fLat_deg = min(abs(fLatMin_deg), abs(fLatMax_deg))
+        # endif
+
+        fCos = np.cos(np.radians(min(fLongMax_deg, 180.0))) * np.cos(np.radians(min(fLat_deg, 90.0)))
+        fPixAngle_deg = 1.0 / min(self._lPixPerDeg)
+
+        return CCullVolume(
+            fConeHalfAngle_deg=min(180.0, float(np.degrees(np.arccos(np.clip(fCos, -1.0, 1.0)))) + fPixAngle_deg),
+            aPlanes=None,
+        )
+
+    # enddef
+
+    #############################################################################
+    def _CenterFovRange(self, _iAxis: int):
+        # Adapt the FoV range to an adjusted FoV, keeping the FoV center
+        self._lFovRange_deg[_iAxis] = [
+            self._lFovCenter_deg[_iAxis] - self._lFov_deg[_iAxis] / 2.0,
+            self._lFovCenter_deg[_iAxis] + self._lFov_deg[_iAxis] / 2.0,
+        ]
+
+    # enddef
+
     #############################################################################
     def _AdjustFov(self):
 
@@ -75,8 +196,10 @@ class CCameraViewPanoEquirect(CCameraView):
         fZero_deg = 0.01
         if self._lFov_deg[0] <= fZero_deg and self._lFov_deg[1] > fZero_deg:
             self._lFov_deg[0] = self._lFov_deg[1] / self._fPixResAspectYX
+            self._CenterFovRange(0)
         elif self._lFov_deg[1] <= fZero_deg and self._lFov_deg[0] > fZero_deg:
             self._lFov_deg[1] = self._lFov_deg[0] * self._fPixResAspectYX
+            self._CenterFovRange(1)
         elif self._lFov_deg[1] <= fZero_deg and self._lFov_deg[0] <= fZero_deg:
             raise CAnyExcept("Error: Zero field of view given")
         # endif
@@ -92,8 +215,10 @@ class CCameraViewPanoEquirect(CCameraView):
             if self._fFovAspectYX != self._fPixResAspectYX:
                 if self._lFov_deg[0] >= self._lFov_deg[1]:
                     self._lFov_deg[1] = self._lFov_deg[0] * self._fPixResAspectYX
+                    self._CenterFovRange(1)
                 else:
                     self._lFov_deg[0] = self._lFov_deg[1] / self._fPixResAspectYX
+                    self._CenterFovRange(0)
                 # endif
                 self._fFovAspectYX = self._fPixResAspectYX
             # endif
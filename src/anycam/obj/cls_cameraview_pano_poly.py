@@ -33,6 +33,7 @@ from pathlib import Path
 
 from anyblend.mesh.types import CMeshData
 
+from ..model.cls_camera_lut import CFrustumMeshArrays
 from ..model.cls_camera_pano_poly import CCameraPanoPoly
 from .cls_cameraview import CCameraView
 
@@ -97,10 +98,14 @@ class CCameraViewPanoPoly(CCameraView):
         iLutSuperSampling: int = 1,
         lLutCenterRC: list[float] = None,
         xFilePath: Union[str, list, tuple, Path] = None,
+        bLutStreamFit: bool = False,
+        sInverseMode: str = "poly",
+        fInverseMaxError_pix: float = 0.01,
     ):
 
         self._lPixCnt = copy.deepcopy(lPixCnt)
         self._fPixSize_um = fPixSize_um
+        self._dicPixelRays = {}
 
         if lAxes is None:
             self._lAxes = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
@@ -115,6 +120,7 @@ class CCameraViewPanoPoly(CCameraView):
         # endif
 
         self._xCamPoly = CCameraPanoPoly()
+        self._xCamPoly.SetInverseMode(sInverseMode, _fMaxError_pix=fInverseMaxError_pix)
 
         if lPolyCoef_rad_mm is not None and lCenterOffsetXY_mm is not None:
             self._xCamPoly.FromCoef(
@@ -134,6 +140,7 @@ class CCameraViewPanoPoly(CCameraView):
                 _iLutSuperSampling=iLutSuperSampling,
                 _lLutCenterRC=lLutCenterRC,
                 _xFilePath=xFilePath,
+                _bStreamFit=bLutStreamFit,
             )
         else:
             raise RuntimeError("Insufficient arguments provided to initialize polynomial camera.")
@@ -159,6 +166,8 @@ class CCameraViewPanoPoly(CCameraView):
         self._fAspectX = 1.0
         self._fAspectY = 1.0
 
+        self._xCullVolume = self._CreateCullVolume()
+
     # enddef
 
     #############################################################################
@@ -184,38 +193,48 @@ class CCameraViewPanoPoly(CCameraView):
     # enddef
 
     #############################################################################
-    def ProjectToImage(self, _lPointsXYZ_m: list[list[float]], *, _bDetailedFlags: bool = False):
-        """Project 3D-world point to image.
-
-        Parameters
-        ----------
-        _lPointsXYZ_m : list[list[float]]
-            Coordinates of 3D-points in world coordinate system.
-
-        Returns
-        -------
-        list[list[float]]
-            2D-pixel coordinates (X,Y) in CV-image coordinate system,
-            with origin at top-left of image and x-axis pointing right,
-            y-axis pointing down.
-        """
-
-        # Transform world points to points in camera frame
-        aLocPnts_m = self.PointsToCameraFrame(_lPointsXYZ_m)
-
+    def _ProjectLocalPointsToImageArray(
+        self, _aLocPnts_m: np.ndarray, _aPixXY: np.ndarray, _aInFront: np.ndarray, _aInImage: np.ndarray
+    ):
         # Map 3D-points in camera frame to pixel centered pixel positions
         # Set _bInvertPixelDir = True, if the camera object is rotated 180° about Z
         # and the polynomial coefficients are not negated.
-        aPixPosXY, aPixelValid = self._xCamPoly.RayDirsToPixelsXY(aLocPnts_m, _bNormalize=True, _bInvertPixelDir=False)
+        aPixPosXY, aPixelValid = self._xCamPoly.RayDirsToPixelsXY(_aLocPnts_m, _bNormalize=True, _bInvertPixelDir=False)
 
         # Map to CV-Coordinate system, with origin at top-left and y-axis pointing down.
-        aPixPosXY[:, 1] = self._xCamPoly.lPixCntXY[1] - aPixPosXY[:, 1]
+        _aPixXY[:, 0] = aPixPosXY[:, 0]
+        np.subtract(self._xCamPoly.lPixCntXY[1], aPixPosXY[:, 1], out=_aPixXY[:, 1], casting="same_kind")
 
-        if _bDetailedFlags is True:
-            return aPixPosXY.tolist(), aPixelValid.tolist(), aPixelValid.tolist()
-        else:
-            return aPixPosXY.tolist(), aPixelValid.tolist()
-        # endif
+        np.copyto(_aInFront, aPixelValid)
+        np.copyto(_aInImage, aPixelValid)
+
+    # enddef
+
+    #############################################################################
+    def _UnprojectPixelsLocal(self, _aPixXY: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Map from CV-Coordinate system to Blender image coordinates, with origin at bottom-left and y-axis pointing up.
+        aPixPosXY = np.empty_like(_aPixXY)
+        aPixPosXY[:, 0] = _aPixXY[:, 0]
+        np.subtract(self._xCamPoly.lPixCntXY[1], _aPixXY[:, 1], out=aPixPosXY[:, 1])
+
+        return self._xCamPoly.PixelsXYToRayDirs(aPixPosXY)
+
+    # enddef
+
+    #############################################################################
+    def _CreatePixelRayDirs(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._xCamPoly.GetImageRayDirs()
+
+    # enddef
+
+    #############################################################################
+    def GetFrustumMeshArrays(
+        self, *, _fRayLen: float, _fMaxEdgeAngle_deg: float = 1.0, _fSurfAngleStep_deg: float = 10.0
+    ) -> CFrustumMeshArrays:
+
+        return self._xCamPoly.GetFrustumMeshArrays(
+            _fRayLen=_fRayLen, _fMaxEdgeAngle_deg=_fMaxEdgeAngle_deg, _fSurfAngleStep_deg=_fSurfAngleStep_deg
+        )
 
     # enddef
 
@@ -28,9 +28,8 @@
 
 import math
 import numpy as np
-from typing import Union
 from anybase.cls_anyexcept import CAnyExcept
-from .cls_cameraview import CCameraView
+from .cls_cameraview import CCameraView, CCullVolume
 
 
 class CCameraViewPinhole(CCameraView):
@@ -129,51 +128,74 @@ class CCameraViewPinhole(CCameraView):
     # enddef
 
     #############################################################################
-    def ProjectToImage(
-        self, _lPoints_m: Union[list[list[float]], np.ndarray], *, _bDetailedFlags: bool = False
-    ) -> list[list[float]]:
-        """Project 3D-world point to image.
-
-        Parameters
-        ----------
-        _lPointsXYZ_m : list[list[float]]
-            Coordinates of 3D-points in world coordinate system.
-
-        Returns
-        -------
-        list[list[float]]
-            2D-pixel coordinates (X,Y) in CV-image coordinate system,
-            with origin at top-left of image and x-axis pointing right,
-            y-axis pointing down.
-        """
-
-        aLocPnts_m = self.PointsToCameraFrame(_lPoints_m)
-        aInFront = aLocPnts_m[:, 2] < 0.0
-
-        aScale = -self.fFocLen_mm / aLocPnts_m[:, 2]
-        aPrjPnts_mm = aLocPnts_m[:, 0:2] * aScale[:, None]
+    def _ProjectLocalPointsToImageArray(
+        self, _aLocPnts_m: np.ndarray, _aPixXY: np.ndarray, _aInFront: np.ndarray, _aInImage: np.ndarray
+    ):
+        np.less(_aLocPnts_m[:, 2], 0.0, out=_aInFront)
+
+        aScale = np.divide(-self.fFocLen_mm, _aLocPnts_m[:, 2])
+        np.multiply(_aLocPnts_m[:, 0:2], aScale[:, None], out=_aPixXY)
 
         aSenCtr_mm = np.array(self._lSenCtr_mm)
         aSenSize_mm = np.array(self._lSenSize_mm)
         aSenOffset_mm = aSenSize_mm / 2.0 - aSenCtr_mm
         aPixPerMM = np.array(self._lPixCnt) / np.array(self._lSenSize_mm)
 
-        aPrjPnts_pix = (aPrjPnts_mm + aSenOffset_mm) * aPixPerMM
-        aPrjPnts_pix[:, 1] = self._lPixCnt[1] - aPrjPnts_pix[:, 1]
+        _aPixXY += aSenOffset_mm
+        _aPixXY *= aPixPerMM
+        np.subtract(self._lPixCnt[1], _aPixXY[:, 1], out=_aPixXY[:, 1])
 
-        aPrjPntsInt_pix = np.round(aPrjPnts_pix)
+        self._EvalInImage(_aPixXY, _aInFront, _aInImage)
 
-        # Flag whether projection is in image
-        aInImage = np.logical_and(aInFront, aPrjPntsInt_pix[:, 0] < self.iPixCntX)
-        aInImage = np.logical_and(aInImage, aPrjPntsInt_pix[:, 0] >= 0.0)
-        aInImage = np.logical_and(aInImage, aPrjPntsInt_pix[:, 1] < self.iPixCntY)
-        aInImage = np.logical_and(aInImage, aPrjPntsInt_pix[:, 1] >= 0.0)
+    # enddef
 
-        if _bDetailedFlags is True:
-            return aPrjPnts_pix.tolist(), aInFront.tolist(), aInImage.tolist()
-        else:
-            return aPrjPnts_pix.tolist(), aInImage.tolist()
-        # endif
+    #############################################################################
+    def _UnprojectPixelsLocal(self, _aPixXY: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        aSenCtr_mm = np.array(self._lSenCtr_mm)
+        aSenSize_mm = np.array(self._lSenSize_mm)
+        aSenOffset_mm = aSenSize_mm / 2.0 - aSenCtr_mm
+        aPixPerMM = np.array(self._lPixCnt) / np.array(self._lSenSize_mm)
+
+        # Flip the y-axis from CV-coordinate frame to camera frame
+        # and map pixel positions to positions on the image plane.
+        aRayDirs = np.empty((_aPixXY.shape[0], 3))
+        aRayDirs[:, 0] = _aPixXY[:, 0]
+        np.subtract(self._lPixCnt[1], _aPixXY[:, 1], out=aRayDirs[:, 1])
+        aRayDirs[:, 0:2] /= aPixPerMM
+        aRayDirs[:, 0:2] -= aSenOffset_mm
+        aRayDirs[:, 2] = -self.fFocLen_mm
+
+        aRayDirs /= np.linalg.norm(aRayDirs, axis=1)[:, np.newaxis]
+
+        return aRayDirs, np.ones(_aPixXY.shape[0], dtype=bool)
+
+    # enddef
+
+    #############################################################################
+    def _CreateCullVolume(self) -> CCullVolume:
+        # Frustum planes through the camera origin and the sensor edges on the image plane at z = -f,
+        # with normals pointing inside, and the plane z = 0 to reject points behind the camera.
+        # The sensor is widened by one pixel, as projections are rounded to the nearest pixel corner.
+        fF = self._fFocLen_mm
+        lPixSize_mm = [self._lSenSize_mm[i] / self._lPixCnt[i] for i in range(2)]
+        lMin_mm = [self._lSenCtr_mm[i] - self._lSenSize_mm[i] / 2.0 - lPixSize_mm[i] for i in range(2)]
+        lMax_mm = [self._lSenCtr_mm[i] + self._lSenSize_mm[i] / 2.0 + lPixSize_mm[i] for i in range(2)]
+
+        aPlanes = np.array(
+            [
+                [fF, 0.0, lMin_mm[0], 0.0],
+                [-fF, 0.0, -lMax_mm[0], 0.0],
+                [0.0, fF, lMin_mm[1], 0.0],
+                [0.0, -fF, -lMax_mm[1], 0.0],
+                [0.0, 0.0, -1.0, 0.0],
+            ]
+        )
+        aPlanes[:, 0:3] /= np.linalg.norm(aPlanes[:, 0:3], axis=1)[:, np.newaxis]
+
+        # Bounding cone through the sensor corner furthest from the optical axis
+        fCornerRad_mm = max(math.hypot(fX, fY) for fX in (lMin_mm[0], lMax_mm[0]) for fY in (lMin_mm[1], lMax_mm[1]))
+
+        return CCullVolume(fConeHalfAngle_deg=math.degrees(math.atan2(fCornerRad_mm, fF)), aPlanes=aPlanes)
 
     # enddef
 
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \obj\cls_rectify_map_cache.py
+# Created Date: Friday, October 16th 2026, 7:24:51 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from anybase.cls_anyexcept import CAnyExcept
+from .cls_cameraview import CCameraView
+from . import util
+
+
+# Rotations of the cube map faces with respect to the source camera.
+# The rows are the right, up and backward axes of the face camera in the source camera frame.
+g_dicCubeFaceRotations: dict[str, np.ndarray] = {
+    "front": np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]),
+    "right": np.array([[0.0, 0.0, 1.0], [0.0, 1.0, 0.0], [-1.0, 0.0, 0.0]]),
+    "back": np.array([[-1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, -1.0]]),
+    "left": np.array([[0.0, 0.0, -1.0], [0.0, 1.0, 0.0], [1.0, 0.0, 0.0]]),
+    "up": np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, -1.0, 0.0]]),
+    "down": np.array([[1.0, 0.0, 0.0], [0.0, 0.0, -1.0], [0.0, 1.0, 0.0]]),
+}
+
+
+#############################################################################
+class CRectifyMaps(NamedTuple):
+    # Intrinsic matrix (3x3) of the virtual pinhole camera
+    aDstIntrinsics: np.ndarray
+    # Rotation matrix (3x3) of the virtual camera with respect to the source camera
+    aRotationMatrix: np.ndarray
+    # Float maps of shape (H, W) of type float32 in the pixel coordinates of the camera views,
+    # where the center of the top-left pixel is at (0.5, 0.5).
+    # If fixed point maps are requested, maps of shape (H, W, 2) of type int16 and (H, W) of type uint16,
+    # as created by cv2.convertMaps(), in the pixel coordinates of OpenCV, where the center of the top-left
+    # pixel is at (0, 0). These can be passed to cv2.remap() directly.
+    aMapX: np.ndarray
+    aMapY: np.ndarray
+    # Mask of shape (H, W), which pixels of the virtual camera are in the field of view of the source camera
+    aPointsInFoV: np.ndarray
+
+    #############################################################################
+    @property
+    def iByteCnt(self) -> int:
+        return self.aMapX.nbytes + self.aMapY.nbytes + self.aPointsInFoV.nbytes
+
+    # enddef
+
+    #############################################################################
+    def GetWorldToCamMatrix(self, _xSrcView: CCameraView) -> np.ndarray:
+        """Transformation matrix (3x4) of world points into the virtual camera frame,
+        for the current extrinsics of the source camera view."""
+        return util.GetVirtualPinholeWorldToCamMatrix(_xSrcView, self.aRotationMatrix)
+
+    # enddef
+
+
+# endclass
+
+
+#############################################################################
+class CRectifyMapCacheEntry(NamedTuple):
+    # The source view is referenced, so that the identity of its camera model remains valid
+    xSrcView: CCameraView
+    xMaps: CRectifyMaps
+
+
+# endclass
+
+
+#############################################################################
+class CRectifyMapCache:
+    """Cache of rectification maps from virtual pinhole cameras to source camera views,
+    with least recently used eviction within a memory budget.
+
+    The maps only depend on the intrinsics of the source view and not on its extrinsics,
+    so that the maps of a moving camera are reused for all frames.
+    The cached arrays are read-only, as they are shared between all callers.
+    """
+
+    #############################################################################
+    def __init__(self, *, iMaxSize_bytes: int = 1024 * 1024 * 1024):
+        self._iMaxSize_bytes: int = iMaxSize_bytes
+        self._iSize_bytes: int = 0
+        self._dicEntries: OrderedDict[str, CRectifyMapCacheEntry] = OrderedDict()
+
+    # enddef
+
+    #############################################################################
+    @property
+    def iMaxSize_bytes(self) -> int:
+        return self._iMaxSize_bytes
+
+    # enddef
+
+    @property
+    def iSize_bytes(self) -> int:
+        return self._iSize_bytes
+
+    # enddef
+
+    @property
+    def iMapCnt(self) -> int:
+        return len(self._dicEntries)
+
+    # enddef
+
+    #############################################################################
+    @staticmethod
+    def CreateKey(
+        _xSrcView: CCameraView,
+        _aDstIntrinsics: np.ndarray,
+        _iDstImageWidth: int,
+        _iDstImageHeight: int,
+        _aRotationMatrix: np.ndarray,
+        _bFixedPoint: bool,
+    ) -> str:
+        """Create the cache key from the source view intrinsics, the target intrinsics and the rotation."""
+        xHash = hashlib.sha1(_xSrcView.GetIntrinsicsKey().encode("utf-8"))
+        xHash.update(np.ascontiguousarray(_aDstIntrinsics, dtype=np.float64).tobytes())
+        xHash.update(np.ascontiguousarray(_aRotationMatrix, dtype=np.float64).tobytes())
+        xHash.update(f"|{_iDstImageWidth}|{_iDstImageHeight}|{_bFixedPoint}".encode("utf-8"))
+
+        return xHash.hexdigest()
+
+    # enddef
+
+    #############################################################################
+    def GetMaps(
+        self,
+        _xSrcView: CCameraView,
+        *,
+        _fDstFocalLengthX: float,
+        _fDstFocalLengthY: float,
+        _fDstPrinciplePointX: float,
+        _fDstPrinciplePointY: float,
+        _iDstImageWidth: int,
+        _iDstImageHeight: int,
+        _aRotationMatrix: Optional[np.ndarray] = None,
+        _bFixedPoint: bool = False,
+    ) -> CRectifyMaps:
+        """Get the rectification maps of a virtual pinhole camera from cache or create them.
+        See util.MapToVirtualPinholeCamera() for the parameters.
+
+        Parameters
+        ----------
+        _bFixedPoint : bool, optional
+            If True, the maps are converted with cv2.convertMaps() to fixed point maps,
+            which are faster to apply with cv2.remap(). See ConvertToFixedPoint().
+
+        Returns
+        -------
+        CRectifyMaps
+            The maps and the parameters of the virtual camera.
+        """
+        return self.GetMapSet(
+            _xSrcView,
+            _fDstFocalLengthX=_fDstFocalLengthX,
+            _fDstFocalLengthY=_fDstFocalLengthY,
+            _fDstPrinciplePointX=_fDstPrinciplePointX,
+            _fDstPrinciplePointY=_fDstPrinciplePointY,
+            _iDstImageWidth=_iDstImageWidth,
+            _iDstImageHeight=_iDstImageHeight,
+            _lRotationMatrices=[_aRotationMatrix],
+            _bFixedPoint=_bFixedPoint,
+        )[0]
+
+    # enddef
+
+    #############################################################################
+    def GetMapSet(
+        self,
+        _xSrcView: CCameraView,
+        *,
+        _fDstFocalLengthX: float,
+        _fDstFocalLengthY: float,
+        _fDstPrinciplePointX: float,
+        _fDstPrinciplePointY: float,
+        _iDstImageWidth: int,
+        _iDstImageHeight: int,
+        _lRotationMatrices: list[Optional[np.ndarray]],
+        _bFixedPoint: bool = False,
+    ) -> list[CRectifyMaps]:
+        """Get the rectification maps of a set of rotated virtual pinhole cameras with the same intrinsics.
+        All maps that are not cached, are created in a single batched projection.
+
+        Returns
+        -------
+        list[CRectifyMaps]
+            The maps in the order of the given rotation matrices.
+        """
+        aDstIntrinsics = util.GetVirtualPinholeIntrinsics(
+            _fDstFocalLengthX, _fDstFocalLengthY, _fDstPrinciplePointX, _fDstPrinciplePointY
+        )
+        lRotationMatrices = [
+            np.eye(3) if aRot is None else np.array(aRot, dtype=np.float64) for aRot in _lRotationMatrices
+        ]
+        for aRot in lRotationMatrices:
+            if aRot.shape != (3, 3):
+                raise CAnyExcept(f"Rotation matrix must be of shape (3, 3), but has shape {aRot.shape}")
+            # endif
+        # endfor
+
+        lKeys = [
+            CRectifyMapCache.CreateKey(_xSrcView, aDstIntrinsics, _iDstImageWidth, _iDstImageHeight, aRot, _bFixedPoint)
+            for aRot in lRotationMatrices
+        ]
+
+        # Rotations that are not cached, where equal keys are only evaluated once
+        dicMaps: dict[str, CRectifyMaps] = {}
+        dicMissing: dict[str, np.ndarray] = {}
+        for sKey, aRot in zip(lKeys, lRotationMatrices):
+            xEntry = self._dicEntries.get(sKey)
+            if xEntry is None:
+                dicMissing[sKey] = aRot
+            else:
+                dicMaps[sKey] = xEntry.xMaps
+                self._dicEntries.move_to_end(sKey)
+            # endif
+        # endfor
+
+        if len(dicMissing) > 0:
+            aMapX, aMapY, aPointsInFoV = util.EvalVirtualPinholeMaps(
+                _xSrcView, aDstIntrinsics, _iDstImageWidth, _iDstImageHeight, list(dicMissing.values())
+            )
+
+            for iIdx, (sKey, aRot) in enumerate(dicMissing.items()):
+                if _bFixedPoint is True:
+                    aMapXi, aMapYi = CRectifyMapCache.ConvertToFixedPoint(aMapX[iIdx], aMapY[iIdx], aPointsInFoV[iIdx])
+                else:
+                    aMapXi, aMapYi = aMapX[iIdx].copy(), aMapY[iIdx].copy()
+                # endif
+
+                xMaps = CRectifyMaps(
+                    aDstIntrinsics=aDstIntrinsics,
+                    aRotationMatrix=aRot,
+                    aMapX=aMapXi,
+                    aMapY=aMapYi,
+                    aPointsInFoV=aPointsInFoV[iIdx].copy(),
+                )
+                for aArray in xMaps:
+                    aArray.setflags(write=False)
+                # endfor
+
+                dicMaps[sKey] = xMaps
+                self._Add(sKey, CRectifyMapCacheEntry(xSrcView=_xSrcView, xMaps=xMaps))
+            # endfor
+        # endif
+
+        return [dicMaps[sKey] for sKey in lKeys]
+
+    # enddef
+
+    #############################################################################
+    def GetCubeMaps(
+        self,
+        _xSrcView: CCameraView,
+        *,
+        _iFaceSize: int,
+        _lFaces: Optional[list[str]] = None,
+        _bFixedPoint: bool = False,
+    ) -> dict[str, CRectifyMaps]:
+        """Get the rectification maps of the faces of a cube map around the source camera.
+
+        Parameters
+        ----------
+        _xSrcView : CCameraView
+            The source camera view.
+        _iFaceSize : int
+            Width and height of each face in pixels. The faces have a field of view of 90 degrees.
+        _lFaces : Optional[list[str]], optional
+            The faces to create, out of 'front', 'right', 'back', 'left', 'up' and 'down'.
+            If None, all faces are created.
+        _bFixedPoint : bool, optional
+            If True, fixed point maps are created, see GetMaps().
+
+        Returns
+        -------
+        dict[str, CRectifyMaps]
+            The maps per face name.
+        """
+        lFaces = list(g_dicCubeFaceRotations.keys()) if _lFaces is None else _lFaces
+        for sFace in lFaces:
+            if sFace not in g_dicCubeFaceRotations:
+                raise CAnyExcept(f"Unknown cube map face '{sFace}'")
+            # endif
+        # endfor
+
+        # Pixel centers are at integer positions, so that the faces are symmetric about the center
+        fFocLen = _iFaceSize / 2.0
+        fCtr = (_iFaceSize - 1) / 2.0
+
+        lMaps = self.GetMapSet(
+            _xSrcView,
+            _fDstFocalLengthX=fFocLen,
+            _fDstFocalLengthY=fFocLen,
+            _fDstPrinciplePointX=fCtr,
+            _fDstPrinciplePointY=fCtr,
+            _iDstImageWidth=_iFaceSize,
+            _iDstImageHeight=_iFaceSize,
+            _lRotationMatrices=[g_dicCubeFaceRotations[sFace] for sFace in lFaces],
+            _bFixedPoint=_bFixedPoint,
+        )
+
+        return dict(zip(lFaces, lMaps))
+
+    # enddef
+
+    #############################################################################
+    @staticmethod
+    def ConvertToFixedPoint(
+        _aMapX: np.ndarray, _aMapY: np.ndarray, _aPointsInFoV: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Convert float maps to the fixed point maps of OpenCV, mapping invalid pixels to (-1, -1).
+        The float maps are in the pixel coordinates of the camera views, where the center of the top-left
+        pixel is at (0.5, 0.5). They are shifted by half a pixel to the pixel coordinates of OpenCV,
+        as the fixed point maps cannot be shifted after the conversion."""
+        try:
+            import cv2
+        except ImportError as xEx:
+            raise CAnyExcept("OpenCV (cv2) is required to create fixed point maps") from xEx
+        # endtry
+
+        aMapX = np.where(_aPointsInFoV, _aMapX - 0.5, -1.0).astype(np.float32)
+        aMapY = np.where(_aPointsInFoV, _aMapY - 0.5, -1.0).astype(np.float32)
+
+        return cv2.convertMaps(aMapX, aMapY, cv2.CV_16SC2)
+
+    # enddef
+
+    #############################################################################
+    def _Add(self, _sKey: str, _xEntry: CRectifyMapCacheEntry):
+        self._dicEntries[_sKey] = _xEntry
+        self._iSize_bytes += _xEntry.xMaps.iByteCnt
+
+        # Keep at least the newest entry, even if it exceeds the memory budget
+        while self._iSize_bytes > self._iMaxSize_bytes and len(self._dicEntries) > 1:
+            _, xEntry = self._dicEntries.popitem(last=False)
+            self._iSize_bytes -= xEntry.xMaps.iByteCnt
+        # endwhile
+
+    # enddef
+
+    #############################################################################
+    def Clear(self):
+        self._dicEntries.clear()
+        self._iSize_bytes = 0
+
+    # enddef
+
+
+# endclass
+
+
+#############################################################################
+# Process-wide rectification map cache
+g_xRectifyMapCache: CRectifyMapCache = CRectifyMapCache()
+
+
+#############################################################################
+def GetRectifyMapCache() -> CRectifyMapCache:
+    return g_xRectifyMapCache
+
+
+# enddef
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \obj\cls_rectify_pipeline.py
+# Created Date: Friday, October 16th 2026, 8:41:17 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import os
+import time
+import fnmatch
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Union
+
+from anybase.cls_anyexcept import CAnyExcept
+from .cls_cameraview import CCameraView
+from .cls_rectify_map_cache import CRectifyMaps, CRectifyMapCache, GetRectifyMapCache
+
+# File name patterns of label and depth images, which are remapped with nearest neighbour interpolation.
+# Linear interpolation would mix label ids, and depth values across depth discontinuities.
+g_tLabelPatterns: tuple[str, ...] = ("*label*", "*semseg*", "*instance*", "*depth*")
+
+
+#############################################################################
+class CRectifyTarget(NamedTuple):
+    # Name of the target, which is used as name of the output sub-folder
+    sName: str
+    xMaps: CRectifyMaps
+    # Maps in OpenCV pixel coordinates for nearest neighbour interpolation, of type float32
+    aMapX: np.ndarray
+    aMapY: np.ndarray
+    # Fixed point maps for linear and cubic interpolation, or None if float maps are used
+    aMapFixed1: Optional[np.ndarray]
+    aMapFixed2: Optional[np.ndarray]
+
+
+# endclass
+
+
+#############################################################################
+class CRectifyPipelineStats(NamedTuple):
+    iFrameCnt: int
+    iImageCnt: int
+    fTime_s: float
+
+    @property
+    def fFramesPerSec(self) -> float:
+        return self.iFrameCnt / self.fTime_s if self.fTime_s > 0.0 else 0.0
+
+    # enddef
+
+
+# endclass
+
+
+#############################################################################
+def _ImportCv2():
+    # need to enable OpenExr explicitly
+    os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
+    try:
+        import cv2
+    except ImportError as xEx:
+        raise CAnyExcept("OpenCV (cv2) is required for the rectification pipeline") from xEx
+    # endtry
+
+    return cv2
+
+
+# enddef
+
+
+#############################################################################
+def LoadImage(_xFilePath: Union[str, Path]) -> np.ndarray:
+    """Load an image unchanged from an OpenEXR or other image file, or from a numpy '.npy' file."""
+    pathFile = Path(_xFilePath)
+
+    if pathFile.suffix == ".npy":
+        return np.load(pathFile)
+    # endif
+
+    cv2 = _ImportCv2()
+    imgData = cv2.imread(pathFile.as_posix(), cv2.IMREAD_ANYCOLOR | cv2.IMREAD_ANYDEPTH | cv2.IMREAD_UNCHANGED)
+    if imgData is None:
+        raise CAnyExcept(f"Image could not be loaded: {pathFile.as_posix()}")
+    # endif
+
+    return imgData
+
+
+# enddef
+
+
+#############################################################################
+def SaveImage(_xFilePath: Union[str, Path], _imgData: np.ndarray):
+    """Save an image to an OpenEXR or other image file, or to a numpy '.npy' file."""
+    pathFile = Path(_xFilePath)
+
+    if pathFile.suffix == ".npy":
+        np.save(pathFile, _imgData)
+        return
+    # endif
+
+    cv2 = _ImportCv2()
+    if not cv2.imwrite(pathFile.as_posix(), _imgData):
+        raise CAnyExcept(f"Image could not be written: {pathFile.as_posix()}")
+    # endif
+
+
+# enddef
+
+
+#############################################################################
+class CRectifyPipeline:
+    """Streaming rectification of rendered image sequences of a source camera to virtual pinhole cameras.
+
+    Frames are read ahead in a bounded queue, remapped in a thread pool and written asynchronously.
+    OpenCV releases the GIL while reading, remapping and writing images, so that the stages run in parallel.
+    The number of frames in memory is bounded by the prefetch and pending counts, independent of the
+    length of the sequence. The output images of a target are written to the sub-folder of the
+    target name, with the file names of the source frames.
+    """
+
+    #############################################################################
+    def __init__(
+        self,
+        _xSrcView: CCameraView,
+        *,
+        iThreadCnt: Optional[int] = None,
+        iPrefetchCnt: Optional[int] = None,
+        iMaxPendingCnt: Optional[int] = None,
+        bFixedPoint: bool = True,
+        xMapCache: Optional[CRectifyMapCache] = None,
+    ):
+        self._xSrcView: CCameraView = _xSrcView
+        self._iThreadCnt: int = max(1, iThreadCnt if iThreadCnt is not None else min(8, os.cpu_count() or 1))
+        self._iPrefetchCnt: int = max(1, iPrefetchCnt if iPrefetchCnt is not None else self._iThreadCnt)
+        self._iMaxPendingCnt: int = max(1, iMaxPendingCnt if iMaxPendingCnt is not None else 2 * self._iThreadCnt)
+        self._bFixedPoint: bool = bFixedPoint
+        self._xMapCache: CRectifyMapCache = xMapCache if xMapCache is not None else GetRectifyMapCache()
+        self._dicTargets: dict[str, CRectifyTarget] = {}
+
+    # enddef
+
+    #############################################################################
+    @property
+    def dicTargets(self) -> dict[str, CRectifyTarget]:
+        return self._dicTargets
+
+    # enddef
+
+    #############################################################################
+    def AddTarget(
+        self,
+        _sName: str,
+        *,
+        _fDstFocalLengthX: float,
+        _fDstFocalLengthY: float,
+        _fDstPrinciplePointX: float,
+        _fDstPrinciplePointY: float,
+        _iDstImageWidth: int,
+        _iDstImageHeight: int,
+        _aRotationMatrix: Optional[np.ndarray] = None,
+    ) -> CRectifyTarget:
+        """Add a virtual pinhole camera as target. See util.MapToVirtualPinholeCamera() for the parameters."""
+        dicArgs = dict(
+            _fDstFocalLengthX=_fDstFocalLengthX,
+            _fDstFocalLengthY=_fDstFocalLengthY,
+            _fDstPrinciplePointX=_fDstPrinciplePointX,
+            _fDstPrinciplePointY=_fDstPrinciplePointY,
+            _iDstImageWidth=_iDstImageWidth,
+            _iDstImageHeight=_iDstImageHeight,
+            _aRotationMatrix=_aRotationMatrix,
+        )
+        xMaps = self._xMapCache.GetMaps(self._xSrcView, **dicArgs)
+
+        xFixedMaps = None
+        if self._bFixedPoint is True:
+            xFixedMaps = self._xMapCache.GetMaps(self._xSrcView, **dicArgs, _bFixedPoint=True)
+        # endif
+
+        return self.AddTargetMaps(_sName, xMaps, _xFixedMaps=xFixedMaps)
+
+    # enddef
+
+    #############################################################################
+    def AddCubeTargets(self, *, _iFaceSize: int, _lFaces: Optional[list[str]] = None) -> list[CRectifyTarget]:
+        """Add the faces of a cube map around the source camera as targets, named by the face names."""
+        dicMaps = self._xMapCache.GetCubeMaps(self._xSrcView, _iFaceSize=_iFaceSize, _lFaces=_lFaces)
+
+        dicFixedMaps: dict[str, CRectifyMaps] = {}
+        if self._bFixedPoint is True:
+            dicFixedMaps = self._xMapCache.GetCubeMaps(
+                self._xSrcView, _iFaceSize=_iFaceSize, _lFaces=_lFaces, _bFixedPoint=True
+            )
+        # endif
+
+        return [
+            self.AddTargetMaps(sFace, xMaps, _xFixedMaps=dicFixedMaps.get(sFace)) for sFace, xMaps in dicMaps.items()
+        ]
+
+    # enddef
+
+    #############################################################################
+    def AddTargetMaps(
+        self, _sName: str, _xMaps: CRectifyMaps, *, _xFixedMaps: Optional[CRectifyMaps] = None
+    ) -> CRectifyTarget:
+        """Add a target from float rectification maps.
+        If fixed point maps are used and _xFixedMaps is None, the fixed point maps are created from the float maps.
+        Otherwise, _xFixedMaps must be the fixed point maps of the same virtual camera,
+        as returned by CRectifyMapCache.GetMaps() with _bFixedPoint=True.
+        """
+        if _xMaps.aMapX.dtype != np.float32:
+            raise CAnyExcept(f"Target '{_sName}' requires float rectification maps")
+        # endif
+
+        if _xFixedMaps is not None and _xFixedMaps.aMapX.dtype != np.int16:
+            raise CAnyExcept(f"Target '{_sName}' requires fixed point rectification maps as '_xFixedMaps'")
+        # endif
+
+        # The camera views place the center of the top-left pixel at (0.5, 0.5),
+        # while OpenCV places it at (0, 0). Pixels outside the field of view are mapped
+        # to (-1, -1), so that they obtain the border value.
+        aMapX = np.where(_xMaps.aPointsInFoV, _xMaps.aMapX - 0.5, -1.0).astype(np.float32)
+        aMapY = np.where(_xMaps.aPointsInFoV, _xMaps.aMapY - 0.5, -1.0).astype(np.float32)
+
+        aMapFixed1, aMapFixed2 = None, None
+        if self._bFixedPoint is True:
+            if _xFixedMaps is None:
+                # Shifts the float maps to the pixel coordinates of OpenCV, like the cached fixed point maps
+                aMapFixed1, aMapFixed2 = CRectifyMapCache.ConvertToFixedPoint(
+                    _xMaps.aMapX, _xMaps.aMapY, _xMaps.aPointsInFoV
+                )
+            else:
+                aMapFixed1, aMapFixed2 = _xFixedMaps.aMapX, _xFixedMaps.aMapY
+            # endif
+        # endif
+
+        xTarget = CRectifyTarget(
+            sName=_sName,
+            xMaps=_xMaps,
+            aMapX=aMapX,
+            aMapY=aMapY,
+            aMapFixed1=aMapFixed1,
+            aMapFixed2=aMapFixed2,
+        )
+        self._dicTargets[_sName] = xTarget
+
+        return xTarget
+
+    # enddef
+
+    #############################################################################
+    @staticmethod
+    def Remap(_xTarget: CRectifyTarget, _imgSrc: np.ndarray, *, _bNearest: bool, _fBorderValue: float = 0.0):
+        """Remap a source image to a target. Images with more than four channels are remapped in parts."""
+        cv2 = _ImportCv2()
+
+        if _bNearest is True:
+            aMap1, aMap2, iInterpolation = _xTarget.aMapX, _xTarget.aMapY, cv2.INTER_NEAREST
+        elif _xTarget.aMapFixed1 is not None:
+            aMap1, aMap2, iInterpolation = _xTarget.aMapFixed1, _xTarget.aMapFixed2, cv2.INTER_LINEAR
+        else:
+            aMap1, aMap2, iInterpolation = _xTarget.aMapX, _xTarget.aMapY, cv2.INTER_LINEAR
+        # endif
+
+        def RemapChannels(_imgData: np.ndarray) -> np.ndarray:
+            return cv2.remap(
+                _imgData,
+                aMap1,
+                aMap2,
+                iInterpolation,
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=_fBorderValue,
+            )
+
+        # enddef
+
+        if _imgSrc.ndim == 3 and _imgSrc.shape[2] > 4:
+            return np.stack([RemapChannels(_imgSrc[:, :, iChIdx]) for iChIdx in range(_imgSrc.shape[2])], axis=2)
+        # endif
+
+        imgDst = RemapChannels(_imgSrc)
+        if _imgSrc.ndim == 3 and imgDst.ndim == 2:
+            imgDst = imgDst[:, :, np.newaxis]
+        # endif
+
+        return imgDst
+
+    # enddef
+
+    #############################################################################
+    def Process(
+        self,
+        _xFrames: Union[str, Path, list],
+        _xOutputPath: Union[str, Path],
+        *,
+        _sFilePattern: str = "*.exr",
+        _sInterpolation: str = "auto",
+        _lLabelPatterns: Optional[list[str]] = None,
+        _fBorderValue: float = 0.0,
+        _funcProgress: Optional[Callable[[int, int, float], None]] = None,
+    ) -> CRectifyPipelineStats:
+        """Rectify a sequence of frames to all targets.
+
+        Parameters
+        ----------
+        _xFrames : Union[str, Path, list]
+            A frame folder, a single image file or a list of image files.
+        _xOutputPath : Union[str, Path]
+            The output folder, in which a sub-folder per target is created.
+        _sFilePattern : str, optional
+            Glob pattern of the frame files, if a folder is given.
+        _sInterpolation : str, optional
+            One of 'linear', 'nearest' or 'auto'. For 'auto', nearest neighbour interpolation is used
+            for label and depth images, whose file names match one of the label patterns,
+            and linear interpolation otherwise.
+        _lLabelPatterns : Optional[list[str]], optional
+            File name patterns of label and depth images. Defaults to g_tLabelPatterns.
+        _fBorderValue : float, optional
+            Value of the target pixels outside the field of view of the source camera.
+        _funcProgress : Optional[Callable[[int, int, float], None]], optional
+            Called after each frame with the number of finished frames, the total number of frames
+            and the current frames per second.
+
+        Returns
+        -------
+        CRectifyPipelineStats
+            The number of frames and images written, and the total time.
+        """
+        if len(self._dicTargets) == 0:
+            raise CAnyExcept("No rectification targets added to pipeline")
+        # endif
+
+        if _sInterpolation not in ("linear", "nearest", "auto"):
+            raise CAnyExcept(f"Unsupported interpolation '{_sInterpolation}'")
+        # endif
+        tLabelPatterns = tuple(_lLabelPatterns) if _lLabelPatterns is not None else g_tLabelPatterns
+
+        if isinstance(_xFrames, (str, Path)):
+            pathFrames = Path(_xFrames)
+            if pathFrames.is_dir():
+                lFiles = sorted(pathFrames.glob(_sFilePattern))
+            else:
+                lFiles = [pathFrames]
+            # endif
+        else:
+            lFiles = [Path(x) for x in _xFrames]
+        # endif
+
+        pathOutput = Path(_xOutputPath)
+        for sName in self._dicTargets:
+            (pathOutput / sName).mkdir(parents=True, exist_ok=True)
+        # endfor
+
+        def IsLabel(_pathFile: Path) -> bool:
+            if _sInterpolation == "auto":
+                sName = _pathFile.name.lower()
+                return any(fnmatch.fnmatch(sName, sPattern) for sPattern in tLabelPatterns)
+            # endif
+            return _sInterpolation == "nearest"
+
+        # enddef
+
+        def RemapAndSave(_xTarget: CRectifyTarget, _pathFile: Path, _imgSrc: np.ndarray):
+            imgDst = CRectifyPipeline.Remap(
+                _xTarget, _imgSrc, _bNearest=IsLabel(_pathFile), _fBorderValue=_fBorderValue
+            )
+            SaveImage(pathOutput / _xTarget.sName / _pathFile.name, imgDst)
+
+        # enddef
+
+        iFrameCnt = len(lFiles)
+        iFrameDoneCnt = 0
+        iImageCnt = 0
+        fStart_s = time.perf_counter()
+
+        # The futures of the images of a frame are kept together, so that the progress is reported per frame
+        dqRead = deque()
+        dqPending = deque()
+
+        def FinishFrame():
+            nonlocal iFrameDoneCnt, iImageCnt
+            for xFuture in dqPending.popleft():
+                xFuture.result()
+                iImageCnt += 1
+            # endfor
+            iFrameDoneCnt += 1
+            if _funcProgress is not None:
+                fTime_s = time.perf_counter() - fStart_s
+                _funcProgress(iFrameDoneCnt, iFrameCnt, iFrameDoneCnt / fTime_s if fTime_s > 0.0 else 0.0)
+            # endif
+
+        # enddef
+
+        def SubmitFrame(_xWorkPool: ThreadPoolExecutor):
+            pathFile, xFuture = dqRead.popleft()
+            imgSrc = xFuture.result()
+            dqPending.append(
+                [_xWorkPool.submit(RemapAndSave, xTarget, pathFile, imgSrc) for xTarget in self._dicTargets.values()]
+            )
+            while len(dqPending) > self._iMaxPendingCnt:
+                FinishFrame()
+            # endwhile
+
+        # enddef
+
+        with ThreadPoolExecutor(max_workers=self._iPrefetchCnt) as xReadPool, ThreadPoolExecutor(
+            max_workers=self._iThreadCnt
+        ) as xWorkPool:
+            try:
+                for pathFile in lFiles:
+                    dqRead.append((pathFile, xReadPool.submit(LoadImage, pathFile)))
+                    if len(dqRead) > self._iPrefetchCnt:
+                        SubmitFrame(xWorkPool)
+                    # endif
+                # endfor
+
+                while len(dqRead) > 0:
+                    SubmitFrame(xWorkPool)
+                # endwhile
+
+                while len(dqPending) > 0:
+                    FinishFrame()
+                # endwhile
+            finally:
+                # Do not process the remaining frames, if an error occurred
+                for _, xFuture in dqRead:
+                    xFuture.cancel()
+                # endfor
+                for lFutures in dqPending:
+                    for xFuture in lFutures:
+                        xFuture.cancel()
+                    # endfor
+                # endfor
+            # endtry
+        # endwith
+
+        return CRectifyPipelineStats(
+            iFrameCnt=iFrameDoneCnt, iImageCnt=iImageCnt, fTime_s=time.perf_counter() - fStart_s
+        )
+
+    # enddef
+
+
+# endclass
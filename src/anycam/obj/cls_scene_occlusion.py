@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \obj\cls_scene_occlusion.py
+# Created Date: Friday, October 16th 2026, 6:03:18 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import bpy
+import numpy as np
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Union
+from mathutils.bvhtree import BVHTree
+
+from anybase.cls_anyexcept import CAnyExcept
+from .cls_cameraview import CCameraView
+
+
+# Object types that are converted to meshes for the occlusion test
+g_setGeometryTypes: set[str] = {"MESH", "CURVE", "SURFACE", "META", "FONT"}
+
+# Modifier types whose result may change from frame to frame, without the object being animated
+g_setTimeDependentModifierTypes: set[str] = {
+    "CLOTH",
+    "SOFT_BODY",
+    "FLUID",
+    "DYNAMIC_PAINT",
+    "OCEAN",
+    "EXPLODE",
+    "PARTICLE_SYSTEM",
+    "WAVE",
+    "MESH_CACHE",
+    "MESH_SEQUENCE_CACHE",
+    "NODES",
+}
+
+
+#############################################################################
+class CSceneVisibility(NamedTuple):
+    aPixXY: np.ndarray
+    aInFront: np.ndarray
+    aInImage: np.ndarray
+    aOccluded: np.ndarray
+    aHitDist_m: np.ndarray
+    aVisible: np.ndarray
+
+
+# endclass
+
+
+#############################################################################
+class CSceneOcclusionTree(NamedTuple):
+    tKey: tuple
+    setObjNames: set[str]
+    xTree: Optional[BVHTree]
+
+
+# endclass
+
+
+#############################################################################
+def _HasAnimData(_xId) -> bool:
+    if _xId is None:
+        return False
+    # endif
+
+    xAnimData = getattr(_xId, "animation_data", None)
+    if xAnimData is None:
+        return False
+    # endif
+
+    return xAnimData.action is not None or len(xAnimData.drivers) > 0
+
+
+# enddef
+
+
+#############################################################################
+def _IsObjectAnimated(_objX: bpy.types.Object) -> bool:
+    objX = _objX
+    while objX is not None:
+        if _HasAnimData(objX) or _HasAnimData(objX.data):
+            return True
+        # endif
+
+        if _HasAnimData(getattr(objX.data, "shape_keys", None)):
+            return True
+        # endif
+
+        for modX in objX.modifiers:
+            if modX.type in g_setTimeDependentModifierTypes:
+                return True
+            # endif
+
+            objTarget = getattr(modX, "object", None)
+            if objTarget is not None and objTarget != objX and _HasAnimData(objTarget):
+                return True
+            # endif
+        # endfor
+
+        for conX in objX.constraints:
+            objTarget = getattr(conX, "target", None)
+            if objTarget is not None and objTarget != objX and _HasAnimData(objTarget):
+                return True
+            # endif
+        # endfor
+
+        objX = objX.parent
+    # endwhile
+
+    return False
+
+
+# enddef
+
+
+#############################################################################
+def _GetObjectTriangles(_objEval: bpy.types.Object, _fMeterPerBU: float) -> tuple[np.ndarray, np.ndarray]:
+    # Returns the vertices in world coordinates in meters and the vertex indices of the triangles
+    meshX = _objEval.to_mesh()
+    try:
+        if meshX is None:
+            return np.zeros((0, 3), dtype=np.float64), np.zeros((0, 3), dtype=np.int64)
+        # endif
+
+        meshX.calc_loop_triangles()
+
+        aVex = np.empty(len(meshX.vertices) * 3, dtype=np.float32)
+        meshX.vertices.foreach_get("co", aVex)
+
+        aTri = np.empty(len(meshX.loop_triangles) * 3, dtype=np.int32)
+        meshX.loop_triangles.foreach_get("vertices", aTri)
+    finally:
+        _objEval.to_mesh_clear()
+    # endtry
+
+    aMatrix = np.array(_objEval.matrix_world, dtype=np.float64)
+    aVex = aVex.reshape(-1, 3) @ aMatrix[0:3, 0:3].T
+    aVex += aMatrix[0:3, 3]
+    aVex *= _fMeterPerBU
+
+    return aVex, aTri.reshape(-1, 3).astype(np.int64)
+
+
+# enddef
+
+
+#############################################################################
+def _CreateTree(_lObjects: list, _xDepsgraph: bpy.types.Depsgraph, _fMeterPerBU: float) -> Optional[BVHTree]:
+    lVex = []
+    lTri = []
+    iVexCnt = 0
+    for objX in _lObjects:
+        aVex, aTri = _GetObjectTriangles(objX.evaluated_get(_xDepsgraph), _fMeterPerBU)
+        if aTri.shape[0] == 0:
+            continue
+        # endif
+
+        lVex.append(aVex)
+        lTri.append(aTri + iVexCnt)
+        iVexCnt += aVex.shape[0]
+    # endfor
+
+    if len(lTri) == 0:
+        return None
+    # endif
+
+    return BVHTree.FromPolygons(np.concatenate(lVex).tolist(), np.concatenate(lTri).tolist(), all_triangles=True)
+
+
+# enddef
+
+
+#############################################################################
+class CSceneOcclusion:
+    """Occlusion test of points against the geometry of a set of collections.
+
+    The geometry is held in two BVH trees. The tree of the static objects is reused for all frames,
+    as long as the static objects, their transforms and mesh data are unchanged.
+    The tree of the animated objects is created per frame and kept for the last frames evaluated.
+    """
+
+    #############################################################################
+    def __init__(self, *, iMaxFrameCnt: int = 8):
+        self._iMaxFrameCnt: int = max(1, iMaxFrameCnt)
+        self._xStatic: Optional[CSceneOcclusionTree] = None
+        self._dicAnimated: OrderedDict[tuple, CSceneOcclusionTree] = OrderedDict()
+
+    # enddef
+
+    #############################################################################
+    @property
+    def iMaxFrameCnt(self) -> int:
+        return self._iMaxFrameCnt
+
+    # enddef
+
+    @property
+    def iAnimatedTreeCnt(self) -> int:
+        return len(self._dicAnimated)
+
+    # enddef
+
+    #############################################################################
+    @staticmethod
+    def GetObjects(_lCollections: list[Union[str, bpy.types.Collection]]) -> list[bpy.types.Object]:
+        """Get the renderable geometry objects of the given collections and their child collections."""
+        dicObjects: dict[str, bpy.types.Object] = {}
+        for xColl in _lCollections:
+            if isinstance(xColl, str):
+                clnX = bpy.data.collections.get(xColl)
+                if clnX is None:
+                    raise CAnyExcept(f"Collection '{xColl}' not found")
+                # endif
+            else:
+                clnX = xColl
+            # endif
+
+            for objX in clnX.all_objects:
+                if objX.type in g_setGeometryTypes and objX.hide_render is False:
+                    dicObjects[objX.name] = objX
+                # endif
+            # endfor
+        # endfor
+
+        return [dicObjects[sName] for sName in sorted(dicObjects)]
+
+    # enddef
+
+    #############################################################################
+    def _GetStaticTree(
+        self, _lObjects: list, _xDepsgraph: bpy.types.Depsgraph, _fMeterPerBU: float
+    ) -> Optional[BVHTree]:
+        lKey = [_fMeterPerBU]
+        for objX in _lObjects:
+            objEval = objX.evaluated_get(_xDepsgraph)
+            xData = objX.data
+            lKey.append(
+                (
+                    objX.name,
+                    None if xData is None else xData.as_pointer(),
+                    tuple(tuple(xRow) for xRow in objEval.matrix_world),
+                )
+            )
+        # endfor
+        tKey = tuple(lKey)
+
+        if self._xStatic is None or self._xStatic.tKey != tKey:
+            self._xStatic = CSceneOcclusionTree(
+                tKey=tKey,
+                setObjNames={objX.name for objX in _lObjects},
+                xTree=_CreateTree(_lObjects, _xDepsgraph, _fMeterPerBU),
+            )
+        # endif
+
+        return self._xStatic.xTree
+
+    # enddef
+
+    #############################################################################
+    def _GetAnimatedTree(
+        self, _lObjects: list, _xDepsgraph: bpy.types.Depsgraph, _fMeterPerBU: float
+    ) -> Optional[BVHTree]:
+        if len(_lObjects) == 0:
+            return None
+        # endif
+
+        xScene = _xDepsgraph.scene
+        tKey = (
+            xScene.name,
+            xScene.frame_current + xScene.frame_subframe,
+            _fMeterPerBU,
+            tuple(objX.name for objX in _lObjects),
+        )
+
+        xEntry = self._dicAnimated.get(tKey)
+        if xEntry is None:
+            xEntry = CSceneOcclusionTree(
+                tKey=tKey,
+                setObjNames={objX.name for objX in _lObjects},
+                xTree=_CreateTree(_lObjects, _xDepsgraph, _fMeterPerBU),
+            )
+            self._dicAnimated[tKey] = xEntry
+
+            while len(self._dicAnimated) > self._iMaxFrameCnt:
+                self._dicAnimated.popitem(last=False)
+            # endwhile
+        # endif
+        self._dicAnimated.move_to_end(tKey)
+
+        return xEntry.xTree
+
+    # enddef
+
+    #############################################################################
+    def EvalVisibility(
+        self,
+        _xView: CCameraView,
+        _aPointsXYZ_m: np.ndarray,
+        *,
+        _lCollections: list[Union[str, bpy.types.Collection]],
+        _xDepsgraph: Optional[bpy.types.Depsgraph] = None,
+        _fTolerance_m: float = 1e-3,
+    ) -> CSceneVisibility:
+        """Project 3D-world points to image and test whether they are occluded by the scene geometry.
+
+        Parameters
+        ----------
+        _xView : CCameraView
+            The camera view with the extrinsics of the camera at the current frame.
+        _aPointsXYZ_m : np.ndarray
+            Array of shape (N, 3) with coordinates of 3D-points in world coordinate system.
+        _lCollections : list[Union[str, bpy.types.Collection]]
+            Collections, or their names, with the objects that may occlude the points.
+        _xDepsgraph : Optional[bpy.types.Depsgraph], optional
+            The evaluated dependency graph. If None, the one of the current context is used.
+        _fTolerance_m : float, optional
+            Geometry closer than this distance to a point does not occlude it,
+            so that points lying on a surface are visible.
+
+        Returns
+        -------
+        CSceneVisibility
+            The projection of the points as returned by ProjectToImageArray(),
+            flags whether points in the image are occluded,
+            the distance from the camera origin to the occluding surface, or infinity if there is none,
+            and flags whether points are in the image and not occluded.
+        """
+        aPixXY, aInFront, aInImage = _xView.ProjectToImageArray(_aPointsXYZ_m)
+
+        if _xDepsgraph is None:
+            xDepsgraph = bpy.context.evaluated_depsgraph_get()
+        else:
+            xDepsgraph = _xDepsgraph
+        # endif
+        fMeterPerBU: float = xDepsgraph.scene.unit_settings.scale_length
+
+        lObjects = CSceneOcclusion.GetObjects(_lCollections)
+        lAnimated = []
+        lStatic = []
+        for objX in lObjects:
+            if _IsObjectAnimated(objX):
+                lAnimated.append(objX)
+            else:
+                lStatic.append(objX)
+            # endif
+        # endfor
+
+        lTrees = [
+            xTree
+            for xTree in (
+                self._GetStaticTree(lStatic, xDepsgraph, fMeterPerBU),
+                self._GetAnimatedTree(lAnimated, xDepsgraph, fMeterPerBU),
+            )
+            if xTree is not None
+        ]
+
+        aHitDist_m = np.full(aInImage.shape[0], np.inf)
+        aIdx = np.flatnonzero(aInImage)
+        if len(lTrees) > 0 and aIdx.shape[0] > 0:
+            aOrig_m = np.array(_xView.lOrig_m, dtype=np.float64)
+            aDirs = np.asarray(_aPointsXYZ_m, dtype=np.float64)[aIdx] - aOrig_m
+            aDist_m = np.linalg.norm(aDirs, axis=1)
+            aDirs /= np.maximum(aDist_m, 1e-12)[:, np.newaxis]
+            aMaxDist_m = np.maximum(aDist_m - _fTolerance_m, 0.0)
+
+            # BVHTree has no batch ray cast, so only the rays of points in the image are cast.
+            tOrig_m = tuple(aOrig_m.tolist())
+            for iIdx, tDir, fMaxDist_m in zip(aIdx.tolist(), aDirs.tolist(), aMaxDist_m.tolist()):
+                if fMaxDist_m <= 0.0:
+                    continue
+                # endif
+
+                fHitDist_m = np.inf
+                for xTree in lTrees:
+                    fDist_m = xTree.ray_cast(tOrig_m, tDir, min(fMaxDist_m, fHitDist_m))[3]
+                    if fDist_m is not None and fDist_m < fHitDist_m:
+                        fHitDist_m = fDist_m
+                    # endif
+                # endfor
+                aHitDist_m[iIdx] = fHitDist_m
+            # endfor
+        # endif
+
+        aOccluded = np.isfinite(aHitDist_m)
+
+        return CSceneVisibility(
+            aPixXY=aPixXY,
+            aInFront=aInFront,
+            aInImage=aInImage,
+            aOccluded=aOccluded,
+            aHitDist_m=aHitDist_m,
+            aVisible=aInImage & ~aOccluded,
+        )
+
+    # enddef
+
+    #############################################################################
+    def InvalidateObject(self, _sObjName: str):
+        if self._xStatic is not None and _sObjName in self._xStatic.setObjNames:
+            self._xStatic = None
+        # endif
+
+    # enddef
+
+    #############################################################################
+    def Clear(self):
+        self._xStatic = None
+        self._dicAnimated.clear()
+
+    # enddef
+
+
+# endclass
+
+
+#############################################################################
+# Process-wide scene occlusion test
+g_xSceneOcclusion: CSceneOcclusion = CSceneOcclusion()
+
+
+#############################################################################
+def GetSceneOcclusion() -> CSceneOcclusion:
+    return g_xSceneOcclusion
+
+
+# enddef
@@ -26,9 +26,133 @@
 # </LICENSE>
 ###
 
+import copy
 import numpy as np
 
 
+def GetVirtualPinholeIntrinsics(
+    _fDstFocalLengthX, _fDstFocalLengthY, _fDstPrinciplePointX, _fDstPrinciplePointY
+) -> np.ndarray:
+    """Get the intrinsic matrix (3x3) of a virtual pinhole camera."""
+    return np.array(
+        [
+            [_fDstFocalLengthX, 0, _fDstPrinciplePointX],
+            [0, _fDstFocalLengthY, _fDstPrinciplePointY],
+            [0, 0, 1],
+        ]
+    )
+
+
+# enddef
+
+
+def GetVirtualPinholeWorldToCamMatrix(_SrcCamera, _aRotationMatrix=None) -> np.ndarray:
+    """Get the transformation matrix (3x4) of world points into the frame of a virtual pinhole camera,
+    which is rotated by the given rotation matrix with respect to the source camera.
+    The virtual camera frame has its x-axis pointing right, y-axis pointing down and z-axis in view direction.
+    """
+    if type(_aRotationMatrix) is np.ndarray:
+        aRotationMatrix = np.copy(_aRotationMatrix)
+    else:
+        aRotationMatrix = np.eye(3)
+    # endif
+
+    aSrcCamOrigin = np.array(_SrcCamera._lOrig_m)
+    aSrcCam2WorldRotationMatrix = np.array(_SrcCamera._lAxes)
+    aFlipMat = np.array([[1, 0, 0], [0, -1, 0], [0, 0, -1]])
+
+    # construct world to blender camera matrix
+    aDstWorld2CamRotationMatrix = np.hstack(
+        (
+            aSrcCam2WorldRotationMatrix,
+            -aSrcCam2WorldRotationMatrix @ aSrcCamOrigin.reshape((-1, 1)),
+        )
+    )
+    # rotate by specified rotation matrix
+    return aFlipMat @ aRotationMatrix @ aDstWorld2CamRotationMatrix
+
+
+# enddef
+
+
+def EvalVirtualPinholeMaps(_SrcCamera, _aDstIntrinsics, _lDstImageWidth, _lDstImageHeight, _lRotationMatrices):
+    """Evaluate the look-up maps from a set of rotated virtual pinhole cameras with equal intrinsics to a source camera.
+
+    Parameters
+    ----------
+    _SrcCamera : CCameraView
+        Camera model which to use as source
+    _aDstIntrinsics : np.ndarray
+        Intrinsic matrix (3x3) of the virtual pinhole cameras.
+    _lDstImageWidth : int
+        Width of destination images.
+    _lDstImageHeight : int
+        Height of destination images.
+    _lRotationMatrices : list
+        Rotation matrices indicating rotation of virtual cameras with respect to source camera.
+        An element may be None for no rotation.
+
+    Returns
+    -------
+    aMapX: np.ndarray
+        Maps in the x direction of shape (M, _lDstImageHeight, _lDstImageWidth), for M rotations.
+    aMapY: np.ndarray
+        Maps in the y direction of shape (M, _lDstImageHeight, _lDstImageWidth).
+    aPointsInFoV: np.ndarray
+        Masks which points are within the cameras field of view, of shape (M, _lDstImageHeight, _lDstImageWidth).
+    """
+    iRotCnt = len(_lRotationMatrices)
+    aRotationMatrices = np.empty((iRotCnt, 3, 3))
+    for iIdx, aRotationMatrix in enumerate(_lRotationMatrices):
+        aRotationMatrices[iIdx] = np.eye(3) if aRotationMatrix is None else aRotationMatrix
+    # endfor
+
+    # Directional vectors of the pixels of the virtual pinhole camera in its camera frame.
+    # The camera model has its z-axis pointing towards the camera and its y-axis pointing up,
+    # while pixel rows increase downwards. Hence, (x, y, 1) of the normalized image coordinates
+    # becomes (x, -y, -1). The directions are evaluated separably per axis, instead of
+    # applying the inverted intrinsic matrix to a homogeneous pixel grid.
+    fFocX, fFocY = _aDstIntrinsics[0, 0], _aDstIntrinsics[1, 1]
+    fCtrX, fCtrY = _aDstIntrinsics[0, 2], _aDstIntrinsics[1, 2]
+    aDirs = np.empty((_lDstImageHeight, _lDstImageWidth, 3))
+    aDirs[:, :, 0] = ((np.arange(_lDstImageWidth) - fCtrX) / fFocX)[np.newaxis, :]
+    aDirs[:, :, 1] = ((fCtrY - np.arange(_lDstImageHeight)) / fFocY)[:, np.newaxis]
+    aDirs[:, :, 2] = -1.0
+
+    # As the maps do not depend on the source camera extrinsics, the directions are rotated
+    # into the source camera frame and projected with a copy of the source camera at the world origin.
+    # The pixel grid is set up once for all rotations, and the projections are written directly
+    # into the output arrays, one rotation at a time to keep the temporary arrays small.
+    aDirs = aDirs.reshape(-1, 3)
+    iPixCnt = aDirs.shape[0]
+
+    xSrcCamera = copy.copy(_SrcCamera)
+    xSrcCamera.SetExtrinsics()
+
+    tShape = (iRotCnt, _lDstImageHeight, _lDstImageWidth)
+    aMapX = np.empty(tShape, dtype=np.float32)
+    aMapY = np.empty(tShape, dtype=np.float32)
+    aPointsInFoV = np.empty(tShape, dtype=bool)
+
+    aProjPoints = np.empty((iPixCnt, 2))
+    aInFront = np.empty(iPixCnt, dtype=bool)
+    for iIdx in range(iRotCnt):
+        xSrcCamera.ProjectToImageArray(
+            aDirs @ aRotationMatrices[iIdx],
+            _aOutPixXY=aProjPoints,
+            _aOutInFront=aInFront,
+            _aOutInImage=aPointsInFoV[iIdx].reshape(-1),
+        )
+        aMapX[iIdx] = aProjPoints[:, 0].reshape(tShape[1:])
+        aMapY[iIdx] = aProjPoints[:, 1].reshape(tShape[1:])
+    # endfor
+
+    return aMapX, aMapY, aPointsInFoV
+
+
+# enddef
+
+
 def MapToVirtualPinholeCamera(
     _SrcCamera,
     _fDstFocalLengthX,
@@ -75,24 +199,9 @@ def MapToVirtualPinholeCamera(
         Mask which points are within the cameras field of view. Array of size (_lDstImageHeight x _lDstImageWidth).
     """
     # create intrinsic camera of virtual pinhole camera
-    aDstIntrincics = np.array(
-        [
-            [_fDstFocalLengthX, 0, _fDstPrinciplePointX],
-            [0, _fDstFocalLengthY, _fDstPrinciplePointY],
-            [0, 0, 1],
-        ]
+    aDstIntrincics = GetVirtualPinholeIntrinsics(
+        _fDstFocalLengthX, _fDstFocalLengthY, _fDstPrinciplePointX, _fDstPrinciplePointY
     )
-    # invert intrinsic of virtual pinhol camera
-    aDstIntrincicsInv = np.linalg.inv(aDstIntrincics)
-
-    # get indicies of image of the virtual pinhole camera virtual
-    # the idea is to use these pixel coordinates and compute their respective mapping in the source image using
-    # the source camera model
-    aIndexY, aIndexX = np.indices((_lDstImageHeight, _lDstImageWidth))
-    # get pixels
-    aPoints_pix = np.array(
-        [aIndexX.ravel(), aIndexY.ravel(), np.ones_like(aIndexX).ravel()]
-    ).T
 
     if type(_aRotationMatrix) is np.ndarray:
         aRotationMatrix = np.copy(_aRotationMatrix)
@@ -100,63 +209,20 @@ def MapToVirtualPinholeCamera(
         aRotationMatrix = np.eye(3)
     # endif
 
-    aSrcCamOrigin = np.array(_SrcCamera._lOrig_m)
-    aSrcCam2WorldRotationMatrix = np.array(_SrcCamera._lAxes)
-    aOverallRotatonMatrix = aRotationMatrix @ aSrcCam2WorldRotationMatrix
-
-    # want to have directional vectors from camera plane towards the "outer" world.
-    # Actually for a standard pinhole model this is given by (-x, -y, f),
-    # where f is the focal length. However, since our z-axis is pointing
-    # towards the camera, we have to invert this. Hence, we have (-x, -y, -f) und thus we have
-    # ot multiply by -1.
-    # However, as the camera model (to be used later) flips the y-axis, we have to flip it in advance
-    # Hence it remains "untouched". Hence, we also multiply by -1.
-    aFlipMat = np.array([[1, 0, 0], [0, -1, 0], [0, 0, -1]])
-
-    # convert to normalized image coordinates by applying the inverted intrinsic matrix
-    # then rotate normalized image coordinates (virtual camera is now looking into the specified direction).
-    aPointsWorld = aPoints_pix @ aDstIntrincicsInv.T @ aFlipMat @ aOverallRotatonMatrix
-
-    # subsequently cope with translation
-    aDirectionVectors = aPointsWorld + aSrcCamOrigin.reshape((1, -1))
-
     # apply the source camera model to obtain the mapping of the virtual camera points in the source camera/ image.
-    aProjPoints, aPointsInFoV = _SrcCamera.ProjectToImage(aDirectionVectors)
-    aProjPoints = np.array(aProjPoints)
-    aPointsInFoV = np.array(aPointsInFoV)
-
-    # create map_x and map-y
-    aMapX = (
-        aProjPoints[:, 0]
-        .reshape((_lDstImageHeight, _lDstImageWidth))
-        .astype(np.float32)
-    )
-    aMapY = (
-        aProjPoints[:, 1]
-        .reshape((_lDstImageHeight, _lDstImageWidth))
-        .astype(np.float32)
+    aMapX, aMapY, aPointsInFoV = EvalVirtualPinholeMaps(
+        _SrcCamera, aDstIntrincics, _lDstImageWidth, _lDstImageHeight, [aRotationMatrix]
     )
 
     # construct matrix for conversion of 3D world points into new virtual camera
-    aDstWorld2CamRotationMatrix = aSrcCam2WorldRotationMatrix
-    # construct world to blender camera matrix
-    aDstWorld2CamRotationMatrix = np.hstack(
-        (
-            aDstWorld2CamRotationMatrix,
-            -aDstWorld2CamRotationMatrix @ aSrcCamOrigin.reshape((-1, 1)),
-        )
-    )
-    # rotate by specified rotation matrix
-    aDstWorld2CamRotationMatrix = (
-        aFlipMat @ aRotationMatrix @ aDstWorld2CamRotationMatrix
-    )
+    aDstWorld2CamRotationMatrix = GetVirtualPinholeWorldToCamMatrix(_SrcCamera, aRotationMatrix)
 
     return (
         aDstIntrincics,
         aDstWorld2CamRotationMatrix,
-        aMapX,
-        aMapY,
-        aPointsInFoV.reshape((_lDstImageHeight, _lDstImageWidth)),
+        aMapX[0],
+        aMapY[0],
+        aPointsInFoV[0],
     )
 
 
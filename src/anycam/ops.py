@@ -32,6 +32,8 @@ import bpy
 import mathutils
 import os
 import re
+import math
+import numpy as np
 from pathlib import Path
 import pyjson5 as json
 
@@ -39,6 +41,8 @@ from ison.util import data as isondata
 
 from . import node
 from . import obj
+from .obj.cls_cameraview_cache import GetCameraViewCache
+from .obj.cls_scene_occlusion import GetSceneOcclusion, g_setGeometryTypes
 from . import ac_global
 
 from anybase import config
@@ -1207,20 +1211,320 @@ def ApplyCameraRenderPars(_xContext, _sCamId, bOptionalApply=True):
 
 
 #######################################################################################
-def GetAnyCamView(_xContext: bpy.types.Context, _sCamId: str, *, _bAddExtrinsics: bool = False):
+def GetAnyCamView(
+    _xContext: bpy.types.Context,
+    _sCamId: str,
+    *,
+    _bAddExtrinsics: bool = False,
+    _matCamera: mathutils.Matrix = None,
+):
     dicCam: dict = GetAnyCam(_xContext, _sCamId)
     dicAnyCam: dict = dicCam.get("dicAnyCam")
 
-    if _bAddExtrinsics is True:
+    # If a world matrix is given, the extrinsics are taken from it instead of the camera object
+    if _bAddExtrinsics is True or _matCamera is not None:
         fMeterPerBU: float = bpy.context.scene.unit_settings.scale_length
         objCam: bpy.types.Object = dicCam["objCam"]
-        matCamera = objCam.matrix_world
+        matCamera = objCam.matrix_world if _matCamera is None else _matCamera
         dicAnyCam["lAxes"] = [list(x) for x in matCamera.to_euler().to_matrix().transposed()]
         dicAnyCam["lOrigin"] = [x * fMeterPerBU for x in matCamera.translation]
     # endif
 
-    # Try to get a camera
-    return obj.camera.CreateCameraView(dicAnyCam, bDoThrow=False)
+    # Try to get a camera. Views are cached per camera object, so that the camera model,
+    # e.g. a LUT read back from Blender, is only created again if the intrinsics change.
+    return GetCameraViewCache().GetView(dicCam["objCam"].name, dicAnyCam, _CreateCameraView)
+
+
+# enddef
+
+
+#######################################################################################
+# Project world points in meters into the camera at the current frame and test them for
+# occlusion by the objects of the given collections.
+def GetAnyCamPointVisibility(_xContext: bpy.types.Context, _sCamId: str, _aPointsXYZ_m, *, _lCollections: list):
+    xView = GetAnyCamView(_xContext, _sCamId, _bAddExtrinsics=True)
+    if xView is None:
+        raise CAnyExcept(f"Camera view of camera '{_sCamId}' could not be created")
+    # endif
+
+    return GetSceneOcclusion().EvalVisibility(
+        xView, _aPointsXYZ_m, _lCollections=_lCollections, _xDepsgraph=_xContext.evaluated_depsgraph_get()
+    )
+
+
+# enddef
+
+
+#######################################################################################
+def _CreateCameraView(_dicAnyCam: dict):
+    return obj.camera.CreateCameraView(_dicAnyCam, bDoThrow=False)
+
+
+# enddef
+
+
+#######################################################################################
+# Invalidate cached camera views that use an updated LUT image, e.g. after an image reload,
+# and the occlusion geometry of static objects, whose geometry was edited.
+@bpy.app.handlers.persistent
+def _HandlerCameraViewCacheDepsgraphUpdate(_xScene, _xDepsgraph):
+    xCache = GetCameraViewCache()
+    xOcclusion = GetSceneOcclusion()
+
+    for xUpdate in _xDepsgraph.updates:
+        if isinstance(xUpdate.id, bpy.types.Image):
+            if xCache.iViewCnt > 0:
+                xCache.InvalidateImage(xUpdate.id.name)
+            # endif
+        elif isinstance(xUpdate.id, bpy.types.Object) and xUpdate.is_updated_geometry:
+            xOcclusion.InvalidateObject(xUpdate.id.name)
+        # endif
+    # endfor
+
+
+# enddef
+
+
+#######################################################################################
+# Cached camera views refer to data of the previous Blender file
+@bpy.app.handlers.persistent
+def _HandlerCameraViewCacheLoad(_xScene, *args):
+    GetCameraViewCache().Clear()
+    GetSceneOcclusion().Clear()
+
+
+# enddef
+
+
+#######################################################################################
+def RegisterCameraViewCacheHandlers():
+    if _HandlerCameraViewCacheDepsgraphUpdate not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_HandlerCameraViewCacheDepsgraphUpdate)
+    # endif
+
+    if _HandlerCameraViewCacheLoad not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_HandlerCameraViewCacheLoad)
+    # endif
+
+
+# enddef
+
+
+#######################################################################################
+def UnregisterCameraViewCacheHandlers():
+    if _HandlerCameraViewCacheDepsgraphUpdate in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_HandlerCameraViewCacheDepsgraphUpdate)
+    # endif
+
+    if _HandlerCameraViewCacheLoad in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_HandlerCameraViewCacheLoad)
+    # endif
+
+    GetCameraViewCache().Clear()
+    GetSceneOcclusion().Clear()
+
+
+# enddef
+
+
+#######################################################################################
+# Custom object property that stores the render hide state of objects culled for rendering
+g_sRenderCullProp: str = "AnyCam.Cull"
+
+# Restore culled objects when the next render completes or is cancelled
+g_bRestoreCulledAfterRender: bool = False
+
+
+#######################################################################################
+# World matrix of an AnyCam camera, with its top object placed at the given location object,
+# as it is parented to the location for the elements of a camera set.
+def GetAnyCamMatrixAtLocation(_sCamId: str, _objLocation: bpy.types.Object) -> mathutils.Matrix:
+    objCam = bpy.data.objects.get(_sCamId)
+    if objCam is None:
+        raise RuntimeError(f"Camera object with id '{_sCamId}' not found.")
+    # endif
+
+    objTop = GetAnyCamTopObject(_sCamId)
+    if objTop.parent == _objLocation:
+        return objCam.matrix_world.copy()
+    # endif
+
+    matTop = _objLocation.matrix_world @ objTop.matrix_parent_inverse @ objTop.matrix_basis
+    return matTop @ objTop.matrix_world.inverted() @ objCam.matrix_world
+
+
+# enddef
+
+
+#######################################################################################
+# Cycles does not report its BVH build time to Python. The build time is estimated
+# to scale with n log(n) of the primitive count n.
+def _EstimateBvhBuildCost(_iPrimCnt: int) -> float:
+    return _iPrimCnt * math.log2(_iPrimCnt) if _iPrimCnt > 1 else 0.0
+
+
+# enddef
+
+
+#######################################################################################
+# Evaluate which renderable objects of the scene do not intersect the viewing volume
+# of any of the given cameras, expanded by a margin in meters.
+# The cameras are given as list of tuples (camera id, world matrix),
+# where the world matrix may be None to use the current camera transform.
+def EvalRenderCulling(_xContext: bpy.types.Context, _lCameras: list, *, fMargin_m: float = 1.0) -> dict:
+    xDepsgraph = _xContext.evaluated_depsgraph_get()
+    fMeterPerBU: float = _xContext.scene.unit_settings.scale_length
+
+    lViews = []
+    setIgnore = set()
+    for sCamId, matCamera in _lCameras:
+        xView = GetAnyCamView(_xContext, sCamId, _bAddExtrinsics=True, _matCamera=matCamera)
+        if xView is None:
+            raise CAnyExcept(f"Camera view of camera '{sCamId}' could not be created")
+        # endif
+        lViews.append(xView)
+
+        # Never cull the camera hierarchies, e.g. the lens system of LFT cameras
+        objTop = GetAnyCamTopObject(sCamId)
+        setIgnore.add(objTop.name)
+        setIgnore.update(GetObjectChildrenNames(objTop, Recursive=True))
+    # endfor
+
+    lObjects = [
+        objX
+        for objX in _xContext.scene.objects
+        if objX.type in g_setGeometryTypes and objX.hide_render is False and objX.name not in setIgnore
+    ]
+
+    # World bounding boxes of the evaluated objects, including modifiers
+    aCorners = np.empty((len(lObjects), 8, 3))
+    aFaceCnt = np.zeros(len(lObjects), dtype=np.int64)
+    for iIdx, objX in enumerate(lObjects):
+        objEval = objX.evaluated_get(xDepsgraph)
+        aMatrix = np.array(objEval.matrix_world)
+        aCorners[iIdx] = np.array(objEval.bound_box) @ aMatrix[0:3, 0:3].T + aMatrix[0:3, 3]
+        if objEval.type == "MESH":
+            aFaceCnt[iIdx] = len(objEval.data.polygons)
+        # endif
+    # endfor
+    aCorners *= fMeterPerBU
+
+    aVisible = np.zeros(len(lObjects), dtype=bool)
+    if len(lObjects) > 0:
+        aMin_m = aCorners.min(axis=1)
+        aMax_m = aCorners.max(axis=1)
+        for xView in lViews:
+            aVisible |= xView.CullAABBs(aMin_m, aMax_m, _fMargin_m=fMargin_m)
+        # endfor
+    # endif
+
+    iFaceCnt = int(aFaceCnt.sum())
+    iCulledFaceCnt = int(aFaceCnt[~aVisible].sum())
+
+    fBuildCost = _EstimateBvhBuildCost(iFaceCnt)
+    if fBuildCost > 0.0:
+        fBvhTimeSavedRatio = 1.0 - _EstimateBvhBuildCost(iFaceCnt - iCulledFaceCnt) / fBuildCost
+    else:
+        fBvhTimeSavedRatio = 0.0
+    # endif
+
+    return {
+        "iObjectCnt": len(lObjects),
+        "lCulledNames": [objX.name for objX, bVisible in zip(lObjects, aVisible) if not bVisible],
+        "iFaceCnt": iFaceCnt,
+        "iCulledFaceCnt": iCulledFaceCnt,
+        "fBvhTimeSavedRatio": fBvhTimeSavedRatio,
+    }
+
+
+# enddef
+
+
+#######################################################################################
+# Exclude all objects from rendering, which are outside the viewing volumes of the given cameras.
+# The render hide states are stored with the objects, so that they can be restored.
+def CullRenderObjects(
+    _xContext: bpy.types.Context, _lCameras: list, *, fMargin_m: float = 1.0, bRestoreAfterRender: bool = True
+) -> dict:
+    global g_bRestoreCulledAfterRender
+
+    RestoreCulledRenderObjects()
+
+    dicResult = EvalRenderCulling(_xContext, _lCameras, fMargin_m=fMargin_m)
+    for sName in dicResult["lCulledNames"]:
+        objX = bpy.data.objects.get(sName)
+        objX[g_sRenderCullProp] = json.dumps({"bRender": objX.hide_render})
+        objX.hide_render = True
+    # endfor
+
+    g_bRestoreCulledAfterRender = bRestoreAfterRender
+
+    return dicResult
+
+
+# enddef
+
+
+#######################################################################################
+# Restore the render hide states of all objects culled by CullRenderObjects().
+# Returns the number of restored objects.
+def RestoreCulledRenderObjects() -> int:
+    global g_bRestoreCulledAfterRender
+
+    g_bRestoreCulledAfterRender = False
+
+    iCnt = 0
+    for objX in bpy.data.objects:
+        sData = objX.get(g_sRenderCullProp)
+        if sData is None:
+            continue
+        # endif
+
+        dicData = json.loads(sData)
+        bHide = dicData.get("bRender")
+        if isinstance(bHide, bool):
+            objX.hide_render = bHide
+        # endif
+        del objX[g_sRenderCullProp]
+        iCnt += 1
+    # endfor
+
+    return iCnt
+
+
+# enddef
+
+
+#######################################################################################
+@bpy.app.handlers.persistent
+def _HandlerRenderCullRestore(_xScene, *args):
+    if g_bRestoreCulledAfterRender is True:
+        RestoreCulledRenderObjects()
+    # endif
+
+
+# enddef
+
+
+#######################################################################################
+def RegisterRenderCullHandlers():
+    for lHandlers in (bpy.app.handlers.render_complete, bpy.app.handlers.render_cancel):
+        if _HandlerRenderCullRestore not in lHandlers:
+            lHandlers.append(_HandlerRenderCullRestore)
+        # endif
+    # endfor
+
+
+# enddef
+
+
+#######################################################################################
+def UnregisterRenderCullHandlers():
+    for lHandlers in (bpy.app.handlers.render_complete, bpy.app.handlers.render_cancel):
+        if _HandlerRenderCullRestore in lHandlers:
+            lHandlers.remove(_HandlerRenderCullRestore)
+        # endif
+    # endfor
 
 
 # enddef
@@ -1232,7 +1536,7 @@ def GetAnyCamHorizFov_deg(_objCam, _dicAnyCam):
     fFovHoriz_deg = None
     lFov_deg = _dicAnyCam.get("lFov_deg")
     if lFov_deg is None or not isinstance(lFov_deg, list) or len(lFov_deg) != 2 or lFov_deg[0] == 0:
-        xView = obj.camera.CreateCameraView(_dicAnyCam, bDoThrow=False)
+        xView = GetCameraViewCache().GetView(_objCam.name, _dicAnyCam, _CreateCameraView)
         if xView is not None:
             fFovHoriz_deg = xView.lFov_deg[0]
         else:
@@ -1253,7 +1557,7 @@ def GetAnyCamFov_deg(_objCam, _dicAnyCam):
     # Try to get horizontal FoV for camera
     lFov_deg = _dicAnyCam.get("lFov_deg")
     if lFov_deg is None or not isinstance(lFov_deg, list) or len(lFov_deg) != 2 or lFov_deg[0] == 0 or lFov_deg[1] == 0:
-        xView = obj.camera.CreateCameraView(_dicAnyCam, bDoThrow=False)
+        xView = GetCameraViewCache().GetView(_objCam.name, _dicAnyCam, _CreateCameraView)
         if xView is not None:
             lFov_deg = xView.lFov_deg
         else:
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \bench-equirect-projection.py
+# Created Date: Friday, October 16th 2026, 5:12:40 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Throughput benchmark of the equirectangular camera view projection and unprojection.
+# Run with the anycam module on the Python path:
+#   python bench-equirect-projection.py [--counts 10000 1000000 10000000] [--loop-count 100000]
+#
+# The per-point loop measures a generic projection as done per point in Python,
+# for comparison with the vectorized projection.
+
+import math
+import time
+import argparse
+
+import numpy as np
+
+from anycam.obj.cls_cameraview_pano_equirect import CCameraViewPanoEquirect
+
+
+############################################################################
+def ProjectLoop(_xView: CCameraViewPanoEquirect, _aLocPnts_m: np.ndarray) -> list:
+    fLongMin_deg, fLongMax_deg = _xView.lFovRange_deg[0]
+    fLatMin_deg, fLatMax_deg = _xView.lFovRange_deg[1]
+    fPixPerDegX, fPixPerDegY = _xView.fPixPerDegX, _xView.fPixPerDegY
+
+    lResult = []
+    for fX, fY, fZ in _aLocPnts_m.tolist():
+        fLong_deg = math.degrees(math.atan2(fX, -fZ))
+        fLat_deg = math.degrees(math.atan2(fY, math.hypot(fX, fZ)))
+        bValid = fLongMin_deg <= fLong_deg <= fLongMax_deg and fLatMin_deg <= fLat_deg <= fLatMax_deg
+        lResult.append(((fLong_deg - fLongMin_deg) * fPixPerDegX, (fLatMax_deg - fLat_deg) * fPixPerDegY, bValid))
+    # endfor
+
+    return lResult
+
+
+# enddef
+
+
+############################################################################
+def Measure(_funcRun, _iRepeatCnt: int = 3) -> float:
+    # Returns the best run time in seconds
+    fBest_s = math.inf
+    for _ in range(_iRepeatCnt):
+        fStart = time.perf_counter()
+        _funcRun()
+        fBest_s = min(fBest_s, time.perf_counter() - fStart)
+    # endfor
+
+    return fBest_s
+
+
+# enddef
+
+
+############################################################################
+def Run(_xView: CCameraViewPanoEquirect, _iPntCnt: int, _iLoopCnt: int):
+    xRng = np.random.default_rng(0)
+    aPnts_m = xRng.normal(size=(_iPntCnt, 3)) * 10.0
+    aPnts32_m = aPnts_m.astype(np.float32)
+
+    aOutPixXY = np.empty((_iPntCnt, 2))
+    aOutInFront = np.empty(_iPntCnt, dtype=bool)
+    aOutInImage = np.empty(_iPntCnt, dtype=bool)
+
+    aPixXY = xRng.uniform((0.0, 0.0), (_xView.iPixCntX, _xView.iPixCntY), size=(_iPntCnt, 2))
+
+    lResults = [
+        ("project float64", Measure(lambda: _xView.ProjectToImageArray(aPnts_m))),
+        ("project float32", Measure(lambda: _xView.ProjectToImageArray(aPnts32_m))),
+        (
+            "project out-buffers",
+            Measure(
+                lambda: _xView.ProjectToImageArray(
+                    aPnts_m, _aOutPixXY=aOutPixXY, _aOutInFront=aOutInFront, _aOutInImage=aOutInImage
+                )
+            ),
+        ),
+        ("unproject", Measure(lambda: _xView.UnprojectPixels(aPixXY))),
+    ]
+
+    iLoopCnt = min(_iPntCnt, _iLoopCnt)
+    if iLoopCnt > 0:
+        aLocPnts_m = _xView.PointsToCameraFrame(aPnts_m[0:iLoopCnt])
+        fLoop_s = Measure(lambda: ProjectLoop(_xView, aLocPnts_m), _iRepeatCnt=1)
+        lResults.append(("per-point loop", fLoop_s * _iPntCnt / iLoopCnt))
+    # endif
+
+    print(f"\n{_iPntCnt} points")
+    for sName, fTime_s in lResults:
+        print(f"  {sName:<20} {fTime_s:9.4f} s, {_iPntCnt / fTime_s / 1e6:9.2f} M points/s")
+    # endfor
+
+
+# enddef
+
+
+############################################################################
+def Main():
+    xParser = argparse.ArgumentParser(description="Benchmark equirectangular camera view projection")
+    xParser.add_argument("--counts", nargs="+", type=int, default=[10000, 1000000, 10000000], help="point counts")
+    xParser.add_argument(
+        "--loop-count", type=int, default=100000, help="maximal number of points for the per-point loop"
+    )
+    xArgs = xParser.parse_args()
+
+    xView = CCameraViewPanoEquirect()
+    xView.Init(
+        lPixCnt=[4096, 2048],
+        fPixSize_um=3.0,
+        lFovRange_deg=[[-180.0, 180.0], [-90.0, 90.0]],
+        lAxes=[[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, -1.0, 0.0]],
+        lOrig_m=[0.0, 0.0, 1.5],
+    )
+
+    for iPntCnt in xArgs.counts:
+        Run(xView, iPntCnt, xArgs.loop_count)
+    # endfor
+
+
+# enddef
+
+
+if __name__ == "__main__":
+    Main()
+# endif
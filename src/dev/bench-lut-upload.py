@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \bench-lut-upload.py
+# Created Date: Friday, October 16th 2026, 11:02:17 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Benchmark of LUT upload into and readback from Blender images.
+# Run in Blender with the anycam module on the Python path:
+#   blender -b --factory-startup --python bench-lut-upload.py -- [--legacy] [--sizes 1024 4096 8192]
+#
+# With '--legacy' the former list based upload and readback is measured as well.
+# This needs a lot of memory for large LUTs.
+
+import sys
+import time
+import argparse
+import resource
+import tracemalloc
+
+import bpy
+import numpy as np
+
+from anycam.obj.camera_lut import SetBlenderImagePixels, GetBlenderImagePixels
+
+
+############################################################################
+def GetMaxRss_MB() -> float:
+    # ru_maxrss is given in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+# enddef
+
+
+############################################################################
+def Measure(_funcRun) -> tuple[float, float, float]:
+    """Returns run time in seconds, peak traced Python memory in MB
+    and increase of peak resident set size of the process in MB."""
+    fMaxRss_MB = GetMaxRss_MB()
+    tracemalloc.start()
+    fStart = time.perf_counter()
+    _funcRun()
+    fTime_s = time.perf_counter() - fStart
+    _, iPeak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return fTime_s, iPeak / 1e6, GetMaxRss_MB() - fMaxRss_MB
+
+
+# enddef
+
+
+############################################################################
+def CreateLut(_iSize: int) -> np.ndarray:
+    # Equidistant fisheye LUT with 180 degree FoV, as created by CCameraLut.
+    aX = (np.arange(_iSize, dtype=np.float32) + 0.5) / _iSize * 2.0 - 1.0
+    aGridX, aGridY = np.meshgrid(aX, -aX)
+    aTheta = np.hypot(aGridX, aGridY) * (np.pi / 2.0)
+    aPhi = np.arctan2(aGridY, aGridX)
+
+    imgLut = np.empty((_iSize, _iSize, 4), dtype=np.float64)
+    imgLut[:, :, 0] = np.sin(aTheta) * np.cos(aPhi)
+    imgLut[:, :, 1] = np.sin(aTheta) * np.sin(aPhi)
+    imgLut[:, :, 2] = -np.cos(aTheta)
+    imgLut[:, :, 3] = 1.0
+    imgLut[aTheta > np.pi / 2.0, 0:3] = 0.0
+
+    # CCameraLut stores the LUT with top row first, Blender with bottom row first
+    return np.flipud(imgLut)
+
+
+# enddef
+
+
+############################################################################
+def Run(_iSize: int, _bLegacy: bool):
+    imgLut = CreateLut(_iSize)
+    imgA = bpy.data.images.new(
+        f"Bench.Lut.{_iSize}", _iSize, _iSize, alpha=True, float_buffer=True, is_data=True
+    )
+
+    lResults = []
+
+    if _bLegacy is True:
+
+        def LegacyUpload():
+            imgA.pixels = list(imgLut.flatten())
+
+        # enddef
+
+        def LegacyReadback():
+            np.asarray(imgA.pixels, dtype=np.float32).reshape(_iSize, _iSize, -1)
+
+        # enddef
+
+        lResults.append(("list upload", Measure(LegacyUpload)))
+        lResults.append(("list readback", Measure(LegacyReadback)))
+    # endif
+
+    lResults.append(("buffer upload", Measure(lambda: SetBlenderImagePixels(imgA, imgLut))))
+
+    lReadback = []
+    lResults.append(("buffer readback", Measure(lambda: lReadback.append(GetBlenderImagePixels(imgA)))))
+
+    fMaxDiff = np.max(np.abs(lReadback[0] - imgLut.astype(np.float32)))
+    bpy.data.images.remove(imgA)
+
+    print(f"\nLUT {_iSize} x {_iSize} ({imgLut.nbytes / 1e6:.0f} MB as float64), max. readback error: {fMaxDiff}")
+    for sName, (fTime_s, fPeak_MB, fRss_MB) in lResults:
+        print(f"  {sName:<16} {fTime_s:8.3f} s, peak traced: {fPeak_MB:9.1f} MB, peak RSS increase: {fRss_MB:9.1f} MB")
+    # endfor
+
+
+# enddef
+
+
+############################################################################
+def Main():
+    lArgv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+
+    xParser = argparse.ArgumentParser(description="Benchmark LUT upload into Blender images")
+    xParser.add_argument("--legacy", action="store_true", help="also measure the list based upload and readback")
+    xParser.add_argument("--sizes", nargs="+", type=int, default=[1024, 4096, 8192], help="LUT sizes in pixels")
+    xArgs = xParser.parse_args(lArgv)
+
+    # Peak RSS never decreases, so measure the sizes in increasing order
+    for iSize in sorted(xArgs.sizes):
+        Run(iSize, xArgs.legacy)
+    # endfor
+
+
+# enddef
+
+
+if __name__ == "__main__":
+    Main()
+# endif
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \tests\conftest.py
+# Created Date: Saturday, October 17th 2026, 10:02:47 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+import pytest
+
+
+# ##########################################################################################################
+@pytest.fixture
+def imgFisheyeLut() -> np.ndarray:
+    """Synthetic RGBA LUT of an equidistant fisheye camera with a FoV of 190 degrees on the sensor diagonal,
+    with 240 by 320 pixels. Rays beyond the FoV are zero. The alpha channel is a radial vignetting."""
+    iRows, iCols = 240, 320
+    fAngleMax_rad = np.radians(95.0)
+
+    aRow, aCol = np.mgrid[0:iRows, 0:iCols].astype(np.float64)
+    aX = aCol - (iCols / 2.0 - 0.5)
+    aY = (iRows / 2.0 - 0.5) - aRow
+    aRad = np.hypot(aX, aY)
+    aAngle = aRad * (fAngleMax_rad / np.hypot(iCols / 2.0, iRows / 2.0)) * 1.2
+    aValid = aAngle <= fAngleMax_rad
+
+    aRadSafe = np.where(aRad > 0.0, aRad, 1.0)
+    imgLut = np.zeros((iRows, iCols, 4), dtype=np.float32)
+    imgLut[:, :, 0] = np.sin(aAngle) * aX / aRadSafe
+    imgLut[:, :, 1] = np.sin(aAngle) * aY / aRadSafe
+    imgLut[:, :, 2] = -np.cos(aAngle)
+    imgLut[:, :, 3] = np.cos(aAngle / 2.0)
+    imgLut[~aValid] = 0.0
+
+    return imgLut
+
+
+# enddef
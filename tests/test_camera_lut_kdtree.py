@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \tests\test_camera_lut_kdtree.py
+# Created Date: Saturday, October 17th 2026, 12:08:36 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+from pathlib import Path
+import pytest
+
+pytest.importorskip("anybase")
+pytest.importorskip("anyblend")
+
+from anycam.model.cls_camera_lut import CCameraLut
+from anycam.model.cls_lut_container import CLutContainer
+
+
+# ##########################################################################################################
+def _SaveLutContainer(_imgLut: np.ndarray, _pathFolder: Path) -> Path:
+    xCamLut = CCameraLut()
+    xCamLut.FromArray(_imgLut=_imgLut, _iLutBorderPixel=0, _iLutSuperSampling=2)
+    pathFile = _pathFolder / f"lut{CLutContainer.c_sSuffix}"
+    xCamLut.SaveContainer(pathFile)
+    return pathFile
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_kdtree_file_is_only_used_with_opt_in(imgFisheyeLut, tmp_path):
+    pathFile = _SaveLutContainer(imgFisheyeLut, tmp_path)
+
+    # Without opt-in, the KD-tree is neither saved nor loaded
+    xCamLut = CCameraLut()
+    xCamLut.FromFile(_xFilePath=pathFile)
+    xCamLut.GetKdTree()
+    pathKdTree = xCamLut.GetKdTreeFilePath()
+    assert not pathKdTree.exists()
+
+    xCamLut.SaveKdTree()
+    assert pathKdTree.exists()
+    with pytest.raises(RuntimeError):
+        xCamLut.LoadKdTree()
+    # endwith
+
+    # With opt-in, the saved KD-tree is loaded instead of being rebuilt
+    xLoaded = CCameraLut()
+    xLoaded.FromFile(_xFilePath=pathFile, _bAllowKdTreePickle=True)
+    assert xLoaded.LoadKdTree(_bAllowPickle=True) is True
+    assert np.array_equal(xLoaded.GetKdTree().indices, xCamLut.GetKdTree().indices)
+
+
+# enddef
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \tests\test_camera_lut_precision.py
+# Created Date: Saturday, October 17th 2026, 11:42:05 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+import pytest
+
+pytest.importorskip("anybase")
+pytest.importorskip("anyblend")
+
+from anycam.model.cls_camera_lut import CCameraLut
+
+# Tolerances for values derived from a float32 LUT evaluation, compared to the float64 evaluation.
+# The LUT directions are unit vectors, so float32 rounding (about 6e-8) leads to angle differences
+# in the order of 1e-6 rad. The render FoV, crop and shift are derived from integer pixel counts and
+# the maximal radial angle, which is rounded to full degrees, so they must agree exactly.
+c_fAngleTol_deg = 1e-4
+c_fAngleTol_rad = 1e-5
+c_fPixelRadiusTol_pix = 1e-4
+
+
+# ##########################################################################################################
+def _CreateCameraLut(_imgLut: np.ndarray, _sPrecision: str, _iLutBorderPixel: int) -> CCameraLut:
+    xCamLut = CCameraLut()
+    xCamLut.FromArray(_imgLut=_imgLut, _iLutBorderPixel=_iLutBorderPixel, _iLutSuperSampling=2, _sPrecision=_sPrecision)
+    return xCamLut
+
+
+# enddef
+
+
+# ##########################################################################################################
+@pytest.mark.parametrize("iLutBorderPixel", [0, 3])
+def test_derived_values_agree_between_precisions(imgFisheyeLut, iLutBorderPixel):
+    xLut32 = _CreateCameraLut(imgFisheyeLut, "float32", iLutBorderPixel)
+    xLut64 = _CreateCameraLut(imgFisheyeLut, "float64", iLutBorderPixel)
+
+    assert xLut32.xDType == np.float32
+    assert xLut64.xDType == np.float64
+
+    # Render FoV, crop and camera shift
+    assert xLut32.fRenderFoV_deg == xLut64.fRenderFoV_deg
+    assert xLut32.fRadAngleMax_deg == xLut64.fRadAngleMax_deg
+    assert xLut32.iRenderPixCnt == xLut64.iRenderPixCnt
+    assert xLut32.tCamShiftXY == pytest.approx(xLut64.tCamShiftXY, rel=0.0, abs=1e-12)
+    assert tuple(xLut32.xRenderCrop) == pytest.approx(tuple(xLut64.xRenderCrop), rel=0.0, abs=1e-12)
+    assert xLut32.tRenderLutAngleRangeX_deg == pytest.approx(xLut64.tRenderLutAngleRangeX_deg, abs=1e-12)
+    assert xLut32.tRenderLutAngleRangeY_deg == pytest.approx(xLut64.tRenderLutAngleRangeY_deg, abs=1e-12)
+
+    # LUT FoV and angle ranges
+    assert xLut32.tLutFovXY_deg == pytest.approx(xLut64.tLutFovXY_deg, rel=0.0, abs=c_fAngleTol_deg)
+    assert xLut32.tLutAngleRangeX_deg == pytest.approx(xLut64.tLutAngleRangeX_deg, rel=0.0, abs=c_fAngleTol_deg)
+    assert xLut32.tLutAngleRangeY_deg == pytest.approx(xLut64.tLutAngleRangeY_deg, rel=0.0, abs=c_fAngleTol_deg)
+
+    # Per pixel angles and radii follow the selected precision
+    aAngles32 = xLut32.GetLutAngles_rad()
+    aAngles64 = xLut64.GetLutAngles_rad()
+    assert aAngles32.dtype == np.float32
+    assert aAngles64.dtype == np.float64
+    assert np.max(np.abs(aAngles32 - aAngles64)) <= c_fAngleTol_rad
+
+    aRadii32 = xLut32.GetLutImgPixelRadii()
+    aRadii64 = xLut64.GetLutImgPixelRadii()
+    assert aRadii32.dtype == np.float32
+    assert np.max(np.abs(aRadii32 - aRadii64)) <= c_fPixelRadiusTol_pix
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_unsupported_precision_raises(imgFisheyeLut):
+    with pytest.raises(RuntimeError):
+        _CreateCameraLut(imgFisheyeLut, "float16", 0)
+    # endwith
+
+
+# enddef
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \tests\test_camera_pano_poly_fit.py
+# Created Date: Saturday, October 17th 2026, 2:05:17 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import math
+import numpy as np
+import pytest
+
+pytest.importorskip("anybase")
+pytest.importorskip("anyblend")
+
+from numpy.polynomial import Polynomial
+
+from anycam.model.cls_camera_lut import CCameraLut
+from anycam.model.cls_camera_pano_poly import CCameraPanoPoly
+
+# Pixel size of the polynomial camera, fitted to the synthetic fisheye LUT
+c_fPixSize_um = 3.0
+
+
+# ##########################################################################################################
+def _GetEquidistantSlope_rad_mm(_imgLut: np.ndarray) -> float:
+    # Slope of the equidistant fisheye LUT in conftest.py, in radians per mm on the sensor
+    iRows, iCols = _imgLut.shape[0:2]
+    fSlope_rad_pix = math.radians(95.0) / math.hypot(iCols / 2.0, iRows / 2.0) * 1.2
+    return fSlope_rad_pix / (c_fPixSize_um * 1e-3)
+
+
+# enddef
+
+
+# ##########################################################################################################
+def _CreateCamera(_imgLut: np.ndarray, *, _bStreamFit: bool = False) -> CCameraPanoPoly:
+    xCamPoly = CCameraPanoPoly()
+    xCamPoly.FromLut(
+        _lPixCntXY=[_imgLut.shape[1], _imgLut.shape[0]],
+        _fPixSize_um=c_fPixSize_um,
+        _imgLut=_imgLut,
+        _bStreamFit=_bStreamFit,
+    )
+    return xCamPoly
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_lut_fit_recovers_equidistant_slope(imgFisheyeLut):
+    xCamPoly = _CreateCamera(imgFisheyeLut)
+
+    # The fit must have full rank and an almost vanishing residual, also for a float32 LUT
+    lResid, iRank = xCamPoly.lPolyFitQuality[0:2]
+    assert iRank == 5
+    assert len(lResid) == 1 and lResid[0] < 1e-9
+
+    # The fitted polynomial is linear with the slope of the equidistant fisheye
+    fSlope_rad_mm = _GetEquidistantSlope_rad_mm(imgFisheyeLut)
+    aRad_mm = np.linspace(0.0, 0.6, 13)
+    aAngle_rad = xCamPoly.polyAngle_rad_mm(aRad_mm)
+    assert np.max(np.abs(aAngle_rad - fSlope_rad_mm * aRad_mm)) < 1e-6
+
+
+# enddef
+
+
+# ##########################################################################################################
+def _FitReference(_imgLut: np.ndarray) -> tuple[Polynomial, list]:
+    # Weighted fit of FromLut(), evaluated with Polynomial.fit() on a float64 LUT
+    xCamLut = CCameraLut()
+    xCamLut.FromArray(_imgLut=_imgLut, _sPrecision="float64")
+    aImgRad_mm = xCamLut.GetLutImgPixelRadii().reshape(-1) * (c_fPixSize_um * 1e-3)
+    aImgAngles_rad = xCamLut.GetLutAngles_rad()[:, :, 0].reshape(-1)
+
+    iBinCnt = int(max(_imgLut.shape[0:2]))
+    fImgMaxRad_mm = float(np.max(aImgRad_mm))
+    aHistBins = np.linspace(0.0, fImgMaxRad_mm, num=iBinCnt + 1)
+    aHistBins[iBinCnt] += 1.0
+    aRadCnt, _ = np.histogram(aImgRad_mm, bins=aHistBins)
+    aRadBins = np.digitize(aImgRad_mm, aHistBins) - 1
+    aWeights = np.min(aRadCnt, where=aRadCnt > 0, initial=aImgRad_mm.size) / aRadCnt[aRadBins]
+
+    polyRef, lQuality = Polynomial.fit(
+        aImgRad_mm,
+        aImgAngles_rad,
+        deg=4,
+        w=aWeights,
+        domain=[0.0, fImgMaxRad_mm],
+        window=[0.0, 1.0],
+        full=True,
+    )
+    return polyRef, lQuality
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_streamed_fit_matches_float64_reference(imgFisheyeLut):
+    polyRef, lQualityRef = _FitReference(imgFisheyeLut)
+    assert int(lQualityRef[1]) == 5
+
+    # The camera LUT is evaluated in float32, the streamed fit must still match the float64 reference
+    xCamPoly = _CreateCamera(imgFisheyeLut, _bStreamFit=True)
+    lResid, iRank = xCamPoly.lPolyFitQuality[0:2]
+    assert iRank == int(lQualityRef[1])
+    assert len(lResid) == 1
+    assert lResid[0] == pytest.approx(float(lQualityRef[0][0]), abs=1e-12)
+
+    # FromLut() sets the constant coefficient to zero
+    aCoefRef = polyRef.coef.copy()
+    aCoefRef[0] = 0.0
+    assert np.allclose(xCamPoly.polyAngle_rad_mm.coef, aCoefRef, rtol=0.0, atol=1e-5)
+    assert np.allclose(xCamPoly.polyAngle_rad_mm.domain, polyRef.domain, rtol=1e-6, atol=0.0)
+
+
+# enddef
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \tests\test_camera_pano_poly_inverse.py
+# Created Date: Saturday, October 17th 2026, 9:12:03 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+import pytest
+
+pytest.importorskip("anybase")
+pytest.importorskip("anyblend")
+
+from anycam.model.cls_camera_pano_poly import CCameraPanoPoly
+
+
+# ##########################################################################################################
+def _CreateCamera(_lPolyCoef_rad_mm: list[float]) -> CCameraPanoPoly:
+    xCamPoly = CCameraPanoPoly()
+    xCamPoly.FromCoef(
+        _lPixCntXY=[1920, 1440],
+        _fPixSize_um=3.0,
+        _lPolyCoef_rad_mm=_lPolyCoef_rad_mm,
+        _lCenterOffsetXY_mm=[0.03, -0.02],
+        _fFovMax_deg=200.0,
+    )
+    return xCamPoly
+
+
+# enddef
+
+
+# ##########################################################################################################
+def _GetTestDirs() -> np.ndarray:
+    aDirs = np.random.default_rng(1).normal(size=(1000, 3))
+    aDirs[:, 2] = -np.abs(aDirs[:, 2])
+    return aDirs
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_auto_mode_uses_polynomial_if_accurate():
+    xCamPoly = _CreateCamera([0.0, 0.45, 0.05, -0.03, 0.004])
+
+    # Switching from table to auto must release the table again
+    xCamPoly.SetInverseMode("table", _fMaxError_pix=0.01)
+    assert xCamPoly.bUseInverseTable is True
+
+    xCamPoly.SetInverseMode("auto", _fMaxError_pix=0.01)
+    assert xCamPoly.bUseInverseTable is False
+    assert xCamPoly.fInverseTableError_pix is None
+
+    aAngle_rad = np.linspace(0.0, 1.0, 100)
+    assert np.array_equal(xCamPoly.AnglesToRadii_mm(aAngle_rad), xCamPoly._polyRadius_mm_rad(aAngle_rad))
+
+    aPixPosXY, aValid = xCamPoly.RayDirsToPixelsXY(_GetTestDirs(), _bNormalize=True)
+    assert np.all(np.isfinite(aPixPosXY[aValid]))
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_auto_mode_uses_table_if_polynomial_inaccurate():
+    # The angle polynomial has a maximum inside the sensor, so that the inverse polynomial fit is poor
+    xCamPoly = _CreateCamera([0.0, 0.3, 0.2, -0.1])
+
+    xCamPoly.SetInverseMode("auto", _fMaxError_pix=0.01)
+    assert xCamPoly.bUseInverseTable is True
+    assert xCamPoly.fInverseTableError_pix < xCamPoly._fPolyRadiusFit_ResidualMax_pix
+
+    aPixPosXY, aValid = xCamPoly.RayDirsToPixelsXY(_GetTestDirs(), _bNormalize=True)
+    assert np.any(aValid)
+    assert np.all(np.isfinite(aPixPosXY[aValid]))
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_auto_mode_does_not_use_table_with_newton_refinement(monkeypatch):
+    xCamPoly = _CreateCamera([0.0, 0.3, 0.2, -0.1])
+    funcEvalInverseTable = xCamPoly._EvalInverseTable
+
+    # Table with Newton refinement is slower than the polynomial
+    def EvalInverseTableWithNewton():
+        funcEvalInverseTable()
+        xCamPoly._iInvTableNewtonCnt = 1
+
+    # enddef
+
+    monkeypatch.setattr(xCamPoly, "_EvalInverseTable", EvalInverseTableWithNewton)
+
+    xCamPoly.SetInverseMode("auto", _fMaxError_pix=0.01)
+    assert xCamPoly.bUseInverseTable is False
+
+    xCamPoly.SetInverseMode("table", _fMaxError_pix=0.01)
+    assert xCamPoly.bUseInverseTable is True
+
+
+# enddef
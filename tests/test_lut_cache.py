@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \tests\test_lut_cache.py
+# Created Date: Saturday, October 17th 2026, 12:31:52 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+import pytest
+
+pytest.importorskip("anybase")
+pytest.importorskip("anyblend")
+
+from anycam.model.cls_camera_lut import CCameraLut
+from anycam.model.cls_lut_cache import CLutCache
+
+
+# ##########################################################################################################
+@pytest.fixture
+def funcCreateLut(imgFisheyeLut):
+    def CreateLut() -> CCameraLut:
+        xCamLut = CCameraLut()
+        xCamLut.FromArray(_imgLut=imgFisheyeLut, _iLutBorderPixel=0, _iLutSuperSampling=2)
+        return xCamLut
+
+    # enddef
+
+    return CreateLut
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_cache_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv(CLutCache.c_sEnvPath, raising=False)
+    monkeypatch.delenv(CLutCache.c_sEnvMaxSize, raising=False)
+    assert CLutCache().bEnabled is False
+
+    monkeypatch.setenv(CLutCache.c_sEnvMaxSize, "0")
+    assert CLutCache().bEnabled is False
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_cache_is_enabled_by_path(monkeypatch, tmp_path):
+    monkeypatch.setenv(CLutCache.c_sEnvPath, tmp_path.as_posix())
+    monkeypatch.delenv(CLutCache.c_sEnvMaxSize, raising=False)
+    xCache = CLutCache()
+    assert xCache.bEnabled is True
+    assert xCache.iMaxSize_bytes == CLutCache.c_iDefaultMaxSize_MB * 1024 * 1024
+
+    monkeypatch.delenv(CLutCache.c_sEnvPath)
+    assert CLutCache(_xPath=tmp_path).bEnabled is True
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_cache_round_trip(funcCreateLut, tmp_path):
+    xCache = CLutCache(_xPath=tmp_path)
+    dicParams = {"sType": "test", "iSuperSampling": 2}
+
+    xCamLut = xCache.GetOrCreateCameraLut(dicParams, funcCreateLut)
+    xCached = xCache.GetCameraLut(CLutCache.CreateKey(dicParams))
+    assert xCached is not None
+    assert xCached.GetStateDict() == xCamLut.GetStateDict()
+    assert np.array_equal(xCached.imgLut, xCamLut.imgLut)
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_cache_write_failure_warns(funcCreateLut, tmp_path):
+    # The cache path is a file, so the cache folder cannot be created
+    pathCache = tmp_path / "cache"
+    pathCache.write_text("")
+    xCache = CLutCache(_xPath=pathCache)
+
+    with pytest.warns(RuntimeWarning, match="Cannot write LUT to cache"):
+        xCamLut = xCache.GetOrCreateCameraLut({"sType": "test"}, funcCreateLut)
+    # endwith
+    assert xCamLut is not None
+
+
+# enddef
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \tests\test_lut_container.py
+# Created Date: Saturday, October 17th 2026, 10:14:21 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Camera add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+import pytest
+
+pytest.importorskip("anybase")
+pytest.importorskip("anyblend")
+
+from anycam.model.cls_camera_lut import CCameraLut
+from anycam.model.cls_lut_container import CLutContainer
+
+
+# ##########################################################################################################
+def _CreateCameraLut(_imgLut: np.ndarray) -> CCameraLut:
+    xCamLut = CCameraLut()
+    xCamLut.FromArray(_imgLut=_imgLut, _iLutBorderPixel=0, _iLutSuperSampling=2)
+    return xCamLut
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_float32_round_trip_is_exact(imgFisheyeLut, tmp_path):
+    xCamLut = _CreateCameraLut(imgFisheyeLut)
+    pathFile = tmp_path / f"lut{CLutContainer.c_sSuffix}"
+    dicHeader = xCamLut.SaveContainer(pathFile, _sDType="float32")
+
+    assert CLutContainer.IsContainerFile(pathFile)
+    assert CLutContainer.ReadHeader(pathFile) == dicHeader
+
+    xLoaded = CCameraLut()
+    xLoaded.FromFile(_xFilePath=pathFile)
+
+    assert isinstance(xLoaded.imgLut, np.memmap)
+    assert xLoaded.GetStateDict() == xCamLut.GetStateDict()
+    assert np.array_equal(xLoaded.imgLut, xCamLut.imgLut)
+    assert np.array_equal(xLoaded.aLutMask, xCamLut.aLutMask)
+
+    # Corrupted data is detected by the content hash
+    xData = bytearray(pathFile.read_bytes())
+    xData[-1] ^= 1
+    pathFile.write_bytes(bytes(xData))
+    with pytest.raises(RuntimeError):
+        CLutContainer.Load(pathFile, _bVerifyHash=True)
+    # endwith
+
+
+# enddef
+
+
+# ##########################################################################################################
+def test_float16_round_trip_precision(imgFisheyeLut, tmp_path):
+    xCamLut = _CreateCameraLut(imgFisheyeLut)
+    pathFile = tmp_path / f"lut16{CLutContainer.c_sSuffix}"
+    xCamLut.SaveContainer(pathFile, _sDType="float16")
+
+    xLoaded = CCameraLut()
+    xLoaded.FromContainer(_xFilePath=pathFile, _bVerifyHash=True)
+
+    assert xLoaded.imgLut.dtype == np.float32
+    assert xLoaded.GetStateDict() == xCamLut.GetStateDict()
+    assert np.array_equal(xLoaded.aLutMask, xCamLut.aLutMask)
+
+    # Ray directions are of unit length again and deviate by less than 0.05 degrees
+    aMask = xCamLut.aLutMask[:, :, 0]
+    aDirs = xLoaded.imgLut[:, :, 0:3][aMask].astype(np.float64)
+    aRefDirs = xCamLut.imgLut[:, :, 0:3][aMask].astype(np.float64)
+    assert np.allclose(np.linalg.norm(aDirs, axis=1), 1.0, atol=1e-6)
+    fAngleMax_deg = np.degrees(np.max(np.arccos(np.clip(np.sum(aDirs * aRefDirs, axis=1), -1.0, 1.0))))
+    assert fAngleMax_deg < 0.05
+
+    # The rounding errors must not break the decimation of the frustum boundary
+    iVexCnt = xCamLut.GetFrustumMeshArrays(_fRayLen=1.0).aVex.shape[0]
+    iVexCnt16 = xLoaded.GetFrustumMeshArrays(_fRayLen=1.0).aVex.shape[0]
+    assert abs(iVexCnt16 - iVexCnt) <= 0.1 * iVexCnt
+
+    # Projection of ray directions to pixels deviates by less than half a pixel
+    aPixRC = np.array([[20.3, 30.7], [60.0, 80.0], [100.5, 150.2]])
+    aRayDirs, aValid = xCamLut.PixelsRCToRayDirsArray(aPixRC)
+    assert np.all(aValid)
+    aPixRC16, aValid16 = xLoaded.RayDirsToPixelsRCArray(aRayDirs, _bNormalize=True)
+    assert np.all(aValid16)
+    assert np.max(np.abs(aPixRC16 - aPixRC)) < 0.5
+
+
+# enddef